@@ -4,5 +4,5 @@ from flask import Blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 # 导入所有路由（必须在蓝图创建后导入）
-from . import stock_index, sector, trading_review, zt_pool, zb_pool, dt_pool, board_change
+from . import stock_index, sector, trading_review, zt_pool, zb_pool, dt_pool, board_change, snapshot, export, concept_membership, search, jobs
 
@@ -0,0 +1,92 @@
+from flask import jsonify, request
+from api import api_bp
+from services.concept_membership_service import ConceptMembershipService, POOL_MODELS
+from database.db import get_db
+from datetime import datetime
+
+@api_bp.route('/concept-membership/stock/<code>', methods=['GET'])
+def get_stock_concepts(code):
+    """获取股票所属的概念"""
+    try:
+        db = next(get_db())
+        concepts = ConceptMembershipService.get_stock_concepts(db, code)
+        return jsonify({
+            'success': True,
+            'code': code,
+            'data': concepts,
+            'count': len(concepts)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/concept-membership/concept/<concept>', methods=['GET'])
+def get_concept_stocks(concept):
+    """获取概念的成分股代码"""
+    try:
+        db = next(get_db())
+        stock_codes = ConceptMembershipService.get_concept_stocks(db, concept)
+        return jsonify({
+            'success': True,
+            'concept': concept,
+            'data': stock_codes,
+            'count': len(stock_codes)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/concept-membership/pool/<date_str>', methods=['GET'])
+def get_pool_concepts(date_str):
+    """
+    指定日期股票池中个股所属的概念排行（如"哪些概念带动了当日涨停"）
+    
+    路径参数:
+        date_str: 日期 (格式: YYYY-MM-DD)
+    
+    查询参数:
+        pool: 股票池，zt_pool（默认）/ zb_pool / dt_pool
+        top: 返回的概念数，默认 20，0 表示全部
+    """
+    try:
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+    
+    pool = request.args.get('pool', 'zt_pool')
+    if pool not in POOL_MODELS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid pool parameter. Must be one of: {', '.join(POOL_MODELS)}"
+        }), 400
+    
+    try:
+        top = int(request.args.get('top', 20))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid top parameter. Must be an integer'
+        }), 400
+    
+    try:
+        db = next(get_db())
+        concepts = ConceptMembershipService.get_pool_concepts(db, target_date, pool=pool, top=top or None)
+        return jsonify({
+            'success': True,
+            'date': date_str,
+            'pool': pool,
+            'data': concepts,
+            'count': len(concepts)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,102 @@
+from flask import Response, jsonify, request, stream_with_context
+from api import api_bp
+from services.export_service import ExportService, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
+from utils.columnar import iter_ndjson, iter_arrow_stream, iter_parquet, ARROW_MIMETYPE, PARQUET_MIMETYPE, NDJSON_MIMETYPE
+from datetime import datetime
+
+# 可选的导出格式
+FORMATS = ('ndjson', 'arrow', 'parquet')
+
+# Accept 请求头 -> 导出格式
+ACCEPT_FORMATS = {
+    NDJSON_MIMETYPE: 'ndjson',
+    'application/jsonl': 'ndjson',
+    ARROW_MIMETYPE: 'arrow',
+    PARQUET_MIMETYPE: 'parquet',
+    'application/x-parquet': 'parquet',
+}
+
+# 不作为列过滤条件的查询参数
+RESERVED_PARAMS = ('columns', 'start_date', 'end_date', 'format', 'chunk_size')
+
+def _negotiate_format():
+    """导出格式：优先使用 format 查询参数，其次根据 Accept 请求头，默认 ndjson"""
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt.lower()
+    best = request.accept_mimetypes.best_match(list(ACCEPT_FORMATS))
+    return ACCEPT_FORMATS.get(best, 'ndjson')
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+@api_bp.route('/export/<table>', methods=['GET'])
+def export_table(table):
+    """
+    按日期范围流式导出历史表（分块传输，适合批量消费方）
+    
+    路径参数:
+        table: 表名 (sector_history, zt_pool_history, zb_pool_history, dt_pool_history,
+               index_history, stock_fund_flow_history, market_daily_summary)
+    
+    查询参数:
+        start_date: 开始日期 (格式: YYYY-MM-DD，可选)
+        end_date: 结束日期 (格式: YYYY-MM-DD，可选)
+        columns: 导出的列（数据库列名），逗号分隔，默认全部
+        format: ndjson（默认）/ arrow（Arrow IPC 流）/ parquet；也可通过 Accept 请求头协商
+        chunk_size: 每块行数，默认 5000，最大 50000
+        其他参数: 按列过滤，如 code=000001,600000（逗号分隔为 IN），名称列按名称过滤
+    """
+    try:
+        start_date = _parse_date(request.args.get('start_date'))
+        end_date = _parse_date(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+    
+    fmt = _negotiate_format()
+    if fmt not in FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid format parameter. Must be one of: {', '.join(FORMATS)}"
+        }), 400
+    
+    try:
+        chunk_size = int(request.args.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        chunk_size = 0
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid chunk_size parameter. Must be between 1 and {MAX_CHUNK_SIZE}'
+        }), 400
+    
+    columns = request.args.get('columns')
+    columns = [name.strip() for name in columns.split(',') if name.strip()] if columns else None
+    filters = {
+        name: [value.strip() for raw in request.args.getlist(name) for value in raw.split(',')]
+        for name in request.args if name not in RESERVED_PARAMS
+    }
+    
+    try:
+        plan = ExportService.prepare(table, columns, start_date, end_date, filters)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    chunks = ExportService.iter_chunks(plan, chunk_size)
+    if fmt == 'arrow':
+        body, mimetype = iter_arrow_stream(plan.schema, chunks), ARROW_MIMETYPE
+    elif fmt == 'parquet':
+        body, mimetype = iter_parquet(plan.schema, chunks), PARQUET_MIMETYPE
+    else:
+        body, mimetype = iter_ndjson(chunks), NDJSON_MIMETYPE
+    
+    headers = {}
+    if fmt == 'parquet':
+        headers['Content-Disposition'] = f'attachment; filename={table}.parquet'
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
@@ -0,0 +1,125 @@
+from flask import jsonify, request
+from api import api_bp
+from services.job_queue_service import JobQueueService, JOB_TYPES
+from database.db import get_db
+
+@api_bp.route('/jobs', methods=['POST'])
+def enqueue_job():
+    """
+    提交后台任务（由工作进程 run_job_worker.py 执行），立即返回任务记录
+    
+    请求体:
+        type: 任务类型（GET /api/jobs/types 查看）
+        params: 任务参数，如 {"force": true}、{"stock_codes": ["000001"], "target_date": "2025-11-17"}
+        priority: 优先级，越大越先执行，默认 0
+    """
+    data = request.get_json()
+    if not data or not data.get('type'):
+        return jsonify({
+            'success': False,
+            'error': 'Request body with "type" is required'
+        }), 400
+    
+    db = next(get_db())
+    try:
+        job = JobQueueService.enqueue(
+            db, data['type'], params=data.get('params') or {},
+            priority=int(data.get('priority') or 0), enqueued_by='api'
+        )
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        }), 202
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """
+    最近提交的后台任务
+    
+    查询参数:
+        status: queued / running / success / failed / cancelled
+        type: 任务类型
+        limit: 返回条数，默认 50
+    """
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'limit must be an integer'
+        }), 400
+    
+    try:
+        db = next(get_db())
+        jobs = JobQueueService.list_jobs(
+            db, status=request.args.get('status'), job_type=request.args.get('type'), limit=limit
+        )
+        return jsonify({
+            'success': True,
+            'data': [job.to_dict() for job in jobs],
+            'count': len(jobs)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/jobs/types', methods=['GET'])
+def list_job_types():
+    """可提交的任务类型"""
+    return jsonify({
+        'success': True,
+        'data': [{'type': job_type, 'name': name} for job_type, name in JOB_TYPES.items()]
+    })
+
+@api_bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询后台任务的状态和进度（轮询使用）"""
+    try:
+        db = next(get_db())
+        job = JobQueueService.get_job(db, job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消尚未开始执行的后台任务"""
+    try:
+        db = next(get_db())
+        if not JobQueueService.cancel(db, job_id):
+            return jsonify({
+                'success': False,
+                'error': 'Job not found or already started'
+            }), 409
+        return jsonify({
+            'success': True,
+            'data': JobQueueService.get_job(db, job_id).to_dict()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
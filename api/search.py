@@ -0,0 +1,51 @@
+from flask import jsonify, request
+from api import api_bp
+from services.search_service import SearchService, KINDS
+
+@api_bp.route('/search', methods=['GET'])
+def search():
+    """
+    搜索股票和指数（输入联想）
+    
+    查询参数:
+        q: 关键词，代码、名称或拼音首字母（如 000001、平安、payh）
+        type: 搜索类型，all（默认）/ stock / index
+        limit: 最多返回条数，默认 10，最大 100
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': 'q parameter is required'
+        }), 400
+    
+    kind = request.args.get('type', 'all')
+    if kind != 'all' and kind not in KINDS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid type parameter. Must be one of: all, {', '.join(KINDS)}"
+        }), 400
+    
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= 100:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid limit parameter. Must be between 1 and 100'
+        }), 400
+    
+    try:
+        results = SearchService.search(query, kind=kind, limit=limit)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'data': results,
+            'count': len(results)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
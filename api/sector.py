@@ -57,13 +57,14 @@ def get_all_sectors():
         if save_to_db:
             try:
                 db = next(get_db())
-                saved_count = SectorHistoryService.save_today_sectors(db, sector_type)
+                result = SectorHistoryService.save_today_sectors(db, sector_type)
                 return jsonify({
                     'success': True,
                     'data': sectors,
                     'count': len(sectors),
                     'saved': True,
-                    'saved_count': saved_count,
+                    'saved_count': result.total,
+                    'changed_count': result.changed,
                     'type': sector_type,
                     'source': 'api'
                 })
@@ -108,11 +109,12 @@ def save_sectors():
             }), 400
         
         db = next(get_db())
-        saved_count = SectorHistoryService.save_today_sectors(db, sector_type)
+        result = SectorHistoryService.save_today_sectors(db, sector_type)
         return jsonify({
             'success': True,
-            'message': f'Successfully saved {saved_count} {sector_type} sectors',
-            'saved_count': saved_count,
+            'message': f'Successfully saved {result.total} {sector_type} sectors ({result.changed} rows written)',
+            'saved_count': result.total,
+            'changed_count': result.changed,
             'type': sector_type
         })
     except Exception as e:
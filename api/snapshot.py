@@ -0,0 +1,86 @@
+from flask import Response, jsonify, request
+from api import api_bp
+from services.snapshot_service import SnapshotService
+from utils.columnar import to_columns, encode_arrow, encode_parquet, ARROW_MIMETYPE, PARQUET_MIMETYPE
+from datetime import datetime
+
+# 可选的响应格式
+FORMATS = ('json', 'columns', 'arrow', 'parquet')
+
+# Accept 请求头 -> 响应格式
+ACCEPT_FORMATS = {
+    ARROW_MIMETYPE: 'arrow',
+    'application/vnd.apache.arrow.file': 'arrow',
+    PARQUET_MIMETYPE: 'parquet',
+    'application/x-parquet': 'parquet',
+}
+
+def _negotiate_format():
+    """响应格式：优先使用 format 查询参数，其次根据 Accept 请求头，默认 json"""
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt.lower()
+    best = request.accept_mimetypes.best_match(list(ACCEPT_FORMATS) + ['application/json'])
+    return ACCEPT_FORMATS.get(best, 'json')
+
+@api_bp.route('/snapshot/<date_str>', methods=['GET'])
+def get_snapshot(date_str):
+    """
+    一次获取指定日期的全部历史数据集（服务端并发查询）
+    
+    路径参数:
+        date_str: 日期 (格式: YYYY-MM-DD)
+    
+    查询参数:
+        datasets: 数据集，逗号分隔，默认全部
+                  (industry_sectors, concept_sectors, zt_pool, zb_pool, dt_pool, indices, market_summary)
+        format: 响应格式，json（行式，默认）/ columns（列式 JSON）/ arrow（Arrow IPC 流）/ parquet；
+                也可通过 Accept 请求头协商（application/vnd.apache.arrow.stream、application/vnd.apache.parquet）
+    """
+    try:
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+    
+    fmt = _negotiate_format()
+    if fmt not in FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid format parameter. Must be one of: {', '.join(FORMATS)}"
+        }), 400
+    
+    datasets = request.args.get('datasets')
+    datasets = [name.strip() for name in datasets.split(',') if name.strip()] if datasets else None
+    
+    try:
+        snapshot = SnapshotService.get_snapshot(target_date, datasets)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    if fmt == 'arrow':
+        return Response(encode_arrow(snapshot), mimetype=ARROW_MIMETYPE)
+    if fmt == 'parquet':
+        return Response(encode_parquet(snapshot), mimetype=PARQUET_MIMETYPE, headers={
+            'Content-Disposition': f'attachment; filename=snapshot_{date_str}.parquet'
+        })
+    
+    data = {name: to_columns(rows) for name, rows in snapshot.items()} if fmt == 'columns' else snapshot
+    return jsonify({
+        'success': True,
+        'date': date_str,
+        'format': fmt,
+        'data': data,
+        'counts': {name: len(rows) for name, rows in snapshot.items()},
+        'source': 'database'
+    })
@@ -46,13 +46,14 @@ def get_zt_pool():
         if save_to_db:
             try:
                 db = next(get_db())
-                saved_count = ZtPoolHistoryService.save_today_zt_pool(db)
+                result = ZtPoolHistoryService.save_today_zt_pool(db)
                 return jsonify({
                     'success': True,
                     'data': stocks,
                     'count': len(stocks),
                     'saved': True,
-                    'saved_count': saved_count,
+                    'saved_count': result.total,
+                    'changed_count': result.changed,
                     'source': 'api'
                 })
             except Exception as e:
@@ -84,11 +85,12 @@ def save_zt_pool():
     """
     try:
         db = next(get_db())
-        saved_count = ZtPoolHistoryService.save_today_zt_pool(db)
+        result = ZtPoolHistoryService.save_today_zt_pool(db)
         return jsonify({
             'success': True,
-            'message': f'Successfully saved {saved_count} stocks',
-            'saved_count': saved_count
+            'message': f'Successfully saved {result.total} stocks ({result.changed} rows written)',
+            'saved_count': result.total,
+            'changed_count': result.changed
         })
     except Exception as e:
         return jsonify({
@@ -1,9 +1,12 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, abort, jsonify, request
 from flask_cors import CORS
 from config import config
 from database.db import init_db
 from api import api_bp
 from tasks.sector_scheduler import get_scheduler
+from utils.akshare_replay import install_from_env
+from utils.metrics import render_prometheus
+from database.query_profiler import get_query_profiler
 
 def create_app(config_name='default'):
     """创建Flask应用"""
@@ -13,12 +16,28 @@ def create_app(config_name='default'):
     # 启用CORS
     CORS(app)
     
+    # akshare 录制/回放（由 AKSHARE_MODE 环境变量控制，默认关闭）
+    install_from_env()
+    
     # 初始化数据库
     init_db()
     
     # 注册蓝图
     app.register_blueprint(api_bp)
     
+    # SQL 分析：每个请求作为一个执行单元（SQL_PROFILE 开启时）
+    profiler = get_query_profiler()
+    if profiler is not None:
+        @app.before_request
+        def begin_query_profile():
+            request.environ['query_profile_token'] = profiler.begin(f"{request.method} {request.path}")
+        
+        @app.teardown_request
+        def end_query_profile(exc=None):
+            token = request.environ.pop('query_profile_token', None)
+            if token is not None:
+                profiler.end(token)
+    
     # 启动定时任务（仅在非测试环境）
     if not app.config.get('TESTING'):
         scheduler = get_scheduler()
@@ -38,6 +57,11 @@ def create_app(config_name='default'):
                 'zb-pool': '/api/zb-pool',
                 'dt-pool': '/api/dt-pool',
                 'board-change': '/api/board-change',
+                'snapshot': '/api/snapshot/<date>',
+                'export': '/api/export/<table>',
+                'concept-membership': '/api/concept-membership',
+                'search': '/api/search?q=<keyword>',
+                'jobs': '/api/jobs',
                 'trading-review': '/api/trading-review'
             }
         })
@@ -50,6 +74,18 @@ def create_app(config_name='default'):
             'message': 'Service is running'
         })
     
+    # 最近的 SQL 分析汇总（SQL_PROFILE 开启时）
+    @app.route('/debug/sql')
+    def sql_profile():
+        if profiler is None:
+            abort(404)
+        return jsonify({'units': profiler.recent_summaries()})
+    
+    # 阶段耗时统计（Prometheus 文本格式）
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试用的合成数据
+
+- *_frame：与 akshare 接口返回结构一致的 DataFrame（列名、单位、字符串格式）
+- seed_history：向数据库批量写入指定交易日数的历史数据
+
+数据量按真实规模设置：行业板块约90个、概念板块约400个、指数564个、
+个股资金流约5000只，涨停/炸板/跌停股票池每天几十只。
+"""
+from datetime import date, timedelta
+from typing import List
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from models.sector_history import SectorHistory
+from models.index_history import IndexHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.dt_pool_history import DtgcPoolHistory
+from models.stock_fund_flow_history import StockFundFlowHistory
+
+# 默认数据规模
+SIZES = {
+    'industry': 90,
+    'concept': 400,
+    'indices': 564,
+    'fund_flow': 5000,
+    'zt_pool': 80,
+    'zb_pool': 30,
+    'dt_pool': 20,
+}
+
+INDUSTRIES = ['半导体', '软件开发', '通信设备', '汽车零部件', '电池', '光伏设备', '医疗器械', '化学制药',
+              '证券', '银行', '白酒', '电力', '煤炭开采', '工程机械', '军工电子', '消费电子']
+
+
+def trading_days(end_date: date, days: int) -> List[date]:
+    """生成截止到 end_date 的 days 个工作日（作为交易日）"""
+    dates = pd.bdate_range(end=end_date, periods=days)
+    return [d.date() for d in dates]
+
+
+def stock_codes(n: int) -> List[str]:
+    """生成 n 个股票代码（沪深两市混合）"""
+    prefixes = ['600', '601', '603', '000', '002', '300']
+    return [f"{prefixes[i % len(prefixes)]}{i // len(prefixes):03d}" for i in range(n)]
+
+
+def _sealing_times(rng: np.random.Generator, n: int) -> List[str]:
+    """生成 09:30:00 ~ 14:59:59 之间的封板时间字符串"""
+    seconds = rng.integers(9 * 3600 + 1800, 15 * 3600, size=n)
+    return [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds]
+
+
+def industry_summary_frame(n: int = SIZES['industry'], seed: int = 0) -> pd.DataFrame:
+    """stock_board_industry_summary_ths 结构"""
+    rng = np.random.default_rng(seed)
+    up = rng.integers(0, 80, size=n)
+    return pd.DataFrame({
+        '序号': np.arange(1, n + 1),
+        '板块': [f"行业{i:03d}" for i in range(n)],
+        '涨跌幅': rng.normal(0, 2, size=n).round(2),
+        '总成交量': rng.uniform(100, 5000, size=n).round(2),
+        '总成交额': rng.uniform(10, 800, size=n).round(2),
+        '净流入': rng.normal(0, 10, size=n).round(2),
+        '上涨家数': up,
+        '下跌家数': rng.integers(0, 80, size=n),
+        '均价': rng.uniform(5, 80, size=n).round(2),
+        '领涨股': [f"股票{i:04d}" for i in rng.integers(0, 5000, size=n)],
+        '领涨股-最新价': rng.uniform(3, 200, size=n).round(2),
+        '领涨股-涨跌幅': rng.uniform(0, 20, size=n).round(2),
+    })
+
+
+def concept_fund_flow_frame(n: int = SIZES['concept'], seed: int = 0) -> pd.DataFrame:
+    """stock_fund_flow_concept 结构（资金单位：亿元）"""
+    rng = np.random.default_rng(seed)
+    inflow = rng.uniform(1, 300, size=n).round(2)
+    outflow = rng.uniform(1, 300, size=n).round(2)
+    return pd.DataFrame({
+        '序号': np.arange(1, n + 1),
+        '行业': [f"概念{i:03d}" for i in range(n)],
+        '行业指数': rng.uniform(500, 3000, size=n).round(2),
+        '行业-涨跌幅': rng.normal(0, 2, size=n).round(2),
+        '流入资金': inflow,
+        '流出资金': outflow,
+        '净额': (inflow - outflow).round(2),
+        '公司家数': rng.integers(10, 300, size=n),
+        '领涨股': [f"股票{i:04d}" for i in rng.integers(0, 5000, size=n)],
+        '领涨股-涨跌幅': rng.uniform(0, 20, size=n).round(2),
+        '当前价': rng.uniform(3, 200, size=n).round(2),
+    })
+
+
+def index_spot_sina_frame(n: int = SIZES['indices'], seed: int = 0) -> pd.DataFrame:
+    """stock_zh_index_spot_sina 结构（代码带 sh/sz 前缀）"""
+    rng = np.random.default_rng(seed)
+    half = n // 2
+    codes = [f"sh000{i:03d}" for i in range(half)] + [f"sz399{i:03d}" for i in range(n - half)]
+    prev_close = rng.uniform(500, 15000, size=n).round(2)
+    change = (prev_close * rng.normal(0, 0.015, size=n)).round(2)
+    return pd.DataFrame({
+        '代码': codes,
+        '名称': [f"指数{i:03d}" for i in range(n)],
+        '最新价': (prev_close + change).round(2),
+        '涨跌额': change,
+        '涨跌幅': (change / prev_close * 100).round(2),
+        '昨收': prev_close,
+        '今开': (prev_close * rng.uniform(0.99, 1.01, size=n)).round(2),
+        '最高': (prev_close * 1.02).round(2),
+        '最低': (prev_close * 0.98).round(2),
+        '成交量': rng.integers(10 ** 6, 10 ** 10, size=n),
+        '成交额': rng.uniform(1e8, 1e11, size=n).round(0),
+    })
+
+
+def fund_flow_individual_frame(n: int = SIZES['fund_flow'], seed: int = 0) -> pd.DataFrame:
+    """stock_fund_flow_individual(symbol="即时") 结构（金额和百分比为带单位的字符串）"""
+    rng = np.random.default_rng(seed)
+    
+    def amounts(values):
+        return [f"{v / 1e8:.2f}亿" if abs(v) >= 1e8 else f"{v / 1e4:.2f}万" for v in values]
+    
+    inflow = rng.uniform(1e6, 5e9, size=n)
+    outflow = rng.uniform(1e6, 5e9, size=n)
+    return pd.DataFrame({
+        '序号': np.arange(1, n + 1),
+        '股票代码': [int(code) for code in stock_codes(n)],
+        '股票简称': [f"股票{i:04d}" for i in range(n)],
+        '最新价': rng.uniform(2, 300, size=n).round(2),
+        '涨跌幅': [f"{v:.2f}%" for v in rng.normal(0, 3, size=n)],
+        '换手率': [f"{v:.2f}%" for v in rng.uniform(0.1, 30, size=n)],
+        '流入资金': amounts(inflow),
+        '流出资金': amounts(outflow),
+        '净额': amounts(inflow - outflow),
+        '成交额': amounts(inflow + outflow),
+    })
+
+
+def board_change_frame(n: int = SIZES['industry'] + SIZES['concept'], seed: int = 0) -> pd.DataFrame:
+    """stock_board_change_em 结构"""
+    rng = np.random.default_rng(seed)
+    change_types = '[{"t": 8201, "ct": 3}, {"t": 8202, "ct": 1}]'
+    return pd.DataFrame({
+        '板块名称': [f"板块{i:03d}" for i in range(n)],
+        '涨跌幅': rng.normal(0, 2, size=n).round(2),
+        '主力净流入': rng.normal(0, 5e8, size=n).round(0),
+        '板块异动总次数': rng.integers(1, 50, size=n),
+        '板块异动最频繁个股及所属类型-股票代码': stock_codes(n),
+        '板块异动最频繁个股及所属类型-股票名称': [f"股票{i:04d}" for i in range(n)],
+        '板块异动最频繁个股及所属类型-买卖方向': rng.choice(['大笔买入', '大笔卖出'], size=n),
+        '板块具体异动类型列表及出现次数': [change_types] * n,
+    })
+
+
+def _pool_base(n: int, rng: np.random.Generator, offset: int) -> dict:
+    """涨停/炸板/跌停股票池的公共列（金额单位：元）"""
+    codes = stock_codes(5000)
+    picks = (rng.permutation(5000)[:n] + offset) % 5000
+    return {
+        '序号': np.arange(1, n + 1),
+        '代码': [codes[i] for i in picks],
+        '名称': [f"股票{i:04d}" for i in picks],
+        '最新价': rng.uniform(2, 300, size=n).round(2),
+        '成交额': rng.uniform(1e7, 5e9, size=n).round(0),
+        '流通市值': rng.uniform(1e9, 5e11, size=n).round(0),
+        '总市值': rng.uniform(1e9, 8e11, size=n).round(0),
+        '换手率': rng.uniform(0.5, 40, size=n).round(2),
+        '所属行业': [INDUSTRIES[i] for i in rng.integers(0, len(INDUSTRIES), size=n)],
+    }
+
+
+def zt_pool_frame(n: int = SIZES['zt_pool'], seed: int = 0) -> pd.DataFrame:
+    """stock_zt_pool_em 结构"""
+    rng = np.random.default_rng(seed)
+    boards = rng.choice([1, 1, 1, 1, 2, 2, 3, 4, 5], size=n)
+    data = _pool_base(n, rng, seed)
+    data.update({
+        '涨跌幅': rng.uniform(9.9, 20.1, size=n).round(2),
+        '封板资金': rng.uniform(1e6, 2e9, size=n).round(0),
+        '首次封板时间': _sealing_times(rng, n),
+        '最后封板时间': _sealing_times(rng, n),
+        '炸板次数': rng.integers(0, 5, size=n),
+        '涨停统计': [f"{b}/{b + int(extra)}" for b, extra in zip(boards, rng.integers(0, 3, size=n))],
+        '连板数': boards,
+    })
+    return pd.DataFrame(data)
+
+
+def zbgc_pool_frame(n: int = SIZES['zb_pool'], seed: int = 0) -> pd.DataFrame:
+    """stock_zt_pool_zbgc_em 结构"""
+    rng = np.random.default_rng(seed + 1)
+    data = _pool_base(n, rng, seed)
+    data.update({
+        '涨跌幅': rng.uniform(0, 9.9, size=n).round(2),
+        '涨停价': rng.uniform(2, 300, size=n).round(2),
+        '涨速': rng.normal(0, 1, size=n).round(2),
+        '首次封板时间': _sealing_times(rng, n),
+        '炸板次数': rng.integers(1, 8, size=n),
+        '涨停统计': ['1/2'] * n,
+        '振幅': rng.uniform(2, 20, size=n).round(2),
+    })
+    return pd.DataFrame(data)
+
+
+def dtgc_pool_frame(n: int = SIZES['dt_pool'], seed: int = 0) -> pd.DataFrame:
+    """stock_zt_pool_dtgc_em 结构"""
+    rng = np.random.default_rng(seed + 2)
+    data = _pool_base(n, rng, seed)
+    data.update({
+        '涨跌幅': rng.uniform(-20.1, -9.9, size=n).round(2),
+        '动态市盈率': rng.uniform(-50, 200, size=n).round(2),
+        '封单资金': rng.uniform(1e6, 1e9, size=n).round(0),
+        '最后封板时间': _sealing_times(rng, n),
+        '板上成交额': rng.uniform(1e6, 1e9, size=n).round(0),
+        '连续跌停': rng.integers(1, 4, size=n),
+        '开板次数': rng.integers(0, 5, size=n),
+    })
+    return pd.DataFrame(data)
+
+
+def seed_history(db: Session, dates: List[date], fund_flow_days: int = 20, seed: int = 0) -> dict:
+    """
+    批量写入历史数据（使用 Core 批量插入，不经过服务层）
+    
+    Args:
+        db: 数据库会话
+        dates: 交易日列表
+        fund_flow_days: 个股资金流只写入最近 N 个交易日（每天约5000行）
+        seed: 随机种子
+    
+    Returns:
+        各表写入行数
+    """
+    rng = np.random.default_rng(seed)
+    counts = {'sector_history': 0, 'index_history': 0, 'zt_pool_history': 0,
+              'zbgc_pool_history': 0, 'dtgc_pool_history': 0, 'stock_fund_flow_history': 0}
+    codes = stock_codes(SIZES['fund_flow'])
+    
+    for day_number, day in enumerate(dates):
+        sector_rows = []
+        for sector_type, n in (('industry', SIZES['industry']), ('concept', SIZES['concept'])):
+            change = rng.normal(0, 2, size=n).round(2)
+            net = rng.normal(0, 10, size=n).round(2)
+            up = rng.integers(0, 80, size=n)
+            down = rng.integers(0, 80, size=n)
+            prefix = '行业' if sector_type == 'industry' else '概念'
+            sector_rows.extend({
+                'date': day, 'sector_type': sector_type, 'index': i + 1, 'name': f"{prefix}{i:03d}",
+                'change_percent': float(change[i]), 'total_volume': 1000.0, 'total_amount': 100.0,
+                'net_inflow': float(net[i]), 'up_count': int(up[i]), 'down_count': int(down[i]),
+                'avg_price': 20.0, 'leading_stock': f"股票{i:04d}", 'leading_stock_price': 10.0,
+                'leading_stock_change_percent': 5.0,
+            } for i in range(n))
+        db.execute(SectorHistory.__table__.insert(), sector_rows)
+        counts['sector_history'] += len(sector_rows)
+        
+        index_frame = index_spot_sina_frame(seed=seed + day_number)
+        index_rows = [{
+            'date': day, 'code': row['代码'][2:], 'name': row['名称'], 'current_price': row['最新价'],
+            'change_percent': row['涨跌幅'], 'change': row['涨跌额'], 'volume': float(row['成交量']),
+            'amount': row['成交额'], 'open': row['今开'], 'high': row['最高'], 'low': row['最低'],
+            'prev_close': row['昨收'], 'amplitude': 0, 'volume_ratio': 0,
+        } for row in index_frame.to_dict('records')]
+        db.execute(IndexHistory.__table__.insert(), index_rows)
+        counts['index_history'] += len(index_rows)
+        
+        for model, frame, key in (
+            (ZtPoolHistory, zt_pool_frame(seed=seed + day_number), 'zt_pool_history'),
+            (ZbgcPoolHistory, zbgc_pool_frame(seed=seed + day_number), 'zbgc_pool_history'),
+            (DtgcPoolHistory, dtgc_pool_frame(seed=seed + day_number), 'dtgc_pool_history'),
+        ):
+            columns = {column.name for column in model.__table__.columns}
+            rows = []
+            for row in frame.to_dict('records'):
+                record = {
+                    'date': day, 'index': int(row['序号']), 'code': row['代码'], 'name': row['名称'],
+                    'change_percent': float(row['涨跌幅']), 'latest_price': float(row['最新价']),
+                    'turnover': round(row['成交额'] / 1e8, 2), 'turnover_rate': float(row['换手率']),
+                    'circulating_market_value': round(row['流通市值'] / 1e8, 2),
+                    'total_market_value': round(row['总市值'] / 1e8, 2),
+                    'continuous_boards': int(row.get('连板数', 0)), 'explosion_count': int(row.get('炸板次数', 0)),
+                    'zt_statistics': row.get('涨停统计'), 'industry': row['所属行业'],
+                    'sealing_funds': round(row.get('封板资金', row.get('封单资金', 0)) / 1e8, 2),
+                    'limit_price': float(row.get('涨停价', 0)), 'rise_speed': float(row.get('涨速', 0)),
+                    'amplitude': float(row.get('振幅', 0)),
+                    'board_turnover': round(row.get('板上成交额', 0) / 1e8, 2),
+                    'continuous_limit_down': int(row.get('连续跌停', 0)), 'open_count': int(row.get('开板次数', 0)),
+                }
+                rows.append({k: v for k, v in record.items() if k in columns})
+            db.execute(model.__table__.insert(), rows)
+            counts[key] += len(rows)
+        
+        if day_number >= len(dates) - fund_flow_days:
+            n = SIZES['fund_flow']
+            inflow = rng.uniform(1e6, 5e9, size=n)
+            outflow = rng.uniform(1e6, 5e9, size=n)
+            fund_rows = [{
+                'date': day, 'stock_code': codes[i], 'stock_name': f"股票{i:04d}",
+                'latest_price': 10.0, 'change_percent': 1.0, 'turnover_rate': 2.0,
+                'inflow': float(inflow[i]), 'outflow': float(outflow[i]),
+                'net_amount': float(inflow[i] - outflow[i]), 'turnover': float(inflow[i] + outflow[i]),
+            } for i in range(n)]
+            db.execute(StockFundFlowHistory.__table__.insert(), fund_rows)
+            counts['stock_fund_flow_history'] += len(fund_rows)
+        
+        db.commit()
+    
+    return counts
+
+
+def next_trading_day(dates: List[date]) -> date:
+    """历史数据之后的下一个工作日（save 基准测试写入的日期）"""
+    next_day = dates[-1] + timedelta(days=1)
+    while next_day.weekday() >= 5:
+        next_day += timedelta(days=1)
+    return next_day
@@ -121,3 +121,20 @@ MULTI_LINE_COLORS = [
     '#34d399',  # 翠绿色
 ]
 
+
+# 热力图配置
+HEATMAP_CONFIG = {
+    'text_max_cells': 1500,  # 单元格数量不超过该值时才显示数值文字
+    'row_height': 28,  # 行数较少时的行高
+    'min_row_height': 4,  # 行数很多时的最小行高
+    'min_height': 400,  # 最小高度
+    'max_height': 1200,  # 最大高度（超过后压缩行高，避免页面过长）
+    'max_y_ticks': 80,  # 行数超过该值时隐藏纵轴标签（悬停仍可查看）
+    'webgl_min_cells': 20000,  # 单元格数量超过该值且环境支持时使用WebGL热力图
+}
+
+# 折线/散点图渲染配置
+TRACE_CONFIG = {
+    'webgl_point_threshold': 2000,  # 总点数超过该值时使用 Scattergl（WebGL）渲染
+    'marker_point_limit': 120,  # 单条折线点数超过该值时不再绘制标记点
+}
@@ -28,6 +28,55 @@ class Config:
     
     # akshare配置
     AKSHARE_TIMEOUT = 30  # 请求超时时间（秒）
+    
+    # 盘中快照采样间隔（分钟），0 表示关闭盘中采样
+    INTRADAY_SNAPSHOT_MINUTES = int(os.environ.get('INTRADAY_SNAPSHOT_MINUTES', '0'))
+    
+    # 实时仪表盘后台预取间隔（秒），交易时间内生效
+    REALTIME_PREFETCH_SECONDS = int(os.environ.get('REALTIME_PREFETCH_SECONDS', '30'))
+    
+    # 指数行情对冲等待秒数：主要数据源（新浪）超过该时间未返回完整结果时并行请求备用数据源
+    INDEX_HEDGE_SECONDS = float(os.environ.get('INDEX_HEDGE_SECONDS', '3'))
+    
+    # 分区表提前创建的月分区数
+    PARTITION_MONTHS_AHEAD = int(os.environ.get('PARTITION_MONTHS_AHEAD', '3'))
+    # 明细数据保留月数：更早的资金流/指数明细汇总为周数据后删除，0 表示不汇总、不删除
+    ROLLUP_HORIZON_MONTHS = int(os.environ.get('ROLLUP_HORIZON_MONTHS', '0'))
+    
+    # 概念成分股刷新：daily（工作日08:30）/ weekly（周日20:00）/ off
+    CONCEPT_MEMBERSHIP_SCHEDULE = os.environ.get('CONCEPT_MEMBERSHIP_SCHEDULE', 'weekly').lower()
+    # 刷新成分股时并发获取的线程数和每秒最多请求数
+    CONCEPT_MEMBERSHIP_WORKERS = int(os.environ.get('CONCEPT_MEMBERSHIP_WORKERS', '4'))
+    CONCEPT_MEMBERSHIP_RATE = float(os.environ.get('CONCEPT_MEMBERSHIP_RATE', '3'))
+    # 进程内概念成分股索引的有效期（秒），过期后从数据库重新加载
+    CONCEPT_INDEX_TTL_SECONDS = int(os.environ.get('CONCEPT_INDEX_TTL_SECONDS', '3600'))
+    
+    # 股票搜索索引的有效期（秒），过期后从数据库重新构建（指数搜索索引在配置文件修改后重新构建）
+    SEARCH_INDEX_TTL_SECONDS = int(os.environ.get('SEARCH_INDEX_TTL_SECONDS', '3600'))
+    
+    # 调度器主节点选举：多个进程（Flask worker、Streamlit）都启动调度器时只有主节点执行定时任务
+    SCHEDULER_LEADER_ELECTION = os.environ.get('SCHEDULER_LEADER_ELECTION', 'True').lower() == 'true'
+    # 主节点租约有效期和续约间隔（秒），主节点失联超过有效期后由其他进程接管
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', '60'))
+    SCHEDULER_LEASE_RENEW_SECONDS = int(os.environ.get('SCHEDULER_LEASE_RENEW_SECONDS', '15'))
+    
+    # 后台任务队列：工作进程（run_job_worker.py）同时执行的任务数和领取任务的轮询间隔（秒）
+    JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', '2'))
+    JOB_WORKER_POLL_SECONDS = float(os.environ.get('JOB_WORKER_POLL_SECONDS', '2'))
+    # 工作进程心跳间隔和超时（秒），超时未心跳的任务重新排队
+    JOB_HEARTBEAT_SECONDS = int(os.environ.get('JOB_HEARTBEAT_SECONDS', '30'))
+    JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', '300'))
+    # 定时任务到点后提交到后台任务队列，由工作进程执行（需要部署 run_job_worker.py）
+    SCHEDULER_USE_JOB_QUEUE = os.environ.get('SCHEDULER_USE_JOB_QUEUE', 'False').lower() == 'true'
+    # 页面的手动执行和资金流刷新提交到后台任务队列（需要部署 run_job_worker.py），关闭时在页面中直接执行
+    JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED', str(SCHEDULER_USE_JOB_QUEUE)).lower() == 'true'
+    
+    # SQL 分析模式：统计每个请求/页面运行/定时任务的 SQL 语句，发现 N+1 查询和慢查询
+    SQL_PROFILE = os.environ.get('SQL_PROFILE', 'False').lower() == 'true'
+    # 慢查询阈值（毫秒）
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', '200'))
+    # 同一语句结构在一个执行单元内重复执行达到该次数时视为 N+1 查询
+    SQL_REPEAT_THRESHOLD = int(os.environ.get('SQL_REPEAT_THRESHOLD', '10'))
 
 class DevelopmentConfig(Config):
     """开发环境配置"""
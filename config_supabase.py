@@ -37,8 +37,8 @@ def _get_config_value(key: str, default: str = '') -> str:
         import streamlit as st
         if hasattr(st, 'secrets') and key in st.secrets:
             return st.secrets[key]
-    except (ImportError, RuntimeError, AttributeError):
-        # 不在 Streamlit 环境中，或 secrets 不可用
+    except (ImportError, RuntimeError, AttributeError, FileNotFoundError):
+        # 不在 Streamlit 环境中，或 secrets 不可用（新版 Streamlit 没有 secrets.toml 时抛出 FileNotFoundError 子类）
         pass
     
     # 从环境变量读取（本地开发或非 Streamlit 环境）
@@ -9,8 +9,9 @@ from .db_supabase import (
     engine,
     SessionLocal,
     init_db,
-    get_db
+    get_db,
+    register_models
 )
 
-__all__ = ['Base', 'engine', 'SessionLocal', 'init_db', 'get_db']
+__all__ = ['Base', 'engine', 'SessionLocal', 'init_db', 'get_db', 'register_models']
 
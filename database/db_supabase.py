@@ -124,15 +124,18 @@ except Exception as e:
     print(error_msg)
     raise RuntimeError("无法连接到 Supabase 数据库") from e
 
+# SQL 分析（SQL_PROFILE 开启时检测 N+1 查询和慢查询）
+from database.query_profiler import install_query_profiler
+install_query_profiler(engine)
+
 # 创建会话工厂
 SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 
 # 创建基类
 Base = declarative_base()
 
-def init_db():
-    """初始化数据库"""
-    # 导入所有模型，确保它们被注册
+def register_models():
+    """导入所有模型，确保它们注册到 Base.metadata（初始化数据库和基准测试共用）"""
     from models.trading_review import TradingReview
     from models.trading_reason import TradingReason
     from models.sector_history import SectorHistory
@@ -142,6 +145,20 @@ def init_db():
     from models.index_history import IndexHistory
     from models.scheduler_execution import SchedulerExecution
     from models.stock_fund_flow_history import StockFundFlowHistory
+    from models.intraday_snapshot import IntradaySnapshot
+    from models.zt_ladder import ZtLadderDaily
+    from models.backfill_checkpoint import BackfillCheckpoint
+    from models.dimension import DimSector, DimIndex, DimStock
+    from models.history_rollup import HistoryWeeklyRollup
+    from models.market_daily_summary import MarketDailySummary
+    from models.concept_membership import ConceptMembership
+    from models.scheduler_lease import SchedulerLease
+    from models.job_queue import QueueJob
+
+def init_db():
+    """初始化数据库"""
+    # 导入所有模型，确保它们被注册
+    register_models()
     
     # 创建所有表
     Base.metadata.create_all(bind=engine)
@@ -151,6 +168,15 @@ def init_db():
     
     # 检查并添加交易日志表的止盈止损字段（如果不存在）
     _ensure_trading_reviews_columns()
+    
+    # 检查并添加定时任务执行记录的阶段耗时字段（如果不存在）
+    _ensure_scheduler_execution_columns()
+    
+    # 检查并添加历史表的名称维度ID字段（如果不存在）
+    _ensure_dimension_columns()
+    
+    # 检查并添加历史表的行内容摘要和最后写入时间字段（如果不存在）
+    _ensure_row_hash_columns()
 
 def _ensure_sector_type_column():
     """确保 sector_history 表有 sector_type 列（向后兼容）"""
@@ -410,6 +436,116 @@ def _ensure_trading_reviews_columns():
         print(f"⚠️  检查/添加 trading_reviews 表列时出错: {e}")
         # 不抛出异常，允许应用继续运行
 
+def _ensure_scheduler_execution_columns():
+    """确保 scheduler_execution 表有 stage_breakdown 列（向后兼容）"""
+    try:
+        db = SessionLocal()
+        try:
+            check_sql = text("""
+                SELECT column_name 
+                FROM information_schema.columns 
+                WHERE table_name = 'scheduler_execution' 
+                AND column_name = 'stage_breakdown'
+            """)
+            if db.execute(check_sql).fetchone():
+                return
+            
+            alter_sql = text("""
+                ALTER TABLE scheduler_execution 
+                ADD COLUMN stage_breakdown TEXT
+            """)
+            db.execute(alter_sql)
+            db.commit()
+            print("✅ 已为 scheduler_execution 表添加 stage_breakdown 列")
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  添加 scheduler_execution.stage_breakdown 列时出错: {e}")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  检查 scheduler_execution 表列时出错: {e}")
+        # 不抛出异常，允许应用继续运行
+
+def _ensure_dimension_columns():
+    """确保历史表有名称维度ID列，并允许名称列为空（名称改为保存在维度表中）"""
+    # (表名, ID列, 维度表, 名称列)
+    columns = [
+        ('sector_history', 'sector_id', 'dim_sector', 'name'),
+        ('sector_history', 'leading_stock_id', 'dim_stock', 'leading_stock'),
+        ('zt_pool_history', 'stock_id', 'dim_stock', 'name'),
+        ('zt_pool_history', 'industry_id', 'dim_sector', 'industry'),
+        ('index_history', 'index_id', 'dim_index', 'name'),
+        ('stock_fund_flow_history', 'stock_id', 'dim_stock', 'stock_name'),
+    ]
+    try:
+        db = SessionLocal()
+        try:
+            for table_name, id_column, dim_table, name_column in columns:
+                check_sql = text("""
+                    SELECT column_name 
+                    FROM information_schema.columns 
+                    WHERE table_name = :table_name 
+                    AND column_name = :column_name
+                """)
+                if db.execute(check_sql, {'table_name': table_name, 'column_name': id_column}).fetchone():
+                    continue
+                
+                db.execute(text(f"""
+                    ALTER TABLE {table_name} 
+                    ADD COLUMN {id_column} INTEGER REFERENCES {dim_table}(id)
+                """))
+                db.execute(text(f"""
+                    ALTER TABLE {table_name} 
+                    ALTER COLUMN {name_column} DROP NOT NULL
+                """))
+                db.commit()
+                print(f"✅ 已为 {table_name} 表添加 {id_column} 列")
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  添加名称维度ID列时出错: {e}")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  检查名称维度ID列时出错: {e}")
+        # 不抛出异常，允许应用继续运行
+
+def _ensure_row_hash_columns():
+    """确保历史表有行内容摘要列和最后写入时间列（同日重复保存时只写入有变化的行）"""
+    tables = ['sector_history', 'zt_pool_history', 'index_history']
+    # (列名, 列定义)；updated_at 的默认值对已有行只写入元数据，不重写整表
+    columns = [
+        ('row_hash', 'VARCHAR(16)'),
+        ('updated_at', 'TIMESTAMP DEFAULT now()'),
+    ]
+    try:
+        db = SessionLocal()
+        try:
+            for table_name in tables:
+                for column_name, column_type in columns:
+                    check_sql = text("""
+                        SELECT column_name 
+                        FROM information_schema.columns 
+                        WHERE table_name = :table_name 
+                        AND column_name = :column_name
+                    """)
+                    if db.execute(check_sql, {'table_name': table_name, 'column_name': column_name}).fetchone():
+                        continue
+                    
+                    db.execute(text(f"""
+                        ALTER TABLE {table_name} 
+                        ADD COLUMN {column_name} {column_type}
+                    """))
+                    db.commit()
+                    print(f"✅ 已为 {table_name} 表添加 {column_name} 列")
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  添加行内容摘要列时出错: {e}")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  检查行内容摘要列时出错: {e}")
+        # 不抛出异常，允许应用继续运行
+
 def get_db():
     """获取数据库会话"""
     db = SessionLocal()
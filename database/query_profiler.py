@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL 分析（N+1 查询和慢查询检测）
+
+开启 SQL_PROFILE=true 后，在数据库引擎上监听 before/after_cursor_execute 事件，
+按执行单元（HTTP 请求、Streamlit 页面运行、定时任务）统计 SQL 语句：
+
+- 语句数和总耗时
+- 按语句结构（参数替换为 ?）汇总的执行次数，同一结构重复达到 SQL_REPEAT_THRESHOLD 次视为 N+1 查询
+- 超过 SQL_SLOW_QUERY_MS 毫秒的慢查询及其在项目代码中的调用位置
+
+单元结束时把汇总写入日志，最近的汇总保存在内存中（QueryProfiler.recent_summaries）。
+未开启时不注册事件监听，没有额外开销。
+
+用法：
+    with profile_unit('job:save_daily_data'):
+        ...
+    
+    @profile_unit('job:save_daily_data')
+    def save_daily_data(self): ...
+    
+    profile_streamlit_rerun('历史仪表盘')   # 页面脚本开头调用
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 保留的最近单元汇总数
+RECENT_SUMMARIES = 100
+
+_PARAM_PATTERNS = [
+    (re.compile(r"%\(\w+\)s"), '?'),               # psycopg2 命名参数
+    (re.compile(r"'(?:[^']|'')*'"), '?'),          # 字符串字面量
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), '?'),       # 数字字面量
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), '(?...)'),  # IN 列表
+    (re.compile(r"\s+"), ' '),
+]
+
+
+def statement_shape(statement: str) -> str:
+    """把 SQL 语句规范化为结构（去掉参数和字面量），用于识别重复执行的同类语句"""
+    shape = statement
+    for pattern, replacement in _PARAM_PATTERNS:
+        shape = pattern.sub(replacement, shape)
+    return shape.strip()
+
+
+def find_call_site() -> str:
+    """返回调用栈中最近的项目代码位置（跳过 SQLAlchemy 和本模块）"""
+    this_file = Path(__file__).resolve()
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith('<'):
+            continue
+        path = Path(frame.filename).resolve()
+        if path == this_file or 'site-packages' in path.parts:
+            continue
+        try:
+            relative = path.relative_to(PROJECT_ROOT)
+        except ValueError:
+            continue
+        return f"{relative}:{frame.lineno} ({frame.name})"
+    return 'unknown'
+
+
+class QueryUnit:
+    """一个执行单元内的 SQL 统计"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self.statements = 0
+        self.seconds = 0.0
+        # 语句结构 -> {'count', 'seconds', 'callSite'}
+        self.shapes: Dict[str, Dict] = {}
+        self.slow_queries: List[Dict] = []
+        self._lock = threading.Lock()
+    
+    def record(self, statement: str, seconds: float, slow_threshold: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.statements += 1
+            self.seconds += seconds
+            item = self.shapes.get(shape)
+            is_new = item is None
+            if is_new:
+                item = self.shapes[shape] = {'count': 0, 'seconds': 0.0, 'callSite': None}
+            item['count'] += 1
+            item['seconds'] += seconds
+        
+        is_slow = seconds >= slow_threshold
+        if is_new or is_slow:
+            call_site = find_call_site()
+            if is_new:
+                item['callSite'] = call_site
+            if is_slow:
+                with self._lock:
+                    self.slow_queries.append({
+                        'ms': round(seconds * 1000, 1),
+                        'callSite': call_site,
+                        'statement': shape[:500],
+                    })
+    
+    def summary(self, repeat_threshold: int) -> Dict:
+        """单元汇总：语句数、耗时、重复语句（疑似 N+1）和慢查询"""
+        with self._lock:
+            repeated = [
+                {
+                    'count': item['count'],
+                    'ms': round(item['seconds'] * 1000, 1),
+                    'callSite': item['callSite'],
+                    'statement': shape[:500],
+                }
+                for shape, item in self.shapes.items()
+                if item['count'] >= repeat_threshold
+            ]
+            repeated.sort(key=lambda item: item['count'], reverse=True)
+            return {
+                'unit': self.name,
+                'startedAt': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+                'durationMs': round((time.time() - self.started_at) * 1000, 1),
+                'statements': self.statements,
+                'distinctStatements': len(self.shapes),
+                'dbMs': round(self.seconds * 1000, 1),
+                'repeated': repeated,
+                'slowQueries': list(self.slow_queries),
+            }
+
+
+class QueryProfiler:
+    """SQL 分析器：注册引擎事件监听并维护当前执行单元"""
+    
+    def __init__(self, slow_query_ms: float = None, repeat_threshold: int = None):
+        self.slow_seconds = (Config.SQL_SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms) / 1000
+        self.repeat_threshold = Config.SQL_REPEAT_THRESHOLD if repeat_threshold is None else repeat_threshold
+        self._current: contextvars.ContextVar[Optional[QueryUnit]] = contextvars.ContextVar('query_unit', default=None)
+        self._recent = deque(maxlen=RECENT_SUMMARIES)
+        self._engines = []
+    
+    def install(self, engine):
+        """在引擎上注册事件监听"""
+        if engine in self._engines:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._engines.append(engine)
+    
+    def uninstall(self):
+        """移除所有引擎上的事件监听"""
+        for engine in self._engines:
+            event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._engines.clear()
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_profiler_start', []).append(time.perf_counter())
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_profiler_start')
+        if not starts:
+            return
+        seconds = time.perf_counter() - starts.pop()
+        
+        unit = self._current.get()
+        if unit is not None:
+            unit.record(statement, seconds, self.slow_seconds)
+        elif seconds >= self.slow_seconds:
+            # 不在执行单元内的慢查询也记录日志
+            logger.warning(f"🐢 慢查询 {seconds * 1000:.0f}ms @ {find_call_site()}: {statement_shape(statement)[:300]}")
+    
+    def begin(self, name: str) -> contextvars.Token:
+        """开始一个执行单元（返回值用于 end）"""
+        return self._current.set(QueryUnit(name))
+    
+    def end(self, token: contextvars.Token = None) -> Optional[Dict]:
+        """结束当前执行单元，输出汇总日志并返回汇总"""
+        unit = self._current.get()
+        if token is not None:
+            self._current.reset(token)
+        else:
+            self._current.set(None)
+        if unit is None:
+            return None
+        return self.finish(unit)
+    
+    def finish(self, unit: QueryUnit) -> Dict:
+        """汇总执行单元并输出日志"""
+        summary = unit.summary(self.repeat_threshold)
+        self._recent.append(summary)
+        self._log_summary(summary)
+        return summary
+    
+    def current_unit(self) -> Optional[QueryUnit]:
+        """当前执行单元"""
+        return self._current.get()
+    
+    def recent_summaries(self) -> List[Dict]:
+        """最近的单元汇总（最新的在前）"""
+        return list(reversed(self._recent))
+    
+    def _log_summary(self, summary: Dict):
+        logger.info(
+            f"📊 SQL [{summary['unit']}] {summary['statements']} 条语句 "
+            f"({summary['distinctStatements']} 种结构)，数据库耗时 {summary['dbMs']}ms / 总耗时 {summary['durationMs']}ms"
+        )
+        for item in summary['repeated']:
+            logger.warning(
+                f"🔁 疑似 N+1 查询 [{summary['unit']}] 同一语句执行 {item['count']} 次（{item['ms']}ms）"
+                f" @ {item['callSite']}: {item['statement'][:300]}"
+            )
+        for item in summary['slowQueries']:
+            logger.warning(f"🐢 慢查询 [{summary['unit']}] {item['ms']}ms @ {item['callSite']}: {item['statement'][:300]}")
+
+
+# 全局分析器实例（SQL_PROFILE 开启时由 install_query_profiler 创建）
+_profiler: Optional[QueryProfiler] = None
+
+
+def install_query_profiler(engine, enabled: bool = None) -> Optional[QueryProfiler]:
+    """
+    在引擎上启用 SQL 分析（默认由 Config.SQL_PROFILE 控制）
+    
+    Returns:
+        QueryProfiler 实例，未启用时返回None
+    """
+    global _profiler
+    if enabled is None:
+        enabled = Config.SQL_PROFILE
+    if not enabled:
+        return None
+    if _profiler is None:
+        _profiler = QueryProfiler()
+    _profiler.install(engine)
+    logger.info(f"SQL 分析已启用：慢查询阈值 {Config.SQL_SLOW_QUERY_MS}ms，重复阈值 {Config.SQL_REPEAT_THRESHOLD} 次")
+    return _profiler
+
+
+def get_query_profiler() -> Optional[QueryProfiler]:
+    """获取 SQL 分析器（未启用时返回None）"""
+    return _profiler
+
+
+@contextmanager
+def profile_unit(name: str):
+    """
+    把 with 块（或被装饰的函数）作为一个执行单元统计 SQL
+    
+    未启用 SQL 分析或已在其他单元内时不做任何事。
+    """
+    profiler = _profiler
+    if profiler is None or profiler.current_unit() is not None:
+        yield
+        return
+    token = profiler.begin(name)
+    try:
+        yield
+    finally:
+        profiler.end(token)
+
+
+def profile_streamlit_rerun(page_name: str):
+    """
+    把当前 Streamlit 页面运行作为一个执行单元（在页面脚本开头调用）
+    
+    Streamlit 没有页面运行结束的回调：同一会话的上一次运行在下一次运行开始时结束并输出汇总。
+    """
+    profiler = _profiler
+    if profiler is None:
+        return
+    import streamlit as st
+    
+    previous = st.session_state.get('_sql_profile_unit')
+    if previous is not None:
+        profiler.finish(previous)
+    profiler.begin(f"streamlit:{page_name}")
+    st.session_state['_sql_profile_unit'] = profiler.current_unit()
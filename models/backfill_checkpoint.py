@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史数据回填进度模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from database.db import Base
+
+class BackfillCheckpoint(Base):
+    """
+    历史数据回填进度（每个数据集、每个日期一行）
+    
+    回填中断后重新运行时跳过已完成（done/empty）的分区，只重试失败和未处理的分区。
+    """
+    __tablename__ = 'backfill_checkpoint'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dataset = Column(String(50), nullable=False, comment='数据集: zt_pool/zbgc_pool/dtgc_pool')
+    date = Column(Date, nullable=False, index=True, comment='日期')
+    status = Column(String(20), nullable=False, comment='状态: done/empty/failed')
+    row_count = Column(Integer, nullable=False, default=0, comment='保存条数')
+    attempts = Column(Integer, nullable=False, default=0, comment='尝试次数')
+    error_message = Column(Text, nullable=True, comment='最近一次错误信息')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+    
+    __table_args__ = (
+        UniqueConstraint('dataset', 'date', name='uq_backfill_dataset_date'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'dataset': self.dataset,
+            'date': self.date.strftime('%Y-%m-%d') if self.date else None,
+            'status': self.status,
+            'rowCount': self.row_count,
+            'attempts': self.attempts,
+            'errorMessage': self.error_message,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+概念板块成分股模型
+
+每个（概念, 股票代码）一行，概念名称保存在维度表 dim_sector 中（concept_id），
+由 ConceptMembershipService 定期批量刷新，只写入新增和移除的成分股。
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from database.db import Base
+from models.dimension import DimensionCache
+
+class ConceptMembership(Base):
+    """概念板块成分股（概念 -> 股票代码）"""
+    __tablename__ = 'concept_membership'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    concept_id = Column(Integer, ForeignKey('dim_sector.id'), nullable=False, index=True, comment='概念名称ID（dim_sector）')
+    stock_code = Column(String(10), nullable=False, index=True, comment='股票代码')
+    created_at = Column(DateTime, server_default=func.now(), comment='加入时间（首次发现的刷新时间）')
+    
+    __table_args__ = (
+        UniqueConstraint('concept_id', 'stock_code', name='uq_concept_membership'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'concept': DimensionCache.name('sector', self.concept_id),
+            'conceptId': self.concept_id,
+            'stockCode': self.stock_code,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+        }
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+名称维度表模型（字典编码）
+
+板块、指数、股票名称在历史表中每个交易日重复出现，改为保存在维度表中，
+历史表只保存整数ID（sector_id / index_id / stock_id 等）。
+
+DimensionCache 在进程内缓存 名称 <-> ID 的映射：
+- 写入时通过 resolve_ids 批量把名称转换为ID（不存在的名称自动插入维度表）
+- 读取时通过 name 把ID还原为名称（未命中时整表加载，维度表很小）
+"""
+import threading
+from typing import Dict, Iterable, Optional
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from database.db import Base, engine
+
+class DimSector(Base):
+    """板块/行业名称维度表"""
+    __tablename__ = 'dim_sector'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True, comment='板块/行业名称')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+
+class DimIndex(Base):
+    """指数名称维度表"""
+    __tablename__ = 'dim_index'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True, comment='指数名称')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+
+class DimStock(Base):
+    """股票名称维度表"""
+    __tablename__ = 'dim_stock'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True, comment='股票名称')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+
+
+class DimensionCache:
+    """维度表 名称 <-> ID 的进程内缓存（线程安全）"""
+    
+    MODELS = {
+        'sector': DimSector,
+        'index': DimIndex,
+        'stock': DimStock,
+    }
+    
+    # IN 查询每批的名称数
+    QUERY_CHUNK = 500
+    
+    _ids: Dict[str, Dict[str, int]] = {kind: {} for kind in MODELS}
+    _names: Dict[str, Dict[int, str]] = {kind: {} for kind in MODELS}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def _remember(cls, kind: str, rows):
+        with cls._lock:
+            for dim_id, name in rows:
+                cls._ids[kind][name] = dim_id
+                cls._names[kind][dim_id] = name
+    
+    @classmethod
+    def _query_ids(cls, session: Session, kind: str, names: list):
+        model = cls.MODELS[kind]
+        for i in range(0, len(names), cls.QUERY_CHUNK):
+            chunk = names[i:i + cls.QUERY_CHUNK]
+            cls._remember(kind, session.query(model.id, model.name).filter(model.name.in_(chunk)).all())
+    
+    @classmethod
+    def resolve_ids(cls, db: Session, kind: str, names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """
+        批量把名称转换为维度ID，不存在的名称插入维度表
+        
+        新名称在独立的会话中插入并立即提交，调用方的事务回滚不会使缓存中的ID失效。
+        
+        Returns:
+            名称 -> ID（空名称不包含在结果中）
+        """
+        wanted = {str(name) for name in names if name}
+        missing = [name for name in wanted if name not in cls._ids[kind]]
+        if missing:
+            session = Session(bind=db.get_bind())
+            try:
+                cls._query_ids(session, kind, missing)
+                new_names = [name for name in missing if name not in cls._ids[kind]]
+                if new_names:
+                    model = cls.MODELS[kind]
+                    try:
+                        session.add_all([model(name=name) for name in new_names])
+                        session.commit()
+                    except IntegrityError:
+                        # 其他进程同时插入了部分名称：逐个插入，跳过已存在的
+                        session.rollback()
+                        for name in new_names:
+                            try:
+                                session.add(model(name=name))
+                                session.commit()
+                            except IntegrityError:
+                                session.rollback()
+                    cls._query_ids(session, kind, new_names)
+            finally:
+                session.close()
+        return {name: cls._ids[kind][name] for name in wanted if name in cls._ids[kind]}
+    
+    @classmethod
+    def name(cls, kind: str, dim_id: Optional[int]) -> Optional[str]:
+        """把维度ID还原为名称（缓存未命中时重新加载整个维度表）"""
+        if dim_id is None:
+            return None
+        name = cls._names[kind].get(dim_id)
+        if name is None:
+            cls.load(kind)
+            name = cls._names[kind].get(dim_id)
+        return name
+    
+    @classmethod
+    def load(cls, kind: str):
+        """加载整个维度表到缓存"""
+        model = cls.MODELS[kind]
+        session = Session(bind=engine)
+        try:
+            cls._remember(kind, session.query(model.id, model.name).all())
+        finally:
+            session.close()
+    
+    @classmethod
+    def clear(cls):
+        """清空缓存"""
+        with cls._lock:
+            for kind in cls.MODELS:
+                cls._ids[kind].clear()
+                cls._names[kind].clear()
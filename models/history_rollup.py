@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史数据周汇总模型
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, UniqueConstraint
+from sqlalchemy.sql import func
+from database.db import Base
+from models.dimension import DimensionCache
+
+# 数据集 -> 名称维度
+DATASET_DIMENSIONS = {
+    'index_history': 'index',
+    'stock_fund_flow_history': 'stock',
+}
+
+class HistoryWeeklyRollup(Base):
+    """
+    历史数据周汇总（每个数据集、每周、每个指数/股票一行）
+    
+    超过保留期限的明细数据汇总到本表后删除（见 PartitionService.maintain）。
+    """
+    __tablename__ = 'history_weekly_rollup'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dataset = Column(String(50), nullable=False, comment='数据集: index_history/stock_fund_flow_history')
+    week_start = Column(Date, nullable=False, index=True, comment='周一日期')
+    first_date = Column(Date, nullable=False, comment='本周第一个有数据的日期')
+    last_date = Column(Date, nullable=False, comment='本周最后一个有数据的日期')
+    code = Column(String(10), nullable=False, comment='指数/股票代码')
+    name = Column(String(50), nullable=True, comment='名称（旧数据，新数据保存在 name_id）')
+    name_id = Column(Integer, nullable=True, comment='名称ID（dim_index/dim_stock）')
+    days = Column(Integer, nullable=False, comment='交易日数')
+    open_price = Column(Float, nullable=True, comment='周开盘价')
+    close_price = Column(Float, nullable=True, comment='周收盘价（最后一日最新价）')
+    high_price = Column(Float, nullable=True, comment='周最高价')
+    low_price = Column(Float, nullable=True, comment='周最低价')
+    change_percent = Column(Float, nullable=True, comment='周涨跌幅(%)')
+    volume = Column(Float, nullable=True, comment='成交量合计')
+    amount = Column(Float, nullable=True, comment='成交额合计')
+    inflow = Column(Float, nullable=True, comment='流入资金合计(元)')
+    outflow = Column(Float, nullable=True, comment='流出资金合计(元)')
+    net_amount = Column(Float, nullable=True, comment='净额合计(元)')
+    turnover_rate = Column(Float, nullable=True, comment='日均换手率(%)')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    
+    __table_args__ = (
+        UniqueConstraint('dataset', 'week_start', 'code', name='uq_weekly_rollup_dataset_week_code'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        name = self.name
+        if name is None and self.dataset in DATASET_DIMENSIONS:
+            name = DimensionCache.name(DATASET_DIMENSIONS[self.dataset], self.name_id)
+        return {
+            'id': self.id,
+            'dataset': self.dataset,
+            'weekStart': self.week_start.strftime('%Y-%m-%d') if self.week_start else None,
+            'firstDate': self.first_date.strftime('%Y-%m-%d') if self.first_date else None,
+            'lastDate': self.last_date.strftime('%Y-%m-%d') if self.last_date else None,
+            'code': self.code,
+            'name': name,
+            'days': self.days,
+            'openPrice': self.open_price,
+            'closePrice': self.close_price,
+            'highPrice': self.high_price,
+            'lowPrice': self.low_price,
+            'changePercent': self.change_percent,
+            'volume': self.volume,
+            'amount': self.amount,
+            'inflow': self.inflow,
+            'outflow': self.outflow,
+            'netAmount': self.net_amount,
+            'turnoverRate': self.turnover_rate,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+        }
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey
 from sqlalchemy.sql import func
 from database.db import Base
+from models.dimension import DimensionCache
 
 class IndexHistory(Base):
     """指数历史数据模型"""
@@ -9,7 +10,8 @@ class IndexHistory(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, nullable=False, index=True, comment='日期')
     code = Column(String(10), nullable=False, index=True, comment='指数代码')
-    name = Column(String(50), nullable=False, comment='指数名称')
+    name = Column(String(50), nullable=True, comment='指数名称（旧数据，新数据保存在 index_id）')
+    index_id = Column(Integer, ForeignKey('dim_index.id'), nullable=True, comment='指数名称ID（dim_index）')
     current_price = Column(Float, nullable=False, comment='最新价')
     change_percent = Column(Float, nullable=False, comment='涨跌幅(%)')
     change = Column(Float, nullable=False, comment='涨跌额')
@@ -21,7 +23,9 @@ class IndexHistory(Base):
     prev_close = Column(Float, nullable=False, comment='昨收')
     amplitude = Column(Float, nullable=False, comment='振幅(%)')
     volume_ratio = Column(Float, nullable=False, comment='量比')
+    row_hash = Column(String(16), nullable=True, comment='行内容摘要（同日重复保存时用于变化检测）')
     created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='最后写入时间（变化检测写入时更新）')
     
     def to_dict(self):
         """转换为字典"""
@@ -29,7 +33,7 @@ class IndexHistory(Base):
             'id': self.id,
             'date': self.date.strftime('%Y-%m-%d') if self.date else None,
             'code': self.code,
-            'name': self.name,
+            'name': self.name if self.name is not None else DimensionCache.name('index', self.index_id),
             'currentPrice': self.current_price,
             'changePercent': self.change_percent,
             'change': self.change,
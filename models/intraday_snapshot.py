@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+盘中快照增量数据模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Date, Time, Text, Boolean, Index
+from sqlalchemy.sql import func
+from database.db import Base
+
+class IntradaySnapshot(Base):
+    """
+    盘中快照增量数据模型（按 日期 + 采样时间点 + 实体 存储）
+    
+    只保存相对上一个采样时间点发生变化的实体，payload 中只包含变化的字段。
+    某个时间点的完整快照可以通过按时间顺序叠加增量重建。
+    """
+    __tablename__ = 'intraday_snapshot'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False, comment='日期')
+    tick = Column(Time, nullable=False, comment='采样时间点')
+    dataset = Column(String(20), nullable=False, comment='数据集: industry/concept/zt_pool')
+    entity_key = Column(String(50), nullable=False, comment='实体键（板块名称或股票代码）')
+    payload = Column(Text, nullable=True, comment='变化字段（JSON）')
+    is_removed = Column(Boolean, nullable=False, default=False, comment='实体是否在该时间点移除')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    
+    __table_args__ = (
+        Index('idx_intraday_snapshot_date_dataset_tick', 'date', 'dataset', 'tick'),
+        Index('idx_intraday_snapshot_entity', 'date', 'dataset', 'entity_key'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'date': self.date.strftime('%Y-%m-%d') if self.date else None,
+            'tick': self.tick.strftime('%H:%M:%S') if self.tick else None,
+            'dataset': self.dataset,
+            'entityKey': self.entity_key,
+            'payload': self.payload,
+            'isRemoved': self.is_removed,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+        }
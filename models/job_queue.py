@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务队列模型
+"""
+import json
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Index
+from sqlalchemy.sql import func
+from database.db import Base
+
+class QueueJob(Base):
+    """
+    后台任务队列（每个任务一行）
+    
+    页面和接口插入 queued 任务后立即返回，独立的工作进程（run_job_worker.py）
+    用 FOR UPDATE SKIP LOCKED 领取任务并执行，执行过程中更新进度和心跳，页面轮询该行查看进度。
+    """
+    __tablename__ = 'job_queue'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(String(50), nullable=False, comment='任务类型')
+    params = Column(Text, nullable=True, comment='任务参数（JSON）')
+    status = Column(String(20), nullable=False, default='queued', comment='状态: queued/running/success/failed/cancelled')
+    priority = Column(Integer, nullable=False, default=0, comment='优先级（越大越先执行）')
+    progress = Column(Float, nullable=False, default=0.0, comment='进度（0-1）')
+    progress_message = Column(String(500), nullable=True, comment='当前进度说明')
+    result = Column(Text, nullable=True, comment='执行结果（JSON）')
+    error_message = Column(Text, nullable=True, comment='错误信息')
+    error_traceback = Column(Text, nullable=True, comment='错误堆栈')
+    attempts = Column(Integer, nullable=False, default=0, comment='已领取次数')
+    max_attempts = Column(Integer, nullable=False, default=2, comment='最多领取次数（工作进程失联后重新排队）')
+    worker = Column(String(200), nullable=True, comment='执行的工作进程: 主机名:进程号')
+    enqueued_by = Column(String(100), nullable=True, comment='提交来源: page/api/scheduler')
+    created_at = Column(DateTime, server_default=func.now(), comment='提交时间')
+    started_at = Column(DateTime, nullable=True, comment='开始执行时间')
+    heartbeat_at = Column(DateTime, nullable=True, comment='工作进程最近心跳时间')
+    finished_at = Column(DateTime, nullable=True, comment='结束时间')
+    
+    __table_args__ = (
+        Index('ix_job_queue_status_priority', 'status', 'priority', 'id'),
+        Index('ix_job_queue_type_status', 'job_type', 'status'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'jobType': self.job_type,
+            'params': json.loads(self.params) if self.params else {},
+            'status': self.status,
+            'priority': self.priority,
+            'progress': self.progress,
+            'progressMessage': self.progress_message,
+            'result': json.loads(self.result) if self.result else None,
+            'errorMessage': self.error_message,
+            'errorTraceback': self.error_traceback,
+            'attempts': self.attempts,
+            'maxAttempts': self.max_attempts,
+            'worker': self.worker,
+            'enqueuedBy': self.enqueued_by,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'startedAt': self.started_at.isoformat() if self.started_at else None,
+            'heartbeatAt': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+        }
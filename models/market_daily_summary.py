@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+每日市场概况模型（预先计算的市场宽度统计）
+"""
+from sqlalchemy import Column, Integer, Float, DateTime, Date
+from sqlalchemy.sql import func
+from database.db import Base
+
+class MarketDailySummary(Base):
+    """
+    每日市场概况（每个交易日一行）
+    
+    由各历史数据服务的保存函数和历史数据回填在写入明细后计算（见 MarketSummaryService.refresh_summary），
+    仪表盘的历史指标卡片和多月趋势图直接读取本表，不再从明细数据汇总。
+    """
+    __tablename__ = 'market_daily_summary'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False, unique=True, index=True, comment='日期')
+    
+    # 行业板块
+    industry_count = Column(Integer, nullable=False, default=0, comment='行业板块数')
+    industry_up = Column(Integer, nullable=False, default=0, comment='上涨行业板块数')
+    industry_down = Column(Integer, nullable=False, default=0, comment='下跌行业板块数')
+    industry_net_inflow = Column(Float, nullable=False, default=0, comment='行业板块资金净流入合计(亿元，只计净流入为正的板块)')
+    industry_net_outflow = Column(Float, nullable=False, default=0, comment='行业板块资金净流出合计(亿元，正数)')
+    
+    # 概念板块
+    concept_count = Column(Integer, nullable=False, default=0, comment='概念板块数')
+    concept_up = Column(Integer, nullable=False, default=0, comment='上涨概念板块数')
+    concept_down = Column(Integer, nullable=False, default=0, comment='下跌概念板块数')
+    concept_net_inflow = Column(Float, nullable=False, default=0, comment='概念板块资金净流入合计(亿元，只计净流入为正的板块)')
+    concept_net_outflow = Column(Float, nullable=False, default=0, comment='概念板块资金净流出合计(亿元，正数)')
+    
+    # 股票池
+    zt_count = Column(Integer, nullable=False, default=0, comment='涨停股票数')
+    continuous_count = Column(Integer, nullable=False, default=0, comment='连板股票数（连板数>1）')
+    zb_count = Column(Integer, nullable=False, default=0, comment='炸板股票数')
+    dt_count = Column(Integer, nullable=False, default=0, comment='跌停股票数')
+    
+    # 指数
+    index_count = Column(Integer, nullable=False, default=0, comment='指数数')
+    index_up = Column(Integer, nullable=False, default=0, comment='上涨指数数')
+    index_down = Column(Integer, nullable=False, default=0, comment='下跌指数数')
+    
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+    
+    @property
+    def continuous_rate(self) -> float:
+        """连板率(%)：连板股票数 / 涨停股票数"""
+        return round(self.continuous_count / self.zt_count * 100, 2) if self.zt_count else 0.0
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'date': self.date.strftime('%Y-%m-%d') if self.date else None,
+            'industryCount': self.industry_count,
+            'industryUp': self.industry_up,
+            'industryDown': self.industry_down,
+            'industryNetInflow': self.industry_net_inflow,
+            'industryNetOutflow': self.industry_net_outflow,
+            'conceptCount': self.concept_count,
+            'conceptUp': self.concept_up,
+            'conceptDown': self.concept_down,
+            'conceptNetInflow': self.concept_net_inflow,
+            'conceptNetOutflow': self.concept_net_outflow,
+            'ztCount': self.zt_count,
+            'continuousCount': self.continuous_count,
+            'continuousRate': self.continuous_rate,
+            'zbCount': self.zb_count,
+            'dtCount': self.dt_count,
+            'indexCount': self.index_count,
+            'indexUp': self.index_up,
+            'indexDown': self.index_down,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -3,6 +3,7 @@
 """
 定时任务执行记录模型
 """
+import json
 from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, Date
 from sqlalchemy.sql import func
 from database.db import Base
@@ -34,6 +35,7 @@ class SchedulerExecution(Base):
     # 其他信息
     is_trading_day = Column(Boolean, nullable=True, comment='是否为交易日')
     notes = Column(Text, nullable=True, comment='备注信息')
+    stage_breakdown = Column(Text, nullable=True, comment='各阶段耗时（JSON）')
     
     created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
     
@@ -57,6 +59,7 @@ class SchedulerExecution(Base):
             'errorTraceback': self.error_traceback,
             'isTradingDay': self.is_trading_day,
             'notes': self.notes,
+            'stageBreakdown': json.loads(self.stage_breakdown) if self.stage_breakdown else None,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
         }
 
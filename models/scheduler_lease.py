@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时任务调度器主节点租约模型
+"""
+from sqlalchemy import Column, String, DateTime
+from database.db import Base
+
+class SchedulerLease(Base):
+    """
+    调度器主节点租约（每个调度器一行）
+    
+    持有未过期租约的进程是主节点，只有主节点执行定时任务；
+    主节点定期续约，进程退出或失联后租约过期，其他进程接管。
+    时间均为数据库时间换算的北京时间（不带时区），不使用各进程的本地时钟。
+    """
+    __tablename__ = 'scheduler_lease'
+    
+    name = Column(String(50), primary_key=True, comment='调度器名称')
+    holder = Column(String(200), nullable=False, comment='持有者: 主机名:进程号:随机后缀')
+    acquired_at = Column(DateTime, nullable=False, comment='成为主节点的时间')
+    renewed_at = Column(DateTime, nullable=False, comment='最近续约时间')
+    expires_at = Column(DateTime, nullable=False, comment='租约过期时间')
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'acquiredAt': self.acquired_at.isoformat() if self.acquired_at else None,
+            'renewedAt': self.renewed_at.isoformat() if self.renewed_at else None,
+            'expiresAt': self.expires_at.isoformat() if self.expires_at else None,
+        }
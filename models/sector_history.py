@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, ForeignKey
 from sqlalchemy.sql import func
 from database.db import Base
+from models.dimension import DimensionCache
 
 class SectorHistory(Base):
     """板块历史数据模型（支持行业板块和概念板块）"""
@@ -10,7 +11,8 @@ class SectorHistory(Base):
     date = Column(Date, nullable=False, index=True, comment='日期')
     sector_type = Column(String(20), nullable=False, default='industry', index=True, comment='板块类型: industry(行业板块) 或 concept(概念板块)')
     index = Column(Integer, nullable=False, comment='序号')
-    name = Column(String(50), nullable=False, index=True, comment='板块名称')
+    name = Column(String(50), nullable=True, index=True, comment='板块名称（旧数据，新数据保存在 sector_id）')
+    sector_id = Column(Integer, ForeignKey('dim_sector.id'), nullable=True, index=True, comment='板块名称ID（dim_sector）')
     change_percent = Column(Float, nullable=False, comment='涨跌幅(%)')
     total_volume = Column(Float, nullable=False, comment='总成交量(万手)')
     total_amount = Column(Float, nullable=False, comment='总成交额(亿元)')
@@ -18,10 +20,13 @@ class SectorHistory(Base):
     up_count = Column(Integer, nullable=False, comment='上涨家数')
     down_count = Column(Integer, nullable=False, comment='下跌家数')
     avg_price = Column(Float, nullable=False, comment='均价')
-    leading_stock = Column(String(50), nullable=True, comment='领涨股')
+    leading_stock = Column(String(50), nullable=True, comment='领涨股（旧数据，新数据保存在 leading_stock_id）')
+    leading_stock_id = Column(Integer, ForeignKey('dim_stock.id'), nullable=True, comment='领涨股名称ID（dim_stock）')
     leading_stock_price = Column(Float, nullable=True, comment='领涨股-最新价')
     leading_stock_change_percent = Column(Float, nullable=True, comment='领涨股-涨跌幅(%)')
+    row_hash = Column(String(16), nullable=True, comment='行内容摘要（同日重复保存时用于变化检测）')
     created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='最后写入时间（变化检测写入时更新）')
     
     def to_dict(self):
         """转换为字典"""
@@ -30,7 +35,7 @@ class SectorHistory(Base):
             'date': self.date.strftime('%Y-%m-%d') if self.date else None,
             'sectorType': self.sector_type,
             'index': self.index,
-            'name': self.name,
+            'name': self.name if self.name is not None else DimensionCache.name('sector', self.sector_id),
             'changePercent': self.change_percent,
             'totalVolume': self.total_volume,
             'totalAmount': self.total_amount,
@@ -38,7 +43,7 @@ class SectorHistory(Base):
             'upCount': self.up_count,
             'downCount': self.down_count,
             'avgPrice': self.avg_price,
-            'leadingStock': self.leading_stock,
+            'leadingStock': self.leading_stock if self.leading_stock is not None else DimensionCache.name('stock', self.leading_stock_id),
             'leadingStockPrice': self.leading_stock_price,
             'leadingStockChangePercent': self.leading_stock_change_percent,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey
 from sqlalchemy.sql import func
 from database.db import Base
+from models.dimension import DimensionCache
 
 class StockFundFlowHistory(Base):
     """个股资金流即时数据模型（基于 stock_fund_flow_individual 接口）"""
@@ -9,7 +10,8 @@ class StockFundFlowHistory(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, nullable=False, index=True, comment='日期')
     stock_code = Column(String(10), nullable=False, index=True, comment='股票代码')
-    stock_name = Column(String(50), nullable=True, comment='股票简称')
+    stock_name = Column(String(50), nullable=True, comment='股票简称（旧数据，新数据保存在 stock_id）')
+    stock_id = Column(Integer, ForeignKey('dim_stock.id'), nullable=True, comment='股票简称ID（dim_stock）')
     
     # 价格和涨跌信息
     latest_price = Column(Float, nullable=True, comment='最新价')
@@ -31,7 +33,7 @@ class StockFundFlowHistory(Base):
             'id': self.id,
             'date': self.date.strftime('%Y-%m-%d') if self.date else None,
             'stockCode': self.stock_code,
-            'stockName': self.stock_name,
+            'stockName': self.stock_name if self.stock_name is not None else DimensionCache.name('stock', self.stock_id),
             'latestPrice': self.latest_price,
             'changePercent': self.change_percent,
             'turnoverRate': self.turnover_rate,
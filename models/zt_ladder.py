@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连板梯队数据模型
+"""
+from sqlalchemy import Column, Integer, Float, DateTime, Date, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from database.db import Base
+
+class ZtLadderDaily(Base):
+    """
+    连板梯队每日统计模型（每个日期、每个连板高度一行）
+    
+    由涨停股票池历史数据派生，在保存涨停股票池后增量更新。
+    """
+    __tablename__ = 'zt_ladder_daily'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False, index=True, comment='日期')
+    board_height = Column(Integer, nullable=False, comment='连板高度')
+    stock_count = Column(Integer, nullable=False, default=0, comment='该高度股票数')
+    codes = Column(Text, nullable=True, comment='该高度股票代码（逗号分隔）')
+    prev_date = Column(Date, nullable=True, comment='上一交易日')
+    prev_height_count = Column(Integer, nullable=True, comment='上一交易日前一高度（height-1）股票数')
+    promoted_count = Column(Integer, nullable=True, comment='由上一交易日前一高度晋级的股票数')
+    promotion_rate = Column(Float, nullable=True, comment='晋级率(%)')
+    max_height = Column(Integer, nullable=False, default=0, comment='当日最高连板高度')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    
+    __table_args__ = (
+        UniqueConstraint('date', 'board_height', name='uq_zt_ladder_date_height'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'date': self.date.strftime('%Y-%m-%d') if self.date else None,
+            'boardHeight': self.board_height,
+            'stockCount': self.stock_count,
+            'codes': self.codes.split(',') if self.codes else [],
+            'prevDate': self.prev_date.strftime('%Y-%m-%d') if self.prev_date else None,
+            'prevHeightCount': self.prev_height_count,
+            'promotedCount': self.promoted_count,
+            'promotionRate': self.promotion_rate,
+            'maxHeight': self.max_height,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+        }
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Time
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Time, ForeignKey
 from sqlalchemy.sql import func
 from database.db import Base
+from models.dimension import DimensionCache
 
 class ZtPoolHistory(Base):
     """涨停股票池历史数据模型"""
@@ -11,7 +12,8 @@ class ZtPoolHistory(Base):
     time = Column(Time, nullable=True, comment='时间')
     index = Column(Integer, nullable=False, comment='序号')
     code = Column(String(10), nullable=False, index=True, comment='股票代码')
-    name = Column(String(50), nullable=False, comment='股票名称')
+    name = Column(String(50), nullable=True, comment='股票名称（旧数据，新数据保存在 stock_id）')
+    stock_id = Column(Integer, ForeignKey('dim_stock.id'), nullable=True, comment='股票名称ID（dim_stock）')
     change_percent = Column(Float, nullable=False, comment='涨跌幅(%)')
     latest_price = Column(Float, nullable=False, comment='最新价')
     turnover = Column(Float, nullable=False, comment='成交额(亿元)')
@@ -24,8 +26,11 @@ class ZtPoolHistory(Base):
     explosion_count = Column(Integer, nullable=False, default=0, comment='炸板次数')
     zt_statistics = Column(String(50), nullable=True, comment='涨停统计')
     continuous_boards = Column(Integer, nullable=False, default=0, index=True, comment='连板数')
-    industry = Column(String(50), nullable=True, index=True, comment='所属行业')
+    industry = Column(String(50), nullable=True, index=True, comment='所属行业（旧数据，新数据保存在 industry_id）')
+    industry_id = Column(Integer, ForeignKey('dim_sector.id'), nullable=True, index=True, comment='所属行业ID（dim_sector）')
+    row_hash = Column(String(16), nullable=True, comment='行内容摘要（同日重复保存时用于变化检测）')
     created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='最后写入时间（变化检测写入时更新）')
     
     def to_dict(self):
         """转换为字典"""
@@ -35,7 +40,7 @@ class ZtPoolHistory(Base):
             'time': self.time.strftime('%H:%M:%S') if self.time else None,
             'index': self.index,
             'code': self.code,
-            'name': self.name,
+            'name': self.name if self.name is not None else DimensionCache.name('stock', self.stock_id),
             'changePercent': self.change_percent,
             'latestPrice': self.latest_price,
             'turnover': self.turnover,
@@ -48,7 +53,7 @@ class ZtPoolHistory(Base):
             'explosionCount': self.explosion_count,
             'ztStatistics': self.zt_statistics,
             'continuousBoards': self.continuous_boards,
-            'industry': self.industry,
+            'industry': self.industry if self.industry is not None else DimensionCache.name('sector', self.industry_id),
             'createdAt': self.created_at.isoformat() if self.created_at else None,
         }
 
@@ -45,6 +45,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('关注管理')
+
 st.markdown('<h1 class="main-header">⭐ 关注管理</h1>', unsafe_allow_html=True)
 
 # 使用标签页组织两个功能
@@ -366,7 +370,7 @@ with tab2:
                         "🔍 搜索指数",
                         value=input_value,
                         placeholder="请输入需要添加的指数或名称",
-                        help=f"共 {len(available_indices)} 个可用指数，输入关键词快速查找（点击输入框自动清除提示）",
+                        help=f"共 {len(available_indices)} 个可用指数，输入代码、名称或拼音首字母快速查找（点击输入框自动清除提示）",
                         key="index_search_input_widget"
                     )
                     
@@ -380,9 +384,11 @@ with tab2:
                     
                     # 根据搜索关键词过滤选项
                     if search_input and search_input.strip():
+                        # 按代码、名称或拼音首字母搜索（按匹配程度排序）
+                        available_codes = {idx['code'] for idx in available_indices}
                         filtered_options = [
-                            opt for opt in display_options
-                            if search_input.lower() in opt.lower()
+                            f"{idx['name']}（{idx['code']}）" for idx in search_indices(search_input.strip())
+                            if idx['code'] in available_codes
                         ]
                     else:
                         filtered_options = display_options
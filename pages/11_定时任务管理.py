@@ -5,6 +5,7 @@
 """
 import streamlit as st
 import pandas as pd
+import plotly.express as px
 from pathlib import Path
 import sys
 from datetime import datetime
@@ -18,6 +19,10 @@ from tasks.sector_scheduler import get_scheduler
 from utils.time_utils import UTC8, get_utc8_date
 from database.db import SessionLocal
 from services.scheduler_execution_service import SchedulerExecutionService
+from services.scheduler_analytics_service import SchedulerAnalyticsService
+from services.job_queue_service import JobQueueService, JOB_TYPES
+from tasks.job_worker import JOB_HANDLERS
+from config import Config
 from datetime import date, timedelta
 
 st.set_page_config(
@@ -31,6 +36,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles, get_scheduler_specific_styles
 apply_common_styles(additional_styles=get_scheduler_specific_styles())
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('定时任务管理')
+
 # 页面标题
 st.markdown('<h1 class="main-header">⏰ 定时任务管理</h1>', unsafe_allow_html=True)
 
@@ -67,6 +76,38 @@ with col3:
     now = datetime.now(UTC8)
     st.metric("当前时间", now.strftime("%H:%M:%S"))
 
+# 主节点选举状态（多个进程都启动调度器时只有主节点执行定时任务）
+leader = getattr(scheduler_obj, 'leader', None)
+if leader is None:
+    st.caption("ℹ️ 未启用主节点选举（SCHEDULER_LEADER_ELECTION=false），本进程启动调度器后直接执行定时任务")
+else:
+    leader_status = leader.get_status()
+    lease = leader_status['lease']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if not is_running:
+            role_text = "⚪ 未参与竞选"
+        elif leader_status['isLeader']:
+            role_text = "👑 主节点"
+        else:
+            role_text = "👀 观察者"
+        st.metric("本进程角色", role_text)
+    with col2:
+        if lease and lease['active']:
+            st.metric("当前主节点", lease['holder'].split(':')[0])
+        else:
+            st.metric("当前主节点", "无")
+    with col3:
+        st.metric("租约有效期", f"{leader_status['leaseSeconds']} 秒")
+    st.caption(f"本进程: `{leader_status['identity']}`")
+    if lease:
+        st.caption(
+            f"租约持有者: `{lease['holder']}`，成为主节点: {lease['acquiredAt']}，"
+            f"最近续约: {lease['renewedAt']}，过期时间: {lease['expiresAt']}"
+        )
+    if is_running and not leader_status['isLeader']:
+        st.info("💡 其他进程是主节点，本进程的定时任务到点后会跳过；主节点退出或失联超过租约有效期后自动接管。")
+
 # 任务列表
 st.markdown("---")
 st.markdown("### 📋 定时任务列表")
@@ -225,156 +266,104 @@ else:
                     force_execution = st.checkbox("强制执行", key=f"force_{job.id}", 
                                                   help="跳过交易日检查，强制执行任务")
                 
-                # 手动执行按钮
+                # 手动执行按钮：启用后台任务队列时提交到队列，由工作进程执行，页面不等待；
+                # 未启用（没有部署工作进程）时在页面中直接执行
+                job_type = getattr(job.func, '__name__', job.id)
                 if st.button(f"▶️ 立即执行", key=f"run_{job.id}", use_container_width=True):
-                    with st.spinner("正在执行任务，请稍候..."):
-                        try:
-                            # 执行任务
-                            if job.id == 'save_daily_data':
-                                # 使用 run_scheduler_task 中的函数
-                                results = {}
-                                try:
-                                    # 检查是否为交易日（除非强制执行）
-                                    if not force_execution:
-                                        today = get_utc8_date()
-                                        if not scheduler_obj._is_trading_day(today):
-                                            st.warning(f"⚠️ 今日 ({today}) 不是交易日，任务已跳过")
-                                            st.info('💡 如需强制执行，请勾选上方的"强制执行"选项')
-                                            # 保存跳过记录
-                                            execution_key = f"execution_{job.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                                            st.session_state[execution_key] = {
-                                                'job_id': job.id,
-                                                'job_name': job.name,
-                                                'execution_time': datetime.now(UTC8).strftime("%Y-%m-%d %H:%M:%S"),
-                                                'status': 'skipped',
-                                                'reason': f'今日 ({today}) 不是交易日'
-                                            }
-                                            # 不继续执行，但继续显示页面
-                                            continue_execution = False
-                                        else:
-                                            continue_execution = True
-                                    else:
-                                        continue_execution = True
-                                    
-                                    if not continue_execution:
-                                        # 跳过执行，但继续显示页面
-                                        pass
-                                    else:
-                                        # 获取数据库会话
-                                        from database.db import SessionLocal
-                                        from services.sector_history_service import SectorHistoryService
-                                        from services.zt_pool_history_service import ZtPoolHistoryService
-                                        from services.zbgc_pool_history_service import ZbgcPoolHistoryService
-                                        from services.dtgc_pool_history_service import DtgcPoolHistoryService
-                                        from services.index_history_service import IndexHistoryService
-                                        from utils.excel_export import append_sectors_to_excel
-                                        
-                                        db = SessionLocal()
-                                        try:
-                                            # 1. 保存行业板块数据
-                                            try:
-                                                industry_count = SectorHistoryService.save_today_sectors(db, sector_type='industry')
-                                                results['sectors'] = industry_count
-                                                excel_file = append_sectors_to_excel()
-                                            except Exception as e:
-                                                results['sectors'] = f"失败: {str(e)}"
-                                            
-                                            # 1.1 保存概念板块数据
-                                            try:
-                                                concept_count = SectorHistoryService.save_today_sectors(db, sector_type='concept')
-                                                if 'sectors' in results and isinstance(results['sectors'], int):
-                                                    results['sectors'] = f"行业:{results['sectors']}, 概念:{concept_count}"
-                                                elif 'sectors' in results:
-                                                    results['sectors'] = f"{results['sectors']}, 概念:{concept_count}"
-                                                else:
-                                                    results['sectors'] = f"概念:{concept_count}"
-                                            except Exception as e:
-                                                if 'sectors' in results:
-                                                    results['sectors'] = f"{results['sectors']}, 概念失败: {str(e)}"
-                                                else:
-                                                    results['sectors'] = f"概念失败: {str(e)}"
-                                            
-                                            # 2. 保存涨停股票池数据
-                                            try:
-                                                zt_count = ZtPoolHistoryService.save_today_zt_pool(db)
-                                                results['zt_pool'] = zt_count
-                                            except Exception as e:
-                                                results['zt_pool'] = f"失败: {str(e)}"
-                                            
-                                            # 3. 保存炸板股票池数据
-                                            try:
-                                                zbgc_count = ZbgcPoolHistoryService.save_today_zbgc_pool(db)
-                                                results['zbgc_pool'] = zbgc_count
-                                            except Exception as e:
-                                                results['zbgc_pool'] = f"失败: {str(e)}"
-                                            
-                                            # 4. 保存跌停股票池数据
-                                            try:
-                                                dtgc_count = DtgcPoolHistoryService.save_today_dtgc_pool(db)
-                                                results['dtgc_pool'] = dtgc_count
-                                            except Exception as e:
-                                                results['dtgc_pool'] = f"失败: {str(e)}"
-                                            
-                                            # 5. 保存指数数据
-                                            try:
-                                                index_count = IndexHistoryService.save_today_indices(db)
-                                                results['indices'] = index_count
-                                            except Exception as e:
-                                                results['indices'] = f"失败: {str(e)}"
-                                            
-                                        finally:
-                                            db.close()
-                                        
-                                        # 显示执行结果
-                                        st.success("✅ 任务执行完成！")
-                                        
-                                        # 结果详情
-                                        st.markdown("#### 📊 执行结果")
-                                        result_df = pd.DataFrame([
-                                            {"数据类型": "板块数据", "结果": results.get('sectors', '未执行')},
-                                            {"数据类型": "涨停股票池", "结果": results.get('zt_pool', '未执行')},
-                                            {"数据类型": "炸板股票池", "结果": results.get('zbgc_pool', '未执行')},
-                                            {"数据类型": "跌停股票池", "结果": results.get('dtgc_pool', '未执行')},
-                                            {"数据类型": "指数数据", "结果": results.get('indices', '未执行')},
-                                        ])
-                                        st.dataframe(result_df, use_container_width=True, hide_index=True)
-                                        
-                                        # 保存执行结果到 session state
-                                        execution_key = f"execution_{job.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                                        st.session_state[execution_key] = {
-                                            'job_id': job.id,
-                                            'job_name': job.name,
-                                            'execution_time': datetime.now(UTC8).strftime("%Y-%m-%d %H:%M:%S"),
-                                            'results': results,
-                                            'status': 'success'
-                                        }
-                                    
-                                except Exception as e:
-                                    error_msg = str(e)
-                                    st.error(f"❌ 任务执行失败: {error_msg}")
-                                    st.code(traceback.format_exc())
-                                    
-                                    # 保存失败结果
-                                    execution_key = f"execution_{job.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                                    st.session_state[execution_key] = {
-                                        'job_id': job.id,
-                                        'job_name': job.name,
-                                        'execution_time': datetime.now(UTC8).strftime("%Y-%m-%d %H:%M:%S"),
-                                        'error': error_msg,
-                                        'status': 'error'
-                                    }
-                            else:
-                                # 对于其他任务，直接运行
-                                job.func()
-                                st.success("✅ 任务执行完成！")
-                                
-                        except Exception as e:
-                            st.error(f"❌ 任务执行失败: {str(e)}")
-                            st.code(traceback.format_exc())
+                    try:
+                        params = {'force': True} if job.id == 'save_daily_data' and force_execution else {}
+                        if job_type in JOB_TYPES and Config.JOB_QUEUE_ENABLED:
+                            db = SessionLocal()
+                            try:
+                                queued_job = JobQueueService.enqueue(db, job_type, params, enqueued_by='page')
+                                st.success(f"✅ 已提交到后台任务队列（任务 #{queued_job.id}），可在下方「后台任务队列」查看进度")
+                            finally:
+                                db.close()
+                        elif job_type in JOB_HANDLERS:
+                            # 与工作进程使用相同的执行函数，进度显示在页面上
+                            progress_bar = st.progress(0.0, text="正在执行任务，请稍候...")
+                            result = JOB_HANDLERS[job_type](
+                                params, lambda value, message: progress_bar.progress(max(0.0, min(float(value), 1.0)), text=message or None)
+                            )
+                            progress_bar.empty()
+                            st.success("✅ 任务执行完成！")
+                            if result:
+                                st.json(result, expanded=False)
+                        else:
+                            # 不在任务队列中的短任务直接运行（调用原函数，不受主节点限制）
+                            with st.spinner("正在执行任务，请稍候..."):
+                                getattr(job.func, '__wrapped__', job.func)()
+                            st.success("✅ 任务执行完成！")
+                    except Exception as e:
+                        st.error(f"❌ 任务执行失败: {str(e)}")
+                        st.code(traceback.format_exc())
             
             st.markdown('</div>', unsafe_allow_html=True)
             st.markdown("<br>", unsafe_allow_html=True)
 
+# 后台任务队列
+st.markdown("---")
+st.markdown("### 📥 后台任务队列")
+
+JOB_STATUS_TEXT = {
+    'queued': '⏳ 排队中',
+    'running': '🔄 执行中',
+    'success': '✅ 成功',
+    'failed': '❌ 失败',
+    'cancelled': '⚪ 已取消',
+}
+
+try:
+    db = SessionLocal()
+    try:
+        queued_jobs = JobQueueService.list_jobs(db, limit=20)
+    finally:
+        db.close()
+    
+    if queued_jobs:
+        waiting = [job for job in queued_jobs if job.status == 'queued']
+        running = [job for job in queued_jobs if job.status == 'running']
+        if waiting and not running and waiting[-1].created_at and \
+                (datetime.now(UTC8).replace(tzinfo=None) - waiting[-1].created_at).total_seconds() > 60:
+            st.warning("⚠️ 有任务排队超过 1 分钟仍未开始，请确认工作进程已启动：`python run_job_worker.py`")
+        
+        for queued_job in running + waiting:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.markdown(
+                    f"**#{queued_job.id} {JOB_TYPES.get(queued_job.job_type, queued_job.job_type)}** "
+                    f"{JOB_STATUS_TEXT.get(queued_job.status, queued_job.status)}"
+                    + (f"（{queued_job.worker}）" if queued_job.worker else "")
+                )
+                st.progress(queued_job.progress or 0.0, text=queued_job.progress_message or None)
+            with col2:
+                if queued_job.status == 'queued' and st.button("取消", key=f"cancel_job_{queued_job.id}", use_container_width=True):
+                    db = SessionLocal()
+                    try:
+                        JobQueueService.cancel(db, queued_job.id)
+                    finally:
+                        db.close()
+                    st.rerun()
+        
+        job_df = pd.DataFrame([{
+            '任务ID': job.id,
+            '任务': JOB_TYPES.get(job.job_type, job.job_type),
+            '状态': JOB_STATUS_TEXT.get(job.status, job.status),
+            '进度': f"{(job.progress or 0.0) * 100:.0f}%",
+            '来源': job.enqueued_by or '-',
+            '工作进程': job.worker or '-',
+            '提交时间': job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else '-',
+            '结束时间': job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else '-',
+            '错误信息': job.error_message or '',
+        } for job in queued_jobs])
+        st.dataframe(job_df, use_container_width=True, hide_index=True)
+        if st.button("🔄 刷新任务进度", key="refresh_job_queue"):
+            st.rerun()
+    else:
+        st.info("📝 暂无后台任务。点击任务的「立即执行」后，任务由工作进程（`python run_job_worker.py`）执行")
+except Exception as e:
+    st.error(f"❌ 查询后台任务队列失败: {str(e)}")
+
 # 执行历史
 st.markdown("---")
 st.markdown("### 📜 执行历史（从数据库查询）")
@@ -486,11 +475,15 @@ try:
             
             history_df = pd.DataFrame(history_data)
             
-            # 显示统计信息
-            total_count = len(executions)
-            success_count = len([e for e in executions if e.status == 'success'])
-            failed_count = len([e for e in executions if e.status == 'failed'])
-            skipped_count = len([e for e in executions if e.status == 'skipped'])
+            # 显示统计信息（在数据库中按状态聚合）
+            statistics = SchedulerExecutionService.get_execution_statistics(
+                db, start_date, end_date,
+                job_id=None if selected_job_id == '全部' else selected_job_id
+            )
+            total_count = statistics['total']
+            success_count = statistics['success']
+            failed_count = statistics['failed']
+            skipped_count = statistics['skipped']
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -544,6 +537,22 @@ try:
                         st.markdown("**备注**")
                         st.write(exec.notes)
                     
+                    stage_breakdown = exec.to_dict().get('stageBreakdown')
+                    if stage_breakdown:
+                        st.markdown("**阶段耗时**（fetch: 接口获取，transform: 数据转换，db: 数据库写入；自身耗时不含嵌套阶段）")
+                        stage_df = pd.DataFrame([
+                            {
+                                "阶段": name,
+                                "自身耗时(秒)": item.get('seconds', 0),
+                                "总耗时(秒)": item.get('wallSeconds', item.get('seconds', 0)),
+                                "次数": item.get('count', 0),
+                                "行数": item.get('rows', 0),
+                                "错误": item.get('errors', 0),
+                            }
+                            for name, item in stage_breakdown.items()
+                        ])
+                        st.dataframe(stage_df, use_container_width=True, hide_index=True)
+                    
                     if exec.error_message:
                         st.markdown("**错误信息**")
                         st.error(exec.error_message)
@@ -552,7 +561,7 @@ try:
                                 st.code(exec.error_traceback, language='python')
         else:
             st.info(f"📝 在 {start_date} 至 {end_date} 期间暂无执行历史记录")
-            
+    
     except Exception as e:
         st.error(f"❌ 查询执行历史失败: {str(e)}")
         import traceback
@@ -563,6 +572,89 @@ except Exception as e:
     st.error(f"❌ 数据库连接失败: {str(e)}")
     st.info("💡 提示：请确保数据库配置正确且已初始化")
 
+# 任务性能分析
+st.markdown("---")
+st.markdown("### 📈 任务性能分析")
+st.caption("按上方日期范围和任务筛选，在数据库中聚合；基线为前 10 个执行日的平均耗时，当日平均耗时达到基线 1.5 倍时标记为退化")
+
+try:
+    db = SessionLocal()
+    try:
+        analytics_job_id = None if selected_job_id == '全部' else selected_job_id
+        performance = SchedulerAnalyticsService.get_job_performance(
+            db, start_date, end_date, job_id=analytics_job_id
+        )
+        trend = SchedulerAnalyticsService.get_daily_trend(
+            db, start_date, end_date, job_id=analytics_job_id
+        )
+    finally:
+        db.close()
+    
+    if performance:
+        performance_df = pd.DataFrame([
+            {
+                "任务ID": item['job_id'],
+                "任务名称": item['job_name'],
+                "执行次数": item['total'],
+                "成功率": f"{item['success_rate']:.1f}%" if item['success_rate'] is not None else "-",
+                "失败": item['failed'],
+                "跳过": item['skipped'],
+                "p50(秒)": item['p50_seconds'],
+                "p95(秒)": item['p95_seconds'],
+                "最大(秒)": item['max_seconds'],
+            }
+            for item in performance
+        ])
+        st.dataframe(performance_df, use_container_width=True, hide_index=True)
+        
+        regressions = [item for item in trend if item['regression']]
+        for item in regressions:
+            st.warning(
+                f"⚠️ {item['execution_date']} `{item['job_id']}` 平均耗时 {item['avg_seconds']:.1f}秒，"
+                f"为基线 {item['baseline_seconds']:.1f}秒 的 {item['ratio']:.2f} 倍"
+            )
+        
+        trend_df = pd.DataFrame(trend)
+        duration_df = trend_df.dropna(subset=['avg_seconds'])
+        if not duration_df.empty:
+            duration_long = duration_df.melt(
+                id_vars=['execution_date', 'job_id'],
+                value_vars=['avg_seconds', 'baseline_seconds'],
+                var_name='指标', value_name='耗时(秒)'
+            ).dropna(subset=['耗时(秒)'])
+            duration_long['指标'] = duration_long['指标'].map({'avg_seconds': '平均耗时', 'baseline_seconds': '基线'})
+            fig = px.line(
+                duration_long, x='execution_date', y='耗时(秒)', color='job_id', line_dash='指标',
+                markers=True, labels={'execution_date': '执行日期', 'job_id': '任务'},
+                title="每日平均耗时与滚动基线"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        dataset_labels = {
+            'industry_sectors': '行业板块',
+            'concept_sectors': '概念板块',
+            'zt_pool': '涨停股票池',
+            'zbgc_pool': '炸板股票池',
+            'dtgc_pool': '跌停股票池',
+            'indices': '指数',
+        }
+        rows_df = trend_df.groupby('execution_date', as_index=False)[list(dataset_labels)].sum()
+        rows_long = rows_df.melt(
+            id_vars=['execution_date'], var_name='数据集', value_name='保存条数'
+        )
+        rows_long = rows_long[rows_long['保存条数'] > 0]
+        if not rows_long.empty:
+            rows_long['数据集'] = rows_long['数据集'].map(dataset_labels)
+            fig = px.bar(
+                rows_long, x='execution_date', y='保存条数', color='数据集',
+                labels={'execution_date': '执行日期'}, title="每日各数据集保存条数"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info(f"📝 在 {start_date} 至 {end_date} 期间暂无执行记录")
+except Exception as e:
+    st.error(f"❌ 查询任务性能分析失败: {str(e)}")
+
 # 调度器控制
 st.markdown("---")
 st.markdown("### ⚙️ 调度器控制")
@@ -573,7 +665,7 @@ with col1:
     if is_running:
         if st.button("⏸️ 停止调度器", type="primary", use_container_width=True):
             try:
-                scheduler.shutdown()
+                scheduler_obj.shutdown()
                 st.success("✅ 调度器已停止")
                 st.rerun()
             except Exception as e:
@@ -582,7 +674,7 @@ with col1:
     else:
         if st.button("▶️ 启动调度器", type="primary", use_container_width=True):
             try:
-                scheduler.start()
+                scheduler_obj.start()
                 st.success("✅ 调度器已启动")
                 st.rerun()
             except Exception as e:
@@ -601,9 +693,10 @@ with st.expander("ℹ️ 使用说明"):
     
     1. **调度器状态**: 显示定时任务调度器的运行状态
     2. **任务列表**: 显示所有配置的定时任务及其详细信息
-    3. **手动执行**: 点击"立即执行"按钮可以手动触发任务执行
+    3. **手动执行**: 点击"立即执行"按钮把任务提交到后台任务队列，由工作进程（`python run_job_worker.py`）执行，可在"后台任务队列"查看进度
     4. **执行历史**: 查看最近的任务执行记录和结果
     5. **调度器控制**: 可以启动或停止调度器
+    6. **主节点选举**: 多个进程都启动调度器时，只有持有租约的主节点执行定时任务，其他进程只观察
     
     ### 注意事项
     
@@ -21,6 +21,9 @@ try:
     from services.stock_fund_flow_history_service import StockFundFlowHistoryService
     from utils.time_utils import get_utc8_date
     from utils.focused_stocks import get_focused_stocks
+    from services.job_queue_service import JobQueueService
+    from tasks.job_worker import JOB_HANDLERS
+    from config import Config
     DB_AVAILABLE = True
 except (ValueError, RuntimeError) as e:
     DB_AVAILABLE = False
@@ -36,10 +39,17 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+from utils.table_format import render_cached_table
+from utils.pagination import PageQuery, paginate_query, show_query_pagination_controls, fetch_query_page, clear_query_cache
+
 # 应用统一样式
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('个股资金')
+
 st.markdown('<h1 class="main-header">💰 个股资金流分析</h1>', unsafe_allow_html=True)
 
 # 检查数据库配置
@@ -91,102 +101,96 @@ stock_search = st.text_input(
 )
 
 # ==================== 数据查询 ====================
+# 排序选项 -> (排序字段, 是否升序)
+SORT_OPTIONS = {
+    '净额降序': ('net_amount', False), '净额升序': ('net_amount', True),
+    '流入资金降序': ('inflow', False), '流入资金升序': ('inflow', True),
+    '流出资金降序': ('outflow', False), '流出资金升序': ('outflow', True),
+    '涨跌幅降序': ('change_percent', False), '涨跌幅升序': ('change_percent', True),
+    '成交额降序': ('turnover', False), '成交额升序': ('turnover', True),
+}
+
+def fund_flows_to_dataframe(fund_flows):
+    """资金流记录转换为显示用DataFrame（数值保持数值类型）"""
+    return pd.DataFrame([
+        {
+            '股票代码': ff['stockCode'],
+            '股票简称': ff.get('stockName') or '-',
+            '最新价': ff.get('latestPrice'),
+            '涨跌幅(%)': ff.get('changePercent'),
+            '换手率(%)': ff.get('turnoverRate'),
+            '流入资金(元)': ff.get('inflow'),
+            '流出资金(元)': ff.get('outflow'),
+            '净额(元)': ff.get('netAmount'),
+            '成交额(元)': ff.get('turnover'),
+        }
+        for ff in fund_flows
+    ], columns=['股票代码', '股票简称', '最新价', '涨跌幅(%)', '换手率(%)', '流入资金(元)', '流出资金(元)', '净额(元)', '成交额(元)'])
+
+def build_fund_flow_query(target_date, stock_codes, keyword, sort_by, ascending) -> PageQuery:
+    """构建资金流分页查询（每次查询在独立会话中执行，可在后台线程预取）"""
+    filters = dict(stock_codes=stock_codes, keyword=keyword or None)
+    
+    def fetch(offset, limit):
+        db = SessionLocal()
+        try:
+            return fund_flows_to_dataframe(StockFundFlowHistoryService.get_fund_flow_page(
+                db, target_date, offset=offset, limit=limit,
+                sort_by=sort_by, ascending=ascending, **filters
+            ))
+        finally:
+            db.close()
+    
+    def count():
+        db = SessionLocal()
+        try:
+            return StockFundFlowHistoryService.count_fund_flow(db, target_date, **filters)
+        finally:
+            db.close()
+    
+    return PageQuery(
+        key=('stock_fund_flow', target_date, tuple(stock_codes) if stock_codes is not None else None, keyword or None, sort_by, ascending),
+        fetch=fetch,
+        count=count
+    )
+
 db = SessionLocal()
 try:
-    # 获取选中日期的所有股票资金流数据
-    fund_flows = StockFundFlowHistoryService.get_fund_flow_by_date(db, selected_date)
+    # 选中日期是否有数据（只统计行数，不加载数据）
+    date_count = StockFundFlowHistoryService.count_fund_flow(db, selected_date)
     
-    if not fund_flows:
+    if date_count == 0:
         st.warning(f"📭 {selected_date} 暂无资金流数据")
         st.info("💡 提示：可以点击下方的'刷新今日数据'按钮获取最新数据")
     else:
-        # 转换为DataFrame
-        df_data = []
-        for ff in fund_flows:
-            df_data.append({
-                '股票代码': ff['stockCode'],
-                '股票简称': ff.get('stockName') or '-',
-                '最新价': ff.get('latestPrice'),
-                '涨跌幅(%)': ff.get('changePercent'),
-                '换手率(%)': ff.get('turnoverRate'),
-                '流入资金(元)': ff.get('inflow'),
-                '流出资金(元)': ff.get('outflow'),
-                '净额(元)': ff.get('netAmount'),
-                '成交额(元)': ff.get('turnover'),
-            })
-        
-        df = pd.DataFrame(df_data)
-        
         # ==================== 数据筛选 ====================
-        # 按筛选选项过滤
+        # 筛选条件在数据库中执行
+        stock_codes = None
         if filter_option == '仅关注股票':
-            if focused_stocks:
-                df = df[df['股票代码'].isin(focused_stocks)]
-            else:
+            stock_codes = sorted(focused_stocks) if focused_stocks else []
+            if not focused_stocks:
                 st.warning("⚠️ 没有关注股票，请先添加关注股票")
-                df = pd.DataFrame()
         elif filter_option == '仅交易过的股票':
             from services.trading_review_service import TradingReviewService
             all_reviews = TradingReviewService.get_all_reviews(db)
-            traded_stocks = list(set([r.stock_code for r in all_reviews if r.stock_code]))
-            if traded_stocks:
-                df = df[df['股票代码'].isin(traded_stocks)]
-            else:
+            stock_codes = sorted(set([r.stock_code for r in all_reviews if r.stock_code]))
+            if not stock_codes:
                 st.warning("⚠️ 没有交易过的股票")
-                df = pd.DataFrame()
         
-        # 股票代码/名称搜索
-        if stock_search:
-            search_term = stock_search.strip()
-            # 判断是代码还是名称
-            if search_term.isdigit():
-                # 如果是纯数字，按代码搜索（补齐6位）
-                search_code = search_term.zfill(6)
-                df = df[df['股票代码'].str.contains(search_code, na=False)]
-            else:
-                # 如果是非数字，按名称搜索（支持模糊匹配）
-                df = df[df['股票简称'].str.contains(search_term, na=False, case=False)]
+        keyword = stock_search.strip() if stock_search else ''
+        sort_by, ascending = SORT_OPTIONS[sort_option]
         
-        if not df.empty:
-            # ==================== 数据排序 ====================
-            # 保存原始数值用于排序（格式化前）
-            df['_净额_原始'] = df['净额(元)']
-            df['_流入_原始'] = df['流入资金(元)']
-            df['_流出_原始'] = df['流出资金(元)']
-            df['_涨跌幅_原始'] = df['涨跌幅(%)']
-            df['_成交额_原始'] = df['成交额(元)']
-            
-            if '净额降序' in sort_option:
-                df = df.sort_values('_净额_原始', ascending=False, na_position='last')
-            elif '净额升序' in sort_option:
-                df = df.sort_values('_净额_原始', ascending=True, na_position='last')
-            elif '流入资金降序' in sort_option:
-                df = df.sort_values('_流入_原始', ascending=False, na_position='last')
-            elif '流入资金升序' in sort_option:
-                df = df.sort_values('_流入_原始', ascending=True, na_position='last')
-            elif '流出资金降序' in sort_option:
-                df = df.sort_values('_流出_原始', ascending=False, na_position='last')
-            elif '流出资金升序' in sort_option:
-                df = df.sort_values('_流出_原始', ascending=True, na_position='last')
-            elif '涨跌幅降序' in sort_option:
-                df = df.sort_values('_涨跌幅_原始', ascending=False, na_position='last')
-            elif '涨跌幅升序' in sort_option:
-                df = df.sort_values('_涨跌幅_原始', ascending=True, na_position='last')
-            elif '成交额降序' in sort_option:
-                df = df.sort_values('_成交额_原始', ascending=False, na_position='last')
-            elif '成交额升序' in sort_option:
-                df = df.sort_values('_成交额_原始', ascending=True, na_position='last')
+        # 统计信息在数据库中汇总
+        summary = StockFundFlowHistoryService.get_fund_flow_summary(
+            db, selected_date, stock_codes=stock_codes, keyword=keyword or None
+        ) if stock_codes != [] else {'totalCount': 0}
+        
+        if summary['totalCount'] > 0:
+            query = build_fund_flow_query(selected_date, stock_codes, keyword, sort_by, ascending)
             
             # ==================== 统计信息 ====================
             st.markdown('<h2 class="section-header">📊 统计信息</h2>', unsafe_allow_html=True)
             
-            # 计算统计数据
-            total_count = len(df)
-            total_inflow = df['_流入_原始'].sum() if df['_流入_原始'].notna().any() else 0
-            total_outflow = df['_流出_原始'].sum() if df['_流出_原始'].notna().any() else 0
-            total_net = df['_净额_原始'].sum() if df['_净额_原始'].notna().any() else 0
-            total_turnover = df['_成交额_原始'].sum() if df['_成交额_原始'].notna().any() else 0
-            
             # 格式化函数
             def format_amount(val):
                 if pd.isna(val) or val is None or val == 0:
@@ -203,41 +207,40 @@ try:
             col_stat1, col_stat2, col_stat3, col_stat4, col_stat5 = st.columns(5)
             
             with col_stat1:
-                st.metric("📈 总记录数", f"{total_count:,}")
+                st.metric("📈 总记录数", f"{summary['totalCount']:,}")
             
             with col_stat2:
-                st.metric("💰 总流入", format_amount(total_inflow))
+                st.metric("💰 总流入", format_amount(summary['totalInflow']))
             
             with col_stat3:
-                st.metric("💸 总流出", format_amount(total_outflow))
+                st.metric("💸 总流出", format_amount(summary['totalOutflow']))
             
             with col_stat4:
-                net_color = "normal" if total_net >= 0 else "inverse"
-                st.metric("📊 净流入", format_amount(total_net), delta=None)
+                st.metric("📊 净流入", format_amount(summary['totalNet']), delta=None)
             
             with col_stat5:
-                st.metric("💵 总成交额", format_amount(total_turnover))
+                st.metric("💵 总成交额", format_amount(summary['totalTurnover']))
             
             
-            # 准备图表数据（取前20名）
-            df_chart = df.head(20).copy()
+            # 准备图表数据（按当前排序取前20名，只查询20行）
+            df_chart = fetch_query_page(query, 0, 20)
             
             col_chart1, col_chart2 = st.columns(2)
             
             with col_chart1:
                 # 净流入TOP 20
-                if df_chart['_净额_原始'].notna().any():
-                    df_chart_sorted = df_chart.sort_values('_净额_原始', ascending=True, na_position='last')
+                if df_chart['净额(元)'].notna().any():
+                    df_chart_sorted = df_chart.sort_values('净额(元)', ascending=True, na_position='last')
                     fig_net = px.bar(
                         df_chart_sorted,
-                        x='_净额_原始',
+                        x='净额(元)',
                         y='股票简称',
                         orientation='h',
-                        labels={'_净额_原始': '净流入(元)', '股票简称': '股票名称'},
+                        labels={'净额(元)': '净流入(元)', '股票简称': '股票名称'},
                         title="净流入TOP 20",
-                        color='_净额_原始',
+                        color='净额(元)',
                         color_continuous_scale='RdYlGn',
-                        text='_净额_原始'
+                        text='净额(元)'
                     )
                     fig_net.update_traces(
                         texttemplate='%{text:,.0f}',
@@ -256,30 +259,30 @@ try:
             
             with col_chart2:
                 # 流入流出对比
-                if df_chart['_流入_原始'].notna().any() and df_chart['_流出_原始'].notna().any():
-                    df_compare = df_chart[['股票简称', '_流入_原始', '_流出_原始']].copy()
-                    df_compare = df_compare.sort_values('_流入_原始', ascending=True, na_position='last')
+                if df_chart['流入资金(元)'].notna().any() and df_chart['流出资金(元)'].notna().any():
+                    df_compare = df_chart[['股票简称', '流入资金(元)', '流出资金(元)']].copy()
+                    df_compare = df_compare.sort_values('流入资金(元)', ascending=True, na_position='last')
                     
                     fig_compare = go.Figure()
                     
                     fig_compare.add_trace(go.Bar(
                         name='流入',
-                        x=df_compare['_流入_原始'],
+                        x=df_compare['流入资金(元)'],
                         y=df_compare['股票简称'],
                         orientation='h',
                         marker_color='#2ca02c',
-                        text=df_compare['_流入_原始'],
+                        text=df_compare['流入资金(元)'],
                         texttemplate='%{text:,.0f}',
                         textposition='outside'
                     ))
                     
                     fig_compare.add_trace(go.Bar(
                         name='流出',
-                        x=-df_compare['_流出_原始'],
+                        x=-df_compare['流出资金(元)'],
                         y=df_compare['股票简称'],
                         orientation='h',
                         marker_color='#d62728',
-                        text=df_compare['_流出_原始'],
+                        text=df_compare['流出资金(元)'],
                         texttemplate='%{text:,.0f}',
                         textposition='outside'
                     ))
@@ -300,60 +303,53 @@ try:
             # ==================== 数据表格 ====================
             st.markdown('<h2 class="section-header">📋 详细数据</h2>', unsafe_allow_html=True)
             
-            # 格式化显示数据
-            df_display = df.copy()
-            
-            # 格式化金额
-            for col in ['流入资金(元)', '流出资金(元)', '净额(元)', '成交额(元)']:
-                if col in df_display.columns:
-                    df_display[col] = df_display[col].apply(format_amount)
-            
-            # 格式化百分比
-            def format_percent(val):
-                if pd.isna(val) or val is None:
-                    return "-"
-                return f"{val:.2f}%"
-            
-            for col in ['涨跌幅(%)', '换手率(%)']:
-                if col in df_display.columns:
-                    df_display[col] = df_display[col].apply(format_percent)
-            
-            # 格式化价格
-            def format_price(val):
-                if pd.isna(val) or val is None:
-                    return "-"
-                return f"{val:.2f}"
-            
-            if '最新价' in df_display.columns:
-                df_display['最新价'] = df_display['最新价'].apply(format_price)
-            
-            # 删除辅助列
-            df_display = df_display.drop(columns=[col for col in df_display.columns if col.startswith('_')])
-            
-            # 显示前20条记录
-            df_display = df_display.head(20)
-            st.dataframe(
+            # 只查询当前页，下一页在后台预取
+            df_display, page_size, total_rows = paginate_query(query, key_prefix='stock_fund_flow')
+            # 数值保持数值类型：金额换算为万元，按列格式显示
+            render_cached_table(
+                'stock_fund_flow',
+                selected_date,
                 df_display,
+                formats={
+                    '流入资金(元)': 'wan',
+                    '流出资金(元)': 'wan',
+                    '净额(元)': 'wan',
+                    '成交额(元)': 'wan',
+                    '涨跌幅(%)': 'percent',
+                    '换手率(%)': 'percent',
+                    '最新价': 'price',
+                },
+                scales={'流入资金(元)': 1e4, '流出资金(元)': 1e4, '净额(元)': 1e4, '成交额(元)': 1e4},
                 use_container_width=True,
                 hide_index=True,
                 height=600
             )
+            show_query_pagination_controls(total_rows, page_size, key_prefix='stock_fund_flow')
             
             # 导出功能
             st.markdown("---")
             col_export1, col_export2 = st.columns([1, 4])
             with col_export1:
-                # 准备导出数据（使用原始数值）
-                df_export = df.copy()
-                df_export = df_export.drop(columns=[col for col in df_export.columns if col.startswith('_')])
-                csv = df_export.to_csv(index=False).encode('utf-8-sig')
-                st.download_button(
-                    label="📥 导出CSV",
-                    data=csv,
-                    file_name=f"个股资金流_{selected_date}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                # 点击"准备导出"后才查询全部符合条件的数据（使用原始数值），
+                # 生成的CSV按查询条件保存在会话中，筛选条件变化后需要重新准备
+                export_key = 'stock_fund_flow_export'
+                prepared = st.session_state.get(export_key)
+                if prepared is not None and prepared[0] != query.key:
+                    prepared = None
+                    st.session_state.pop(export_key, None)
+                if prepared is None:
+                    if st.button("📦 准备导出", use_container_width=True):
+                        with st.spinner("正在查询导出数据..."):
+                            prepared = (query.key, query.fetch(0, total_rows).to_csv(index=False).encode('utf-8-sig'))
+                        st.session_state[export_key] = prepared
+                if prepared is not None:
+                    st.download_button(
+                        label="📥 导出CSV",
+                        data=prepared[1],
+                        file_name=f"个股资金流_{selected_date}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
         
         else:
             st.info(f"📭 {selected_date} 没有符合条件的数据")
@@ -365,50 +361,95 @@ finally:
 st.markdown("---")
 st.markdown('<h2 class="section-header">🔄 数据操作</h2>', unsafe_allow_html=True)
 
+def run_fund_flow_refresh(db, job_type: str, params: dict):
+    """
+    刷新资金流数据：启用后台任务队列时提交任务，由工作进程（run_job_worker.py）执行，页面只轮询进度；
+    未启用（没有部署工作进程）时在页面中直接执行
+    """
+    if Config.JOB_QUEUE_ENABLED:
+        st.session_state['fund_flow_job_id'] = JobQueueService.enqueue(db, job_type, params, enqueued_by='page').id
+        return
+    progress_bar = st.progress(0.0, text="🔄 正在刷新")
+    result = JOB_HANDLERS[job_type](
+        params, lambda value, message: progress_bar.progress(max(0.0, min(float(value), 1.0)), text=message or None)
+    )
+    progress_bar.empty()
+    clear_query_cache('stock_fund_flow')
+    st.session_state.pop('stock_fund_flow_export', None)
+    st.success(
+        f"✅ 刷新完成：成功刷新 {result.get('successCount', 0)}/{result.get('totalCount', 0)} 只股票的资金流数据"
+    )
+
 col_action1, col_action2, col_action3 = st.columns([1, 1, 2])
 
 with col_action1:
     if st.button("🔄 刷新今日数据", type="primary", use_container_width=True):
-        with st.spinner("正在刷新资金流数据..."):
-            db = SessionLocal()
-            try:
-                # 获取所有需要刷新的股票（关注股票 + 交易过的股票）
-                from services.trading_review_service import TradingReviewService
-                all_reviews = TradingReviewService.get_all_reviews(db)
-                traded_stocks = list(set([r.stock_code for r in all_reviews if r.stock_code]))
-                all_stocks = list(set(focused_stocks + traded_stocks))
-                
-                if all_stocks:
-                    results = StockFundFlowHistoryService.save_multiple_stocks_fund_flow(
-                        db=db,
-                        stock_codes=all_stocks,
-                        target_date=today
-                    )
-                    success_count = sum(1 for success in results.values() if success)
-                    st.success(f"✅ 成功刷新 {success_count}/{len(all_stocks)} 只股票的资金流数据")
-                else:
-                    st.warning("⚠️ 没有需要刷新的股票，请先添加关注股票或进行交易")
-                st.rerun()
-            except Exception as e:
-                st.error(f"❌ 刷新失败: {str(e)}")
-            finally:
-                db.close()
+        db = SessionLocal()
+        try:
+            # 获取所有需要刷新的股票（关注股票 + 交易过的股票）
+            from services.trading_review_service import TradingReviewService
+            all_reviews = TradingReviewService.get_all_reviews(db)
+            traded_stocks = list(set([r.stock_code for r in all_reviews if r.stock_code]))
+            all_stocks = sorted(set(focused_stocks + traded_stocks))
+            
+            if all_stocks:
+                run_fund_flow_refresh(db, 'refresh_stocks_fund_flow', {
+                    'stock_codes': all_stocks,
+                    'target_date': today.isoformat(),
+                })
+            else:
+                st.warning("⚠️ 没有需要刷新的股票，请先添加关注股票或进行交易")
+        except Exception as e:
+            st.error(f"❌ 刷新失败: {str(e)}")
+        finally:
+            db.close()
 
 with col_action2:
     if st.button("🔄 刷新所有股票", use_container_width=True):
-        with st.spinner("正在从接口获取所有股票的资金流数据，这可能需要几分钟..."):
-            db = SessionLocal()
-            try:
-                results = StockFundFlowHistoryService.save_all_stocks_fund_flow_from_individual(
-                    db=db,
-                    target_date=today
-                )
-                st.success(f"✅ 成功保存 {results['success_count']}/{results['total_count']} 只股票的资金流数据")
-                st.rerun()
-            except Exception as e:
-                st.error(f"❌ 刷新失败: {str(e)}")
-            finally:
-                db.close()
+        db = SessionLocal()
+        try:
+            run_fund_flow_refresh(db, 'refresh_all_stocks_fund_flow', {
+                'target_date': today.isoformat(),
+            })
+        except Exception as e:
+            st.error(f"❌ 刷新失败: {str(e)}")
+        finally:
+            db.close()
 
 with col_action3:
     st.info("💡 **提示**: 刷新今日数据会更新关注股票和交易过的股票；刷新所有股票会从接口获取全部股票数据（约5000+只）")
+
+# 最近一次提交的刷新任务的进度
+fund_flow_job_id = st.session_state.get('fund_flow_job_id')
+if fund_flow_job_id:
+    db = SessionLocal()
+    try:
+        fund_flow_job = JobQueueService.get_job(db, fund_flow_job_id)
+    finally:
+        db.close()
+    
+    if fund_flow_job is None:
+        st.session_state.pop('fund_flow_job_id', None)
+    elif fund_flow_job.status in ('queued', 'running'):
+        status_text = "⏳ 排队中，等待工作进程领取" if fund_flow_job.status == 'queued' else "🔄 正在刷新"
+        st.markdown(f"**刷新任务 #{fund_flow_job.id}**: {status_text}")
+        st.progress(fund_flow_job.progress or 0.0, text=fund_flow_job.progress_message or None)
+        if fund_flow_job.status == 'queued':
+            st.caption("💡 如果长时间没有开始，请确认工作进程已启动：`python run_job_worker.py`")
+        if st.button("🔄 刷新进度", key="refresh_fund_flow_job"):
+            st.rerun()
+    else:
+        # 任务结束：清除查询缓存，显示结果（只处理一次）
+        st.session_state.pop('fund_flow_job_id', None)
+        clear_query_cache('stock_fund_flow')
+        st.session_state.pop('stock_fund_flow_export', None)
+        job_result = fund_flow_job.to_dict()['result'] or {}
+        if fund_flow_job.status == 'success':
+            st.success(
+                f"✅ 刷新任务 #{fund_flow_job.id} 完成：成功刷新 "
+                f"{job_result.get('successCount', 0)}/{job_result.get('totalCount', 0)} 只股票的资金流数据"
+            )
+        elif fund_flow_job.status == 'failed':
+            st.error(f"❌ 刷新任务 #{fund_flow_job.id} 失败: {fund_flow_job.error_message}")
+        else:
+            st.info(f"刷新任务 #{fund_flow_job.id} 已取消")
@@ -21,9 +21,11 @@ from services.zt_pool_history_service import ZtPoolHistoryService
 from services.dtgc_pool_history_service import DtgcPoolHistoryService
 from services.zbgc_pool_history_service import ZbgcPoolHistoryService
 from services.index_history_service import IndexHistoryService
+from services.market_summary_service import MarketSummaryService
 from services.stock_index_service import StockIndexService
 from utils.time_utils import get_data_date, get_utc8_date
 from utils.focused_indices import get_focused_indices
+from utils.table_format import render_cached_table
 
 st.set_page_config(
     page_title="历史仪表盘",
@@ -36,6 +38,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles, get_dashboard_specific_styles
 apply_common_styles(additional_styles=get_dashboard_specific_styles())
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('历史仪表盘')
+
 # 页面标题
 st.markdown('<h1 class="main-header">📜 历史仪表盘</h1>', unsafe_allow_html=True)
 
@@ -94,6 +100,15 @@ def load_history_data(target_date: date):
     finally:
         db.close()
 
+@st.cache_data(ttl=300)
+def load_market_summary(target_date: date):
+    """从数据库加载预先计算的每日市场概况"""
+    db = SessionLocal()
+    try:
+        return MarketSummaryService.get_summary_by_date(db, target_date)
+    finally:
+        db.close()
+
 # 加载历史数据
 try:
     # 历史仪表盘：从数据库获取数据
@@ -263,17 +278,44 @@ try:
             # 导入失败，忽略
             pass
     
-    # 计算行业板块统计
-    industry_up = len([s for s in industry_sectors if s.get('changePercent', 0) > 0]) if industry_sectors else 0
-    industry_down = len([s for s in industry_sectors if s.get('changePercent', 0) < 0]) if industry_sectors else 0
-    industry_net_inflow = sum([s.get('netInflow', 0) for s in industry_sectors if s.get('netInflow', 0) > 0]) if industry_sectors else 0
-    industry_net_outflow = abs(sum([s.get('netInflow', 0) for s in industry_sectors if s.get('netInflow', 0) < 0])) if industry_sectors else 0
-    
-    # 计算概念板块统计
-    concept_up = len([s for s in concept_sectors if s.get('changePercent', 0) > 0]) if concept_sectors else 0
-    concept_down = len([s for s in concept_sectors if s.get('changePercent', 0) < 0]) if concept_sectors else 0
-    concept_net_inflow = sum([s.get('netInflow', 0) for s in concept_sectors if s.get('netInflow', 0) > 0]) if concept_sectors else 0
-    concept_net_outflow = abs(sum([s.get('netInflow', 0) for s in concept_sectors if s.get('netInflow', 0) < 0])) if concept_sectors else 0
+    # 市场概况统计：优先读取预先计算的每日市场概况，没有时（概况生成之前的日期）从明细数据计算
+    market_summary = load_market_summary(data_date)
+    if market_summary:
+        industry_up = market_summary['industryUp']
+        industry_down = market_summary['industryDown']
+        industry_net_inflow = market_summary['industryNetInflow']
+        industry_net_outflow = market_summary['industryNetOutflow']
+        concept_up = market_summary['conceptUp']
+        concept_down = market_summary['conceptDown']
+        concept_net_inflow = market_summary['conceptNetInflow']
+        concept_net_outflow = market_summary['conceptNetOutflow']
+        zt_count = market_summary['ztCount']
+        zb_count = market_summary['zbCount']
+        dt_count = market_summary['dtCount']
+        continuous_count = market_summary['continuousCount']
+    else:
+        # 计算行业板块统计
+        industry_up = len([s for s in industry_sectors if s.get('changePercent', 0) > 0]) if industry_sectors else 0
+        industry_down = len([s for s in industry_sectors if s.get('changePercent', 0) < 0]) if industry_sectors else 0
+        industry_net_inflow = sum([s.get('netInflow', 0) for s in industry_sectors if s.get('netInflow', 0) > 0]) if industry_sectors else 0
+        industry_net_outflow = abs(sum([s.get('netInflow', 0) for s in industry_sectors if s.get('netInflow', 0) < 0])) if industry_sectors else 0
+        
+        # 计算概念板块统计
+        concept_up = len([s for s in concept_sectors if s.get('changePercent', 0) > 0]) if concept_sectors else 0
+        concept_down = len([s for s in concept_sectors if s.get('changePercent', 0) < 0]) if concept_sectors else 0
+        concept_net_inflow = sum([s.get('netInflow', 0) for s in concept_sectors if s.get('netInflow', 0) > 0]) if concept_sectors else 0
+        concept_net_outflow = abs(sum([s.get('netInflow', 0) for s in concept_sectors if s.get('netInflow', 0) < 0])) if concept_sectors else 0
+        
+        # 股票池统计
+        zt_count = len(zt_pool) if zt_pool else 0
+        zb_count = len(zb_pool) if zb_pool else 0
+        dt_count = len(dt_pool) if dt_pool else 0
+        continuous_count = None
+        if zt_pool:
+            df_zt = pd.DataFrame(zt_pool)
+            if 'continuousBoards' in df_zt.columns:
+                # 连板数大于1的股票数
+                continuous_count = len(df_zt[df_zt['continuousBoards'] > 1])
     
     # 合并统计（用于兼容旧代码）
     sector_up = industry_up + concept_up
@@ -281,11 +323,6 @@ try:
     sector_net_inflow = industry_net_inflow + concept_net_inflow
     sector_net_outflow = industry_net_outflow + concept_net_outflow
     
-    # 股票池统计
-    zt_count = len(zt_pool) if zt_pool else 0
-    zb_count = len(zb_pool) if zb_pool else 0
-    dt_count = len(dt_pool) if dt_pool else 0
-    
     # 显示市场概况卡片（3列布局）
     col1, col2, col3 = st.columns(3)
     
@@ -430,38 +467,13 @@ try:
         df_display = df_focused_indices[['name', 'code', 'currentPrice', 'changePercent', 'change']].copy()
         df_display.columns = ['指数名称', '指数代码', '最新价', '涨跌幅(%)', '涨跌额']
         
-        # 保存原始涨跌幅用于样式判断（重置索引后，位置索引与DataFrame索引一致）
-        change_percent_values = df_focused_indices['changePercent'].values
-        
-        # 格式化数值
-        df_display['最新价'] = df_display['最新价'].apply(lambda x: f"{x:.2f}")
-        df_display['涨跌幅(%)'] = df_display['涨跌幅(%)'].apply(lambda x: f"{x:+.2f}%")
-        df_display['涨跌额'] = df_display['涨跌额'].apply(lambda x: f"{x:+.2f}")
-        
-        # 定义样式函数：上涨用红色背景，下跌用绿色背景（整行）
-        def apply_cell_style(df):
-            """对整行应用背景色：上涨红色背景，下跌绿色背景"""
-            styles = pd.DataFrame('', index=df.index, columns=df.columns)
-            # 对整行应用样式
-            for idx in df.index:
-                # 使用位置索引获取涨跌幅值（因为已经重置了索引）
-                change_pct = change_percent_values[idx]
-                if change_pct > 0:
-                    # 上涨：红色背景 (#ef4444)，白色文字
-                    for col in df.columns:
-                        styles.loc[idx, col] = 'background-color: #ef4444; color: #ffffff;'
-                elif change_pct < 0:
-                    # 下跌：绿色背景 (#10b981)，白色文字
-                    for col in df.columns:
-                        styles.loc[idx, col] = 'background-color: #10b981; color: #ffffff;'
-            return styles
-        
-        # 使用pandas Styler应用样式
-        styled_df = df_display.style.apply(apply_cell_style, axis=None)
-        
-        # 显示样式化的表格
-        st.dataframe(
-            styled_df,
+        # 数值保持数值类型，按列格式显示；按涨跌幅整行着色（上涨红色背景，下跌绿色背景）
+        render_cached_table(
+            'focused_indices',
+            data_date,
+            df_display.reset_index(drop=True),
+            formats={'最新价': 'price', '涨跌幅(%)': 'signed_percent', '涨跌额': 'signed'},
+            sign_column='涨跌幅(%)',
             use_container_width=True,
             hide_index=True
         )
@@ -812,11 +824,8 @@ try:
     
     with col4:
         # 计算连板率（连板数>1的股票数 / 涨停股票总数）
-        if zt_pool and zt_count > 0:
-            df_zt = pd.DataFrame(zt_pool)
-            if 'continuousBoards' in df_zt.columns:
-                # 连板数大于1的股票数
-                continuous_count = len(df_zt[df_zt['continuousBoards'] > 1])
+        if zt_count > 0:
+            if continuous_count is not None:
                 # 连板率 = 连板股票数 / 涨停股票总数 * 100%
                 continuous_rate = (continuous_count / zt_count) * 100 if zt_count > 0 else 0
                 st.metric(
@@ -1008,27 +1017,27 @@ try:
         # 重命名列
         df_display = df_display.rename(columns=column_mapping)
         
-        # 格式化数值列
-        if '涨跌幅(%)' in df_display.columns:
-            df_display['涨跌幅(%)'] = df_display['涨跌幅(%)'].apply(lambda x: f"{x:.2f}%")
-        if '最新价' in df_display.columns:
-            df_display['最新价'] = df_display['最新价'].apply(lambda x: f"{x:.2f}")
-        if '成交额(亿元)' in df_display.columns:
-            df_display['成交额(亿元)'] = df_display['成交额(亿元)'].apply(lambda x: f"{x:.2f}")
-        if '流通市值(亿元)' in df_display.columns:
-            df_display['流通市值(亿元)'] = df_display['流通市值(亿元)'].apply(lambda x: f"{x:.2f}")
-        if '换手率(%)' in df_display.columns:
-            df_display['换手率(%)'] = df_display['换手率(%)'].apply(lambda x: f"{x:.2f}%")
-        if '封板资金(亿元)' in df_display.columns:
-            df_display['封板资金(亿元)'] = df_display['封板资金(亿元)'].apply(lambda x: f"{x:.2f}")
-        
         # 按连板数降序排序（如果有连板数列）
         if '连板数' in df_display.columns:
             df_display = df_display.sort_values('连板数', ascending=False)
         
-        # 显示前20条记录
+        # 显示前20条记录（数值保持数值类型，按列格式显示）
         df_display = df_display.head(20)
-        st.dataframe(df_display, use_container_width=True, height=400)
+        render_cached_table(
+            'zt_pool',
+            data_date,
+            df_display,
+            formats={
+                '涨跌幅(%)': 'percent',
+                '最新价': 'price',
+                '成交额(亿元)': 'number',
+                '流通市值(亿元)': 'number',
+                '换手率(%)': 'percent',
+                '封板资金(亿元)': 'number',
+            },
+            use_container_width=True,
+            height=400
+        )
     
     # ========== 数据更新时间 ==========
     st.markdown("---")
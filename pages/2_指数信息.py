@@ -19,7 +19,9 @@ try:
     from database.db import SessionLocal
     from services.index_history_service import IndexHistoryService
     from services.stock_index_service import StockIndexService
-    from utils.time_utils import get_utc8_date, get_data_date, filter_trading_days
+    from utils.time_utils import get_utc8_date, get_data_date
+    from utils.chart_utils import prepare_date_axis, build_line_traces
+    from utils.table_format import render_cached_table
     from utils.focused_indices import get_focused_indices
     from datetime import date, timedelta
     DB_AVAILABLE = True
@@ -75,6 +77,10 @@ if not DB_AVAILABLE:
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('指数信息')
+
 # 页面标题
 st.markdown('<h1 class="main-header">📊 指数信息</h1>', unsafe_allow_html=True)
 
@@ -323,37 +329,13 @@ try:
             df_focused_display = df_focused_indices[['name', 'code', 'currentPrice', 'changePercent', 'change']].copy()
             df_focused_display.columns = ['指数名称', '指数代码', '最新价', '涨跌幅(%)', '涨跌额']
             
-            # 保存原始涨跌幅用于样式判断
-            change_percent_values = df_focused_indices['changePercent'].values
-            
-            # 格式化数值
-            df_focused_display['最新价'] = df_focused_display['最新价'].apply(lambda x: f"{x:.2f}")
-            df_focused_display['涨跌幅(%)'] = df_focused_display['涨跌幅(%)'].apply(lambda x: f"{x:+.2f}%")
-            df_focused_display['涨跌额'] = df_focused_display['涨跌额'].apply(lambda x: f"{x:+.2f}")
-            
-            # 定义样式函数：上涨用红色背景，下跌用绿色背景（整行）
-            def apply_cell_style(df):
-                """对整行应用背景色：上涨红色背景，下跌绿色背景"""
-                styles = pd.DataFrame('', index=df.index, columns=df.columns)
-                # 对整行应用样式
-                for idx in df.index:
-                    change_pct = change_percent_values[idx]
-                    if change_pct > 0:
-                        # 上涨：红色背景 (#ef4444)，白色文字
-                        for col in df.columns:
-                            styles.loc[idx, col] = 'background-color: #ef4444; color: #ffffff;'
-                    elif change_pct < 0:
-                        # 下跌：绿色背景 (#10b981)，白色文字
-                        for col in df.columns:
-                            styles.loc[idx, col] = 'background-color: #10b981; color: #ffffff;'
-                return styles
-            
-            # 使用pandas Styler应用样式
-            styled_df = df_focused_display.style.apply(apply_cell_style, axis=None)
-            
-            # 显示样式化的表格
-            st.dataframe(
-                styled_df,
+            # 数值保持数值类型，按列格式显示；按涨跌幅整行着色（上涨红色背景，下跌绿色背景）
+            render_cached_table(
+                'focused_indices',
+                selected_date,
+                df_focused_display.reset_index(drop=True),
+                formats={'最新价': 'price', '涨跌幅(%)': 'signed_percent', '涨跌额': 'signed'},
+                sign_column='涨跌幅(%)',
                 use_container_width=True,
                 hide_index=True
             )
@@ -414,66 +396,28 @@ try:
                     
                     fig_trend = go.Figure()
                     
-                    # 收集所有数据以确定 Y 轴范围
-                    all_change_percents = []
-                    all_dates = set()
+                    # 合并所有关注指数的数据，只解析一次日期，按指数分组一次生成折线
+                    df_focused = pd.concat([
+                        pd.DataFrame(index_info['data']).assign(series=f"{index_info['name']}（{code_6digit}）")
+                        for code_6digit, index_info in focused_indices_data.items()
+                    ], ignore_index=True)
                     
-                    # 为每个关注指数添加一条折线
-                    color_idx = 0
-                    for code_6digit, index_info in focused_indices_data.items():
-                        history_data = index_info['data']
-                        index_name = index_info['name']
-                        
-                        # 转换为DataFrame
-                        df_index = pd.DataFrame(history_data)
+                    all_change_percents = []
+                    if 'date' in df_focused.columns and 'changePercent' in df_focused.columns:
+                        df_focused = prepare_date_axis(df_focused, 'date')
+                        # 收集数据用于确定范围
+                        all_change_percents = df_focused['changePercent'].dropna().tolist()
                         
-                        if 'date' in df_index.columns and 'changePercent' in df_index.columns:
-                            # 确保date列是datetime类型（从数据库返回的是字符串）
-                            if not pd.api.types.is_datetime64_any_dtype(df_index['date']):
-                                df_index['date'] = pd.to_datetime(df_index['date'])
-                            
-                            # 过滤非交易日（这个函数会将date列转换为date对象）
-                            df_index = filter_trading_days(df_index, date_column='date')
-                            
-                            if not df_index.empty:
-                                # filter_trading_days 会将date列转换为date对象，需要重新转换为datetime才能使用.dt访问器
-                                if not pd.api.types.is_datetime64_any_dtype(df_index['date']):
-                                    df_index['date'] = pd.to_datetime(df_index['date'])
-                                
-                                df_index = df_index.sort_values('date')
-                                
-                                # 将日期转换为字符串格式，用于X轴显示（避免非交易日空白）
-                                df_index['date_str'] = df_index['date'].dt.strftime('%Y-%m-%d')
-                                
-                                # 收集数据用于确定范围
-                                all_change_percents.extend(df_index['changePercent'].tolist())
-                                all_dates.update(df_index['date_str'].tolist())
-                                
-                                # 选择颜色
-                                color = color_palette[color_idx % len(color_palette)]
-                                color_idx += 1
-                                
-                                # 添加折线（使用更鲜明的颜色和稍粗的线条）
-                                fig_trend.add_trace(go.Scatter(
-                                    x=df_index['date_str'],
-                                    y=df_index['changePercent'],
-                                    mode='lines+markers',
-                                    name=f"{index_name}（{code_6digit}）",
-                                    line=dict(
-                                        color=color,
-                                        width=2.5,  # 线条稍粗，使颜色更明显
-                                        shape='spline'  # 平滑曲线
-                                    ),
-                                    marker=dict(
-                                        color=color,
-                                        size=5,  # 标记点稍大，使颜色更明显
-                                        line=dict(
-                                            width=1,
-                                            color='white'
-                                        )
-                                    ),
-                                    hovertemplate=f'<b>{index_name}</b><br>日期: %{{x}}<br>涨跌幅: %{{y:.2f}}%<extra></extra>'
-                                ))
+                        # 添加折线（使用更鲜明的颜色和稍粗的线条）
+                        fig_trend.add_traces(build_line_traces(
+                            df_focused,
+                            y_col='changePercent',
+                            group_col='series',
+                            colors=list(color_palette),
+                            y_label='涨跌幅',
+                            value_suffix='%',
+                            line_width=2.5  # 线条稍粗，使颜色更明显
+                        ))
                     
                     # 确定 Y 轴范围（用于背景色矩形）
                     if all_change_percents:
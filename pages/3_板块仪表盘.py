@@ -18,12 +18,13 @@ sys.path.insert(0, str(project_root))
 # 导入组件和工具
 from components.kpi_cards import render_kpi_cards
 from components.sector_selector import render_sector_selector
-from utils.data_loader import load_sector_data, load_sector_data_by_date, get_available_dates
+from utils.data_loader import load_sector_data, load_sector_data_by_date, get_available_dates, load_sector_rotation, load_sector_heatmap
 from utils.chart_utils import (
     create_ranking_bar_chart,
     create_distribution_histogram,
     create_scatter_chart,
-    create_sector_trend_chart
+    create_sector_trend_chart,
+    create_heatmap_from_matrix
 )
 from utils.time_utils import get_utc8_date, get_data_date
 from datetime import timedelta
@@ -39,6 +40,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('板块仪表盘')
+
 # 页面标题
 st.markdown('<h1 class="main-header">📊 板块分析</h1>', unsafe_allow_html=True)
 
@@ -458,5 +463,73 @@ with tab2:
                 """, unsafe_allow_html=True)
             else:
                 st.info("暂无资金净流入数据")
-            
+    
+    # 板块轮动排名（基于最新交易日的滚动累计涨幅）
+    st.markdown("#### 🔄 板块轮动排名")
+    rotation_window = st.selectbox(
+        "滚动窗口（交易日）",
+        options=[3, 5, 10, 20],
+        index=1,
+        key="rotation_window",
+        help="按最近N个交易日的累计涨幅对板块排名"
+    )
+    df_rotation = load_sector_rotation(sector_type=sector_type, window=rotation_window, target_date=end_date)
+    if df_rotation.empty:
+        st.info("暂无板块轮动数据")
+    else:
+        df_rotation_display = df_rotation.rename(columns={
+            'rank': '排名',
+            'name': '板块名称',
+            'cumReturn': f'{rotation_window}日累计涨幅(%)',
+            'rankChange': '排名变化',
+            'streak': '连续涨跌天数',
+            'zscore': '涨幅Z分数',
+            'netInflowSum': f'{rotation_window}日净流入(亿元)',
+            'upRatio': '上涨家数占比',
+            'changePercent': '当日涨跌幅(%)',
+        })
+        rotation_cols = st.columns(2)
+        with rotation_cols[0]:
+            st.markdown("**🚀 动量最强**")
+            st.dataframe(df_rotation_display.head(20), use_container_width=True, hide_index=True, height=400)
+        with rotation_cols[1]:
+            st.markdown("**📈 排名上升最快**")
+            st.dataframe(
+                df_rotation_display.sort_values('排名变化', ascending=False).head(20),
+                use_container_width=True,
+                hide_index=True,
+                height=400
+            )
+    
+    # 板块涨跌幅热力图（矩阵在服务端透视、筛选和排序，板块较多时只保留波动最大的板块）
+    st.markdown("#### 🌡️ 板块涨跌幅热力图")
+    heatmap_cols = st.columns(2)
+    with heatmap_cols[0]:
+        heatmap_top_k = st.selectbox(
+            "显示板块数",
+            options=[30, 50, 100, 200, 0],
+            index=1,
+            format_func=lambda x: '全部' if x == 0 else f'波动最大的{x}个',
+            key="heatmap_top_k"
+        )
+    with heatmap_cols[1]:
+        heatmap_order = st.selectbox(
+            "排序方式",
+            options=['latest', 'mean', 'cluster'],
+            format_func=lambda x: {'latest': '最新涨跌幅', 'mean': '平均涨跌幅', 'cluster': '走势相似度'}[x],
+            key="heatmap_order"
+        )
+    heatmap_values, heatmap_rows, heatmap_dates = load_sector_heatmap(
+        start_date, end_date, sector_type=sector_type, top_k=heatmap_top_k or None, order=heatmap_order
+    )
+    if heatmap_values.size == 0:
+        st.info("暂无热力图数据")
+    else:
+        fig_heatmap = create_heatmap_from_matrix(
+            heatmap_values,
+            heatmap_rows,
+            heatmap_dates,
+            title=f"{sector_type_title}涨跌幅热力图 ({start_date} 至 {end_date})"
+        )
+        st.plotly_chart(fig_heatmap, use_container_width=True)
 
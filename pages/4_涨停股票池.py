@@ -17,7 +17,9 @@ sys.path.insert(0, str(project_root))
 
 from database.db import SessionLocal
 from services.zt_pool_history_service import ZtPoolHistoryService
+from services.zt_ladder_service import ZtLadderService
 from utils.time_utils import get_utc8_date, get_data_date, get_last_trading_day
+from utils.chart_utils import build_line_traces
 import akshare as ak
 import time
 
@@ -32,6 +34,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('涨停股票池')
+
 # 页面标题
 st.markdown('<h1 class="main-header">📈 涨停股票池</h1>', unsafe_allow_html=True)
 
@@ -141,21 +147,18 @@ try:
             
             db_trend = SessionLocal()
             try:
-                trend_stocks = ZtPoolHistoryService.get_zt_pool_by_date_range(db_trend, trend_start_date, trend_end_date)
+                # 从连板梯队表按日期聚合（每天一行），无需加载原始涨停数据
+                trend_summary = ZtLadderService.get_daily_summary_by_date_range(db_trend, trend_start_date, trend_end_date)
                 db_trend.close()
                 
-                if trend_stocks:
-                    trend_df = pd.DataFrame(trend_stocks)
+                if trend_summary:
+                    trend_df = pd.DataFrame(trend_summary)
                     
                     if 'date' in trend_df.columns and len(trend_df) > 0:
-                        # 按日期统计每日涨停股票总数
-                        daily_count = trend_df.groupby('date').size().reset_index(name='涨停股票数')
+                        # 每日涨停股票总数（梯队表只包含有涨停数据的交易日）
+                        daily_count = trend_df[['date', 'ztCount']].rename(columns={'ztCount': '涨停股票数'})
                         daily_count['date'] = pd.to_datetime(daily_count['date'])
                         
-                        # 过滤非交易日
-                        from utils.time_utils import filter_trading_days
-                        daily_count = filter_trading_days(daily_count, date_column='date')
-                        
                         if daily_count.empty:
                             st.info("暂无交易日数据")
                         else:
@@ -172,24 +175,12 @@ try:
                             fig_trend = go.Figure()
                             
                             # 主折线 - 使用日期字符串作为X轴，确保数据点连续无空白
-                            fig_trend.add_trace(go.Scatter(
-                                x=daily_count['date_str'],
-                                y=daily_count['涨停股票数'],
-                                mode='lines+markers',
+                            fig_trend.add_traces(build_line_traces(
+                                daily_count,
+                                y_col='涨停股票数',
                                 name='涨停股票数',
-                                line=dict(
-                                    color=LINE_CHART_COLORS['warning'],
-                                    width=LINE_CHART_CONFIG['line_width'],
-                                    shape='spline'  # 平滑曲线
-                                ),
-                                marker=dict(
-                                    color=LINE_CHART_COLORS['warning'],
-                                    size=LINE_CHART_CONFIG['marker_size'],
-                                    line=dict(
-                                        width=LINE_CHART_CONFIG['marker_line_width'],
-                                        color=LINE_CHART_CONFIG['marker_line_color']
-                                    )
-                                ),
+                                colors=[LINE_CHART_COLORS['warning']],
+                                y_label='涨停股票数',
                                 fill='tozeroy',  # 填充到零线
                                 fillcolor=f"rgba(245, 158, 11, {LINE_CHART_CONFIG['fill_opacity']})"  # 橙色填充
                             ))
@@ -335,6 +326,71 @@ try:
                 else:
                     st.info("暂无连板数据")
         
+        # 连板梯队（从连板梯队表读取，包含相对上一交易日的晋级率）
+        st.markdown("#### 🪜 连板梯队")
+        try:
+            db_ladder = SessionLocal()
+            try:
+                ladder = ZtLadderService.get_ladder_by_date(db_ladder, end_date)
+                ladder_summary = ZtLadderService.get_daily_summary_by_date_range(
+                    db_ladder, end_date - timedelta(days=365), end_date
+                )
+            finally:
+                db_ladder.close()
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if ladder:
+                    ladder_df = pd.DataFrame(ladder)
+                    ladder_df['codes'] = ladder_df['codes'].apply(lambda codes: ', '.join(codes))
+                    ladder_display = ladder_df[['boardHeight', 'stockCount', 'prevHeightCount', 'promotedCount', 'promotionRate', 'codes']].rename(columns={
+                        'boardHeight': '连板高度',
+                        'stockCount': '股票数',
+                        'prevHeightCount': '昨日前一高度数',
+                        'promotedCount': '晋级数',
+                        'promotionRate': '晋级率(%)',
+                        'codes': '股票代码'
+                    })
+                    st.caption(f"{end_date} 连板梯队（最高 {ladder[0]['maxHeight']} 板）")
+                    st.dataframe(ladder_display, use_container_width=True, hide_index=True)
+                else:
+                    st.info(f"{end_date} 暂无连板梯队数据")
+            
+            with col2:
+                if ladder_summary:
+                    summary_df = pd.DataFrame(ladder_summary)
+                    fig_ladder = go.Figure()
+                    fig_ladder.add_trace(go.Scatter(
+                        x=summary_df['date'],
+                        y=summary_df['continuousRate'],
+                        mode='lines',
+                        name='连板率(%)',
+                        line=dict(color='#f59e0b', width=2)
+                    ))
+                    fig_ladder.add_trace(go.Bar(
+                        x=summary_df['date'],
+                        y=summary_df['maxHeight'],
+                        name='最高连板',
+                        yaxis='y2',
+                        marker_color='rgba(239, 68, 68, 0.35)'
+                    ))
+                    fig_ladder.update_layout(
+                        title="近一年连板率与最高连板",
+                        height=400,
+                        hovermode='x unified',
+                        xaxis=dict(type='category', showticklabels=False),
+                        yaxis=dict(title='连板率(%)'),
+                        yaxis2=dict(title='最高连板', overlaying='y', side='right', showgrid=False),
+                        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)'
+                    )
+                    st.plotly_chart(fig_ladder, use_container_width=True)
+                else:
+                    st.info("暂无连板梯队趋势数据")
+        except Exception as e:
+            st.warning(f"获取连板梯队失败: {str(e)}")
+        
         # 封板资金统计
         if 'sealingFunds' in df.columns:
             st.markdown("#### 💵 封板资金TOP 10")
@@ -18,6 +18,7 @@ sys.path.insert(0, str(project_root))
 from database.db import SessionLocal
 from services.zbgc_pool_history_service import ZbgcPoolHistoryService
 from utils.time_utils import get_utc8_date, get_data_date
+from utils.chart_utils import build_line_traces
 
 st.set_page_config(
     page_title="炸板股票池",
@@ -31,6 +32,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('炸板股票池')
+
 # 页面标题
 st.markdown('<h1 class="main-header">💥 炸板股票池</h1>', unsafe_allow_html=True)
 
@@ -135,10 +140,6 @@ try:
                         daily_count = trend_df.groupby('date').size().reset_index(name='炸板股票数')
                         daily_count['date'] = pd.to_datetime(daily_count['date'])
                         
-                        # 过滤非交易日
-                        from utils.time_utils import filter_trading_days
-                        daily_count = filter_trading_days(daily_count, date_column='date')
-                        
                         if daily_count.empty:
                             st.info("暂无交易日数据")
                         else:
@@ -155,24 +156,12 @@ try:
                             fig_trend = go.Figure()
                             
                             # 主折线 - 使用日期字符串作为X轴，确保数据点连续无空白
-                            fig_trend.add_trace(go.Scatter(
-                                x=daily_count['date_str'],
-                                y=daily_count['炸板股票数'],
-                                mode='lines+markers',
+                            fig_trend.add_traces(build_line_traces(
+                                daily_count,
+                                y_col='炸板股票数',
                                 name='炸板股票数',
-                                line=dict(
-                                    color=LINE_CHART_COLORS['warning'],
-                                    width=LINE_CHART_CONFIG['line_width'],
-                                    shape='spline'  # 平滑曲线
-                                ),
-                                marker=dict(
-                                    color=LINE_CHART_COLORS['warning'],
-                                    size=LINE_CHART_CONFIG['marker_size'],
-                                    line=dict(
-                                        width=LINE_CHART_CONFIG['marker_line_width'],
-                                        color=LINE_CHART_CONFIG['marker_line_color']
-                                    )
-                                ),
+                                colors=[LINE_CHART_COLORS['warning']],
+                                y_label='炸板股票数',
                                 fill='tozeroy',  # 填充到零线
                                 fillcolor=f"rgba(245, 158, 11, {LINE_CHART_CONFIG['fill_opacity']})"  # 橙色填充
                             ))
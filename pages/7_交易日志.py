@@ -47,6 +47,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('交易日志')
+
 st.markdown('<h1 class="main-header">📝 交易日志</h1>', unsafe_allow_html=True)
 
 # 检查数据库配置
@@ -18,6 +18,7 @@ sys.path.insert(0, str(project_root))
 import akshare as ak
 import time
 from utils.time_utils import get_utc8_date, get_data_date
+from utils.table_format import render_cached_table
 
 st.set_page_config(
     page_title="个股表现",
@@ -31,6 +32,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles
 apply_common_styles()
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('个股表现')
+
 st.markdown('<h1 class="main-header">📊 个股表现</h1>', unsafe_allow_html=True)
 
 # 股票代码输入
@@ -40,23 +45,35 @@ stock_name = None
 code_input = st.text_input(
         "📊 股票代码",
         value="000001",
-        help="请输入6位股票代码，如：000001（平安银行）、600000（浦发银行）、300001（特锐德）",
-        placeholder="000001"
+        help="请输入6位股票代码，如：000001（平安银行）、600000（浦发银行）、300001（特锐德）；也可输入股票名称或拼音首字母搜索",
+        placeholder="000001 / 平安银行 / payh"
     )
 
 if code_input:
     code_input = code_input.strip()
     
     # 去除前缀
-    if code_input.startswith('sh') or code_input.startswith('sz') or code_input.startswith('bj'):
+    if code_input[:2].lower() in ('sh', 'sz', 'bj') and code_input[2:].isdigit():
         code_input = code_input[2:]
     
     # 验证是否为6位数字
     if code_input.isdigit() and len(code_input) == 6:
         stock_code = code_input
     else:
-        st.error("❌ 请输入有效的6位股票代码")
-        st.stop()
+        # 按代码、名称或拼音首字母搜索股票
+        from services.search_service import SearchService
+        try:
+            matches = SearchService.search(code_input, kind='stock', limit=20)
+        except Exception as e:
+            matches = []
+            st.warning(f"⚠️ 股票搜索失败: {str(e)}")
+        if not matches:
+            st.error("❌ 请输入有效的6位股票代码，或股票名称/拼音首字母")
+            st.stop()
+        option_labels = {f"{item['name']}（{item['code']}）": item for item in matches}
+        selected_label = st.selectbox(f"🔍 找到 {len(matches)} 只股票", list(option_labels), key="stock_search_select")
+        stock_code = option_labels[selected_label]['code']
+        stock_name = option_labels[selected_label]['name']
     
 # 验证股票代码
 if not stock_code:
@@ -301,28 +318,6 @@ if stock_code:
         
         display_hist = hist_chart.copy()
         
-        # 格式化数值
-        if '收盘' in display_hist.columns:
-            display_hist['收盘'] = display_hist['收盘'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-        if '开盘' in display_hist.columns:
-            display_hist['开盘'] = display_hist['开盘'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-        if '最高' in display_hist.columns:
-            display_hist['最高'] = display_hist['最高'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-        if '最低' in display_hist.columns:
-            display_hist['最低'] = display_hist['最低'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-        if '涨跌幅' in display_hist.columns:
-            display_hist['涨跌幅'] = display_hist['涨跌幅'].apply(lambda x: f"{x:+.2f}%" if pd.notna(x) else "N/A")
-        if '涨跌额' in display_hist.columns:
-            display_hist['涨跌额'] = display_hist['涨跌额'].apply(lambda x: f"{x:+.2f}" if pd.notna(x) else "N/A")
-        if '成交量' in display_hist.columns:
-            display_hist['成交量'] = display_hist['成交量'].apply(lambda x: f"{x/10000:.2f}万" if pd.notna(x) and x >= 10000 else f"{x:.0f}" if pd.notna(x) else "N/A")
-        if '成交额' in display_hist.columns:
-            display_hist['成交额'] = display_hist['成交额'].apply(lambda x: f"{x/100000000:.2f}亿" if pd.notna(x) and x >= 100000000 else f"{x/10000:.2f}万" if pd.notna(x) else "N/A")
-        if '振幅' in display_hist.columns:
-            display_hist['振幅'] = display_hist['振幅'].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
-        if '换手率' in display_hist.columns:
-            display_hist['换手率'] = display_hist['换手率'].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
-        
         # 格式化日期
         if '日期' in display_hist.columns:
             display_hist['日期'] = display_hist['日期'].dt.strftime('%Y-%m-%d')
@@ -331,7 +326,27 @@ if stock_code:
         display_cols = ['日期', '开盘', '收盘', '最高', '最低', '涨跌幅', '涨跌额', '成交量', '成交额', '振幅', '换手率']
         available_cols = [col for col in display_cols if col in display_hist.columns]
         
-        st.dataframe(display_hist[available_cols], use_container_width=True, height=400)
+        # 数值保持数值类型：成交量换算为万、成交额换算为亿，按列格式显示
+        render_cached_table(
+            f'stock_hist_{stock_code}',
+            display_hist['日期'].max() if len(display_hist) > 0 else None,
+            display_hist[available_cols],
+            formats={
+                '开盘': 'price',
+                '收盘': 'price',
+                '最高': 'price',
+                '最低': 'price',
+                '涨跌幅': 'signed_percent',
+                '涨跌额': 'signed',
+                '成交量': 'wan',
+                '成交额': 'yi',
+                '振幅': 'percent',
+                '换手率': 'percent',
+            },
+            scales={'成交量': 1e4, '成交额': 1e8},
+            use_container_width=True,
+            height=400
+        )
         
         # 资金流统计
         if len(df_fund) > 0:
@@ -536,33 +551,26 @@ if stock_code:
         # 准备显示数据
         display_df = df_fund.copy()
         
-        # 格式化数值列
-        numeric_cols = [
-            '收盘价', '涨跌幅',
-            '主力净流入-净额', '主力净流入-净占比',
-            '超大单净流入-净额', '超大单净流入-净占比',
-            '大单净流入-净额', '大单净流入-净占比',
-            '中单净流入-净额', '中单净流入-净占比',
-            '小单净流入-净额', '小单净流入-净占比'
-        ]
-        
-        for col in numeric_cols:
-            if col in display_df.columns:
-                if '净额' in col:
-                    # 净额转换为万元显示
-                    display_df[col] = display_df[col].apply(lambda x: f"{x/10000:.2f}万" if pd.notna(x) else "N/A")
-                elif '净占比' in col or '涨跌幅' in col:
-                    # 百分比保留2位小数
-                    display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
-                elif '收盘价' in col:
-                    # 价格保留2位小数
-                    display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-        
         # 格式化日期
         if '日期' in display_df.columns:
             display_df['日期'] = display_df['日期'].dt.strftime('%Y-%m-%d')
         
-        st.dataframe(display_df, use_container_width=True, height=400)
+        # 数值保持数值类型：净额换算为万元，按列格式显示
+        fund_formats = {'收盘价': 'price', '涨跌幅': 'percent'}
+        for col in display_df.columns:
+            if '净额' in col:
+                fund_formats[col] = 'wan'
+            elif '净占比' in col:
+                fund_formats[col] = 'percent'
+        render_cached_table(
+            f'stock_fund_{stock_code}',
+            display_df['日期'].max() if '日期' in display_df.columns and len(display_df) > 0 else None,
+            display_df,
+            formats=fund_formats,
+            scales={col: 1e4 for col in display_df.columns if '净额' in col},
+            use_container_width=True,
+            height=400
+        )
         
     except Exception as e:
         st.error(f"❌ 获取数据失败: {str(e)}")
@@ -22,6 +22,7 @@ try:
     from services.stock_index_service import StockIndexService
     from utils.time_utils import get_utc8_date, get_data_date
     from utils.focused_indices import get_focused_indices
+    from utils.data_loader import load_month_data
     DB_AVAILABLE = True
 except (ValueError, RuntimeError) as e:
     DB_AVAILABLE = False
@@ -41,6 +42,10 @@ st.set_page_config(
 from utils.page_styles import apply_common_styles, get_calendar_specific_styles
 apply_common_styles(additional_styles=get_calendar_specific_styles())
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('复盘日历')
+
 st.markdown('<h1 class="main-header">复盘日历</h1>', unsafe_allow_html=True)
 
 # 检查数据库配置
@@ -148,37 +153,6 @@ for i, weekday in enumerate(weekdays):
     with cols[i]:
         st.markdown(f"<div class='calendar-weekday'>{weekday}</div>", unsafe_allow_html=True)
 
-# 批量加载当月所有日期的数据（优化性能）
-@st.cache_data(ttl=300)  # 缓存5分钟
-def load_month_data(year, month, month_dates, focused_indices):
-    """批量加载整月的数据"""
-    if not month_dates:
-        return {}
-    
-    db = SessionLocal()
-    try:
-        month_data = {}
-        for current_date in month_dates:
-            try:
-                # 获取所有关注的指数数据
-                indices_data = IndexHistoryService.get_indices_by_date(db, current_date)
-                focused_indices_data = [idx for idx in indices_data if idx.get('code') in focused_indices]
-                
-                # 获取top3板块
-                sectors_data = SectorHistoryService.get_sectors_by_date(db, current_date, 'concept')
-                up_sectors = [s for s in sectors_data if s.get('changePercent', 0) > 0]
-                top3_sectors = sorted(up_sectors, key=lambda x: x.get('changePercent', 0), reverse=True)[:3]
-                
-                month_data[current_date] = {
-                    'indices': focused_indices_data,
-                    'top3_sectors': top3_sectors
-                }
-            except Exception:
-                pass
-        return month_data
-    finally:
-        db.close()
-
 # 加载当月数据
 month_data_cache = load_month_data(year, month, month_dates, focused_indices)
 
@@ -234,8 +208,11 @@ for week in cal:
                     indices_html += '</div>'
                     st.markdown(indices_html, unsafe_allow_html=True)
                     
-                    # 板块组 - 显示top3板块（简化显示）
+                    # 板块组 - 显示涨停/跌停数和top3板块（简化显示）
                     sectors_html = '<div class="sector-group">'
+                    market_summary = day_summary.get('market_summary')
+                    if market_summary:
+                        sectors_html += f'<div class="sector-badge">涨停{market_summary["ztCount"]} 跌停{market_summary["dtCount"]}</div>'
                     if day_summary['top3_sectors']:
                         for i, sector in enumerate(day_summary['top3_sectors'], 1):
                             sector_name = sector.get('name', '')
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务工作进程 - 执行页面、接口和定时任务提交到 job_queue 的任务
+"""
+import sys
+import argparse
+import signal
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from database.db import init_db
+from services.job_queue_service import JOB_TYPES
+from tasks.job_worker import JobWorker
+from utils.akshare_replay import install_from_env
+import logging
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    """启动后台任务工作进程"""
+    parser = argparse.ArgumentParser(description='后台任务工作进程 - 执行 job_queue 中的任务')
+    parser.add_argument('--concurrency', type=int, default=None, help='同时执行的任务数（默认 JOB_WORKER_CONCURRENCY）')
+    parser.add_argument('--poll', type=float, default=None, help='没有任务时的轮询间隔秒数（默认 JOB_WORKER_POLL_SECONDS）')
+    parser.add_argument('--types', nargs='+', choices=sorted(JOB_TYPES), help='只执行这些类型的任务')
+    parser.add_argument('--once', action='store_true', help='执行完队列中的任务后退出')
+    args = parser.parse_args()
+    
+    # akshare 录制/回放（由 AKSHARE_MODE 环境变量控制，默认关闭）
+    install_from_env()
+    
+    print("=" * 60)
+    print("🔄 后台任务工作进程")
+    print("=" * 60)
+    
+    init_db()
+    worker = JobWorker(concurrency=args.concurrency, poll_seconds=args.poll, job_types=args.types)
+    print(f"\n👷 工作进程: {worker.identity}，并发: {worker.concurrency}")
+    print(f"📋 任务类型: {', '.join(args.types) if args.types else '全部'}")
+    print("💡 Ctrl+C 停止（等待正在执行的任务结束）")
+    print("-" * 60)
+    
+    def handle_stop(signum, frame):
+        print("\n⏹️  收到停止信号，等待正在执行的任务结束...")
+        worker.stop()
+    
+    signal.signal(signal.SIGINT, handle_stop)
+    signal.signal(signal.SIGTERM, handle_stop)
+    
+    try:
+        executed = worker.run(once=args.once)
+        print("\n" + "=" * 60)
+        print(f"✅ 工作进程已退出，共执行 {executed} 个任务")
+        print("=" * 60)
+    except Exception as e:
+        print(f"\n❌ 工作进程异常退出: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
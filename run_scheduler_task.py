@@ -19,6 +19,7 @@ from services.dtgc_pool_history_service import DtgcPoolHistoryService
 from services.index_history_service import IndexHistoryService
 from utils.excel_export import append_sectors_to_excel
 from utils.time_utils import get_utc8_date
+from utils.akshare_replay import install_from_env
 import logging
 
 # 配置日志
@@ -51,9 +52,9 @@ def save_daily_data(force=False):
             
             # 1. 保存板块数据
             try:
-                saved_count = SectorHistoryService.save_today_sectors(db)
-                logger.info(f"✅ 成功保存 {saved_count} 条板块数据到数据库")
-                results['sectors'] = saved_count
+                result = SectorHistoryService.save_today_sectors(db)
+                logger.info(f"✅ 成功保存 {result.total} 条板块数据到数据库（实际写入 {result.changed} 行）")
+                results['sectors'] = result.total
                 
                 # 追加到Excel文件
                 excel_file = append_sectors_to_excel()
@@ -64,9 +65,9 @@ def save_daily_data(force=False):
             
             # 2. 保存涨停股票池数据
             try:
-                zt_count = ZtPoolHistoryService.save_today_zt_pool(db)
-                logger.info(f"✅ 成功保存 {zt_count} 条涨停股票数据到数据库")
-                results['zt_pool'] = zt_count
+                result = ZtPoolHistoryService.save_today_zt_pool(db)
+                logger.info(f"✅ 成功保存 {result.total} 条涨停股票数据到数据库（实际写入 {result.changed} 行）")
+                results['zt_pool'] = result.total
             except Exception as e:
                 logger.error(f"❌ 保存涨停股票数据失败: {str(e)}", exc_info=True)
                 results['zt_pool'] = f"失败: {str(e)}"
@@ -91,9 +92,9 @@ def save_daily_data(force=False):
             
             # 5. 保存指数数据
             try:
-                index_count = IndexHistoryService.save_today_indices(db)
-                logger.info(f"✅ 成功保存 {index_count} 条指数数据到数据库")
-                results['indices'] = index_count
+                result = IndexHistoryService.save_today_indices(db)
+                logger.info(f"✅ 成功保存 {result.total} 条指数数据到数据库（实际写入 {result.changed} 行）")
+                results['indices'] = result.total
             except Exception as e:
                 logger.error(f"❌ 保存指数数据失败: {str(e)}", exc_info=True)
                 results['indices'] = f"失败: {str(e)}"
@@ -127,6 +128,9 @@ def main():
     parser.add_argument('--force', action='store_true', help='强制执行，跳过交易日检查')
     args = parser.parse_args()
     
+    # akshare 录制/回放（由 AKSHARE_MODE 环境变量控制，默认关闭）
+    install_from_env()
+    
     print("=" * 60)
     print("🔄 手动执行定时任务 - 获取并保存今日数据")
     print("=" * 60)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回填涨停/炸板/跌停股票池历史数据
+
+示例：
+    python scripts/backfill_pools.py --start-date 2025-01-01 --end-date 2025-12-31
+    python scripts/backfill_pools.py --start-date 2025-06-01 --datasets zt_pool --workers 8 --rate 10
+
+中断后使用相同参数重新运行即可从上次的进度继续（已完成的分区记录在 backfill_checkpoint 表中）。
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.db import SessionLocal, init_db
+from services.pool_backfill_service import PoolBackfillService, DATASETS
+from utils.time_utils import get_utc8_date
+from datetime import datetime
+import argparse
+
+def main():
+    """回填股票池历史数据"""
+    parser = argparse.ArgumentParser(description='回填涨停/炸板/跌停股票池历史数据（可断点续传）')
+    parser.add_argument('--start-date', type=str, required=True, help='开始日期，格式：YYYY-MM-DD')
+    parser.add_argument('--end-date', type=str, help='结束日期，格式：YYYY-MM-DD，默认为今天')
+    parser.add_argument('--datasets', type=str, default=','.join(DATASETS),
+                        help=f"要回填的数据集（逗号分隔），默认全部：{','.join(DATASETS)}")
+    parser.add_argument('--workers', type=int, default=4, help='并发获取的线程数，默认4')
+    parser.add_argument('--rate', type=float, default=5.0, help='每秒最多发起的接口请求数，默认5')
+    parser.add_argument('--max-retries', type=int, default=3, help='每个分区的最大尝试次数，默认3')
+    parser.add_argument('--retry-empty', action='store_true', help='重新获取上次返回空数据的日期')
+    parser.add_argument('--no-ladder', action='store_true', help='回填后不重建连板梯队')
+    args = parser.parse_args()
+    
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date() if args.end_date else get_utc8_date()
+    datasets = [name.strip() for name in args.datasets.split(',') if name.strip()]
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        summary = PoolBackfillService.backfill(
+            db,
+            start_date,
+            end_date,
+            datasets=datasets,
+            workers=args.workers,
+            rate=args.rate,
+            max_retries=args.max_retries,
+            retry_empty=args.retry_empty,
+            rebuild_ladder=not args.no_ladder,
+        )
+        print(f"\n✓ 回填完成：{summary['partitions']} 个分区，成功 {summary['done']}，"
+              f"无数据 {summary['empty']}，失败 {summary['failed']}，"
+              f"共 {summary['rows']} 条，耗时 {summary['duration_seconds']} 秒")
+        if summary['failed']:
+            print("失败的分区会在下次运行时重试")
+            sys.exit(1)
+    except Exception as e:
+        print(f"✗ 回填失败: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
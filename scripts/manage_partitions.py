@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史表分区管理
+    
+    python scripts/manage_partitions.py list                  # 查看分区
+    python scripts/manage_partitions.py convert               # 把历史表转换为按月分区表（PostgreSQL）
+    python scripts/manage_partitions.py maintain --horizon 12 # 创建未来分区，汇总并删除12个月之前的明细
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.db import SessionLocal, init_db
+from services.partition_service import PartitionService, PARTITIONED_TABLES
+import argparse
+
+def main():
+    """分区管理"""
+    parser = argparse.ArgumentParser(description='历史表分区管理')
+    parser.add_argument('action', choices=['list', 'convert', 'maintain'],
+                        help='list: 查看分区; convert: 转换为分区表; maintain: 创建未来分区并汇总/删除过期明细')
+    parser.add_argument('--tables', type=str, default=','.join(PARTITIONED_TABLES),
+                        help=f"要处理的表（逗号分隔），默认全部：{','.join(PARTITIONED_TABLES)}")
+    parser.add_argument('--months-ahead', type=int, default=None, help='提前创建的月分区数，默认读取 PARTITION_MONTHS_AHEAD')
+    parser.add_argument('--horizon', type=int, default=None, help='明细保留月数，默认读取 ROLLUP_HORIZON_MONTHS（0 表示不汇总、不删除）')
+    args = parser.parse_args()
+    
+    tables = [name.strip() for name in args.tables.split(',') if name.strip()]
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.action == 'list':
+            for table_name in tables:
+                partitions = PartitionService.list_partitions(db, table_name)
+                if not partitions:
+                    print(f"{table_name}: 不是分区表")
+                    continue
+                print(f"{table_name}: {len(partitions)} 个分区")
+                for partition in partitions:
+                    print(f"  {partition['name']:<40} {partition['rows']:>10} 行  {partition['bound']}")
+        elif args.action == 'convert':
+            for table_name in tables:
+                PartitionService.convert_to_partitioned(db, table_name, months_ahead=args.months_ahead)
+        else:
+            summary = PartitionService.maintain(
+                db, tables=tables, months_ahead=args.months_ahead, horizon_months=args.horizon
+            )
+            for table_name, item in summary.items():
+                print(f"✓ {table_name}: 新建分区 {len(item['created'])} 个，汇总 {item['rolled_up_weeks']} 周，"
+                      f"删除分区 {len(item['dropped_partitions'])} 个、明细 {item['deleted_rows']} 行")
+    except Exception as e:
+        print(f"✗ 执行失败: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
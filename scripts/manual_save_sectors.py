@@ -26,8 +26,8 @@ def main():
         try:
             # 保存到数据库
             print("正在保存板块数据到数据库...")
-            saved_count = SectorHistoryService.save_today_sectors(db)
-            print(f"✓ 成功保存 {saved_count} 条板块数据到数据库")
+            result = SectorHistoryService.save_today_sectors(db)
+            print(f"✓ 成功保存 {result.total} 条板块数据到数据库（实际写入 {result.changed} 行）")
             
             # 追加到Excel文件
             print("正在追加板块数据到Excel文件...")
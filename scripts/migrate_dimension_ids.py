@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+把历史表中已有的名称字符串迁移到名称维度表（字典编码）
+
+新写入的数据已经只保存维度ID；本脚本把旧数据的名称列转换为维度ID并置空。
+迁移后在 PostgreSQL 中执行 VACUUM FULL（或 pg_repack）回收空间。
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.db import SessionLocal, init_db
+from services.dimension_service import DimensionService, ENCODED_COLUMNS
+import argparse
+
+def main():
+    """迁移名称列"""
+    tables = {model.__tablename__: model for model in ENCODED_COLUMNS}
+    parser = argparse.ArgumentParser(description='把历史表的名称列迁移到名称维度表')
+    parser.add_argument('--tables', type=str, default=','.join(tables),
+                        help=f"要迁移的表（逗号分隔），默认全部：{','.join(tables)}")
+    parser.add_argument('--batch-size', type=int, default=5000, help='每批迁移的行数，默认5000')
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        for table_name in [name.strip() for name in args.tables.split(',') if name.strip()]:
+            if table_name not in tables:
+                print(f"✗ 未知的表: {table_name}", file=sys.stderr)
+                sys.exit(1)
+            count = DimensionService.encode_existing_rows(db, tables[table_name], batch_size=args.batch_size)
+            print(f"✓ {table_name}: 共迁移 {count} 行")
+    except Exception as e:
+        print(f"✗ 迁移失败: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
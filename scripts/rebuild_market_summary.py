@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+根据历史明细数据重新生成每日市场概况表
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.db import SessionLocal, init_db
+from services.market_summary_service import MarketSummaryService
+from datetime import datetime
+import argparse
+
+def main():
+    """重新生成每日市场概况"""
+    parser = argparse.ArgumentParser(description='根据历史明细数据重新生成每日市场概况表')
+    parser.add_argument('--start-date', type=str, help='开始日期，格式：YYYY-MM-DD，默认为最早日期')
+    parser.add_argument('--end-date', type=str, help='结束日期，格式：YYYY-MM-DD，默认为最新日期')
+    args = parser.parse_args()
+    
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date() if args.start_date else None
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date() if args.end_date else None
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        print("正在生成每日市场概况...")
+        count = MarketSummaryService.refresh_range(db, start_date=start_date, end_date=end_date)
+        print(f"\n✓ 已生成 {count} 个交易日的市场概况")
+    except Exception as e:
+        print(f"✗ 生成失败: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+刷新概念板块成分股（只写入新增和移除的成分股）
+
+示例：
+    python scripts/refresh_concept_membership.py
+    python scripts/refresh_concept_membership.py --concepts 人工智能,机器人概念
+    python scripts/refresh_concept_membership.py --stock 000001
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.db import SessionLocal, init_db
+from services.concept_membership_service import ConceptMembershipService
+import argparse
+
+def main():
+    """刷新概念成分股"""
+    parser = argparse.ArgumentParser(description='刷新概念板块成分股')
+    parser.add_argument('--concepts', type=str, help='要刷新的概念，逗号分隔，默认全部')
+    parser.add_argument('--workers', type=int, help='并发获取的线程数')
+    parser.add_argument('--rate', type=float, help='每秒最多发起的接口请求数')
+    parser.add_argument('--stock', type=str, help='不刷新，只查询股票所属的概念')
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.stock:
+            concepts = ConceptMembershipService.get_stock_concepts(db, args.stock)
+            print(f"{args.stock} 所属概念（{len(concepts)} 个）: {', '.join(concepts)}")
+            return
+        
+        concepts = [name.strip() for name in args.concepts.split(',') if name.strip()] if args.concepts else None
+        summary = ConceptMembershipService.refresh(db, concepts=concepts, workers=args.workers, rate=args.rate)
+        print(
+            f"\n✓ 刷新完成: 概念 {summary['concepts']} 个，变化 {summary['changed']} 个，"
+            f"新增 {summary['added']}，移除 {summary['removed']}，下线概念成分股 {summary['stale_removed']}，"
+            f"失败 {summary['failed']}，耗时 {summary['duration_seconds']} 秒"
+        )
+        for failure in summary['failures']:
+            print(f"✗ {failure['concept']}: {failure['error']}")
+        if summary['failed']:
+            sys.exit(1)
+    except Exception as e:
+        print(f"✗ 刷新失败: {str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ import akshare as ak
 from typing import List, Dict, Optional
 import pandas as pd
 import json
+from utils.metrics import stage, timed
 
 class BoardChangeService:
     """板块异动服务"""
@@ -14,7 +15,9 @@ class BoardChangeService:
         """
         try:
             # 调用akshare接口
-            df = ak.stock_board_change_em()
+            with stage('fetch.stock_board_change_em') as timer:
+                df = ak.stock_board_change_em()
+                timer.rows = len(df)
             
             # 转换为字典列表
             return cls._dataframe_to_dict_list(df)
@@ -22,6 +25,7 @@ class BoardChangeService:
             raise Exception(f'Failed to get board changes: {str(e)}')
     
     @classmethod
+    @timed('transform.board_change')
     def _dataframe_to_dict_list(cls, df: pd.DataFrame) -> List[Dict]:
         """将DataFrame转换为字典列表"""
         result = []
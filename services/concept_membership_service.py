@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+概念板块成分股服务
+
+股票池只有单个 industry 字段，概念板块历史（sector_history）也没有成分股数据，
+"哪些热门概念带动了今天的涨停"需要实时逐个请求上百个概念的成分股。
+
+- 刷新：限速并发获取全部概念的成分股（东方财富 stock_board_concept_cons_em），
+  与 concept_membership 表中的已有成分股比较，只插入新增、删除移除的成分股
+- 查询：ConceptMembershipIndex 在进程内维护 概念 -> 股票、股票 -> 概念 的双向倒排索引，
+  股票池、个股资金流与概念的关联在内存中完成，不再访问接口
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+import akshare as ak
+from sqlalchemy.orm import Session
+from config import Config
+from models.concept_membership import ConceptMembership
+from models.dimension import DimensionCache, DimSector
+from models.sector_history import SectorHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.dt_pool_history import DtgcPoolHistory
+from models.stock_fund_flow_history import StockFundFlowHistory
+from services.pool_backfill_service import RateLimiter
+from utils.metrics import stage
+
+# 股票池 -> 历史表模型
+POOL_MODELS = {
+    'zt_pool': ZtPoolHistory,
+    'zb_pool': ZbgcPoolHistory,
+    'dt_pool': DtgcPoolHistory,
+}
+
+
+class ConceptMembershipIndex:
+    """概念成分股的进程内双向倒排索引（线程安全，超过 CONCEPT_INDEX_TTL_SECONDS 后重新加载）"""
+    
+    _concept_stocks: Dict[int, FrozenSet[str]] = {}
+    _stock_concepts: Dict[str, FrozenSet[int]] = {}
+    _loaded_at: Optional[float] = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, db: Session):
+        """从 concept_membership 表重新加载整个索引"""
+        with stage('db.concept_membership.load') as timer:
+            rows = db.query(ConceptMembership.concept_id, ConceptMembership.stock_code).all()
+            timer.rows = len(rows)
+        concept_stocks: Dict[int, Set[str]] = {}
+        stock_concepts: Dict[str, Set[int]] = {}
+        for concept_id, stock_code in rows:
+            concept_stocks.setdefault(concept_id, set()).add(stock_code)
+            stock_concepts.setdefault(stock_code, set()).add(concept_id)
+        with cls._lock:
+            cls._concept_stocks = {key: frozenset(value) for key, value in concept_stocks.items()}
+            cls._stock_concepts = {key: frozenset(value) for key, value in stock_concepts.items()}
+            cls._loaded_at = time.monotonic()
+    
+    @classmethod
+    def ensure_loaded(cls, db: Session):
+        """索引未加载或已过期时重新加载"""
+        loaded_at = cls._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > Config.CONCEPT_INDEX_TTL_SECONDS:
+            cls.load(db)
+    
+    @classmethod
+    def invalidate(cls):
+        """使索引失效（下次查询时重新加载）"""
+        with cls._lock:
+            cls._loaded_at = None
+    
+    @classmethod
+    def concept_ids_of(cls, stock_code: str) -> FrozenSet[int]:
+        return cls._stock_concepts.get(stock_code, frozenset())
+    
+    @classmethod
+    def stocks_of(cls, concept_id: int) -> FrozenSet[str]:
+        return cls._concept_stocks.get(concept_id, frozenset())
+    
+    @classmethod
+    def concept_ids(cls) -> List[int]:
+        return list(cls._concept_stocks)
+
+
+class ConceptMembershipService:
+    """概念板块成分股服务"""
+    
+    @staticmethod
+    def fetch_concept_names() -> List[str]:
+        """获取东方财富概念板块列表"""
+        with stage('fetch.stock_board_concept_name_em') as timer:
+            df = ak.stock_board_concept_name_em()
+            timer.rows = len(df) if df is not None else 0
+        if df is None or df.empty:
+            return []
+        return [str(name) for name in df['板块名称'].dropna().unique()]
+    
+    @staticmethod
+    def fetch_constituents(concept: str) -> Set[str]:
+        """获取一个概念板块的成分股代码"""
+        with stage('fetch.stock_board_concept_cons_em') as timer:
+            df = ak.stock_board_concept_cons_em(symbol=concept)
+            timer.rows = len(df) if df is not None else 0
+        if df is None or df.empty:
+            return set()
+        return {str(code).zfill(6) for code in df['代码'].dropna()}
+    
+    @staticmethod
+    def apply_membership(db: Session, concept: str, stock_codes: Iterable[str]) -> Tuple[int, int]:
+        """
+        把一个概念的成分股更新为 stock_codes（只写入变化的部分，不提交）
+        
+        Returns:
+            (新增数, 移除数)
+        """
+        concept_id = DimensionCache.resolve_ids(db, 'sector', [concept])[concept]
+        wanted = set(stock_codes)
+        existing = {
+            row[0] for row in db.query(ConceptMembership.stock_code).filter(
+                ConceptMembership.concept_id == concept_id
+            ).all()
+        }
+        added = wanted - existing
+        removed = existing - wanted
+        if added:
+            db.bulk_save_objects([
+                ConceptMembership(concept_id=concept_id, stock_code=code) for code in sorted(added)
+            ])
+        if removed:
+            db.query(ConceptMembership).filter(
+                ConceptMembership.concept_id == concept_id,
+                ConceptMembership.stock_code.in_(removed)
+            ).delete(synchronize_session=False)
+        return len(added), len(removed)
+    
+    @staticmethod
+    def remove_missing_concepts(db: Session, concepts: Sequence[str]) -> int:
+        """删除不在概念列表中的概念（已下线的概念）的全部成分股（不提交）"""
+        concept_ids = set(DimensionCache.resolve_ids(db, 'sector', concepts).values())
+        existing_ids = {row[0] for row in db.query(ConceptMembership.concept_id).distinct().all()}
+        stale_ids = existing_ids - concept_ids
+        if not stale_ids:
+            return 0
+        return db.query(ConceptMembership).filter(
+            ConceptMembership.concept_id.in_(stale_ids)
+        ).delete(synchronize_session=False)
+    
+    @staticmethod
+    def _fetch_with_retry(concept: str, limiter: RateLimiter, max_retries: int, retry_delay: float) -> Set[str]:
+        """限速获取一个概念的成分股，失败时指数退避重试"""
+        for attempt in range(max_retries):
+            limiter.acquire()
+            try:
+                return ConceptMembershipService.fetch_constituents(concept)
+            except Exception:
+                if attempt == max_retries - 1:
+                    raise
+                time.sleep(retry_delay * (2 ** attempt))
+        return set()
+    
+    @staticmethod
+    def refresh(
+        db: Session,
+        concepts: Optional[Sequence[str]] = None,
+        workers: Optional[int] = None,
+        rate: Optional[float] = None,
+        max_retries: int = 3,
+        retry_delay: float = 2.0
+    ) -> Dict:
+        """
+        刷新概念成分股（每个概念提交一次，只写入变化的成分股）
+        
+        Args:
+            db: 数据库会话（只在调用线程中使用）
+            concepts: 要刷新的概念，默认全部（同时删除已下线概念的成分股）
+            workers: 并发获取的线程数，默认 Config.CONCEPT_MEMBERSHIP_WORKERS
+            rate: 每秒最多发起的接口请求数，默认 Config.CONCEPT_MEMBERSHIP_RATE
+            max_retries: 每个概念的最大尝试次数
+            retry_delay: 首次重试前的等待秒数（之后指数增长）
+        
+        Returns:
+            {'concepts', 'changed', 'added', 'removed', 'stale_removed', 'failed', 'duration_seconds',
+             'failures': [{'concept', 'error'}]}
+        """
+        started = time.time()
+        full_refresh = concepts is None
+        concepts = list(concepts) if concepts is not None else ConceptMembershipService.fetch_concept_names()
+        summary = {
+            'concepts': len(concepts),
+            'changed': 0,
+            'added': 0,
+            'removed': 0,
+            'stale_removed': 0,
+            'failed': 0,
+            'duration_seconds': 0.0,
+            'failures': [],
+        }
+        print(f"📋 待刷新 {len(concepts)} 个概念的成分股")
+        
+        limiter = RateLimiter(rate if rate is not None else Config.CONCEPT_MEMBERSHIP_RATE)
+        with ThreadPoolExecutor(
+            max_workers=max(int(workers or Config.CONCEPT_MEMBERSHIP_WORKERS), 1),
+            thread_name_prefix='concept-membership'
+        ) as executor:
+            future_to_concept = {
+                executor.submit(
+                    ConceptMembershipService._fetch_with_retry, concept, limiter, max_retries, retry_delay
+                ): concept
+                for concept in concepts
+            }
+            for finished, future in enumerate(as_completed(future_to_concept), start=1):
+                concept = future_to_concept[future]
+                progress = f"[{finished}/{len(concepts)}] {concept}"
+                try:
+                    stock_codes = future.result()
+                    if not stock_codes:
+                        # 接口偶尔返回空数据，保留已有成分股
+                        print(f"⚠️  {progress}: 无数据，保留已有成分股")
+                        continue
+                    with stage('db.concept_membership.apply'):
+                        added, removed = ConceptMembershipService.apply_membership(db, concept, stock_codes)
+                        db.commit()
+                except Exception as e:
+                    db.rollback()
+                    summary['failed'] += 1
+                    summary['failures'].append({'concept': concept, 'error': str(e)})
+                    print(f"❌ {progress}: {str(e)}")
+                    continue
+                
+                summary['added'] += added
+                summary['removed'] += removed
+                if added or removed:
+                    summary['changed'] += 1
+                    print(f"✅ {progress}: 新增 {added}，移除 {removed}")
+        
+        # 只有概念列表完整获取时才删除已下线的概念
+        if full_refresh and concepts:
+            try:
+                summary['stale_removed'] = ConceptMembershipService.remove_missing_concepts(db, concepts)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️  删除已下线概念的成分股失败: {str(e)}")
+        
+        ConceptMembershipIndex.invalidate()
+        summary['duration_seconds'] = round(time.time() - started, 2)
+        return summary
+    
+    @staticmethod
+    def get_stock_concepts(db: Session, stock_code: str) -> List[str]:
+        """获取股票所属的概念（按名称排序）"""
+        ConceptMembershipIndex.ensure_loaded(db)
+        return sorted(
+            name for name in (
+                DimensionCache.name('sector', concept_id)
+                for concept_id in ConceptMembershipIndex.concept_ids_of(stock_code)
+            ) if name
+        )
+    
+    @staticmethod
+    def get_concept_stocks(db: Session, concept: str) -> List[str]:
+        """获取概念的成分股代码（按代码排序）"""
+        ConceptMembershipIndex.ensure_loaded(db)
+        concept_id = db.query(DimSector.id).filter(DimSector.name == concept).scalar()
+        return sorted(ConceptMembershipIndex.stocks_of(concept_id)) if concept_id else []
+    
+    @staticmethod
+    def rank_concepts(db: Session, stock_codes: Iterable[str], top: Optional[int] = None) -> List[Dict]:
+        """
+        统计一组股票（如当日涨停股）在各概念中的分布
+        
+        Returns:
+            [{'concept', 'conceptId', 'count', 'memberCount', 'stockCodes'}]，
+            按命中数降序，命中数相同时成分股少的概念在前
+        """
+        ConceptMembershipIndex.ensure_loaded(db)
+        hits: Dict[int, List[str]] = {}
+        for code in set(stock_codes):
+            for concept_id in ConceptMembershipIndex.concept_ids_of(code):
+                hits.setdefault(concept_id, []).append(code)
+        ranked = sorted(
+            hits.items(),
+            key=lambda item: (-len(item[1]), len(ConceptMembershipIndex.stocks_of(item[0])), item[0])
+        )
+        if top:
+            ranked = ranked[:top]
+        return [
+            {
+                'concept': DimensionCache.name('sector', concept_id),
+                'conceptId': concept_id,
+                'count': len(codes),
+                'memberCount': len(ConceptMembershipIndex.stocks_of(concept_id)),
+                'stockCodes': sorted(codes),
+            }
+            for concept_id, codes in ranked
+        ]
+    
+    @staticmethod
+    def get_pool_concepts(db: Session, target_date: date, pool: str = 'zt_pool', top: Optional[int] = 20) -> List[Dict]:
+        """
+        指定日期股票池中个股所属的概念排行，附带概念当日涨跌幅、板块资金净流入和成分股资金净额
+        
+        Args:
+            pool: 股票池（zt_pool/zb_pool/dt_pool）
+            top: 返回的概念数，None 表示全部
+        
+        Returns:
+            rank_concepts 的结果，每项增加 'changePercent'、'netInflow'（概念板块历史，亿元，
+            名称与东方财富概念一致时才有值）和 'memberNetAmount'（成分股资金净额合计，元）
+        """
+        if pool not in POOL_MODELS:
+            raise ValueError(f"未知的股票池: {pool}，可选: {', '.join(POOL_MODELS)}")
+        model = POOL_MODELS[pool]
+        stock_codes = [row[0] for row in db.query(model.code).filter(model.date == target_date).all()]
+        ranked = ConceptMembershipService.rank_concepts(db, stock_codes, top)
+        if not ranked:
+            return ranked
+        
+        sectors = {
+            sector['name']: sector
+            for sector in (
+                row.to_dict() for row in db.query(SectorHistory).filter(
+                    SectorHistory.date == target_date,
+                    SectorHistory.sector_type == 'concept'
+                ).all()
+            )
+        }
+        net_amounts = ConceptMembershipService.get_concept_net_amounts(
+            db, target_date, [item['conceptId'] for item in ranked]
+        )
+        for item in ranked:
+            sector = sectors.get(item['concept'])
+            item['changePercent'] = sector['changePercent'] if sector else None
+            item['netInflow'] = sector['netInflow'] if sector else None
+            item['memberNetAmount'] = net_amounts.get(item['conceptId'])
+        return ranked
+    
+    @staticmethod
+    def get_concept_net_amounts(
+        db: Session,
+        target_date: date,
+        concept_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, float]:
+        """
+        按成分股汇总指定日期的个股资金净额（stock_fund_flow_history，元）
+        
+        Returns:
+            {概念ID: 成分股资金净额合计}（当日没有任何成分股资金流数据的概念不包含在结果中）
+        """
+        ConceptMembershipIndex.ensure_loaded(db)
+        net_amounts = {
+            code: amount for code, amount in db.query(
+                StockFundFlowHistory.stock_code, StockFundFlowHistory.net_amount
+            ).filter(
+                StockFundFlowHistory.date == target_date,
+                StockFundFlowHistory.net_amount.isnot(None)
+            ).all()
+        }
+        result = {}
+        for concept_id in (concept_ids if concept_ids is not None else ConceptMembershipIndex.concept_ids()):
+            amounts = [net_amounts[code] for code in ConceptMembershipIndex.stocks_of(concept_id) if code in net_amounts]
+            if amounts:
+                result[concept_id] = round(sum(amounts), 2)
+        return result
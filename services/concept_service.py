@@ -2,6 +2,7 @@ import akshare as ak
 from typing import List, Dict, Optional
 import pandas as pd
 import time
+from utils.metrics import stage, timed
 
 class ConceptService:
     """概念板块信息服务（同花顺概念一览表）"""
@@ -21,7 +22,9 @@ class ConceptService:
             for retry in range(max_retries):
                 try:
                     # 优先使用概念资金流接口（提供完整的资金流数据）
-                    df = ak.stock_fund_flow_concept()
+                    with stage('fetch.stock_fund_flow_concept') as timer:
+                        df = ak.stock_fund_flow_concept()
+                        timer.rows = len(df) if df is not None else 0
                     if df is not None and not df.empty:
                         return cls._convert_fund_flow_to_dict(df)
                 except Exception as e:
@@ -32,14 +35,18 @@ class ConceptService:
                         # 如果 stock_fund_flow_concept 失败，尝试使用其他接口
                         try:
                             # 尝试使用 stock_board_concept_name_ths
-                            df = ak.stock_board_concept_name_ths()
+                            with stage('fetch.stock_board_concept_name_ths') as timer:
+                                df = ak.stock_board_concept_name_ths()
+                                timer.rows = len(df) if df is not None else 0
                             if df is not None and not df.empty:
                                 return cls._dataframe_to_dict_list(df)
                         except:
                             pass
                         # 最后尝试使用 stock_board_concept_name_em
                         try:
-                            df = ak.stock_board_concept_name_em()
+                            with stage('fetch.stock_board_concept_name_em') as timer:
+                                df = ak.stock_board_concept_name_em()
+                                timer.rows = len(df) if df is not None else 0
                             if df is not None and not df.empty:
                                 return cls._convert_concept_list_to_dict(df)
                         except:
@@ -52,6 +59,7 @@ class ConceptService:
             raise Exception(f'Failed to get concept summary: {str(e)}')
     
     @classmethod
+    @timed('transform.concept_sectors')
     def _dataframe_to_dict_list(cls, df: pd.DataFrame) -> List[Dict]:
         """将DataFrame转换为字典列表（类似行业板块格式）"""
         result = []
@@ -74,6 +82,7 @@ class ConceptService:
         return result
     
     @classmethod
+    @timed('transform.concept_fund_flow')
     def _convert_fund_flow_to_dict(cls, df: pd.DataFrame) -> List[Dict]:
         """
         将概念资金流DataFrame转换为字典列表（主要方法）
@@ -110,6 +119,7 @@ class ConceptService:
         return result
     
     @classmethod
+    @timed('transform.concept_list')
     def _convert_concept_list_to_dict(cls, df: pd.DataFrame) -> List[Dict]:
         """将概念板块列表DataFrame转换为字典列表（备用方法）"""
         result = []
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变化检测写入服务
+
+同一交易日内多次保存板块、涨停池、指数数据时，大部分行与上次保存的完全相同。
+原来每次都删除当天全部数据再重新插入，现在按自然键对比每行的内容摘要（row_hash 列），
+只对新增、变化和消失的行执行 INSERT/UPDATE/DELETE，未变化的行不写入。
+新增和更新的行的 updated_at 为写入时间，读取缓存（如板块轮动矩阵）用它判断哪些日期需要重新加载。
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from utils.metrics import stage
+
+# 不参与内容摘要的列（updated_at 由 onupdate 在 UPDATE 时写入数据库当前时间）
+EXCLUDED_COLUMNS = ('id', 'created_at', 'updated_at', 'row_hash')
+
+
+def _normalize(value):
+    """把单元格的值转换为稳定的字符串表示（numpy 标量转为 Python 类型）"""
+    if value is None:
+        return None
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return repr(float(value))
+    return str(value)
+
+
+def row_digest(record, columns: Sequence[str]) -> str:
+    """计算一行的内容摘要（16 位十六进制）"""
+    payload = repr([_normalize(getattr(record, column)) for column in columns])
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+@dataclass
+class DiffResult:
+    """变化检测写入的结果"""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    # 自然键重复时无法逐行对比，整体删除后重新插入
+    replaced: bool = False
+    
+    @property
+    def changed(self) -> int:
+        """实际写入的行数"""
+        return self.inserted + self.updated + self.deleted
+    
+    @property
+    def total(self) -> int:
+        """写入后范围内的行数（即本次保存的数据条数）"""
+        return self.inserted + self.updated + self.unchanged
+    
+    def summary(self) -> str:
+        """用于日志输出的统计"""
+        if self.replaced:
+            return f"整体重写 {self.inserted} 条（删除 {self.deleted} 条）"
+        return f"新增 {self.inserted} 条，更新 {self.updated} 条，删除 {self.deleted} 条，未变化 {self.unchanged} 条"
+    
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'unchanged': self.unchanged,
+            'changed': self.changed,
+            'total': self.total,
+            'replaced': self.replaced,
+        }
+
+
+class DiffWriteService:
+    """变化检测写入服务"""
+    
+    @staticmethod
+    def value_columns(model, scope: Dict) -> List[str]:
+        """参与内容摘要的列（范围列的值在同一范围内都相同，不参与）"""
+        return [
+            column.name for column in model.__table__.columns
+            if column.name not in EXCLUDED_COLUMNS and column.name not in scope
+        ]
+    
+    @staticmethod
+    def sync(db: Session, model, scope: Dict, records: List, key_columns: Tuple[str, ...]) -> DiffResult:
+        """
+        用 records 替换 scope 范围内的数据，只写入有变化的行（不提交，由调用方在同一事务中提交）
+        
+        旧数据没有 row_hash（添加该列之前保存的）时视为有变化，第一次保存时全部更新一次。
+        
+        Args:
+            db: 数据库会话
+            model: 历史表模型（需要有 row_hash 列）
+            scope: 范围列 -> 值，如 {'date': data_date, 'sector_type': 'industry'}
+            records: 该范围的全部新数据（模型实例，已转换维度ID）
+            key_columns: 自然键列，如 ('code',)
+        
+        Returns:
+            DiffResult
+        """
+        table_name = model.__tablename__
+        columns = DiffWriteService.value_columns(model, scope)
+        scope_filters = [getattr(model, column) == value for column, value in scope.items()]
+        result = DiffResult()
+        
+        with stage(f'db.diff.{table_name}') as timer:
+            for record in records:
+                for column, value in scope.items():
+                    setattr(record, column, value)
+                record.row_hash = row_digest(record, columns)
+            
+            # 只读取ID、自然键和摘要，不加载整行
+            existing_rows = db.query(
+                model.id, model.row_hash, *[getattr(model, column) for column in key_columns]
+            ).filter(*scope_filters).all()
+            existing = {tuple(row[2:]): (row[0], row[1]) for row in existing_rows}
+            incoming = {tuple(getattr(record, column) for column in key_columns): record for record in records}
+            
+            if len(existing) < len(existing_rows) or len(incoming) < len(records):
+                # 自然键重复（旧数据或接口返回重复行），整体删除后重新插入
+                result.deleted = db.query(model).filter(*scope_filters).delete(synchronize_session=False)
+                db.add_all(records)
+                result.inserted = len(records)
+                result.replaced = True
+                timer.rows = result.changed
+                return result
+            
+            inserts, updates = [], []
+            for key, record in incoming.items():
+                if key not in existing:
+                    inserts.append(record)
+                    continue
+                row_id, row_hash = existing.pop(key)
+                if row_hash == record.row_hash:
+                    result.unchanged += 1
+                    continue
+                values = {column: getattr(record, column) for column in columns}
+                values.update(id=row_id, row_hash=record.row_hash)
+                updates.append(values)
+            delete_ids = [row_id for row_id, _ in existing.values()]
+            
+            if delete_ids:
+                db.query(model).filter(model.id.in_(delete_ids)).delete(synchronize_session=False)
+            if updates:
+                # 按主键批量更新
+                db.execute(update(model), updates)
+            if inserts:
+                db.add_all(inserts)
+            
+            result.inserted, result.updated, result.deleted = len(inserts), len(updates), len(delete_ids)
+            timer.rows = result.changed
+        return result
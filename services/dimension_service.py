@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+名称维度编码服务
+
+写入历史表前把名称列转换为维度ID（字典编码），名称列留空；
+读取时由模型的 to_dict 通过 DimensionCache 还原名称。
+旧数据仍保存名称字符串，可通过 encode_existing_rows 迁移。
+"""
+from typing import Dict, List, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from models.dimension import DimensionCache
+from models.sector_history import SectorHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.index_history import IndexHistory
+from models.stock_fund_flow_history import StockFundFlowHistory
+
+# 历史表模型 -> [(名称列, ID列, 维度)]
+ENCODED_COLUMNS: Dict[type, List[Tuple[str, str, str]]] = {
+    SectorHistory: [('name', 'sector_id', 'sector'), ('leading_stock', 'leading_stock_id', 'stock')],
+    ZtPoolHistory: [('name', 'stock_id', 'stock'), ('industry', 'industry_id', 'sector')],
+    IndexHistory: [('name', 'index_id', 'index')],
+    StockFundFlowHistory: [('stock_name', 'stock_id', 'stock')],
+}
+
+
+class DimensionService:
+    """名称维度编码服务"""
+    
+    @staticmethod
+    def encode_records(db: Session, records: list) -> list:
+        """
+        把历史记录对象的名称列转换为维度ID（原地修改，名称列置空）
+        
+        Args:
+            records: 同一模型的记录对象列表（未在 ENCODED_COLUMNS 中的模型原样返回）
+        """
+        if not records:
+            return records
+        columns = ENCODED_COLUMNS.get(type(records[0]), [])
+        for name_attr, id_attr, kind in columns:
+            ids = DimensionCache.resolve_ids(db, kind, (getattr(record, name_attr) for record in records))
+            for record in records:
+                name = getattr(record, name_attr)
+                if name:
+                    setattr(record, id_attr, ids[str(name)])
+                    setattr(record, name_attr, None)
+        return records
+    
+    @staticmethod
+    def encode_existing_rows(db: Session, model: type, batch_size: int = 5000) -> int:
+        """
+        把已有数据的名称列迁移为维度ID（按批提交）
+        
+        Returns:
+            迁移的行数
+        """
+        columns = ENCODED_COLUMNS[model]
+        name_columns = [getattr(model, name_attr) for name_attr, _, _ in columns]
+        total = 0
+        last_id = 0
+        while True:
+            rows = db.query(model).filter(
+                model.id > last_id,
+                or_(*[column.isnot(None) for column in name_columns])
+            ).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            DimensionService.encode_records(db, rows)
+            db.commit()
+            total += len(rows)
+            last_id = rows[-1].id
+            print(f"✅ {model.__tablename__}: 已迁移 {total} 行")
+        return total
@@ -5,12 +5,15 @@ from datetime import date, time as dt_time
 from models.dt_pool_history import DtgcPoolHistory
 from services.dtgc_service import DtgcService
 from utils.time_utils import get_data_date
+from utils.metrics import timed
+from services.market_summary_service import MarketSummaryService
 
 class DtgcPoolHistoryService:
     """跌停股票池历史数据服务"""
     
     @staticmethod
-    def save_today_dtgc_pool(db: Session, target_date: Optional[date] = None) -> int:
+    @timed('db.save_dtgc_pool')
+    def save_today_dtgc_pool(db: Session, target_date: Optional[date] = None, refresh_summary: bool = True) -> int:
         """
         保存跌停股票池数据（自动判断日期）
         - 如果在交易时间内，使用当前日期
@@ -22,6 +25,7 @@ class DtgcPoolHistoryService:
         
         Args:
             target_date: 可选，指定保存的日期。如果为None，则自动判断日期
+            refresh_summary: 保存后更新该日期的每日市场概况（一次保存多个数据集时传 False，最后统一更新）
         """
         from utils.time_utils import get_utc8_date
         
@@ -53,7 +57,19 @@ class DtgcPoolHistoryService:
             stocks = DtgcService.get_dtgc_pool()
         
         # 保存到数据库
-        saved_count = 0
+        records = DtgcPoolHistoryService.build_records(stocks, data_date)
+        db.add_all(records)
+        saved_count = len(records)
+        
+        db.commit()
+        if refresh_summary:
+            MarketSummaryService.refresh_after_save(db, data_date)
+        return saved_count
+    
+    @staticmethod
+    def build_records(stocks: List[Dict], data_date: date) -> List[DtgcPoolHistory]:
+        """把 DtgcService.get_dtgc_pool 返回的股票列表转换为历史记录对象"""
+        records = []
         for stock in stocks:
             # 解析时间字符串（格式：HH:MM:SS 或 HH:MM）
             last_sealing_time = None
@@ -89,11 +105,8 @@ class DtgcPoolHistoryService:
                 open_count=stock.get('openCount', 0),
                 industry=stock.get('industry'),
             )
-            db.add(history)
-            saved_count += 1
-        
-        db.commit()
-        return saved_count
+            records.append(history)
+        return records
     
     @staticmethod
     def get_dtgc_pool_by_date(db: Session, target_date: date) -> List[Dict]:
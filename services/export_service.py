@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史数据范围导出服务
+
+按日期范围导出整张历史表（供批量消费方使用），支持列投影和按列值过滤：
+查询使用服务端游标（stream_results + yield_per）按块读取，
+每块交给 utils.columnar 的流式编码器编码为 NDJSON / Arrow IPC 流 / Parquet，
+内存占用与块大小相关、与导出的总行数无关。
+
+字典编码的名称列（见 services.dimension_service.ENCODED_COLUMNS）导出时还原为名称，
+按名称过滤时同时匹配旧数据的名称列和新数据的维度ID列。
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import pyarrow as pa
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Time, or_, select
+from sqlalchemy.sql import Select
+from database.db import SessionLocal
+from models.dimension import DimensionCache
+from models.sector_history import SectorHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.dt_pool_history import DtgcPoolHistory
+from models.index_history import IndexHistory
+from models.stock_fund_flow_history import StockFundFlowHistory
+from models.market_daily_summary import MarketDailySummary
+from services.dimension_service import ENCODED_COLUMNS
+from utils.metrics import stage
+
+# 可导出的表（都有 date 列）
+EXPORT_TABLES: Dict[str, type] = {
+    model.__tablename__: model
+    for model in (
+        SectorHistory, ZtPoolHistory, ZbgcPoolHistory, DtgcPoolHistory,
+        IndexHistory, StockFundFlowHistory, MarketDailySummary,
+    )
+}
+
+# 每块的默认行数和最大行数
+DEFAULT_CHUNK_SIZE = 5000
+MAX_CHUNK_SIZE = 50000
+
+# 每个过滤条件最多的取值数
+MAX_FILTER_VALUES = 1000
+
+
+def _arrow_type(column) -> pa.DataType:
+    """SQLAlchemy 列类型 -> Arrow 类型"""
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, Time):
+        return pa.time64('us')
+    return pa.string()
+
+
+@dataclass
+class ExportPlan:
+    """校验后的导出请求"""
+    table: str
+    columns: List[str]
+    statement: Select
+    schema: pa.Schema
+    # 需要还原名称的列：[(名称列, ID列, 维度)]
+    decoded: List[Tuple[str, str, str]]
+    # 只为还原名称而查询、不输出的ID列
+    hidden: List[str]
+
+
+class ExportService:
+    """历史数据范围导出服务"""
+    
+    @staticmethod
+    def get_columns(table: str) -> List[str]:
+        """可导出的列（数据库列名）"""
+        return list(ExportService._get_model(table).__table__.columns.keys())
+    
+    @staticmethod
+    def _get_model(table: str) -> type:
+        model = EXPORT_TABLES.get(table)
+        if model is None:
+            raise ValueError(f"不支持导出的表: {table}，可选: {', '.join(EXPORT_TABLES)}")
+        return model
+    
+    @staticmethod
+    def prepare(
+        table: str,
+        columns: Optional[Sequence[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        filters: Optional[Dict[str, Sequence[str]]] = None
+    ) -> ExportPlan:
+        """
+        校验导出参数并构建查询（在开始流式输出前调用，参数错误时抛出 ValueError）
+        
+        Args:
+            table: 表名（见 EXPORT_TABLES）
+            columns: 导出的列（数据库列名），默认全部
+            start_date: 开始日期（包含）
+            end_date: 结束日期（包含）
+            filters: {列名: [取值, ...]}，同一列的多个取值为 IN，不同列之间为 AND
+        """
+        model = ExportService._get_model(table)
+        table_columns = model.__table__.columns
+        columns = list(dict.fromkeys(columns or table_columns.keys()))
+        unknown = [name for name in list(columns) + list(filters or {}) if name not in table_columns]
+        if unknown:
+            raise ValueError(f"未知的列: {', '.join(unknown)}，可选: {', '.join(table_columns.keys())}")
+        if start_date and end_date and start_date > end_date:
+            raise ValueError('开始日期不能晚于结束日期')
+        
+        # 字典编码的名称列：同时查询ID列用于还原名称
+        decoded = [spec for spec in ENCODED_COLUMNS.get(model, []) if spec[0] in columns]
+        hidden = [id_column for _, id_column, _ in decoded if id_column not in columns]
+        
+        statement = select(*[table_columns[name] for name in columns + hidden])
+        if start_date:
+            statement = statement.where(table_columns['date'] >= start_date)
+        if end_date:
+            statement = statement.where(table_columns['date'] <= end_date)
+        
+        encoded = {name_column: (id_column, kind) for name_column, id_column, kind in ENCODED_COLUMNS.get(model, [])}
+        for name, values in (filters or {}).items():
+            values = [value for value in values if value != '']
+            if not values:
+                continue
+            if len(values) > MAX_FILTER_VALUES:
+                raise ValueError(f'过滤条件 {name} 的取值过多（最多 {MAX_FILTER_VALUES} 个）')
+            column = table_columns[name]
+            values = [ExportService._convert_value(column, value) for value in values]
+            if name in encoded:
+                id_column, kind = encoded[name]
+                dim_model = DimensionCache.MODELS[kind]
+                statement = statement.where(or_(
+                    column.in_(values),
+                    table_columns[id_column].in_(select(dim_model.id).where(dim_model.name.in_(values)))
+                ))
+            else:
+                statement = statement.where(column.in_(values))
+        
+        statement = statement.order_by(table_columns['date'], table_columns['id'])
+        schema = pa.schema([(name, _arrow_type(table_columns[name])) for name in columns])
+        return ExportPlan(table, columns, statement, schema, decoded, hidden)
+    
+    @staticmethod
+    def _convert_value(column, value: str):
+        """把过滤条件的字符串取值转换为列类型"""
+        column_type = column.type
+        try:
+            if isinstance(column_type, Boolean):
+                return value.lower() in ('1', 'true', 'yes')
+            if isinstance(column_type, Integer):
+                return int(value)
+            if isinstance(column_type, Float):
+                return float(value)
+            if isinstance(column_type, Date) and not isinstance(column_type, DateTime):
+                return date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f'过滤条件 {column.name} 的取值无效: {value}')
+        return value
+    
+    @staticmethod
+    def iter_chunks(plan: ExportPlan, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        """
+        使用服务端游标按块读取导出数据（独立的数据库会话，读取完毕或中断时关闭）
+        
+        Yields:
+            每块的行式记录列表 [{列名: 值}]
+        """
+        chunk_size = max(1, min(int(chunk_size), MAX_CHUNK_SIZE))
+        db = SessionLocal()
+        try:
+            result = db.execute(plan.statement.execution_options(stream_results=True, yield_per=chunk_size))
+            partitions = result.mappings().partitions(chunk_size)
+            while True:
+                with stage(f'db.export.{plan.table}') as timer:
+                    rows = next(partitions, None)
+                    timer.rows = len(rows) if rows else 0
+                if not rows:
+                    break
+                yield ExportService._decode_rows(plan, rows)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _decode_rows(plan: ExportPlan, rows) -> List[Dict]:
+        records = [dict(row) for row in rows]
+        for name_column, id_column, kind in plan.decoded:
+            for record in records:
+                if record[name_column] is None:
+                    record[name_column] = DimensionCache.name(kind, record[id_column])
+        for id_column in plan.hidden:
+            for record in records:
+                record.pop(id_column, None)
+        return records
@@ -5,12 +5,17 @@ from datetime import date
 from models.index_history import IndexHistory
 from services.stock_index_service import StockIndexService
 from utils.time_utils import get_data_date
+from utils.metrics import timed
+from services.dimension_service import DimensionService
+from services.diff_write_service import DiffWriteService, DiffResult
+from services.market_summary_service import MarketSummaryService
 
 class IndexHistoryService:
     """指数历史数据服务"""
     
     @staticmethod
-    def save_today_indices(db: Session, target_date: Optional[date] = None) -> int:
+    @timed('db.save_indices', rows=lambda result: result.total)
+    def save_today_indices(db: Session, target_date: Optional[date] = None, refresh_summary: bool = True) -> DiffResult:
         """
         保存指数数据（自动判断日期）
         - 如果在交易时间内，使用当前日期
@@ -22,6 +27,10 @@ class IndexHistoryService:
         
         Args:
             target_date: 可选，指定保存的日期。如果为None，则自动判断日期
+            refresh_summary: 保存后更新该日期的每日市场概况（一次保存多个数据集时传 False，最后统一更新）
+        
+        Returns:
+            DiffResult：total 为保存的指数数，changed 为实际写入（新增、更新、删除）的行数
         """
         from utils.time_utils import get_utc8_date
         
@@ -38,66 +47,15 @@ class IndexHistoryService:
             print(f"⚠️  保存的数据将是 {today} 的实时数据，但日期标记为 {target_date}。")
             print(f"⚠️  建议：只在交易日当天保存数据，或使用 target_date=None 自动判断日期。")
         
-        # 检查该日期的数据是否已存在
-        existing = db.query(IndexHistory).filter(IndexHistory.date == data_date).first()
-        if existing:
-            # 如果已存在，先删除旧数据
-            db.query(IndexHistory).filter(IndexHistory.date == data_date).delete()
-            db.commit()
-        
-        # 获取当前指数数据（尝试多个数据源）
-        # 注意：API 返回的是实时数据
-        indices = []
-        error_msg = None
-        
-        # 方法1: 优先使用 stock_zh_index_spot_sina（新浪接口）作为主要数据源
-        # 该接口数据更完整，包含所有深证系列指数（564条数据，包含355个深证指数）
-        try:
-            print("🔄 使用 stock_zh_index_spot_sina 接口获取指数数据（主要数据源）...")
-            indices = StockIndexService.get_index_spot_sina()
-            print(f"✅ 使用 stock_zh_index_spot_sina 成功获取 {len(indices)} 条指数数据")
-        except Exception as e:
-            error_msg = str(e)
-            print(f"⚠️ 使用 stock_zh_index_spot_sina 获取指数数据失败: {error_msg}")
-        
-        # 方法2: 如果方法1失败，尝试使用 stock_zh_index_spot_em 作为备用数据源
-        if not indices:
-            try:
-                print("🔄 尝试使用 stock_zh_index_spot_em 接口获取指数数据（备用数据源）...")
-                indices = StockIndexService.get_index_spot()
-                print(f"✅ 使用 stock_zh_index_spot_em 成功获取 {len(indices)} 条指数数据")
-            except Exception as e:
-                error_msg = str(e)
-                print(f"⚠️ 使用 stock_zh_index_spot_em 获取指数数据失败: {error_msg}")
-        
-        # 方法2.5: 如果使用 stock_zh_index_spot_em 成功但缺少深证系列，尝试单独获取深证系列指数
-        if indices:
-            # 检查是否有399开头的指数
-            has_sz_indices = any(str(idx.get('code', '')).startswith('399') for idx in indices)
-            if not has_sz_indices:
-                try:
-                    print("🔄 检测到缺少深证系列指数，尝试单独获取...")
-                    sz_indices = StockIndexService.get_index_spot(symbol="深证系列指数")
-                    if sz_indices:
-                        print(f"✅ 成功获取 {len(sz_indices)} 条深证系列指数数据")
-                        # 合并数据，去重
-                        existing_codes = {str(idx.get('code', '')) for idx in indices}
-                        for sz_idx in sz_indices:
-                            sz_code = str(sz_idx.get('code', ''))
-                            if sz_code not in existing_codes:
-                                indices.append(sz_idx)
-                                existing_codes.add(sz_code)
-                except Exception as e:
-                    print(f"⚠️ 获取深证系列指数失败: {str(e)}")
-        
-        if not indices:
-            raise Exception(f'Failed to get index spot data from all sources. Last error: {error_msg}')
+        # 获取当前指数数据（多数据源对冲，采用最先返回的完整结果）
+        # 注意：API 返回的是实时数据；在删除旧数据之前获取，避免获取失败时数据丢失
+        indices, source = StockIndexService.get_index_spot_hedged()
         
         if not indices:
-            return 0
+            return DiffResult()
         
-        # 保存到数据库
-        saved_count = 0
+        # 保存到数据库（指数名称转换为维度ID）
+        records = []
         for index_data in indices:
             history = IndexHistory(
                 date=data_date,
@@ -115,11 +73,16 @@ class IndexHistoryService:
                 amplitude=index_data.get('amplitude', 0),
                 volume_ratio=index_data.get('volumeRatio', 0),
             )
-            db.add(history)
-            saved_count += 1
+            records.append(history)
+        DimensionService.encode_records(db, records)
+        # 同一天重复保存时只写入有变化的行（在同一事务中提交）
+        result = DiffWriteService.sync(db, IndexHistory, {'date': data_date}, records, ('code',))
         
         db.commit()
-        return saved_count
+        print(f"✅ 保存 {result.total} 条指数数据到数据库 ({data_date}): {result.summary()}")
+        if refresh_summary:
+            MarketSummaryService.refresh_after_save(db, data_date, changed=result.changed > 0)
+        return result
     
     @staticmethod
     def get_indices_by_date(db: Session, target_date: date) -> List[Dict]:
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+盘中快照服务（增量存储）
+
+盘中每隔 N 分钟采样一次板块、概念资金流和涨停股票池，
+只保存相对上一个采样时间点发生变化的实体和字段，
+并支持按时间点重建完整快照，用于盘中板块轮动回放。
+"""
+import json
+import math
+import threading
+from typing import List, Dict, Optional, Callable, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+from datetime import date, time as dt_time
+from models.intraday_snapshot import IntradaySnapshot
+from services.sector_service import SectorService
+from services.concept_service import ConceptService
+from services.zt_pool_service import ZtPoolService
+from utils.time_utils import get_utc8_now
+
+class IntradaySnapshotService:
+    """盘中快照服务"""
+    
+    # 数据集配置：数据集 -> (实体键字段, 数据获取函数)
+    DATASETS: Dict[str, Tuple[str, Callable[[], List[Dict]]]] = {
+        'industry': ('name', SectorService.get_industry_summary),
+        'concept': ('name', ConceptService.get_concept_summary),
+        'zt_pool': ('code', ZtPoolService.get_zt_pool),
+    }
+    
+    # 上一个采样时间点的完整状态缓存：(日期, 数据集) -> {实体键: 行数据}
+    _last_states: Dict[Tuple[date, str], Dict[str, Dict]] = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def capture_tick(
+        cls,
+        db: Session,
+        dataset: str,
+        rows: Optional[List[Dict]] = None,
+        target_date: Optional[date] = None,
+        tick: Optional[dt_time] = None
+    ) -> int:
+        """
+        采样一次并保存增量
+        
+        Args:
+            db: 数据库会话
+            dataset: 数据集，'industry'、'concept' 或 'zt_pool'
+            rows: 可选，已获取的数据。如果为None，则调用对应接口获取实时数据
+            target_date: 可选，数据日期。如果为None，则使用当前日期（北京时间）
+            tick: 可选，采样时间点。如果为None，则使用当前时间（精确到分钟）
+        
+        Returns:
+            本次写入的增量行数
+        """
+        if dataset not in cls.DATASETS:
+            raise ValueError(f"Invalid dataset: {dataset}. Must be one of {list(cls.DATASETS.keys())}")
+        
+        key_field, fetcher = cls.DATASETS[dataset]
+        now = get_utc8_now()
+        data_date = target_date or now.date()
+        tick = tick or now.time().replace(second=0, microsecond=0)
+        
+        if rows is None:
+            rows = fetcher()
+        
+        current = {}
+        for row in rows or []:
+            entity_key = str(row.get(key_field, ''))
+            if entity_key:
+                current[entity_key] = row
+        
+        if not current:
+            # 接口失败或暂时返回空数据时跳过本次采样，避免把所有实体记为移除
+            print(f"⚠️  {dataset} 盘中快照 {data_date} {tick}: 未获取到数据，跳过本次采样")
+            return 0
+        
+        with cls._lock:
+            previous = cls._last_states.get((data_date, dataset))
+            if previous is None:
+                # 进程重启后，从数据库重建上一个时间点的状态
+                previous = {
+                    str(row[key_field]): row
+                    for row in cls.reconstruct_at(db, data_date, dataset, tick)
+                }
+            
+            records = []
+            for entity_key, row in current.items():
+                old_row = previous.get(entity_key)
+                changed = cls._diff_row(old_row, row)
+                if changed:
+                    records.append(IntradaySnapshot(
+                        date=data_date,
+                        tick=tick,
+                        dataset=dataset,
+                        entity_key=entity_key,
+                        payload=json.dumps(changed, ensure_ascii=False),
+                        is_removed=False,
+                    ))
+            
+            for entity_key in previous.keys() - current.keys():
+                records.append(IntradaySnapshot(
+                    date=data_date,
+                    tick=tick,
+                    dataset=dataset,
+                    entity_key=entity_key,
+                    payload=None,
+                    is_removed=True,
+                ))
+            
+            try:
+                if records:
+                    db.add_all(records)
+                    db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"❌ 保存{dataset}盘中快照失败: {str(e)}")
+                raise
+            
+            # 只保留当天的状态，避免缓存无限增长
+            for cache_key in list(cls._last_states.keys()):
+                if cache_key[0] != data_date:
+                    del cls._last_states[cache_key]
+            cls._last_states[(data_date, dataset)] = current
+        
+        print(f"✅ {dataset} 盘中快照 {data_date} {tick}: {len(current)} 个实体，写入 {len(records)} 条增量")
+        return len(records)
+    
+    @staticmethod
+    def _diff_row(old_row: Optional[Dict], new_row: Dict) -> Dict:
+        """返回新行相对旧行发生变化的字段（旧行为空时返回全部字段）"""
+        if old_row is None:
+            return dict(new_row)
+        return {
+            field: value
+            for field, value in new_row.items()
+            if field not in old_row or not IntradaySnapshotService._same_value(old_row[field], value)
+        }
+    
+    @staticmethod
+    def _same_value(old_value, new_value) -> bool:
+        """判断字段值是否相同（NaN 与 NaN 视为相同，否则缺失值每次采样都会被记为变化）"""
+        if isinstance(old_value, float) and isinstance(new_value, float):
+            if math.isnan(old_value) and math.isnan(new_value):
+                return True
+        return old_value == new_value
+    
+    @staticmethod
+    def reconstruct_at(db: Session, target_date: date, dataset: str, at_tick: dt_time) -> List[Dict]:
+        """
+        重建指定时间点的完整快照（按时间顺序叠加增量）
+        
+        Args:
+            target_date: 日期
+            dataset: 数据集
+            at_tick: 时间点（包含）
+        
+        Returns:
+            该时间点所有实体的完整数据列表
+        """
+        deltas = db.query(
+            IntradaySnapshot.entity_key,
+            IntradaySnapshot.payload,
+            IntradaySnapshot.is_removed
+        ).filter(
+            and_(
+                IntradaySnapshot.date == target_date,
+                IntradaySnapshot.dataset == dataset,
+                IntradaySnapshot.tick <= at_tick
+            )
+        ).order_by(IntradaySnapshot.tick, IntradaySnapshot.id).all()
+        
+        state: Dict[str, Dict] = {}
+        for entity_key, payload, is_removed in deltas:
+            if is_removed:
+                state.pop(entity_key, None)
+                continue
+            state.setdefault(entity_key, {}).update(json.loads(payload) if payload else {})
+        
+        return list(state.values())
+    
+    @staticmethod
+    def get_ticks(db: Session, target_date: date, dataset: str) -> List[dt_time]:
+        """获取指定日期和数据集的所有采样时间点"""
+        ticks = db.query(IntradaySnapshot.tick).filter(
+            and_(
+                IntradaySnapshot.date == target_date,
+                IntradaySnapshot.dataset == dataset
+            )
+        ).distinct().order_by(IntradaySnapshot.tick).all()
+        return [t[0] for t in ticks]
+    
+    @staticmethod
+    def get_entity_timeline(db: Session, target_date: date, dataset: str, entity_key: str) -> List[Dict]:
+        """
+        获取单个实体在一天内的完整时间线（每个变化时间点的完整数据）
+        
+        Returns:
+            [{'tick': 'HH:MM:SS', 'removed': bool, 'data': {...}}, ...]
+        """
+        deltas = db.query(IntradaySnapshot).filter(
+            and_(
+                IntradaySnapshot.date == target_date,
+                IntradaySnapshot.dataset == dataset,
+                IntradaySnapshot.entity_key == entity_key
+            )
+        ).order_by(IntradaySnapshot.tick, IntradaySnapshot.id).all()
+        
+        timeline = []
+        state: Dict = {}
+        for delta in deltas:
+            if delta.is_removed:
+                state = {}
+            else:
+                state = {**state, **(json.loads(delta.payload) if delta.payload else {})}
+            timeline.append({
+                'tick': delta.tick.strftime('%H:%M:%S'),
+                'removed': delta.is_removed,
+                'data': dict(state),
+            })
+        return timeline
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务队列服务
+
+页面和接口调用 enqueue 提交任务后立即返回，工作进程（run_job_worker.py）调用 claim 领取任务：
+PostgreSQL 上使用 SELECT ... FOR UPDATE SKIP LOCKED，多个工作进程并发领取时互不等待、不会领到同一个任务；
+领取时持有任务类型的事务级咨询锁，同一类型的任务不会被两个工作进程同时领取。
+任务的执行函数见 tasks/job_worker.py。
+"""
+import json
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.orm import Session
+from database.db import engine
+from models.job_queue import QueueJob
+from utils.time_utils import get_utc8_now
+
+logger = logging.getLogger(__name__)
+
+# 任务类型 -> 任务名称
+JOB_TYPES: Dict[str, str] = {
+    'save_daily_data': '保存板块和股票池数据',
+    'save_realtime_fund_flow': '获取即时资金流数据',
+    'save_all_stocks_fund_flow': '获取所有股票资金流数据（定时任务）',
+    'maintain_partitions': '维护历史表分区',
+    'refresh_concept_membership': '刷新概念成分股',
+    'refresh_stocks_fund_flow': '刷新指定股票资金流',
+    'refresh_all_stocks_fund_flow': '刷新所有股票资金流',
+}
+
+# 未结束的任务状态
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def _now():
+    """当前北京时间（不带时区，与任务表的时间列一致）"""
+    return get_utc8_now().replace(tzinfo=None)
+
+
+def _dumps(value) -> Optional[str]:
+    """序列化为 JSON（日期等类型转为字符串）"""
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class JobQueueService:
+    """后台任务队列服务"""
+    
+    @staticmethod
+    def enqueue(db: Session, job_type: str, params: Optional[Dict] = None, priority: int = 0,
+                enqueued_by: Optional[str] = None, dedupe: bool = True) -> QueueJob:
+        """
+        提交任务
+        
+        Args:
+            db: 数据库会话
+            job_type: 任务类型（JOB_TYPES 之一）
+            params: 任务参数（可 JSON 序列化）
+            priority: 优先级，越大越先执行
+            enqueued_by: 提交来源（page/api/scheduler）
+            dedupe: 已有相同类型和参数的未结束任务时直接返回该任务，不重复提交
+        
+        Returns:
+            任务记录
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"未知的任务类型: {job_type}，可选: {', '.join(JOB_TYPES)}")
+        params_json = _dumps(params or {})
+        
+        if dedupe:
+            existing = db.query(QueueJob).filter(
+                QueueJob.job_type == job_type,
+                QueueJob.params == params_json,
+                QueueJob.status.in_(ACTIVE_STATUSES)
+            ).order_by(QueueJob.id).first()
+            if existing is not None:
+                return existing
+        
+        job = QueueJob(
+            job_type=job_type, params=params_json, status='queued', priority=priority,
+            progress=0.0, attempts=0, enqueued_by=enqueued_by
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        logger.info(f"📥 已提交后台任务 #{job.id}: {JOB_TYPES[job_type]}（来源: {enqueued_by or '-'}）")
+        return job
+    
+    @staticmethod
+    def claim(db: Session, worker: str, job_types: Optional[List[str]] = None) -> Optional[QueueJob]:
+        """
+        领取一个待执行的任务（优先级高、提交早的先领取）
+        
+        同一类型已有任务在执行（或正被其他工作进程领取）时不领取该类型的其他任务，不同类型的任务可以并行执行。
+        
+        Args:
+            db: 数据库会话
+            worker: 工作进程标识
+            job_types: 只领取这些类型的任务，None 表示全部
+        
+        Returns:
+            已标记为 running 的任务，没有可领取的任务时返回 None
+        """
+        running_types = select(QueueJob.job_type).where(QueueJob.status == 'running').scalar_subquery()
+        skipped_types: List[str] = []
+        while True:
+            query = db.query(QueueJob).filter(
+                QueueJob.status == 'queued',
+                QueueJob.job_type.notin_(running_types)
+            )
+            if job_types:
+                query = query.filter(QueueJob.job_type.in_(job_types))
+            if skipped_types:
+                query = query.filter(QueueJob.job_type.notin_(skipped_types))
+            # 其他工作进程已锁定的行直接跳过，不等待
+            job = query.order_by(QueueJob.priority.desc(), QueueJob.id).limit(1).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.rollback()
+                return None
+            # 其他工作进程未提交的领取在上面的子查询中不可见：持有该类型的锁后重新确认没有正在执行的同类型任务
+            if JobQueueService._lock_job_type(db, job.job_type) and not JobQueueService._has_running(db, job.job_type):
+                break
+            skipped_types.append(job.job_type)
+        
+        now = _now()
+        job.status = 'running'
+        job.worker = worker
+        job.attempts = (job.attempts or 0) + 1
+        job.started_at = now
+        job.heartbeat_at = now
+        job.progress = 0.0
+        job.progress_message = None
+        db.commit()
+        db.refresh(job)
+        return job
+    
+    @staticmethod
+    def _lock_job_type(db: Session, job_type: str) -> bool:
+        """
+        获取任务类型的事务级咨询锁（PostgreSQL，事务结束时自动释放）
+        
+        不等待：其他工作进程正在领取同类型任务时返回 False，跳过该类型，避免互相等待造成死锁。
+        其他数据库的写事务本身串行执行，直接返回 True。
+        """
+        if db.get_bind().dialect.name != 'postgresql':
+            return True
+        return bool(db.execute(
+            text('SELECT pg_try_advisory_xact_lock(hashtext(:job_type))'), {'job_type': job_type}
+        ).scalar())
+    
+    @staticmethod
+    def _has_running(db: Session, job_type: str) -> bool:
+        """是否有正在执行的同类型任务"""
+        return db.query(QueueJob.id).filter(
+            QueueJob.job_type == job_type, QueueJob.status == 'running'
+        ).first() is not None
+    
+    @staticmethod
+    def update_progress(job_id: int, progress: float, message: Optional[str] = None):
+        """
+        更新任务进度
+        
+        直接在独立连接上提交，不使用 SessionLocal（线程内共享的会话），执行函数正在使用的会话和事务不受影响。
+        """
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    update(QueueJob)
+                    .where(QueueJob.id == job_id, QueueJob.status == 'running')
+                    .values(
+                        progress=max(0.0, min(float(progress), 1.0)),
+                        progress_message=(message or '')[:500] or None,
+                        heartbeat_at=_now(),
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ 更新任务 #{job_id} 进度失败: {str(e)}")
+    
+    @staticmethod
+    def heartbeat(db: Session, job_ids: List[int]) -> int:
+        """刷新正在执行的任务的心跳时间"""
+        if not job_ids:
+            return 0
+        count = db.query(QueueJob).filter(QueueJob.id.in_(job_ids), QueueJob.status == 'running').update(
+            {QueueJob.heartbeat_at: _now()}, synchronize_session=False
+        )
+        db.commit()
+        return count
+    
+    @staticmethod
+    def finish(db: Session, job_id: int, status: str, result: Optional[Dict] = None,
+               error_message: Optional[str] = None, error_traceback: Optional[str] = None):
+        """记录任务结束（success/failed）"""
+        values = {
+            QueueJob.status: status,
+            QueueJob.result: _dumps(result),
+            QueueJob.error_message: error_message,
+            QueueJob.error_traceback: error_traceback,
+            QueueJob.finished_at: _now(),
+        }
+        if status == 'success':
+            values[QueueJob.progress] = 1.0
+        db.query(QueueJob).filter(QueueJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+    
+    @staticmethod
+    def requeue_stale(db: Session, stale_seconds: int) -> Dict[str, int]:
+        """
+        处理心跳超时的任务（工作进程崩溃或失联）：未超过最多领取次数的重新排队，否则记为失败
+        
+        Returns:
+            {'requeued': 重新排队数, 'failed': 失败数}
+        """
+        cutoff = _now() - timedelta(seconds=stale_seconds)
+        stale = QueueJob.status == 'running', or_(QueueJob.heartbeat_at.is_(None), QueueJob.heartbeat_at < cutoff)
+        requeued = db.query(QueueJob).filter(*stale, QueueJob.attempts < QueueJob.max_attempts).update({
+            QueueJob.status: 'queued',
+            QueueJob.worker: None,
+            QueueJob.progress_message: f"工作进程超过 {stale_seconds} 秒无心跳，重新排队",
+        }, synchronize_session=False)
+        failed = db.query(QueueJob).filter(*stale).update({
+            QueueJob.status: 'failed',
+            QueueJob.error_message: f"工作进程超过 {stale_seconds} 秒无心跳，已达到最多执行次数",
+            QueueJob.finished_at: _now(),
+        }, synchronize_session=False)
+        db.commit()
+        if requeued or failed:
+            logger.warning(f"⚠️ 心跳超时的任务: 重新排队 {requeued} 个，失败 {failed} 个")
+        return {'requeued': requeued, 'failed': failed}
+    
+    @staticmethod
+    def cancel(db: Session, job_id: int) -> bool:
+        """取消尚未开始执行的任务，返回是否取消成功"""
+        count = db.query(QueueJob).filter(QueueJob.id == job_id, QueueJob.status == 'queued').update({
+            QueueJob.status: 'cancelled',
+            QueueJob.finished_at: _now(),
+        }, synchronize_session=False)
+        db.commit()
+        return count == 1
+    
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[QueueJob]:
+        """根据ID获取任务"""
+        return db.query(QueueJob).filter(QueueJob.id == job_id).first()
+    
+    @staticmethod
+    def list_jobs(db: Session, status: Optional[str] = None, job_type: Optional[str] = None,
+                  limit: int = 50) -> List[QueueJob]:
+        """最近提交的任务（按ID降序）"""
+        query = db.query(QueueJob)
+        if status:
+            query = query.filter(QueueJob.status == status)
+        if job_type:
+            query = query.filter(QueueJob.job_type == job_type)
+        return query.order_by(QueueJob.id.desc()).limit(limit).all()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+每日市场概况服务
+
+板块涨跌家数、资金净流入/流出、涨停/炸板/跌停数、连板率和指数涨跌家数在数据库中按日期聚合后
+写入 market_daily_summary（每个交易日一行），页面读取少量汇总行，不再加载整日的明细数据。
+"""
+from datetime import date
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+from models.market_daily_summary import MarketDailySummary
+from models.sector_history import SectorHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.dt_pool_history import DtgcPoolHistory
+from models.index_history import IndexHistory
+from utils.metrics import stage
+
+# 汇总来源的明细表（任一表有数据的日期都会生成概况）
+SOURCE_MODELS = (SectorHistory, ZtPoolHistory, ZbgcPoolHistory, DtgcPoolHistory, IndexHistory)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+class MarketSummaryService:
+    """每日市场概况服务"""
+    
+    @staticmethod
+    def compute_summary(db: Session, target_date: date) -> Dict:
+        """
+        从明细表聚合指定日期的市场概况（不写入）
+        
+        Returns:
+            MarketDailySummary 各统计列的值；该日期没有任何明细数据时返回空字典
+        """
+        values = {}
+        
+        # 板块：按类型聚合涨跌家数和正负资金净流入
+        sector_rows = db.query(
+            SectorHistory.sector_type,
+            func.count(SectorHistory.id),
+            _count_if(SectorHistory.change_percent > 0),
+            _count_if(SectorHistory.change_percent < 0),
+            func.coalesce(func.sum(case((SectorHistory.net_inflow > 0, SectorHistory.net_inflow), else_=0)), 0),
+            func.coalesce(func.sum(case((SectorHistory.net_inflow < 0, SectorHistory.net_inflow), else_=0)), 0),
+        ).filter(SectorHistory.date == target_date).group_by(SectorHistory.sector_type).all()
+        for sector_type, count, up, down, inflow, outflow in sector_rows:
+            if sector_type not in ('industry', 'concept'):
+                continue
+            values.update({
+                f'{sector_type}_count': count,
+                f'{sector_type}_up': int(up),
+                f'{sector_type}_down': int(down),
+                f'{sector_type}_net_inflow': round(float(inflow), 4),
+                f'{sector_type}_net_outflow': round(abs(float(outflow)), 4),
+            })
+        
+        zt_count, continuous_count = db.query(
+            func.count(ZtPoolHistory.id),
+            _count_if(ZtPoolHistory.continuous_boards > 1),
+        ).filter(ZtPoolHistory.date == target_date).one()
+        if zt_count:
+            values.update(zt_count=zt_count, continuous_count=int(continuous_count))
+        
+        for column, model in (('zb_count', ZbgcPoolHistory), ('dt_count', DtgcPoolHistory)):
+            count = db.query(func.count(model.id)).filter(model.date == target_date).scalar()
+            if count:
+                values[column] = count
+        
+        index_count, index_up, index_down = db.query(
+            func.count(IndexHistory.id),
+            _count_if(IndexHistory.change_percent > 0),
+            _count_if(IndexHistory.change_percent < 0),
+        ).filter(IndexHistory.date == target_date).one()
+        if index_count:
+            values.update(index_count=index_count, index_up=int(index_up), index_down=int(index_down))
+        
+        return values
+    
+    @staticmethod
+    def refresh_summary(db: Session, target_date: date, commit: bool = True) -> Optional[MarketDailySummary]:
+        """
+        重新计算并保存指定日期的市场概况（明细写入后调用）
+        
+        Returns:
+            概况记录；该日期没有任何明细数据时删除已有概况并返回 None
+        """
+        with stage('db.market_summary'):
+            values = MarketSummaryService.compute_summary(db, target_date)
+            summary = db.query(MarketDailySummary).filter(MarketDailySummary.date == target_date).first()
+            if not values:
+                if summary is not None:
+                    db.delete(summary)
+                    summary = None
+            else:
+                if summary is None:
+                    summary = MarketDailySummary(date=target_date)
+                    db.add(summary)
+                for column in MarketDailySummary.__table__.columns.keys():
+                    if column not in ('id', 'date', 'updated_at'):
+                        setattr(summary, column, values.get(column, 0))
+            if commit:
+                db.commit()
+        return summary
+    
+    @staticmethod
+    def refresh_after_save(db: Session, target_date: date, changed: bool = True):
+        """
+        明细保存后更新该日期的市场概况（各历史数据服务的保存函数调用）
+        
+        概况是派生数据，更新失败只输出警告，不影响已提交的明细。
+        
+        Args:
+            db: 数据库会话
+            target_date: 保存的日期
+            changed: 明细是否有写入；变化检测写入没有写入任何行且该日期已有概况时跳过
+        """
+        try:
+            if not changed and db.query(MarketDailySummary.id).filter(
+                MarketDailySummary.date == target_date
+            ).first() is not None:
+                return
+            MarketSummaryService.refresh_summary(db, target_date)
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  更新 {target_date} 每日市场概况失败: {str(e)}")
+    
+    @staticmethod
+    def refresh_range(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """
+        重新计算日期范围内所有有明细数据的日期（用于首次生成和数据修复），每个日期提交一次
+        
+        Returns:
+            生成的概况数
+        """
+        dates = set()
+        for model in SOURCE_MODELS:
+            query = db.query(model.date)
+            if start_date:
+                query = query.filter(model.date >= start_date)
+            if end_date:
+                query = query.filter(model.date <= end_date)
+            dates.update(row[0] for row in query.distinct().all())
+        
+        count = 0
+        for target_date in sorted(dates):
+            if MarketSummaryService.refresh_summary(db, target_date) is not None:
+                count += 1
+        return count
+    
+    @staticmethod
+    def get_summary_by_date(db: Session, target_date: date) -> Optional[Dict]:
+        """根据日期获取市场概况"""
+        summary = db.query(MarketDailySummary).filter(MarketDailySummary.date == target_date).first()
+        return summary.to_dict() if summary else None
+    
+    @staticmethod
+    def get_summary_by_date_range(db: Session, start_date: date, end_date: date) -> List[Dict]:
+        """根据日期范围获取市场概况（按日期升序）"""
+        summaries = db.query(MarketDailySummary).filter(
+            and_(
+                MarketDailySummary.date >= start_date,
+                MarketDailySummary.date <= end_date
+            )
+        ).order_by(MarketDailySummary.date).all()
+        
+        return [summary.to_dict() for summary in summaries]
+
+    @staticmethod
+    def get_zt_count_trend(db: Session, start_date: date, end_date: date) -> List[Dict]:
+        """
+        日期范围内每日涨停股票数（按日期升序）
+        
+        优先读取市场概况；没有概况的日期（概况生成之前保存的历史数据）在数据库中按日期统计涨停明细。
+        
+        Returns:
+            [{'date': 'YYYY-MM-DD', 'ztCount': 涨停数}, ...]
+        """
+        counts = {
+            summary['date']: summary['ztCount']
+            for summary in MarketSummaryService.get_summary_by_date_range(db, start_date, end_date)
+        }
+        query = db.query(ZtPoolHistory.date, func.count(ZtPoolHistory.id)).filter(
+            and_(
+                ZtPoolHistory.date >= start_date,
+                ZtPoolHistory.date <= end_date
+            )
+        )
+        summary_dates = [date.fromisoformat(day) for day in counts]
+        if summary_dates:
+            query = query.filter(ZtPoolHistory.date.notin_(summary_dates))
+        for row_date, count in query.group_by(ZtPoolHistory.date).all():
+            counts[row_date.strftime('%Y-%m-%d')] = count
+        
+        return [{'date': day, 'ztCount': counts[day]} for day in sorted(counts)]
+
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史表分区管理服务
+
+PostgreSQL 中把历史表转换为按 date 的月度范围分区表（每月一个分区 <表名>_pYYYYMM，
+另有默认分区 <表名>_pdefault 兜底）：
+- 按日期过滤的查询只扫描相关月份的分区（分区裁剪）
+- 每日删除重写只影响当月分区，不会让一张大表持续膨胀
+- 提前创建未来的月分区；过期数据直接删除整个分区
+
+资金流和指数明细超过保留期限（Config.ROLLUP_HORIZON_MONTHS）后先汇总为周数据
+（history_weekly_rollup），再删除明细。非 PostgreSQL 数据库不支持分区，只执行周汇总和按日期删除。
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import Session
+from config import Config
+from models.history_rollup import HistoryWeeklyRollup
+from models.sector_history import SectorHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.dt_pool_history import DtgcPoolHistory
+from models.index_history import IndexHistory
+from models.stock_fund_flow_history import StockFundFlowHistory
+from utils.metrics import stage
+from utils.time_utils import get_utc8_date
+
+# 按月分区的历史表
+PARTITIONED_TABLES: Dict[str, type] = {
+    model.__tablename__: model
+    for model in (
+        StockFundFlowHistory, IndexHistory, SectorHistory,
+        ZtPoolHistory, ZbgcPoolHistory, DtgcPoolHistory,
+    )
+}
+
+PARTITION_NAME_PATTERN = re.compile(r'_p(\d{6})$')
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    """明细表的周汇总方式"""
+    model: type
+    code_column: str
+    name_column: str
+    name_id_column: str
+    # 价格和涨跌幅列：周收盘价取最后一日价格，周涨跌幅由第一日的前收盘价推算
+    price_column: str
+    change_column: str
+    # 周开盘价取第一日的该列
+    open_column: Optional[str] = None
+    # 汇总列 -> (聚合函数, 明细列)
+    aggregates: Dict[str, tuple] = field(default_factory=dict)
+
+
+# 数据集（明细表名） -> 周汇总方式
+ROLLUPS: Dict[str, RollupSpec] = {
+    'index_history': RollupSpec(
+        IndexHistory, 'code', 'name', 'index_id', 'current_price', 'change_percent',
+        open_column='open',
+        aggregates={
+            'high_price': ('max', 'high'),
+            'low_price': ('min', 'low'),
+            'volume': ('sum', 'volume'),
+            'amount': ('sum', 'amount'),
+        },
+    ),
+    'stock_fund_flow_history': RollupSpec(
+        StockFundFlowHistory, 'stock_code', 'stock_name', 'stock_id', 'latest_price', 'change_percent',
+        aggregates={
+            'high_price': ('max', 'latest_price'),
+            'low_price': ('min', 'latest_price'),
+            'amount': ('sum', 'turnover'),
+            'inflow': ('sum', 'inflow'),
+            'outflow': ('sum', 'outflow'),
+            'net_amount': ('sum', 'net_amount'),
+            'turnover_rate': ('avg', 'turnover_rate'),
+        },
+    ),
+}
+
+
+def month_start(d: date) -> date:
+    """所在月的第一天"""
+    return d.replace(day=1)
+
+
+def add_months(d: date, months: int) -> date:
+    """月份加减（结果为该月第一天）"""
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def week_start(d: date) -> date:
+    """所在周的周一"""
+    return d - timedelta(days=d.weekday())
+
+
+def partition_name(table_name: str, month: date) -> str:
+    """月分区表名：<表名>_pYYYYMM"""
+    return f"{table_name}_p{month.strftime('%Y%m')}"
+
+
+class PartitionService:
+    """历史表分区管理服务"""
+    
+    @staticmethod
+    def is_postgresql(db: Session) -> bool:
+        return db.get_bind().dialect.name == 'postgresql'
+    
+    @staticmethod
+    def is_partitioned(db: Session, table_name: str) -> bool:
+        """表是否已是分区表"""
+        if not PartitionService.is_postgresql(db):
+            return False
+        return db.execute(text("""
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table_name
+        """), {'table_name': table_name}).first() is not None
+    
+    @staticmethod
+    def list_partitions(db: Session, table_name: str) -> List[Dict]:
+        """
+        列出分区表的分区
+        
+        Returns:
+            [{'name', 'month'（默认分区为 None）, 'bound', 'rows'（估计行数）}]，按分区名排序
+        """
+        if not PartitionService.is_postgresql(db):
+            return []
+        rows = db.execute(text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :table_name
+            ORDER BY c.relname
+        """), {'table_name': table_name}).all()
+        partitions = []
+        for name, bound, reltuples in rows:
+            match = PARTITION_NAME_PATTERN.search(name)
+            month = date(int(match.group(1)[:4]), int(match.group(1)[4:]), 1) if match else None
+            partitions.append({'name': name, 'month': month, 'bound': bound, 'rows': max(int(reltuples or 0), 0)})
+        return partitions
+    
+    @staticmethod
+    def _create_partition(db: Session, table_name: str, month: date):
+        db.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {partition_name(table_name, month)}
+            PARTITION OF {table_name}
+            FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')
+        """))
+    
+    @staticmethod
+    def ensure_future_partitions(db: Session, table_name: str, months_ahead: int = None,
+                                 today: Optional[date] = None) -> List[str]:
+        """
+        创建当月及之后 months_ahead 个月的分区（已存在的跳过）
+        
+        Returns:
+            新创建的分区名
+        """
+        if not PartitionService.is_partitioned(db, table_name):
+            return []
+        if months_ahead is None:
+            months_ahead = Config.PARTITION_MONTHS_AHEAD
+        current = month_start(today or get_utc8_date())
+        existing = {item['name'] for item in PartitionService.list_partitions(db, table_name)}
+        
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table_name, month)
+            if name in existing:
+                continue
+            try:
+                PartitionService._create_partition(db, table_name, month)
+                db.commit()
+                created.append(name)
+                print(f"✅ 已创建分区 {name}")
+            except Exception as e:
+                # 默认分区中已有该月数据时无法创建，需要先把数据移出默认分区
+                db.rollback()
+                print(f"⚠️  创建分区 {name} 失败: {e}")
+        return created
+    
+    @staticmethod
+    def convert_to_partitioned(db: Session, table_name: str, months_ahead: int = None,
+                               today: Optional[date] = None) -> bool:
+        """
+        把普通历史表转换为按月分区表（在一个事务中完成，失败时回滚，原表不变）
+        
+        步骤：原表改名为 <表名>_legacy，按原表结构创建分区表（主键改为 (id, date)，
+        分区键必须包含在主键中）和覆盖全部已有日期及未来 months_ahead 个月的分区，
+        复制数据后删除原表。转换期间表被锁定，数据量大时应在收盘后的空闲时间执行。
+        
+        Returns:
+            是否执行了转换（非 PostgreSQL 或已是分区表时返回 False）
+        """
+        if table_name not in PARTITIONED_TABLES:
+            raise ValueError(f"未知的历史表: {table_name}，可选: {', '.join(PARTITIONED_TABLES)}")
+        if not PartitionService.is_postgresql(db):
+            print(f"⚠️  {table_name}: 只有 PostgreSQL 支持分区表，跳过")
+            return False
+        if PartitionService.is_partitioned(db, table_name):
+            print(f"✓ {table_name} 已是分区表")
+            return False
+        if months_ahead is None:
+            months_ahead = Config.PARTITION_MONTHS_AHEAD
+        
+        model = PARTITIONED_TABLES[table_name]
+        legacy = f"{table_name}_legacy"
+        sequence = f"{table_name}_part_id_seq"
+        try:
+            with stage(f'db.partition.convert.{table_name}') as timer:
+                min_date, max_id = db.execute(
+                    text(f"SELECT MIN(date), MAX(id) FROM {table_name}")
+                ).one()
+                
+                # 原表及其索引改名，释放索引名供新表使用
+                db.execute(text(f"ALTER TABLE {table_name} RENAME TO {legacy}"))
+                index_names = db.execute(
+                    text("SELECT indexname FROM pg_indexes WHERE tablename = :table_name"),
+                    {'table_name': legacy}
+                ).scalars().all()
+                for index_name in index_names:
+                    db.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name[:50]}_legacy"'))
+                
+                db.execute(text(f"""
+                    CREATE TABLE {table_name} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING COMMENTS)
+                    PARTITION BY RANGE (date)
+                """))
+                # 新表使用自己的 id 序列（原表的序列随原表删除）
+                db.execute(text(f"CREATE SEQUENCE {sequence} START WITH {(max_id or 0) + 1} OWNED BY {table_name}.id"))
+                db.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN id SET DEFAULT nextval('{sequence}')"))
+                db.execute(text(f"ALTER TABLE {table_name} ADD PRIMARY KEY (id, date)"))
+                for foreign_key in model.__table__.foreign_keys:
+                    db.execute(text(f"""
+                        ALTER TABLE {table_name} ADD FOREIGN KEY ({foreign_key.parent.name})
+                        REFERENCES {foreign_key.column.table.name}({foreign_key.column.name})
+                    """))
+                for index in model.__table__.indexes:
+                    index.create(bind=db.connection())
+                
+                # 分区：已有数据的最早月份到未来 months_ahead 个月，加默认分区
+                current = month_start(today or get_utc8_date())
+                month = month_start(min_date) if min_date else current
+                while month <= add_months(current, months_ahead):
+                    PartitionService._create_partition(db, table_name, month)
+                    month = add_months(month, 1)
+                db.execute(text(f"CREATE TABLE {table_name}_pdefault PARTITION OF {table_name} DEFAULT"))
+                
+                result = db.execute(text(f"INSERT INTO {table_name} SELECT * FROM {legacy}"))
+                timer.rows = result.rowcount
+                db.execute(text(f"DROP TABLE {legacy}"))
+            db.commit()
+            print(f"✅ {table_name} 已转换为按月分区表（{result.rowcount} 行）")
+            return True
+        except Exception:
+            db.rollback()
+            raise
+    
+    @staticmethod
+    def drop_before(db: Session, table_name: str, cutoff: date) -> Dict:
+        """
+        删除 cutoff 之前的明细：整月在 cutoff 之前的分区直接删除，其余（默认分区、非分区表）按日期删除
+        
+        Returns:
+            {'partitions': 删除的分区名列表, 'rows': 按日期删除的行数}
+        """
+        model = PARTITIONED_TABLES[table_name]
+        dropped = []
+        for partition in PartitionService.list_partitions(db, table_name):
+            if partition['month'] and add_months(partition['month'], 1) <= cutoff:
+                db.execute(text(f"DROP TABLE {partition['name']}"))
+                dropped.append(partition['name'])
+        rows = db.query(model).filter(model.date < cutoff).delete(synchronize_session=False)
+        db.commit()
+        if dropped or rows:
+            print(f"🗑️  {table_name}: 删除 {cutoff} 之前的分区 {len(dropped)} 个、明细 {rows} 行")
+        return {'partitions': dropped, 'rows': rows}
+    
+    @staticmethod
+    def rollup_week(db: Session, dataset: str, start: date) -> int:
+        """
+        把一周（start 为周一）的明细汇总为周数据（替换该周已有的汇总），不提交
+        
+        Returns:
+            汇总行数
+        """
+        spec = ROLLUPS[dataset]
+        model = spec.model
+        code = getattr(model, spec.code_column)
+        in_week = and_(model.date >= start, model.date <= start + timedelta(days=6))
+        aggregate_names = list(spec.aggregates)
+        
+        rows = db.query(
+            code,
+            func.max(getattr(model, spec.name_column)),
+            func.max(getattr(model, spec.name_id_column)),
+            func.count(model.id),
+            func.min(model.date),
+            func.max(model.date),
+            *[
+                getattr(func, function)(getattr(model, column))
+                for function, column in spec.aggregates.values()
+            ]
+        ).filter(in_week).group_by(code).all()
+        
+        # 每个代码第一日和最后一日的价格
+        bounds = db.query(
+            code.label('code'),
+            func.min(model.date).label('first_date'),
+            func.max(model.date).label('last_date'),
+        ).filter(in_week).group_by(code).subquery()
+        edge_columns = [getattr(model, spec.price_column), getattr(model, spec.change_column)]
+        if spec.open_column:
+            edge_columns.append(getattr(model, spec.open_column))
+        edges = defaultdict(dict)
+        for row in db.query(code, model.date, *edge_columns).join(
+            bounds, and_(code == bounds.c.code, or_(model.date == bounds.c.first_date, model.date == bounds.c.last_date))
+        ).all():
+            edges[row[0]][row[1]] = row[2:]
+        
+        records = []
+        for row in rows:
+            item_code, name, name_id, days, first_date, last_date = row[:6]
+            first = edges[item_code].get(first_date) or (None, None, None)
+            last = edges[item_code].get(last_date) or (None, None, None)
+            price, change = first[0], first[1]
+            close_price = last[0]
+            change_percent = None
+            if price and close_price and change is not None and change > -100:
+                # 第一日的前收盘价 = 第一日价格 / (1 + 第一日涨跌幅)
+                base = price / (1 + change / 100)
+                change_percent = round((close_price / base - 1) * 100, 4)
+            record = HistoryWeeklyRollup(
+                dataset=dataset,
+                week_start=start,
+                first_date=first_date,
+                last_date=last_date,
+                code=item_code,
+                name=name if name_id is None else None,
+                name_id=name_id,
+                days=days,
+                open_price=first[2] if spec.open_column else None,
+                close_price=close_price,
+                change_percent=change_percent,
+            )
+            for column, value in zip(aggregate_names, row[6:]):
+                setattr(record, column, float(value) if value is not None else None)
+            records.append(record)
+        
+        db.query(HistoryWeeklyRollup).filter(
+            HistoryWeeklyRollup.dataset == dataset,
+            HistoryWeeklyRollup.week_start == start
+        ).delete(synchronize_session=False)
+        db.bulk_save_objects(records)
+        return len(records)
+    
+    @staticmethod
+    def rollup_before(db: Session, dataset: str, cutoff: date) -> List[date]:
+        """
+        汇总 cutoff 之前开始、尚未汇总的周（跨 cutoff 的那一周也按完整一周汇总），每周提交一次
+        
+        Returns:
+            汇总的周（周一日期）
+        """
+        model = ROLLUPS[dataset].model
+        dates = db.query(model.date).filter(model.date < cutoff).distinct().all()
+        rolled = {
+            row[0] for row in db.query(HistoryWeeklyRollup.week_start).filter(
+                HistoryWeeklyRollup.dataset == dataset
+            ).distinct().all()
+        }
+        weeks = sorted({week_start(row[0]) for row in dates} - rolled)
+        for start in weeks:
+            with stage(f'db.rollup.{dataset}') as timer:
+                timer.rows = PartitionService.rollup_week(db, dataset, start)
+                db.commit()
+        if weeks:
+            print(f"✅ {dataset}: 已汇总 {len(weeks)} 周（{weeks[0]} ~ {weeks[-1]}）")
+        return weeks
+    
+    @staticmethod
+    def maintain(db: Session, tables: Optional[Sequence[str]] = None, months_ahead: int = None,
+                 horizon_months: int = None, today: Optional[date] = None) -> Dict[str, Dict]:
+        """
+        分区维护：创建未来分区；明细超过保留期限的数据集先汇总为周数据，再删除过期明细
+        
+        Args:
+            tables: 要维护的表，默认全部历史表
+            months_ahead: 提前创建的月分区数，默认 Config.PARTITION_MONTHS_AHEAD
+            horizon_months: 明细保留月数（保留当月及之前 horizon_months 个月），默认 Config.ROLLUP_HORIZON_MONTHS，0 表示不汇总、不删除
+        
+        Returns:
+            {表名: {'created', 'rolled_up_weeks', 'dropped_partitions', 'deleted_rows'}}
+        """
+        if horizon_months is None:
+            horizon_months = Config.ROLLUP_HORIZON_MONTHS
+        today = today or get_utc8_date()
+        cutoff = add_months(month_start(today), -horizon_months)
+        
+        summary = {}
+        for table_name in tables or PARTITIONED_TABLES:
+            if table_name not in PARTITIONED_TABLES:
+                raise ValueError(f"未知的历史表: {table_name}，可选: {', '.join(PARTITIONED_TABLES)}")
+            item = {'created': [], 'rolled_up_weeks': 0, 'dropped_partitions': [], 'deleted_rows': 0}
+            item['created'] = PartitionService.ensure_future_partitions(db, table_name, months_ahead, today)
+            if horizon_months > 0 and table_name in ROLLUPS:
+                item['rolled_up_weeks'] = len(PartitionService.rollup_before(db, table_name, cutoff))
+                dropped = PartitionService.drop_before(db, table_name, cutoff)
+                item['dropped_partitions'] = dropped['partitions']
+                item['deleted_rows'] = dropped['rows']
+            summary[table_name] = item
+        return summary
+    
+    @staticmethod
+    def get_weekly_rollup(db: Session, dataset: str, start_date: date, end_date: date,
+                          code: Optional[str] = None) -> List[HistoryWeeklyRollup]:
+        """查询周汇总数据（按周、代码排序）"""
+        query = db.query(HistoryWeeklyRollup).filter(
+            HistoryWeeklyRollup.dataset == dataset,
+            HistoryWeeklyRollup.week_start >= week_start(start_date),
+            HistoryWeeklyRollup.week_start <= end_date
+        )
+        if code:
+            query = query.filter(HistoryWeeklyRollup.code == code)
+        return query.order_by(HistoryWeeklyRollup.week_start, HistoryWeeklyRollup.code).all()
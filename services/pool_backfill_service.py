@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票池历史数据回填服务
+
+按交易日历列出日期范围内的交易日，找出缺失的（数据集, 日期）分区，
+在线程池中限速并发获取（东方财富股票池接口支持 date 参数），
+主线程逐个分区批量写入并在 backfill_checkpoint 表中记录进度：
+中断后重新运行会跳过已完成的分区，只处理失败和未处理的分区。
+
+注意：东方财富股票池接口只保留近期的历史数据，过早的日期会返回空数据，记录为 empty。
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Set
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from models.backfill_checkpoint import BackfillCheckpoint
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.dt_pool_history import DtgcPoolHistory
+from services.zt_pool_service import ZtPoolService
+from services.zbgc_service import ZbgcService
+from services.dtgc_service import DtgcService
+from services.zt_pool_history_service import ZtPoolHistoryService
+from services.zbgc_pool_history_service import ZbgcPoolHistoryService
+from services.dtgc_pool_history_service import DtgcPoolHistoryService
+from services.dimension_service import DimensionService
+from services.market_summary_service import MarketSummaryService
+from utils.metrics import stage
+from utils.time_utils import get_trading_days
+
+
+@dataclass(frozen=True)
+class BackfillDataset:
+    """可回填的数据集"""
+    model: type
+    fetch: Callable[[str], List[Dict]]
+    build_records: Callable[[List[Dict], date], list]
+
+
+# 数据集 -> 历史表模型、数据获取函数（参数为日期字符串 YYYYMMDD）、记录转换函数
+DATASETS: Dict[str, BackfillDataset] = {
+    'zt_pool': BackfillDataset(
+        ZtPoolHistory, lambda date_str: ZtPoolService.get_zt_pool(date=date_str), ZtPoolHistoryService.build_records
+    ),
+    'zbgc_pool': BackfillDataset(
+        ZbgcPoolHistory, lambda date_str: ZbgcService.get_zbgc_pool(date=date_str), ZbgcPoolHistoryService.build_records
+    ),
+    'dtgc_pool': BackfillDataset(
+        DtgcPoolHistory, lambda date_str: DtgcService.get_dtgc_pool(date=date_str), DtgcPoolHistoryService.build_records
+    ),
+}
+
+# 已完成的分区状态（重新运行时跳过）
+FINISHED_STATUSES = ('done', 'empty')
+
+
+class RateLimiter:
+    """限制请求速率：相邻两次请求的开始时间至少间隔 1/rate 秒（线程安全）"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class PoolBackfillService:
+    """股票池历史数据回填服务"""
+    
+    @staticmethod
+    def find_missing_partitions(
+        db: Session,
+        dataset: str,
+        trading_days: Sequence[date],
+        retry_empty: bool = False
+    ) -> List[date]:
+        """
+        找出需要回填的日期：历史表中没有数据，且回填进度中未完成的交易日
+        
+        Args:
+            retry_empty: 是否重新获取上次返回空数据（empty）的日期
+        """
+        if not trading_days:
+            return []
+        model = DATASETS[dataset].model
+        start_date, end_date = min(trading_days), max(trading_days)
+        
+        existing: Set[date] = {
+            row[0] for row in db.query(model.date).filter(
+                and_(model.date >= start_date, model.date <= end_date)
+            ).distinct().all()
+        }
+        finished_statuses = ('done',) if retry_empty else FINISHED_STATUSES
+        finished: Set[date] = {
+            row[0] for row in db.query(BackfillCheckpoint.date).filter(
+                BackfillCheckpoint.dataset == dataset,
+                BackfillCheckpoint.date >= start_date,
+                BackfillCheckpoint.date <= end_date,
+                BackfillCheckpoint.status.in_(finished_statuses)
+            ).all()
+        }
+        return [d for d in trading_days if d not in existing and d not in finished]
+    
+    @staticmethod
+    def save_partition(db: Session, dataset: str, target_date: date, stocks: List[Dict]) -> int:
+        """批量写入一个分区（替换该日期的旧数据）并记录进度，在同一事务中提交"""
+        spec = DATASETS[dataset]
+        with stage(f'db.backfill.{dataset}') as timer:
+            records = DimensionService.encode_records(db, spec.build_records(stocks, target_date))
+            db.query(spec.model).filter(spec.model.date == target_date).delete(synchronize_session=False)
+            db.bulk_save_objects(records)
+            PoolBackfillService._update_checkpoint(
+                db, dataset, target_date, 'done' if records else 'empty', len(records)
+            )
+            db.commit()
+            timer.rows = len(records)
+        return len(records)
+    
+    @staticmethod
+    def record_failure(db: Session, dataset: str, target_date: date, error_message: str):
+        """记录分区回填失败（下次运行时重试）"""
+        db.rollback()
+        PoolBackfillService._update_checkpoint(db, dataset, target_date, 'failed', 0, error_message)
+        db.commit()
+    
+    @staticmethod
+    def _update_checkpoint(
+        db: Session,
+        dataset: str,
+        target_date: date,
+        status: str,
+        row_count: int,
+        error_message: Optional[str] = None
+    ):
+        checkpoint = db.query(BackfillCheckpoint).filter(
+            BackfillCheckpoint.dataset == dataset,
+            BackfillCheckpoint.date == target_date
+        ).first()
+        if checkpoint is None:
+            checkpoint = BackfillCheckpoint(dataset=dataset, date=target_date, attempts=0)
+            db.add(checkpoint)
+        checkpoint.status = status
+        checkpoint.row_count = row_count
+        checkpoint.attempts = (checkpoint.attempts or 0) + 1
+        checkpoint.error_message = error_message[:2000] if error_message else None
+    
+    @staticmethod
+    def _fetch_with_retry(
+        dataset: str,
+        target_date: date,
+        limiter: RateLimiter,
+        max_retries: int,
+        retry_delay: float
+    ) -> List[Dict]:
+        """限速获取一个分区的数据，失败时指数退避重试"""
+        date_str = target_date.strftime('%Y%m%d')
+        for attempt in range(max_retries):
+            limiter.acquire()
+            try:
+                return DATASETS[dataset].fetch(date_str) or []
+            except Exception:
+                if attempt == max_retries - 1:
+                    raise
+                time.sleep(retry_delay * (2 ** attempt))
+        return []
+    
+    @staticmethod
+    def backfill(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        datasets: Optional[Sequence[str]] = None,
+        workers: int = 4,
+        rate: float = 5.0,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        retry_empty: bool = False,
+        rebuild_ladder: bool = True
+    ) -> Dict:
+        """
+        回填日期范围内缺失的股票池数据
+        
+        Args:
+            db: 数据库会话（只在调用线程中使用）
+            start_date: 开始日期
+            end_date: 结束日期
+            datasets: 要回填的数据集，默认全部（zt_pool/zbgc_pool/dtgc_pool）
+            workers: 并发获取的线程数
+            rate: 每秒最多发起的接口请求数
+            max_retries: 每个分区的最大尝试次数
+            retry_delay: 首次重试前的等待秒数（之后指数增长）
+            retry_empty: 是否重新获取上次返回空数据的日期
+            rebuild_ladder: 回填涨停股票池后是否重建连板梯队
+        
+        Returns:
+            {'trading_days', 'partitions', 'done', 'empty', 'failed', 'rows', 'duration_seconds',
+             'failures': [{'dataset', 'date', 'error'}]}
+        """
+        datasets = list(datasets or DATASETS)
+        unknown = [name for name in datasets if name not in DATASETS]
+        if unknown:
+            raise ValueError(f"未知的数据集: {', '.join(unknown)}，可选: {', '.join(DATASETS)}")
+        
+        started = time.time()
+        trading_days = get_trading_days(start_date, end_date)
+        partitions = [
+            (dataset, target_date)
+            for dataset in datasets
+            for target_date in PoolBackfillService.find_missing_partitions(db, dataset, trading_days, retry_empty)
+        ]
+        summary = {
+            'trading_days': len(trading_days),
+            'partitions': len(partitions),
+            'done': 0,
+            'empty': 0,
+            'failed': 0,
+            'rows': 0,
+            'duration_seconds': 0.0,
+            'failures': [],
+        }
+        print(f"📅 {start_date} ~ {end_date} 共 {len(trading_days)} 个交易日，待回填 {len(partitions)} 个分区")
+        if not partitions:
+            return summary
+        
+        limiter = RateLimiter(rate)
+        zt_dates = []
+        saved_dates = set()
+        with ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix='backfill') as executor:
+            future_to_partition = {
+                executor.submit(
+                    PoolBackfillService._fetch_with_retry, dataset, target_date, limiter, max_retries, retry_delay
+                ): (dataset, target_date)
+                for dataset, target_date in partitions
+            }
+            for finished, future in enumerate(as_completed(future_to_partition), start=1):
+                dataset, target_date = future_to_partition[future]
+                progress = f"[{finished}/{len(partitions)}] {dataset} {target_date}"
+                try:
+                    count = PoolBackfillService.save_partition(db, dataset, target_date, future.result())
+                except Exception as e:
+                    PoolBackfillService.record_failure(db, dataset, target_date, str(e))
+                    summary['failed'] += 1
+                    summary['failures'].append({'dataset': dataset, 'date': target_date, 'error': str(e)})
+                    print(f"❌ {progress}: {str(e)}")
+                    continue
+                
+                summary['rows'] += count
+                saved_dates.add(target_date)
+                if count:
+                    summary['done'] += 1
+                    if dataset == 'zt_pool':
+                        zt_dates.append(target_date)
+                    print(f"✅ {progress}: {count} 条")
+                else:
+                    summary['empty'] += 1
+                    print(f"⚠️  {progress}: 无数据")
+        
+        # 重新计算写入日期的每日市场概况
+        for target_date in sorted(saved_dates):
+            try:
+                MarketSummaryService.refresh_summary(db, target_date)
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️  更新 {target_date} 市场概况失败: {str(e)}")
+        
+        # 连板梯队依赖上一交易日的数据，回填完成后按日期顺序统一重建
+        if rebuild_ladder and zt_dates:
+            try:
+                from services.zt_ladder_service import ZtLadderService
+                ZtLadderService.rebuild_ladder(db, start_date=min(zt_dates), end_date=end_date)
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️  重建连板梯队失败: {str(e)}")
+        
+        summary['duration_seconds'] = round(time.time() - started, 2)
+        return summary
+    
+    @staticmethod
+    def get_progress(db: Session, start_date: date, end_date: date) -> List[Dict]:
+        """按数据集和状态汇总回填进度：[{'dataset', 'status', 'partitions', 'rows'}]"""
+        rows = db.query(
+            BackfillCheckpoint.dataset,
+            BackfillCheckpoint.status,
+            func.count(BackfillCheckpoint.id),
+            func.coalesce(func.sum(BackfillCheckpoint.row_count), 0)
+        ).filter(
+            BackfillCheckpoint.date >= start_date,
+            BackfillCheckpoint.date <= end_date
+        ).group_by(BackfillCheckpoint.dataset, BackfillCheckpoint.status).all()
+        return [
+            {'dataset': dataset, 'status': status, 'partitions': count, 'rows': int(total)}
+            for dataset, status, count, total in rows
+        ]
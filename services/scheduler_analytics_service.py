@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时任务性能分析服务
+
+所有统计都在数据库中聚合（GROUP BY / 窗口函数），只返回聚合后的少量行：
+- 按任务统计执行次数、成功率和耗时分位数（p50/p95/max）
+- 按日期统计每个任务的耗时和各数据集保存条数
+- 与滚动基线（前 N 个执行日的平均耗时）比较，发现耗时退化
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, cast, func, Integer
+from sqlalchemy.orm import Session
+from models.scheduler_execution import SchedulerExecution
+
+# 数据集 -> 保存条数列
+DATASET_COLUMNS = {
+    'industry_sectors': SchedulerExecution.industry_sectors_count,
+    'concept_sectors': SchedulerExecution.concept_sectors_count,
+    'zt_pool': SchedulerExecution.zt_pool_count,
+    'zbgc_pool': SchedulerExecution.zbgc_pool_count,
+    'dtgc_pool': SchedulerExecution.dtgc_pool_count,
+    'indices': SchedulerExecution.index_count,
+}
+
+# 滚动基线默认窗口（执行日数）
+BASELINE_DAYS = 10
+# 当日平均耗时达到基线的该倍数时视为退化
+REGRESSION_RATIO = 1.5
+# 基线至少需要的执行日数
+MIN_BASELINE_DAYS = 3
+
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    return round(float(value), digits) if value is not None else None
+
+
+class SchedulerAnalyticsService:
+    """定时任务性能分析服务"""
+    
+    @staticmethod
+    def _range_filter(start_date: date, end_date: date, job_id: Optional[str] = None):
+        conditions = [
+            SchedulerExecution.execution_date >= start_date,
+            SchedulerExecution.execution_date <= end_date,
+        ]
+        if job_id:
+            conditions.append(SchedulerExecution.job_id == job_id)
+        return and_(*conditions)
+    
+    @staticmethod
+    def _status_count(status: str):
+        return func.sum(case((SchedulerExecution.status == status, 1), else_=0))
+    
+    @staticmethod
+    def _duration_percentiles(db: Session, start_date: date, end_date: date,
+                              job_id: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        按任务计算耗时 p50/p95（只统计成功的执行）
+        
+        PostgreSQL 使用 percentile_cont；其他数据库（如开发环境的 SQLite）用窗口函数按最近秩取值。
+        """
+        duration = SchedulerExecution.duration_seconds
+        condition = and_(
+            SchedulerAnalyticsService._range_filter(start_date, end_date, job_id),
+            SchedulerExecution.status == 'success',
+            duration.isnot(None),
+        )
+        
+        if db.get_bind().dialect.name == 'postgresql':
+            rows = db.query(
+                SchedulerExecution.job_id,
+                func.percentile_cont(0.5).within_group(duration),
+                func.percentile_cont(0.95).within_group(duration),
+            ).filter(condition).group_by(SchedulerExecution.job_id).all()
+        else:
+            ranked = db.query(
+                SchedulerExecution.job_id.label('job_id'),
+                duration.label('duration'),
+                func.row_number().over(
+                    partition_by=SchedulerExecution.job_id, order_by=duration
+                ).label('rn'),
+                func.count().over(partition_by=SchedulerExecution.job_id).label('n'),
+            ).filter(condition).subquery()
+            
+            def nearest_rank(percent: int):
+                # 最近秩：第 ceil(n * p) 个值
+                target = cast((ranked.c.n * percent + 99) / 100, Integer)
+                return func.max(case((ranked.c.rn == target, ranked.c.duration)))
+            
+            rows = db.query(
+                ranked.c.job_id, nearest_rank(50), nearest_rank(95)
+            ).group_by(ranked.c.job_id).all()
+        
+        return {job: {'p50': _round(p50), 'p95': _round(p95)} for job, p50, p95 in rows}
+    
+    @staticmethod
+    def get_job_performance(db: Session, start_date: date, end_date: date,
+                            job_id: Optional[str] = None) -> List[Dict]:
+        """
+        按任务汇总执行情况
+        
+        Returns:
+            每个任务一行：job_id, job_name, total, success, failed, skipped, success_rate,
+            avg_seconds, p50_seconds, p95_seconds, max_seconds, last_execution（按总执行次数降序）
+        """
+        duration = case(
+            (SchedulerExecution.status == 'success', SchedulerExecution.duration_seconds)
+        )
+        rows = db.query(
+            SchedulerExecution.job_id,
+            func.max(SchedulerExecution.job_name),
+            func.count(SchedulerExecution.id),
+            SchedulerAnalyticsService._status_count('success'),
+            SchedulerAnalyticsService._status_count('failed'),
+            SchedulerAnalyticsService._status_count('skipped'),
+            func.avg(duration),
+            func.max(duration),
+            func.max(SchedulerExecution.execution_time),
+        ).filter(
+            SchedulerAnalyticsService._range_filter(start_date, end_date, job_id)
+        ).group_by(SchedulerExecution.job_id).all()
+        
+        percentiles = SchedulerAnalyticsService._duration_percentiles(db, start_date, end_date, job_id)
+        
+        result = []
+        for job, job_name, total, success, failed, skipped, avg_seconds, max_seconds, last_time in rows:
+            success = int(success or 0)
+            # 成功率不计跳过的执行（非交易日）
+            attempted = success + int(failed or 0)
+            result.append({
+                'job_id': job,
+                'job_name': job_name,
+                'total': total,
+                'success': success,
+                'failed': int(failed or 0),
+                'skipped': int(skipped or 0),
+                'success_rate': round(success / attempted * 100, 1) if attempted > 0 else None,
+                'avg_seconds': _round(avg_seconds),
+                'p50_seconds': percentiles.get(job, {}).get('p50'),
+                'p95_seconds': percentiles.get(job, {}).get('p95'),
+                'max_seconds': _round(max_seconds),
+                'last_execution': last_time,
+            })
+        result.sort(key=lambda item: item['total'], reverse=True)
+        return result
+    
+    @staticmethod
+    def _daily_query(db: Session, start_date: date, end_date: date, job_id: Optional[str] = None):
+        """按日期和任务聚合的子查询（成功执行的耗时和各数据集保存条数）"""
+        success = SchedulerExecution.status == 'success'
+        columns = [
+            SchedulerExecution.execution_date.label('execution_date'),
+            SchedulerExecution.job_id.label('job_id'),
+            func.count(SchedulerExecution.id).label('runs'),
+            func.sum(case((success, 1), else_=0)).label('success'),
+            func.sum(case((SchedulerExecution.status == 'failed', 1), else_=0)).label('failed'),
+            func.avg(case((success, SchedulerExecution.duration_seconds))).label('avg_seconds'),
+            func.max(case((success, SchedulerExecution.duration_seconds))).label('max_seconds'),
+        ]
+        columns += [
+            func.coalesce(func.sum(column), 0).label(dataset)
+            for dataset, column in DATASET_COLUMNS.items()
+        ]
+        return db.query(*columns).filter(
+            SchedulerAnalyticsService._range_filter(start_date, end_date, job_id)
+        ).group_by(SchedulerExecution.execution_date, SchedulerExecution.job_id)
+    
+    @staticmethod
+    def get_daily_trend(db: Session, start_date: date, end_date: date, job_id: Optional[str] = None,
+                        baseline_days: int = BASELINE_DAYS,
+                        regression_ratio: float = REGRESSION_RATIO) -> List[Dict]:
+        """
+        按日期统计每个任务的耗时、保存条数和滚动基线
+        
+        基线为该任务前 baseline_days 个执行日中成功执行的日平均耗时的平均值，
+        由窗口函数在数据库中计算；为保证区间开头几天也有基线，会多查询区间之前的数据。
+        
+        Returns:
+            每个任务每天一行（按日期、任务排序）：execution_date, job_id, runs, success, failed,
+            avg_seconds, max_seconds, baseline_seconds, ratio, regression, 以及各数据集的保存条数
+        """
+        # 执行日可能不连续（非交易日跳过），按自然日多取约两倍窗口
+        lookback_start = start_date - timedelta(days=baseline_days * 2 + 7)
+        daily = SchedulerAnalyticsService._daily_query(db, lookback_start, end_date, job_id).subquery()
+        
+        window = dict(
+            partition_by=daily.c.job_id,
+            order_by=daily.c.execution_date,
+            rows=(-baseline_days, -1),
+        )
+        # 只有成功执行的日子参与基线（avg 忽略 NULL）
+        baseline = func.avg(daily.c.avg_seconds).over(**window).label('baseline_seconds')
+        baseline_points = func.count(daily.c.avg_seconds).over(**window).label('baseline_points')
+        
+        with_baseline = db.query(daily, baseline, baseline_points).subquery()
+        rows = db.query(with_baseline).filter(
+            with_baseline.c.execution_date >= start_date
+        ).order_by(with_baseline.c.execution_date, with_baseline.c.job_id).all()
+        
+        result = []
+        for row in rows:
+            item = row._asdict()
+            points = item.pop('baseline_points') or 0
+            avg_seconds = _round(item['avg_seconds'])
+            baseline_seconds = _round(item['baseline_seconds']) if points >= MIN_BASELINE_DAYS else None
+            ratio = round(avg_seconds / baseline_seconds, 2) if avg_seconds and baseline_seconds else None
+            item.update(
+                runs=int(item['runs']),
+                success=int(item['success'] or 0),
+                failed=int(item['failed'] or 0),
+                avg_seconds=avg_seconds,
+                max_seconds=_round(item['max_seconds']),
+                baseline_seconds=baseline_seconds,
+                ratio=ratio,
+                regression=ratio is not None and ratio >= regression_ratio,
+            )
+            for dataset in DATASET_COLUMNS:
+                item[dataset] = int(item[dataset] or 0)
+            result.append(item)
+        return result
+    
+    @staticmethod
+    def detect_regressions(db: Session, start_date: date, end_date: date, job_id: Optional[str] = None,
+                           baseline_days: int = BASELINE_DAYS,
+                           regression_ratio: float = REGRESSION_RATIO) -> List[Dict]:
+        """
+        检测耗时退化：日平均耗时达到滚动基线 regression_ratio 倍的任务日
+        
+        Returns:
+            get_daily_trend 中 regression 为 True 的行（按倍数降序）
+        """
+        trend = SchedulerAnalyticsService.get_daily_trend(
+            db, start_date, end_date, job_id, baseline_days, regression_ratio
+        )
+        regressions = [item for item in trend if item['regression']]
+        regressions.sort(key=lambda item: item['ratio'], reverse=True)
+        return regressions
@@ -3,9 +3,10 @@
 """
 定时任务执行记录服务
 """
+import json
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, func
 from datetime import date, datetime
 from models.scheduler_execution import SchedulerExecution
 
@@ -31,7 +32,8 @@ class SchedulerExecutionService:
         error_message: Optional[str] = None,
         error_traceback: Optional[str] = None,
         is_trading_day: Optional[bool] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        stage_breakdown: Optional[Dict[str, Dict]] = None
     ) -> SchedulerExecution:
         """
         创建执行记录
@@ -54,6 +56,7 @@ class SchedulerExecutionService:
             error_traceback: 错误堆栈
             is_trading_day: 是否为交易日
             notes: 备注信息
+            stage_breakdown: 各阶段耗时（utils.metrics.current_stage_breakdown() 的返回值）
             
         Returns:
             创建的执行记录对象
@@ -74,7 +77,8 @@ class SchedulerExecutionService:
             error_message=error_message,
             error_traceback=error_traceback,
             is_trading_day=is_trading_day,
-            notes=notes
+            notes=notes,
+            stage_breakdown=json.dumps(stage_breakdown, ensure_ascii=False) if stage_breakdown else None
         )
         
         db.add(execution)
@@ -118,16 +122,30 @@ class SchedulerExecutionService:
         ).order_by(desc(SchedulerExecution.execution_time)).all()
     
     @staticmethod
-    def get_execution_statistics(db: Session, start_date: date, end_date: date) -> Dict:
-        """获取执行统计信息"""
-        executions = SchedulerExecutionService.get_executions_by_date_range(
-            db, start_date, end_date
+    def get_execution_statistics(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        job_id: Optional[str] = None
+    ) -> Dict:
+        """获取执行统计信息（在数据库中按状态聚合）"""
+        query = db.query(
+            SchedulerExecution.status,
+            func.count(SchedulerExecution.id)
+        ).filter(
+            and_(
+                SchedulerExecution.execution_date >= start_date,
+                SchedulerExecution.execution_date <= end_date
+            )
         )
+        if job_id:
+            query = query.filter(SchedulerExecution.job_id == job_id)
+        counts = dict(query.group_by(SchedulerExecution.status).all())
         
-        total = len(executions)
-        success = len([e for e in executions if e.status == 'success'])
-        failed = len([e for e in executions if e.status == 'failed'])
-        skipped = len([e for e in executions if e.status == 'skipped'])
+        total = sum(counts.values())
+        success = counts.get('success', 0)
+        failed = counts.get('failed', 0)
+        skipped = counts.get('skipped', 0)
         
         return {
             'total': total,
@@ -136,4 +154,3 @@ class SchedulerExecutionService:
             'skipped': skipped,
             'success_rate': (success / total * 100) if total > 0 else 0,
         }
-
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票和指数搜索服务（输入联想）
+
+每个进程只构建一次搜索索引（utils.search_index.SearchIndex），支持代码、名称、拼音首字母的前缀/子串/模糊匹配：
+- 指数：来自 data/index_base_config.json，配置文件修改时间变化后重新构建
+- 股票：来自最近一个交易日的个股资金流和涨停股票池历史（代码 + 名称），超过 SEARCH_INDEX_TTL_SECONDS 后重新构建
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from config import Config
+from database.db import SessionLocal
+from models.dimension import DimensionCache
+from models.stock_fund_flow_history import StockFundFlowHistory
+from models.zt_pool_history import ZtPoolHistory
+from utils.search_index import SearchIndex
+from utils.metrics import stage
+
+# 可搜索的类型
+KINDS = ('stock', 'index')
+
+
+class SearchService:
+    """股票和指数搜索服务"""
+    
+    # 类型 -> (版本：配置文件修改时间或构建时间, 索引)
+    _indexes: Dict[str, Tuple[float, SearchIndex]] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def get_index_search_index() -> SearchIndex:
+        """指数搜索索引（配置文件修改后重新构建）"""
+        from utils.index_base_config import CONFIG_FILE, load_index_base_config
+        mtime = CONFIG_FILE.stat().st_mtime if CONFIG_FILE.exists() else 0.0
+        cached = SearchService._indexes.get('index')
+        if cached is None or cached[0] != mtime:
+            with SearchService._lock:
+                cached = SearchService._indexes.get('index')
+                if cached is None or cached[0] != mtime:
+                    with stage('search.build.index') as timer:
+                        index = SearchIndex(load_index_base_config())
+                        timer.rows = len(index)
+                    # 配置文件可能在加载时被重新生成，以加载后的修改时间为准
+                    mtime = CONFIG_FILE.stat().st_mtime if CONFIG_FILE.exists() else 0.0
+                    cached = SearchService._indexes['index'] = (mtime, index)
+        return cached[1]
+    
+    @staticmethod
+    def get_stock_search_index() -> SearchIndex:
+        """股票搜索索引（超过 SEARCH_INDEX_TTL_SECONDS 后重新构建）"""
+        cached = SearchService._indexes.get('stock')
+        if cached is None or time.monotonic() - cached[0] > Config.SEARCH_INDEX_TTL_SECONDS:
+            with SearchService._lock:
+                cached = SearchService._indexes.get('stock')
+                if cached is None or time.monotonic() - cached[0] > Config.SEARCH_INDEX_TTL_SECONDS:
+                    with stage('search.build.stock') as timer:
+                        index = SearchIndex(SearchService.load_stocks())
+                        timer.rows = len(index)
+                    cached = SearchService._indexes['stock'] = (time.monotonic(), index)
+        return cached[1]
+    
+    @staticmethod
+    def load_stocks() -> List[Dict[str, str]]:
+        """从最近一个交易日的个股资金流和涨停股票池历史加载股票代码和名称（按代码排序）"""
+        stocks: Dict[str, str] = {}
+        db = SessionLocal()
+        try:
+            # 名称已字典编码的行通过 stock_id 还原
+            for model, code_column, name_column in (
+                (ZtPoolHistory, ZtPoolHistory.code, ZtPoolHistory.name),
+                (StockFundFlowHistory, StockFundFlowHistory.stock_code, StockFundFlowHistory.stock_name),
+            ):
+                latest = db.query(func.max(model.date)).scalar()
+                if latest is None:
+                    continue
+                rows = db.query(code_column, name_column, model.stock_id).filter(model.date == latest).all()
+                for code, name, stock_id in rows:
+                    name = name if name is not None else DimensionCache.name('stock', stock_id)
+                    if code and name:
+                        stocks[code] = name
+        finally:
+            db.close()
+        return [{'code': code, 'name': name} for code, name in sorted(stocks.items())]
+    
+    @staticmethod
+    def invalidate(kind: Optional[str] = None):
+        """使搜索索引失效（下次搜索时重新构建），默认全部"""
+        with SearchService._lock:
+            if kind:
+                SearchService._indexes.pop(kind, None)
+            else:
+                SearchService._indexes.clear()
+    
+    @staticmethod
+    def search(query: str, kind: str = 'all', limit: Optional[int] = 10) -> List[Dict]:
+        """
+        搜索股票和指数
+        
+        Args:
+            query: 代码、名称或拼音首字母（如 000001、平安、payh）
+            kind: stock / index / all
+            limit: 最多返回的条目数，None 表示全部
+        
+        Returns:
+            [{'type', 'code', 'name', 'score', 'match', ...}]，按得分降序
+        """
+        kinds = KINDS if kind == 'all' else (kind,)
+        unknown = [name for name in kinds if name not in KINDS]
+        if unknown:
+            raise ValueError(f"未知的搜索类型: {', '.join(unknown)}，可选: all, {', '.join(KINDS)}")
+        
+        getters = {
+            'stock': SearchService.get_stock_search_index,
+            'index': SearchService.get_index_search_index,
+        }
+        results = []
+        for name in kinds:
+            results.extend({'type': name, **item} for item in getters[name]().search(query, limit))
+        if len(kinds) > 1:
+            results.sort(key=lambda item: (-item['score'], len(item.get('name') or '')))
+            if limit:
+                results = results[:limit]
+        return results
@@ -6,12 +6,18 @@ from models.sector_history import SectorHistory
 from services.sector_service import SectorService
 from services.concept_service import ConceptService
 from utils.time_utils import get_data_date
+from utils.metrics import timed
+from services.dimension_service import DimensionService
+from services.diff_write_service import DiffWriteService, DiffResult
+from services.market_summary_service import MarketSummaryService
 
 class SectorHistoryService:
     """板块历史数据服务（支持行业板块和概念板块）"""
     
     @staticmethod
-    def save_today_sectors(db: Session, sector_type: str = 'industry', target_date: Optional[date] = None) -> int:
+    @timed('db.save_sectors', rows=lambda result: result.total)
+    def save_today_sectors(db: Session, sector_type: str = 'industry', target_date: Optional[date] = None,
+                           refresh_summary: bool = True) -> DiffResult:
         """
         保存板块数据（自动判断日期）
         - 如果在交易时间内，使用当前日期
@@ -21,14 +27,17 @@ class SectorHistoryService:
         注意：AKShare API 只能获取实时数据，无法获取历史数据。
         如果 target_date 不是今天或最近的交易日，保存的将是实时数据，而不是历史数据。
         
-        使用事务和锁机制防止重复数据：
-        1. 先获取数据（避免在删除后获取数据时出现问题）
-        2. 在事务中删除旧数据
-        3. 在事务中保存新数据
+        同一天重复保存时按板块对比行内容摘要，只写入新增、变化和消失的行：
+        1. 先获取数据（避免获取失败时旧数据被删除）
+        2. 在同一事务中执行 INSERT/UPDATE/DELETE 并提交
         
         Args:
             sector_type: 板块类型，'industry'（行业板块）或 'concept'（概念板块）
             target_date: 可选，指定保存的日期。如果为None，则自动判断日期
+            refresh_summary: 保存后更新该日期的每日市场概况（一次保存多个数据集时传 False，最后统一更新）
+        
+        Returns:
+            DiffResult：total 为保存的板块数，changed 为实际写入（新增、更新、删除）的行数
         """
         from utils.time_utils import get_utc8_date, get_data_date
         
@@ -58,26 +67,10 @@ class SectorHistoryService:
             
             if not sectors:
                 print(f"⚠️  警告: {data_date} 没有获取到{sector_type}板块数据")
-                return 0
-            
-            # 在事务中删除旧数据并保存新数据
-            # 检查该日期和类型的数据是否已存在
-            existing_count = db.query(SectorHistory).filter(
-                SectorHistory.date == data_date,
-                SectorHistory.sector_type == sector_type
-            ).count()
-            if existing_count > 0:
-                # 如果已存在，先删除旧数据
-                deleted_count = db.query(SectorHistory).filter(
-                    SectorHistory.date == data_date,
-                    SectorHistory.sector_type == sector_type
-                ).delete()
-                print(f"🗑️  删除 {data_date} 的{sector_type}板块旧数据: {deleted_count} 条")
-                # 立即提交删除操作，确保数据一致性
-                db.commit()
+                return DiffResult()
             
-            # 保存新数据
-            saved_count = 0
+            # 保存新数据（板块名称和领涨股转换为维度ID）
+            records = []
             for sector in sectors:
                 history = SectorHistory(
                     date=data_date,
@@ -95,13 +88,19 @@ class SectorHistoryService:
                     leading_stock_price=sector['leadingStockPrice'],
                     leading_stock_change_percent=sector['leadingStockChangePercent'],
                 )
-                db.add(history)
-                saved_count += 1
+                records.append(history)
+            DimensionService.encode_records(db, records)
+            result = DiffWriteService.sync(
+                db, SectorHistory, {'date': data_date, 'sector_type': sector_type},
+                records, ('sector_id', 'name')
+            )
             
-            # 提交新数据
+            # 在同一事务中提交
             db.commit()
-            print(f"✅ 成功保存 {saved_count} 条{sector_type}板块数据到数据库 ({data_date})")
-            return saved_count
+            print(f"✅ 保存 {result.total} 条{sector_type}板块数据到数据库 ({data_date}): {result.summary()}")
+            if refresh_summary:
+                MarketSummaryService.refresh_after_save(db, data_date, changed=result.changed > 0)
+            return result
             
         except Exception as e:
             db.rollback()
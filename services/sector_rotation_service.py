@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+板块轮动与动量服务
+
+从板块历史表加载 日期×板块 矩阵（按 板块类型 + 回看天数 缓存，
+有新数据写入时只重新查询新增或被覆盖保存的日期并增量扩展），在矩阵上向量化计算
+滚动累计涨幅、排名、排名变化、连续涨跌天数和Z分数。
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import date
+import numpy as np
+from models.sector_history import SectorHistory
+from models.dimension import DimensionCache
+from utils.sector_rotation import SectorMatrix, METRICS, compute_rotation
+
+class SectorRotationService:
+    """板块轮动与动量服务"""
+    
+    # 矩阵缓存：(板块类型, 回看天数) -> SectorMatrix
+    _matrices: Dict[Tuple[str, int], SectorMatrix] = {}
+    # 轮动指标缓存：(板块类型, 回看天数, 滚动窗口) -> (数据版本, 指标矩阵)
+    _rotations: Dict[Tuple[str, int, int], Tuple[tuple, Dict[str, np.ndarray]]] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _query_rows(db: Session, sector_type: str, start_date: Optional[date] = None) -> List[tuple]:
+        """只查询构建矩阵所需的列（板块名称由维度ID在内存中还原）"""
+        query = db.query(
+            SectorHistory.date,
+            SectorHistory.name,
+            SectorHistory.sector_id,
+            SectorHistory.change_percent,
+            SectorHistory.net_inflow,
+            SectorHistory.up_count,
+            SectorHistory.down_count
+        ).filter(SectorHistory.sector_type == sector_type)
+        if start_date:
+            query = query.filter(SectorHistory.date >= start_date)
+        return [
+            (row[0], row[1] if row[1] is not None else DimensionCache.name('sector', row[2])) + tuple(row[3:])
+            for row in query.all()
+        ]
+    
+    @classmethod
+    def get_matrix(cls, db: Session, sector_type: str = 'industry', lookback_days: int = 120) -> SectorMatrix:
+        """
+        获取板块矩阵（带缓存，增量扩展）
+        
+        Args:
+            db: 数据库会话
+            sector_type: 板块类型，'industry'（行业板块）或 'concept'（概念板块）
+            lookback_days: 保留的交易日数
+        
+        Returns:
+            SectorMatrix
+        """
+        if sector_type not in ['industry', 'concept']:
+            raise ValueError(f"Invalid sector_type: {sector_type}. Must be 'industry' or 'concept'")
+        
+        cache_key = (sector_type, lookback_days)
+        with cls._lock:
+            matrix = cls._matrices.get(cache_key)
+            if matrix is None or not matrix.dates:
+                # 首次加载（或缓存为空）：只取最近 lookback_days 个交易日
+                matrix = cls._load_matrix(db, sector_type, lookback_days)
+                cls._matrices[cache_key] = matrix
+                return matrix
+            
+            version = cls._get_version(db, sector_type)
+            if version != matrix.version:
+                # 有数据写入：找出新增、被覆盖保存或被删除的最早日期，从该日期起重新加载
+                date_versions = cls._get_date_versions(db, sector_type, matrix.dates[0])
+                changed_dates = [
+                    d for d in date_versions.keys() | matrix.date_versions.keys()
+                    if date_versions.get(d) != matrix.date_versions.get(d)
+                ]
+                if changed_dates:
+                    reload_from = min(changed_dates)
+                    matrix.drop_last(len(matrix.dates) - bisect_left(matrix.dates, reload_from))
+                    added = matrix.append_rows(cls._query_rows(db, sector_type, start_date=reload_from))
+                    matrix.trim(lookback_days)
+                    print(f"✅ {sector_type}板块矩阵增量刷新：从 {reload_from} 起重新加载 {added} 个交易日")
+                matrix.version = version
+                matrix.date_versions = {d: v for d, v in date_versions.items() if d >= matrix.dates[0]} if matrix.dates else {}
+            return matrix
+    
+    @classmethod
+    def _load_matrix(cls, db: Session, sector_type: str, lookback_days: int) -> SectorMatrix:
+        """从数据库加载最近 lookback_days 个交易日的矩阵"""
+        matrix = SectorMatrix()
+        # 先读取版本再读取数据：版本之后的写入会在下次访问时被发现
+        matrix.version = cls._get_version(db, sector_type)
+        recent_dates = db.query(SectorHistory.date).filter(
+            SectorHistory.sector_type == sector_type
+        ).distinct().order_by(SectorHistory.date.desc()).limit(lookback_days).all()
+        if recent_dates:
+            start_date = recent_dates[-1][0]
+            matrix.date_versions = cls._get_date_versions(db, sector_type, start_date)
+            matrix.append_rows(cls._query_rows(db, sector_type, start_date=start_date))
+        return matrix
+    
+    @staticmethod
+    def _get_version(db: Session, sector_type: str):
+        """
+        板块历史数据版本：(最新日期, 最后写入时间, 行数)
+        
+        同日重复保存只更新有变化的行（created_at 不变，updated_at 更新），只删除行时由行数反映。
+        """
+        return tuple(db.query(
+            func.max(SectorHistory.date),
+            func.max(SectorHistory.updated_at),
+            func.count(SectorHistory.id)
+        ).filter(SectorHistory.sector_type == sector_type).one())
+    
+    @staticmethod
+    def _get_date_versions(db: Session, sector_type: str, start_date: date) -> Dict[date, tuple]:
+        """start_date 及之后各日期的数据版本：日期 -> (行数, 最后写入时间)"""
+        rows = db.query(
+            SectorHistory.date,
+            func.count(SectorHistory.id),
+            func.max(SectorHistory.updated_at)
+        ).filter(
+            SectorHistory.sector_type == sector_type,
+            SectorHistory.date >= start_date
+        ).group_by(SectorHistory.date).all()
+        return {row[0]: (row[1], row[2]) for row in rows}
+    
+    @classmethod
+    def clear_cache(cls):
+        """清空矩阵缓存（历史数据被修改或删除后调用）"""
+        with cls._lock:
+            cls._matrices.clear()
+            cls._rotations.clear()
+    
+    @classmethod
+    def get_metrics(cls, db: Session, sector_type: str = 'industry', window: int = 5, lookback_days: int = 120) -> Tuple[SectorMatrix, Dict[str, np.ndarray]]:
+        """
+        获取板块矩阵及其轮动指标（指标按 板块类型 + 滚动窗口 缓存，数据版本变化时重新计算）
+        """
+        matrix = cls.get_matrix(db, sector_type, lookback_days)
+        cache_key = (sector_type, lookback_days, window)
+        with cls._lock:
+            cached = cls._rotations.get(cache_key)
+            if cached is None or cached[0] != matrix.version:
+                cached = (matrix.version, compute_rotation(matrix, window))
+                cls._rotations[cache_key] = cached
+            return matrix, cached[1]
+    
+    @classmethod
+    def get_rotation_by_date(
+        cls,
+        db: Session,
+        sector_type: str = 'industry',
+        window: int = 5,
+        target_date: Optional[date] = None,
+        lookback_days: int = 120
+    ) -> List[Dict]:
+        """
+        获取指定日期的板块轮动排名
+        
+        Args:
+            db: 数据库会话
+            sector_type: 板块类型
+            window: 滚动窗口（交易日数）
+            target_date: 日期，None 表示矩阵中的最新日期（非交易日取之前最近的交易日）
+            lookback_days: 回看交易日数
+        
+        Returns:
+            [{'name', 'cumReturn', 'rank', 'rankChange', 'streak', 'zscore',
+              'netInflowSum', 'upRatio', 'changePercent'}, ...]（按排名升序）
+        """
+        matrix, metrics = cls.get_metrics(db, sector_type, window, lookback_days)
+        # 取不晚于 target_date 的最近一个交易日
+        row = len(matrix.dates) - 1 if target_date is None else bisect_right(matrix.dates, target_date) - 1
+        if row < 0:
+            return []
+        
+        change = matrix.values['change_percent'][row]
+        # 当日没有数据的板块不参与排名
+        cols = np.flatnonzero(~np.isnan(change))
+        cols = cols[np.argsort(metrics['rank'][row, cols], kind='stable')]
+        
+        def _value(metric: str, col: int, digits: int = 2):
+            value = metrics[metric][row, col]
+            return None if np.isnan(value) else round(float(value), digits)
+        
+        return [
+            {
+                'name': matrix.names[col],
+                'cumReturn': _value('cum_return', col),
+                'rank': int(metrics['rank'][row, col]),
+                'rankChange': None if np.isnan(metrics['rank_change'][row, col]) else int(metrics['rank_change'][row, col]),
+                'streak': int(metrics['streak'][row, col]),
+                'zscore': _value('zscore', col),
+                'netInflowSum': _value('net_inflow_sum', col),
+                'upRatio': _value('up_ratio', col, 4),
+                'changePercent': round(float(change[col]), 2),
+            }
+            for col in cols
+        ]
+    
+    @classmethod
+    def get_rank_history(
+        cls,
+        db: Session,
+        names: List[str],
+        sector_type: str = 'industry',
+        window: int = 5,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        lookback_days: int = 120
+    ) -> List[Dict]:
+        """
+        获取指定板块在日期范围内的排名走势
+        
+        Returns:
+            [{'date', 'name', 'rank', 'cumReturn'}, ...]（按日期升序）
+        """
+        matrix, metrics = cls.get_metrics(db, sector_type, window, lookback_days)
+        cols = [matrix.name_index[name] for name in names if name in matrix.name_index]
+        if not matrix.dates or not cols:
+            return []
+        
+        history = []
+        for row, row_date in enumerate(matrix.dates):
+            if (start_date and row_date < start_date) or (end_date and row_date > end_date):
+                continue
+            for col in cols:
+                rank = metrics['rank'][row, col]
+                if np.isnan(rank):
+                    continue
+                history.append({
+                    'date': row_date.strftime('%Y-%m-%d'),
+                    'name': matrix.names[col],
+                    'rank': int(rank),
+                    'cumReturn': round(float(metrics['cum_return'][row, col]), 2),
+                })
+        return history
+    
+    @classmethod
+    def get_metric_matrix(
+        cls,
+        db: Session,
+        sector_type: str = 'industry',
+        metric: str = 'change_percent',
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        lookback_days: int = 120
+    ) -> Tuple[np.ndarray, List[str], List[date]]:
+        """
+        获取日期范围内某个指标的 板块×日期 矩阵（用于热力图，直接切片缓存矩阵）
+        
+        Returns:
+            (values, names, dates)，values.shape == (len(names), len(dates))，
+            只包含范围内至少有一条数据的板块
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Invalid metric: {metric}. Must be one of {METRICS}")
+        
+        matrix = cls.get_matrix(db, sector_type, lookback_days)
+        lo = bisect_left(matrix.dates, start_date) if start_date else 0
+        hi = bisect_right(matrix.dates, end_date) if end_date else len(matrix.dates)
+        values = matrix.values[metric][lo:hi].T
+        cols = np.flatnonzero(~np.isnan(values).all(axis=1)) if values.size else np.array([], dtype=int)
+        return (
+            values[cols].astype(np.float32),
+            [matrix.names[i] for i in cols],
+            matrix.dates[lo:hi],
+        )
+
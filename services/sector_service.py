@@ -2,6 +2,7 @@ import akshare as ak
 from typing import List, Dict, Optional
 import pandas as pd
 import time as time_module
+from utils.metrics import stage, timed
 # 注意：Config 类在此文件中未使用，但保留导入以防将来需要
 # from config import Config
 
@@ -19,7 +20,9 @@ class SectorService:
         
         for retry in range(max_retries):
             try:
-                df = ak.stock_board_industry_summary_ths()
+                with stage('fetch.stock_board_industry_summary_ths') as timer:
+                    df = ak.stock_board_industry_summary_ths()
+                    timer.rows = len(df) if df is not None else 0
                 
                 # 检查返回结果
                 if df is None:
@@ -76,6 +79,7 @@ class SectorService:
         raise Exception('Failed to get industry summary: All retries exhausted')
     
     @classmethod
+    @timed('transform.industry_sectors')
     def _dataframe_to_dict_list(cls, df: pd.DataFrame) -> List[Dict]:
         """将DataFrame转换为字典列表"""
         result = []
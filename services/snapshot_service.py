@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日期快照服务
+
+一次获取某个日期的全部历史数据集（行业/概念板块、涨停/炸板/跌停股票池、指数、市场概况），
+各数据集在线程池中并发查询，每个线程使用独立的数据库会话。
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+from database.db import SessionLocal
+from services.sector_history_service import SectorHistoryService
+from services.zt_pool_history_service import ZtPoolHistoryService
+from services.zbgc_pool_history_service import ZbgcPoolHistoryService
+from services.dtgc_pool_history_service import DtgcPoolHistoryService
+from services.index_history_service import IndexHistoryService
+from services.market_summary_service import MarketSummaryService
+from utils.metrics import stage
+
+
+def _market_summary(db: Session, target_date: date) -> List[Dict]:
+    summary = MarketSummaryService.get_summary_by_date(db, target_date)
+    return [summary] if summary else []
+
+
+# 数据集 -> 查询函数（参数为会话和日期，返回行式记录列表）
+DATASETS: Dict[str, Callable[[Session, date], List[Dict]]] = {
+    'industry_sectors': lambda db, target_date: SectorHistoryService.get_sectors_by_date(db, target_date, 'industry'),
+    'concept_sectors': lambda db, target_date: SectorHistoryService.get_sectors_by_date(db, target_date, 'concept'),
+    'zt_pool': ZtPoolHistoryService.get_zt_pool_by_date,
+    'zb_pool': ZbgcPoolHistoryService.get_zbgc_pool_by_date,
+    'dt_pool': DtgcPoolHistoryService.get_dtgc_pool_by_date,
+    'indices': IndexHistoryService.get_indices_by_date,
+    'market_summary': _market_summary,
+}
+
+# 默认并发线程数（每个线程占用一个数据库连接，连接池默认 5 + 10）
+MAX_WORKERS = 4
+
+
+class SnapshotService:
+    """日期快照服务"""
+    
+    @staticmethod
+    def _load(name: str, target_date: date) -> List[Dict]:
+        db = SessionLocal()
+        try:
+            with stage(f'db.snapshot.{name}') as timer:
+                rows = DATASETS[name](db, target_date)
+                timer.rows = len(rows)
+            return rows
+        finally:
+            db.close()
+    
+    @staticmethod
+    def get_snapshot(target_date: date, datasets: Optional[Sequence[str]] = None,
+                     max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        并发获取指定日期的数据集
+        
+        Args:
+            target_date: 日期
+            datasets: 要获取的数据集，默认全部（见 DATASETS）
+            max_workers: 并发线程数，默认 min(数据集数, MAX_WORKERS)
+        
+        Returns:
+            {数据集: 行式记录列表}，顺序与 datasets 一致
+        """
+        names = list(datasets or DATASETS)
+        unknown = [name for name in names if name not in DATASETS]
+        if unknown:
+            raise ValueError(f"未知的数据集: {', '.join(unknown)}，可选: {', '.join(DATASETS)}")
+        
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(names), MAX_WORKERS), thread_name_prefix='snapshot') as executor:
+            # 复制上下文，使各线程的阶段耗时计入当前请求
+            futures = {
+                name: executor.submit(contextvars.copy_context().run, SnapshotService._load, name, target_date)
+                for name in names
+            }
+            return {name: futures[name].result() for name in names}
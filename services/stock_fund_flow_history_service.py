@@ -1,9 +1,11 @@
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, func
 from datetime import date
 from models.stock_fund_flow_history import StockFundFlowHistory
 from utils.time_utils import get_data_date
+from utils.metrics import stage, timed
+from models.dimension import DimensionCache, DimStock
 import akshare as ak
 import pandas as pd
 import logging
@@ -13,7 +15,17 @@ logger = logging.getLogger(__name__)
 class StockFundFlowHistoryService:
     """个股资金流历史数据服务"""
     
+    # 分页查询可用的排序字段
+    SORT_COLUMNS = {
+        'net_amount': StockFundFlowHistory.net_amount,
+        'inflow': StockFundFlowHistory.inflow,
+        'outflow': StockFundFlowHistory.outflow,
+        'change_percent': StockFundFlowHistory.change_percent,
+        'turnover': StockFundFlowHistory.turnover,
+    }
+    
     @staticmethod
+    @timed('db.save_stock_fund_flow', rows=lambda saved: 1 if saved else 0)
     def save_stock_fund_flow(db: Session, stock_code: str, target_date: Optional[date] = None) -> bool:
         """
         保存个股资金流数据（即时数据）
@@ -37,7 +49,9 @@ class StockFundFlowHistoryService:
         try:
             # 调用 stock_individual_fund_flow 接口获取单个股票的资金流历史数据
             # 该接口返回120天的历史数据，取最新一条作为当日数据
-            df_fund = ak.stock_individual_fund_flow(stock=stock_code)
+            with stage('fetch.stock_individual_fund_flow') as timer:
+                df_fund = ak.stock_individual_fund_flow(stock=stock_code)
+                timer.rows = len(df_fund) if df_fund is not None else 0
             
             if df_fund is None or df_fund.empty:
                 logger.warning(f"股票代码 {stock_code} 的资金流数据为空")
@@ -210,6 +224,115 @@ class StockFundFlowHistoryService:
         return [ff.to_dict() for ff in fund_flows]
     
     @staticmethod
+    def _filter_by_date(
+        db: Session,
+        target_date: date,
+        stock_codes: Optional[List[str]] = None,
+        keyword: Optional[str] = None,
+        *columns
+    ):
+        """构建按日期筛选的查询（可选：股票代码列表、代码/名称关键字）"""
+        query = db.query(*columns) if columns else db.query(StockFundFlowHistory)
+        query = query.filter(StockFundFlowHistory.date == target_date)
+        if stock_codes is not None:
+            query = query.filter(StockFundFlowHistory.stock_code.in_(stock_codes))
+        if keyword:
+            keyword = keyword.strip()
+            if keyword.isdigit():
+                # 纯数字按代码搜索（补齐6位）
+                query = query.filter(StockFundFlowHistory.stock_code.contains(keyword.zfill(6)))
+            else:
+                # 名称保存在股票维度表中（旧数据仍在 stock_name 列）
+                pattern = f'%{keyword}%'
+                matching_ids = db.query(DimStock.id).filter(DimStock.name.ilike(pattern))
+                query = query.filter(or_(
+                    StockFundFlowHistory.stock_id.in_(matching_ids.scalar_subquery()),
+                    StockFundFlowHistory.stock_name.ilike(pattern)
+                ))
+        return query
+    
+    @staticmethod
+    def get_fund_flow_page(
+        db: Session,
+        target_date: date,
+        offset: int = 0,
+        limit: int = 50,
+        sort_by: str = 'net_amount',
+        ascending: bool = False,
+        stock_codes: Optional[List[str]] = None,
+        keyword: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        分页获取某日的资金流数据（数据库端排序和 LIMIT/OFFSET，只返回一页）
+        
+        Args:
+            db: 数据库会话
+            target_date: 日期
+            offset: 起始行
+            limit: 每页行数
+            sort_by: 排序字段（SORT_COLUMNS 的键），空值始终排在最后
+            ascending: 是否升序
+            stock_codes: 只查询这些股票，None 表示不限制
+            keyword: 股票代码或名称关键字
+        """
+        if sort_by not in StockFundFlowHistoryService.SORT_COLUMNS:
+            raise ValueError(f"Invalid sort_by: {sort_by}. Must be one of {list(StockFundFlowHistoryService.SORT_COLUMNS)}")
+        
+        sort_column = StockFundFlowHistoryService.SORT_COLUMNS[sort_by]
+        fund_flows = StockFundFlowHistoryService._filter_by_date(
+            db, target_date, stock_codes, keyword
+        ).order_by(
+            sort_column.is_(None),
+            sort_column.asc() if ascending else sort_column.desc(),
+            StockFundFlowHistory.id
+        ).offset(offset).limit(limit).all()
+        
+        return [ff.to_dict() for ff in fund_flows]
+    
+    @staticmethod
+    def count_fund_flow(
+        db: Session,
+        target_date: date,
+        stock_codes: Optional[List[str]] = None,
+        keyword: Optional[str] = None
+    ) -> int:
+        """统计某日符合条件的资金流记录数"""
+        return StockFundFlowHistoryService._filter_by_date(
+            db, target_date, stock_codes, keyword, func.count(StockFundFlowHistory.id)
+        ).scalar() or 0
+    
+    @staticmethod
+    def get_fund_flow_summary(
+        db: Session,
+        target_date: date,
+        stock_codes: Optional[List[str]] = None,
+        keyword: Optional[str] = None
+    ) -> Dict:
+        """
+        在数据库中汇总某日符合条件的资金流数据
+        
+        Returns:
+            {'totalCount', 'totalInflow', 'totalOutflow', 'totalNet', 'totalTurnover'}
+        """
+        row = StockFundFlowHistoryService._filter_by_date(
+            db, target_date, stock_codes, keyword,
+            func.count(StockFundFlowHistory.id),
+            func.sum(StockFundFlowHistory.inflow),
+            func.sum(StockFundFlowHistory.outflow),
+            func.sum(StockFundFlowHistory.net_amount),
+            func.sum(StockFundFlowHistory.turnover)
+        ).one()
+        
+        return {
+            'totalCount': row[0] or 0,
+            'totalInflow': row[1] or 0,
+            'totalOutflow': row[2] or 0,
+            'totalNet': row[3] or 0,
+            'totalTurnover': row[4] or 0,
+        }
+    
+    @staticmethod
+    @timed('db.save_all_stocks_fund_flow', rows=lambda result: result['success_count'])
     def save_all_stocks_fund_flow_from_individual(db: Session, target_date: Optional[date] = None) -> Dict[str, int]:
         """
         从 stock_fund_flow_individual(symbol="即时") 接口获取所有股票的资金流数据并保存
@@ -239,7 +362,9 @@ class StockFundFlowHistoryService:
             logger.info(f"保存日期: {data_date}")
             
             # 调用 stock_fund_flow_individual 接口获取所有股票的即时资金流数据
-            df_fund = ak.stock_fund_flow_individual(symbol="即时")
+            with stage('fetch.stock_fund_flow_individual') as timer:
+                df_fund = ak.stock_fund_flow_individual(symbol="即时")
+                timer.rows = len(df_fund) if df_fund is not None else 0
             
             if df_fund is None or df_fund.empty:
                 logger.warning("stock_fund_flow_individual 接口返回空数据")
@@ -296,6 +421,11 @@ class StockFundFlowHistoryService:
                         return None
                 return None
             
+            # 股票简称一次性转换为维度ID（字典编码）
+            stock_ids = DimensionCache.resolve_ids(
+                db, 'stock', df_fund['股票简称'].dropna().astype(str)
+            ) if '股票简称' in df_fund.columns else {}
+            
             # 批量处理数据
             batch_size = 100  # 每批处理100条
             for i in range(0, total_count, batch_size):
@@ -315,10 +445,12 @@ class StockFundFlowHistoryService:
                         ).first()
                         
                         # 准备数据
+                        stock_name = str(row.get('股票简称', '')) if pd.notna(row.get('股票简称')) else None
                         fund_flow_data = {
                             'date': data_date,
                             'stock_code': stock_code,
-                            'stock_name': str(row.get('股票简称', '')) if pd.notna(row.get('股票简称')) else None,
+                            'stock_name': None,
+                            'stock_id': stock_ids.get(stock_name),
                             'latest_price': float(row.get('最新价', 0)) if pd.notna(row.get('最新价')) else None,
                             'change_percent': parse_percent(row.get('涨跌幅')),
                             'turnover_rate': parse_percent(row.get('换手率')),
@@ -1,6 +1,12 @@
 import akshare as ak
-from typing import List, Dict, Optional
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
+from config import Config
+from utils.metrics import stage, registry
+from utils.search_index import SearchIndex
 
 class StockIndexService:
     """A股指数服务"""
@@ -16,6 +22,9 @@ class StockIndexService:
         '399005': '中小板指',
     }
     
+    # 常用指数的搜索索引（首次搜索时构建）
+    _search_index: Optional[SearchIndex] = None
+    
     @classmethod
     def get_index_codes(cls) -> Dict[str, str]:
         """获取指数代码列表"""
@@ -49,11 +58,12 @@ class StockIndexService:
     
     @classmethod
     def search_by_name(cls, keyword: str) -> List[Dict]:
-        """根据名称搜索指数"""
-        matching_codes = [
-            code for code, name in cls.INDEX_CODES.items()
-            if keyword in name
-        ]
+        """根据代码、名称或拼音首字母搜索常用指数（按匹配程度排序）"""
+        if cls._search_index is None:
+            cls._search_index = SearchIndex(
+                {'code': code, 'name': name} for code, name in cls.INDEX_CODES.items()
+            )
+        matching_codes = [item['code'] for item in cls._search_index.search(keyword, limit=None)]
         
         if not matching_codes:
             return []
@@ -118,10 +128,12 @@ class StockIndexService:
         for attempt in range(max_retries):
             try:
                 # 调用 akshare 接口获取指数实时行情
-                if symbol:
-                    df = ak.stock_zh_index_spot_em(symbol=symbol)
-                else:
-                    df = ak.stock_zh_index_spot_em()
+                with stage('fetch.stock_zh_index_spot_em') as timer:
+                    if symbol:
+                        df = ak.stock_zh_index_spot_em(symbol=symbol)
+                    else:
+                        df = ak.stock_zh_index_spot_em()
+                    timer.rows = len(df)
                 
                 if df.empty:
                     return []
@@ -178,38 +190,147 @@ class StockIndexService:
         """
         try:
             # 调用 akshare 新浪接口获取指数实时行情
-            df = ak.stock_zh_index_spot_sina()
+            with stage('fetch.stock_zh_index_spot_sina') as timer:
+                df = ak.stock_zh_index_spot_sina()
+                timer.rows = len(df)
             
             if df.empty:
                 return []
             
             # 转换为字典列表
-            indices = []
-            for _, row in df.iterrows():
-                raw_code = str(row.get('代码', ''))
-                normalized_code = cls.normalize_index_code(raw_code)
+            with stage('transform.indices_sina') as timer:
+                indices = []
+                for _, row in df.iterrows():
+                    raw_code = str(row.get('代码', ''))
+                    normalized_code = cls.normalize_index_code(raw_code)
+                    
+                    index_data = {
+                        'code': normalized_code,
+                        'name': str(row.get('名称', '')),
+                        'currentPrice': float(row.get('最新价', 0)) if pd.notna(row.get('最新价')) else 0,
+                        'changePercent': float(row.get('涨跌幅', 0)) if pd.notna(row.get('涨跌幅')) else 0,
+                        'change': float(row.get('涨跌额', 0)) if pd.notna(row.get('涨跌额')) else 0,
+                        'volume': float(row.get('成交量', 0)) if pd.notna(row.get('成交量')) else 0,
+                        'amount': float(row.get('成交额', 0)) if pd.notna(row.get('成交额')) else 0,
+                        'open': float(row.get('今开', 0)) if pd.notna(row.get('今开')) else 0,
+                        'high': float(row.get('最高', 0)) if pd.notna(row.get('最高')) else 0,
+                        'low': float(row.get('最低', 0)) if pd.notna(row.get('最低')) else 0,
+                        'prevClose': float(row.get('昨收', 0)) if pd.notna(row.get('昨收')) else 0,
+                        'amplitude': 0,  # 新浪接口没有振幅字段
+                        'volumeRatio': 0,  # 新浪接口没有量比字段
+                    }
+                    indices.append(index_data)
                 
-                index_data = {
-                    'code': normalized_code,
-                    'name': str(row.get('名称', '')),
-                    'currentPrice': float(row.get('最新价', 0)) if pd.notna(row.get('最新价')) else 0,
-                    'changePercent': float(row.get('涨跌幅', 0)) if pd.notna(row.get('涨跌幅')) else 0,
-                    'change': float(row.get('涨跌额', 0)) if pd.notna(row.get('涨跌额')) else 0,
-                    'volume': float(row.get('成交量', 0)) if pd.notna(row.get('成交量')) else 0,
-                    'amount': float(row.get('成交额', 0)) if pd.notna(row.get('成交额')) else 0,
-                    'open': float(row.get('今开', 0)) if pd.notna(row.get('今开')) else 0,
-                    'high': float(row.get('最高', 0)) if pd.notna(row.get('最高')) else 0,
-                    'low': float(row.get('最低', 0)) if pd.notna(row.get('最低')) else 0,
-                    'prevClose': float(row.get('昨收', 0)) if pd.notna(row.get('昨收')) else 0,
-                    'amplitude': 0,  # 新浪接口没有振幅字段
-                    'volumeRatio': 0,  # 新浪接口没有量比字段
-                }
-                indices.append(index_data)
+                timer.rows = len(indices)
             
             return indices
         except Exception as e:
             raise Exception(f'Failed to get index spot data from sina: {str(e)}')
     
+    @classmethod
+    def merge_index_results(cls, *results: List[Dict]) -> List[Dict]:
+        """合并多个数据源的指数列表，按标准化代码去重（先出现的优先）"""
+        merged = []
+        seen_codes = set()
+        for indices in results:
+            for index_data in indices or []:
+                code = cls.normalize_index_code(index_data.get('code', ''))
+                if not code or code in seen_codes:
+                    continue
+                seen_codes.add(code)
+                merged.append(dict(index_data, code=code))
+        return merged
+    
+    @classmethod
+    def _has_sz_indices(cls, indices: List[Dict]) -> bool:
+        """是否包含深证系列指数（399开头）"""
+        return any(cls.normalize_index_code(index_data.get('code', '')).startswith('399') for index_data in indices or [])
+    
+    @classmethod
+    def _pick_complete_result(cls, results: Dict[str, List[Dict]]) -> Optional[Tuple[List[Dict], str]]:
+        """从已返回的数据源中选出完整（包含深证系列）的结果，按数据源优先级"""
+        if cls._has_sz_indices(results.get('sina')):
+            return cls.merge_index_results(results['sina']), 'sina'
+        if cls._has_sz_indices(results.get('em')):
+            return cls.merge_index_results(results['em']), 'em'
+        if results.get('em') and results.get('em_sz'):
+            return cls.merge_index_results(results['em'], results['em_sz']), 'em+em_sz'
+        return None
+    
+    @classmethod
+    def get_index_spot_hedged(cls, hedge_seconds: Optional[float] = None) -> Tuple[List[Dict], str]:
+        """
+        多数据源对冲获取指数实时行情
+        
+        先请求新浪接口（主要数据源）；超过 hedge_seconds 秒未返回或失败时，
+        并行请求东方财富全部指数和深证系列指数（备用数据源），采用最先返回的完整结果
+        （包含深证系列指数），按标准化代码去重。未胜出的请求在后台线程中自然结束，结果丢弃。
+        
+        Args:
+            hedge_seconds: 对冲等待秒数，默认 Config.INDEX_HEDGE_SECONDS；0 表示所有数据源同时请求
+        
+        Returns:
+            (指数列表, 胜出的数据源: sina / em / em+em_sz，都不完整时为合并的数据源)
+        """
+        if hedge_seconds is None:
+            hedge_seconds = Config.INDEX_HEDGE_SECONDS
+        sources = {
+            'sina': cls.get_index_spot_sina,
+            'em': cls.get_index_spot,
+            'em_sz': lambda: cls.get_index_spot(symbol="深证系列指数"),
+        }
+        
+        start = time.monotonic()
+        results: Dict[str, List[Dict]] = {}
+        errors: Dict[str, str] = {}
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='index-fetch')
+        
+        def submit(name):
+            # 复制上下文，使接口请求的耗时计入当前任务的阶段耗时
+            return executor.submit(contextvars.copy_context().run, sources[name])
+        
+        try:
+            futures = {submit('sina'): 'sina'}
+            pending = set(futures)
+            hedged = False
+            while pending or not hedged:
+                timeout = None if hedged else max(start + hedge_seconds - time.monotonic(), 0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        results[name] = future.result() or []
+                    except Exception as e:
+                        errors[name] = str(e)
+                        print(f"⚠️ 指数数据源 {name} 获取失败: {str(e)}")
+                
+                picked = cls._pick_complete_result(results)
+                if picked:
+                    indices, source = picked
+                    break
+                
+                if not hedged and (not pending or time.monotonic() - start >= hedge_seconds):
+                    print(f"🔄 主要数据源 {time.monotonic() - start:.1f} 秒未返回完整结果，并行请求备用数据源...")
+                    for name in ('em', 'em_sz'):
+                        future = submit(name)
+                        futures[future] = name
+                        pending.add(future)
+                    hedged = True
+            else:
+                # 所有数据源都已返回但没有完整结果：合并可用的部分
+                available = [name for name in sources if results.get(name)]
+                if not available:
+                    raise Exception(f'Failed to get index spot data from all sources: {errors}')
+                indices = cls.merge_index_results(*(results[name] for name in available))
+                source = '+'.join(available)
+        finally:
+            executor.shutdown(wait=False)
+        
+        elapsed = time.monotonic() - start
+        registry.record(f'fetch.indices_hedged.{source}', elapsed, len(indices))
+        print(f"✅ 指数数据源 {source} 胜出：{len(indices)} 条，耗时 {elapsed:.2f} 秒")
+        return indices, source
+    
     @classmethod
     def _get_mock_index_data(cls, code: str) -> Dict:
         """获取模拟指数数据（实际项目中应替换为真实API调用）"""
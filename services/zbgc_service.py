@@ -2,6 +2,7 @@ import akshare as ak
 from typing import List, Dict, Optional
 import pandas as pd
 from utils.time_utils import get_utc8_date_compact_str
+from utils.metrics import stage, timed
 
 class ZbgcService:
     """炸板股票池服务"""
@@ -19,7 +20,9 @@ class ZbgcService:
                 date = get_utc8_date_compact_str()
             
             # 调用akshare接口
-            df = ak.stock_zt_pool_zbgc_em(date=date)
+            with stage('fetch.stock_zt_pool_zbgc_em') as timer:
+                df = ak.stock_zt_pool_zbgc_em(date=date)
+                timer.rows = len(df)
             
             # 转换为字典列表
             return cls._dataframe_to_dict_list(df)
@@ -27,6 +30,7 @@ class ZbgcService:
             raise Exception(f'Failed to get zbgc pool: {str(e)}')
     
     @classmethod
+    @timed('transform.zbgc_pool')
     def _dataframe_to_dict_list(cls, df: pd.DataFrame) -> List[Dict]:
         """将DataFrame转换为字典列表"""
         result = []
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连板梯队服务
+
+根据涨停股票池历史数据维护每日连板梯队（每个连板高度的股票数、股票代码、
+相对上一交易日的晋级率以及当日最高连板），供仪表盘直接读取，
+避免每次都从原始涨停数据重新计算。
+"""
+from typing import List, Dict, Optional
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, case
+from datetime import date
+from models.zt_pool_history import ZtPoolHistory
+from models.zt_ladder import ZtLadderDaily
+from utils.metrics import timed
+
+class ZtLadderService:
+    """连板梯队服务"""
+    
+    @staticmethod
+    def get_previous_date(db: Session, target_date: date) -> Optional[date]:
+        """获取 target_date 之前最近一个有涨停数据的交易日"""
+        return db.query(func.max(ZtPoolHistory.date)).filter(
+            ZtPoolHistory.date < target_date
+        ).scalar()
+    
+    @staticmethod
+    def get_next_date(db: Session, target_date: date) -> Optional[date]:
+        """获取 target_date 之后最近一个有涨停数据的交易日"""
+        return db.query(func.min(ZtPoolHistory.date)).filter(
+            ZtPoolHistory.date > target_date
+        ).scalar()
+    
+    @staticmethod
+    def has_ladder(db: Session, target_date: date) -> bool:
+        """指定日期是否已有连板梯队"""
+        return db.query(ZtLadderDaily.id).filter(ZtLadderDaily.date == target_date).first() is not None
+    
+    @staticmethod
+    @timed('db.update_zt_ladder')
+    def update_ladder(db: Session, target_date: date) -> int:
+        """
+        更新指定日期的连板梯队（只与上一交易日做关联计算）
+        
+        晋级数 = 今日高度为 h 且上一交易日高度为 h-1 的股票数（按股票代码关联）
+        晋级率 = 晋级数 / 上一交易日高度为 h-1 的股票数 * 100
+        
+        Args:
+            db: 数据库会话
+            target_date: 要更新的日期
+        
+        Returns:
+            写入的梯队行数
+        """
+        today_rows = db.query(
+            ZtPoolHistory.continuous_boards,
+            ZtPoolHistory.code
+        ).filter(ZtPoolHistory.date == target_date).all()
+        
+        prev_date = ZtLadderService.get_previous_date(db, target_date)
+        
+        prev_counts: Dict[int, int] = {}
+        promoted_counts: Dict[int, int] = {}
+        if prev_date is not None:
+            # 上一交易日各高度的股票数
+            prev_counts = dict(db.query(
+                ZtPoolHistory.continuous_boards,
+                func.count(ZtPoolHistory.id)
+            ).filter(
+                ZtPoolHistory.date == prev_date
+            ).group_by(ZtPoolHistory.continuous_boards).all())
+            
+            # 今日与上一交易日按股票代码关联，统计每个高度的晋级数
+            today_zt = aliased(ZtPoolHistory)
+            prev_zt = aliased(ZtPoolHistory)
+            promoted_counts = dict(db.query(
+                today_zt.continuous_boards,
+                func.count(today_zt.id)
+            ).join(
+                prev_zt,
+                and_(
+                    prev_zt.code == today_zt.code,
+                    prev_zt.date == prev_date,
+                    prev_zt.continuous_boards == today_zt.continuous_boards - 1
+                )
+            ).filter(
+                today_zt.date == target_date
+            ).group_by(today_zt.continuous_boards).all())
+        
+        # 按高度汇总今日股票代码
+        codes_by_height: Dict[int, List[str]] = {}
+        for height, code in today_rows:
+            codes_by_height.setdefault(height or 0, []).append(code)
+        max_height = max(codes_by_height.keys()) if codes_by_height else 0
+        
+        try:
+            db.query(ZtLadderDaily).filter(ZtLadderDaily.date == target_date).delete()
+            
+            records = []
+            for height in sorted(codes_by_height.keys()):
+                codes = sorted(codes_by_height[height])
+                prev_height_count = prev_counts.get(height - 1) if prev_date is not None and height > 1 else None
+                promoted_count = promoted_counts.get(height, 0) if prev_height_count is not None else None
+                promotion_rate = None
+                if prev_height_count:
+                    promotion_rate = round(promoted_count / prev_height_count * 100, 2)
+                
+                records.append(ZtLadderDaily(
+                    date=target_date,
+                    board_height=height,
+                    stock_count=len(codes),
+                    codes=','.join(codes),
+                    prev_date=prev_date,
+                    prev_height_count=prev_height_count,
+                    promoted_count=promoted_count,
+                    promotion_rate=promotion_rate,
+                    max_height=max_height,
+                ))
+            
+            db.add_all(records)
+            db.commit()
+            print(f"✅ 成功更新 {target_date} 的连板梯队: {len(records)} 个高度，最高 {max_height} 板")
+            return len(records)
+        except Exception as e:
+            db.rollback()
+            print(f"❌ 更新连板梯队失败: {str(e)}")
+            raise
+    
+    @staticmethod
+    def update_ladder_and_next(db: Session, target_date: date) -> int:
+        """
+        更新指定日期的连板梯队，并重新计算下一交易日的梯队
+        
+        下一交易日的晋级数和晋级率以 target_date 为上一交易日计算，
+        补保存或重新保存较早日期的涨停池后也需要更新。
+        
+        Returns:
+            target_date 写入的梯队行数
+        """
+        count = ZtLadderService.update_ladder(db, target_date)
+        next_date = ZtLadderService.get_next_date(db, target_date)
+        if next_date is not None:
+            ZtLadderService.update_ladder(db, next_date)
+        return count
+    
+    @staticmethod
+    def rebuild_ladder(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """
+        按日期顺序重建连板梯队（用于历史数据初始化或补数据后刷新）
+        
+        Returns:
+            重建的日期数
+        """
+        query = db.query(ZtPoolHistory.date).distinct()
+        if start_date:
+            query = query.filter(ZtPoolHistory.date >= start_date)
+        if end_date:
+            query = query.filter(ZtPoolHistory.date <= end_date)
+        dates = [d[0] for d in query.order_by(ZtPoolHistory.date).all()]
+        
+        for target_date in dates:
+            ZtLadderService.update_ladder(db, target_date)
+        return len(dates)
+    
+    @staticmethod
+    def get_ladder_by_date(db: Session, target_date: date) -> List[Dict]:
+        """根据日期获取连板梯队（按高度降序）"""
+        rows = db.query(ZtLadderDaily).filter(
+            ZtLadderDaily.date == target_date
+        ).order_by(ZtLadderDaily.board_height.desc()).all()
+        
+        return [row.to_dict() for row in rows]
+    
+    @staticmethod
+    def get_ladder_by_date_range(db: Session, start_date: date, end_date: date) -> List[Dict]:
+        """根据日期范围获取连板梯队"""
+        rows = db.query(ZtLadderDaily).filter(
+            and_(
+                ZtLadderDaily.date >= start_date,
+                ZtLadderDaily.date <= end_date
+            )
+        ).order_by(ZtLadderDaily.date.desc(), ZtLadderDaily.board_height.desc()).all()
+        
+        return [row.to_dict() for row in rows]
+    
+    @staticmethod
+    def get_daily_summary_by_date_range(db: Session, start_date: date, end_date: date) -> List[Dict]:
+        """
+        获取日期范围内每日的涨停汇总（在数据库中按日期聚合梯队表）
+        
+        Returns:
+            [{'date', 'ztCount', 'continuousCount', 'continuousRate', 'maxHeight'}, ...]（按日期升序）
+        """
+        continuous_sum = func.sum(
+            case((ZtLadderDaily.board_height > 1, ZtLadderDaily.stock_count), else_=0)
+        )
+        rows = db.query(
+            ZtLadderDaily.date,
+            func.sum(ZtLadderDaily.stock_count),
+            continuous_sum,
+            func.max(ZtLadderDaily.max_height)
+        ).filter(
+            and_(
+                ZtLadderDaily.date >= start_date,
+                ZtLadderDaily.date <= end_date
+            )
+        ).group_by(ZtLadderDaily.date).order_by(ZtLadderDaily.date).all()
+        
+        summary = []
+        for row_date, zt_count, continuous_count, max_height in rows:
+            zt_count = int(zt_count or 0)
+            continuous_count = int(continuous_count or 0)
+            summary.append({
+                'date': row_date.strftime('%Y-%m-%d'),
+                'ztCount': zt_count,
+                'continuousCount': continuous_count,
+                'continuousRate': round(continuous_count / zt_count * 100, 2) if zt_count > 0 else 0,
+                'maxHeight': max_height or 0,
+            })
+        return summary
@@ -5,12 +5,17 @@ from datetime import date, time as dt_time
 from models.zt_pool_history import ZtPoolHistory
 from services.zt_pool_service import ZtPoolService
 from utils.time_utils import get_data_date
+from utils.metrics import timed
+from services.dimension_service import DimensionService
+from services.diff_write_service import DiffWriteService, DiffResult
+from services.market_summary_service import MarketSummaryService
 
 class ZtPoolHistoryService:
     """涨停股票池历史数据服务"""
     
     @staticmethod
-    def save_today_zt_pool(db: Session, target_date: Optional[date] = None) -> int:
+    @timed('db.save_zt_pool', rows=lambda result: result.total)
+    def save_today_zt_pool(db: Session, target_date: Optional[date] = None, refresh_summary: bool = True) -> DiffResult:
         """
         保存涨停股票池数据（自动判断日期）
         - 如果在交易时间内，使用当前日期
@@ -20,10 +25,15 @@ class ZtPoolHistoryService:
         注意：AKShare API 只能获取实时数据，无法获取历史数据。
         如果 target_date 不是今天或最近的交易日，保存的将是实时数据，而不是历史数据。
         
-        优化：使用事务保护，确保数据不丢失
+        优化：使用事务保护，确保数据不丢失；同一天重复保存时按股票代码对比行内容摘要，
+        只写入新增、变化和消失的行，没有变化且当天已有连板梯队时不重新计算梯队
         
         Args:
             target_date: 可选，指定保存的日期。如果为None，则自动判断日期
+            refresh_summary: 保存后更新该日期的每日市场概况（一次保存多个数据集时传 False，最后统一更新）
+        
+        Returns:
+            DiffResult：total 为保存的股票数，changed 为实际写入（新增、更新、删除）的行数
         """
         from utils.time_utils import get_utc8_date
         
@@ -52,84 +62,97 @@ class ZtPoolHistoryService:
             
             if not stocks:
                 print(f"⚠️  警告: {data_date} 没有获取到涨停股票数据")
-                return 0
+                return DiffResult()
             
             # 开始事务：先准备新数据
-            new_records = []
-            for stock in stocks:
-                # 解析时间字符串（格式：HH:MM:SS 或 HH:MM）
-                first_sealing_time = None
-                last_sealing_time = None
-                
-                if stock.get('firstSealingTime'):
-                    try:
-                        time_str = stock['firstSealingTime'].strip()
-                        if time_str:
-                            parts = time_str.split(':')
-                            if len(parts) >= 2:
-                                hour = int(parts[0])
-                                minute = int(parts[1])
-                                second = int(parts[2]) if len(parts) > 2 else 0
-                                first_sealing_time = dt_time(hour, minute, second)
-                    except:
-                        pass
-                
-                if stock.get('lastSealingTime'):
-                    try:
-                        time_str = stock['lastSealingTime'].strip()
-                        if time_str:
-                            parts = time_str.split(':')
-                            if len(parts) >= 2:
-                                hour = int(parts[0])
-                                minute = int(parts[1])
-                                second = int(parts[2]) if len(parts) > 2 else 0
-                                last_sealing_time = dt_time(hour, minute, second)
-                    except:
-                        pass
-                
-                history = ZtPoolHistory(
-                    date=data_date,
-                    index=stock.get('index', 0),
-                    code=stock.get('code', ''),
-                    name=stock.get('name', ''),
-                    change_percent=stock.get('changePercent', 0),
-                    latest_price=stock.get('latestPrice', 0),
-                    turnover=stock.get('turnover', 0),
-                    circulating_market_value=stock.get('circulatingMarketValue', 0),
-                    total_market_value=stock.get('totalMarketValue', 0),
-                    turnover_rate=stock.get('turnoverRate', 0),
-                    sealing_funds=stock.get('sealingFunds', 0),
-                    first_sealing_time=first_sealing_time,
-                    last_sealing_time=last_sealing_time,
-                    explosion_count=stock.get('explosionCount', 0),
-                    zt_statistics=stock.get('ztStatistics'),
-                    continuous_boards=stock.get('continuousBoards', 0),
-                    industry=stock.get('industry'),
-                )
-                new_records.append(history)
-            
-            # 检查该日期的数据是否已存在
-            existing = db.query(ZtPoolHistory).filter(ZtPoolHistory.date == data_date).first()
-            if existing:
-                # 如果已存在，先删除旧数据
-                deleted_count = db.query(ZtPoolHistory).filter(ZtPoolHistory.date == data_date).delete()
-                print(f"🗑️  删除 {data_date} 的旧数据: {deleted_count} 条")
-            
-            # 批量添加新数据
-            for record in new_records:
-                db.add(record)
+            new_records = ZtPoolHistoryService.build_records(stocks, data_date)
+            # 股票名称和所属行业转换为维度ID
+            DimensionService.encode_records(db, new_records)
             
-            # 提交事务
+            # 只写入有变化的行，在同一事务中提交
+            result = DiffWriteService.sync(db, ZtPoolHistory, {'date': data_date}, new_records, ('code',))
             db.commit()
-            print(f"✅ 成功保存 {len(new_records)} 条涨停股票数据到数据库 ({data_date})")
-            return len(new_records)
+            print(f"✅ 保存 {result.total} 条涨停股票数据到数据库 ({data_date}): {result.summary()}")
             
+            # 增量更新连板梯队（只与上一交易日关联计算，失败不影响涨停数据保存）
+            # 涨停池没有变化时只在梯队缺失（如上次更新失败）时计算
+            try:
+                from services.zt_ladder_service import ZtLadderService
+                if result.changed:
+                    # 下一交易日（补保存较早日期时）的晋级率依赖当天数据，一并更新
+                    ZtLadderService.update_ladder_and_next(db, data_date)
+                elif not ZtLadderService.has_ladder(db, data_date):
+                    ZtLadderService.update_ladder(db, data_date)
+            except Exception as e:
+                print(f"⚠️  更新 {data_date} 连板梯队失败: {str(e)}")
+            
+            if refresh_summary:
+                MarketSummaryService.refresh_after_save(db, data_date, changed=result.changed > 0)
+            return result
+        
         except Exception as e:
             # 如果出错，回滚事务
             db.rollback()
             print(f"❌ 保存涨停股票数据失败: {str(e)}")
             raise Exception(f'Failed to save zt pool data: {str(e)}')
     
+    @staticmethod
+    def build_records(stocks: List[Dict], data_date: date) -> List[ZtPoolHistory]:
+        """把 ZtPoolService.get_zt_pool 返回的股票列表转换为历史记录对象"""
+        records = []
+        for stock in stocks:
+            # 解析时间字符串（格式：HH:MM:SS 或 HH:MM）
+            first_sealing_time = None
+            last_sealing_time = None
+            
+            if stock.get('firstSealingTime'):
+                try:
+                    time_str = stock['firstSealingTime'].strip()
+                    if time_str:
+                        parts = time_str.split(':')
+                        if len(parts) >= 2:
+                            hour = int(parts[0])
+                            minute = int(parts[1])
+                            second = int(parts[2]) if len(parts) > 2 else 0
+                            first_sealing_time = dt_time(hour, minute, second)
+                except:
+                    pass
+            
+            if stock.get('lastSealingTime'):
+                try:
+                    time_str = stock['lastSealingTime'].strip()
+                    if time_str:
+                        parts = time_str.split(':')
+                        if len(parts) >= 2:
+                            hour = int(parts[0])
+                            minute = int(parts[1])
+                            second = int(parts[2]) if len(parts) > 2 else 0
+                            last_sealing_time = dt_time(hour, minute, second)
+                except:
+                    pass
+            
+            history = ZtPoolHistory(
+                date=data_date,
+                index=stock.get('index', 0),
+                code=stock.get('code', ''),
+                name=stock.get('name', ''),
+                change_percent=stock.get('changePercent', 0),
+                latest_price=stock.get('latestPrice', 0),
+                turnover=stock.get('turnover', 0),
+                circulating_market_value=stock.get('circulatingMarketValue', 0),
+                total_market_value=stock.get('totalMarketValue', 0),
+                turnover_rate=stock.get('turnoverRate', 0),
+                sealing_funds=stock.get('sealingFunds', 0),
+                first_sealing_time=first_sealing_time,
+                last_sealing_time=last_sealing_time,
+                explosion_count=stock.get('explosionCount', 0),
+                zt_statistics=stock.get('ztStatistics'),
+                continuous_boards=stock.get('continuousBoards', 0),
+                industry=stock.get('industry'),
+            )
+            records.append(history)
+        return records
+    
     @staticmethod
     def get_zt_pool_by_date(db: Session, target_date: date) -> List[Dict]:
         """根据日期获取涨停股票池数据"""
@@ -15,6 +15,10 @@ from datetime import datetime, timedelta
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# akshare 录制/回放（由 AKSHARE_MODE 环境变量控制，默认关闭）
+from utils.akshare_replay import install_from_env
+install_from_env()
+
 # 尝试导入数据库模块，如果失败则显示配置提示
 try:
     from database.db import SessionLocal, init_db
@@ -36,6 +40,10 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# SQL 分析（SQL_PROFILE 开启时统计本次页面运行的 SQL 语句）
+from database.query_profiler import profile_streamlit_rerun
+profile_streamlit_rerun('首页')
+
 # 检查数据库配置
 if not DB_AVAILABLE:
     st.error("❌ 数据库配置未完成")
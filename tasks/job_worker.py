@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务工作进程
+
+从 job_queue 表领取任务并在线程池中执行，每个工作进程同时执行最多 concurrency 个不同类型的任务，
+可以部署多个工作进程（领取时使用 FOR UPDATE SKIP LOCKED，互不重复）。
+执行过程中定期刷新心跳，心跳超时的任务（工作进程崩溃）由其他工作进程重新排队。
+入口脚本见 run_job_worker.py。
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional
+from config import Config
+from database.db import SessionLocal
+from services.job_queue_service import JobQueueService, JOB_TYPES
+from services.stock_fund_flow_history_service import StockFundFlowHistoryService
+
+logger = logging.getLogger(__name__)
+
+# 进度回调：report(0-1, 说明)
+ProgressCallback = Callable[[float, str], None]
+
+# 刷新指定股票资金流时每批的股票数（每批完成后更新一次进度）
+FUND_FLOW_BATCH_SIZE = 20
+
+# 执行定时任务方法的调度器实例（不启动，只复用任务方法）
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _get_scheduler():
+    """获取执行任务方法使用的调度器实例（不启动调度器，不参与主节点选举）"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from tasks.sector_scheduler import SectorScheduler
+            _scheduler = SectorScheduler()
+    return _scheduler
+
+
+def _target_date(params: Dict) -> Optional[date]:
+    """任务参数中的目标日期（YYYY-MM-DD），未指定时返回 None"""
+    value = params.get('target_date')
+    return date.fromisoformat(value) if value else None
+
+
+def run_save_daily_data(params: Dict, report: ProgressCallback) -> Dict:
+    """保存板块和股票池数据（params: force 跳过交易日检查）"""
+    return _get_scheduler().save_daily_data(force=bool(params.get('force')), progress=report)
+
+
+def _scheduler_job(name: str) -> Callable[[Dict, ProgressCallback], Optional[Dict]]:
+    """直接调用调度器的任务方法（执行结果记录在定时任务执行历史中）"""
+    def run(params: Dict, report: ProgressCallback) -> Optional[Dict]:
+        getattr(_get_scheduler(), name)()
+        return None
+    return run
+
+
+def run_refresh_stocks_fund_flow(params: Dict, report: ProgressCallback) -> Dict:
+    """刷新指定股票的资金流数据（params: stock_codes, target_date），分批更新进度"""
+    stock_codes = list(params.get('stock_codes') or [])
+    target_date = _target_date(params)
+    failed_codes = []
+    db = SessionLocal()
+    try:
+        for start in range(0, len(stock_codes), FUND_FLOW_BATCH_SIZE):
+            report(start / len(stock_codes), f"已刷新 {start}/{len(stock_codes)} 只股票")
+            batch = stock_codes[start:start + FUND_FLOW_BATCH_SIZE]
+            results = StockFundFlowHistoryService.save_multiple_stocks_fund_flow(db, batch, target_date)
+            failed_codes.extend(code for code, success in results.items() if not success)
+    finally:
+        db.close()
+    return {
+        'totalCount': len(stock_codes),
+        'successCount': len(stock_codes) - len(failed_codes),
+        'failedCodes': failed_codes,
+    }
+
+
+def run_refresh_all_stocks_fund_flow(params: Dict, report: ProgressCallback) -> Dict:
+    """从 stock_fund_flow_individual 接口刷新所有股票的资金流数据（params: target_date）"""
+    report(0.0, '正在从接口获取所有股票的资金流数据')
+    db = SessionLocal()
+    try:
+        results = StockFundFlowHistoryService.save_all_stocks_fund_flow_from_individual(
+            db=db, target_date=_target_date(params)
+        )
+    finally:
+        db.close()
+    return {
+        'totalCount': results.get('total_count', 0),
+        'successCount': results.get('success_count', 0),
+        'failedCount': results.get('failed_count', 0),
+    }
+
+
+# 任务类型 -> 执行函数 handler(params, report)，返回值保存为任务结果
+JOB_HANDLERS: Dict[str, Callable[[Dict, ProgressCallback], Optional[Dict]]] = {
+    'save_daily_data': run_save_daily_data,
+    'save_realtime_fund_flow': _scheduler_job('save_realtime_fund_flow'),
+    'save_all_stocks_fund_flow': _scheduler_job('save_all_stocks_fund_flow'),
+    'maintain_partitions': _scheduler_job('maintain_partitions'),
+    'refresh_concept_membership': _scheduler_job('refresh_concept_membership'),
+    'refresh_stocks_fund_flow': run_refresh_stocks_fund_flow,
+    'refresh_all_stocks_fund_flow': run_refresh_all_stocks_fund_flow,
+}
+
+assert set(JOB_HANDLERS) == set(JOB_TYPES), "JOB_HANDLERS 与 JOB_TYPES 不一致"
+
+
+class JobWorker:
+    """后台任务工作进程（主线程轮询领取任务，线程池执行）"""
+    
+    def __init__(self, concurrency: int = None, poll_seconds: float = None, job_types: Optional[List[str]] = None,
+                 handlers: Optional[Dict[str, Callable]] = None):
+        """
+        Args:
+            concurrency: 同时执行的任务数，默认使用 Config.JOB_WORKER_CONCURRENCY
+            poll_seconds: 没有任务时的轮询间隔（秒），默认使用 Config.JOB_WORKER_POLL_SECONDS
+            job_types: 只领取这些类型的任务，None 表示全部
+            handlers: 任务类型 -> 执行函数，默认 JOB_HANDLERS
+        """
+        self.concurrency = max(int(concurrency or Config.JOB_WORKER_CONCURRENCY), 1)
+        self.poll_seconds = float(poll_seconds if poll_seconds is not None else Config.JOB_WORKER_POLL_SECONDS)
+        self.job_types = job_types
+        self.handlers = handlers or JOB_HANDLERS
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
+        
+        # 正在执行的任务：任务ID -> Future
+        self._active: Dict[int, Future] = {}
+        self._stop = threading.Event()
+        self._last_heartbeat = 0.0
+    
+    def stop(self):
+        """请求停止（不再领取新任务，等待正在执行的任务结束）"""
+        self._stop.set()
+    
+    def execute(self, job_id: int, job_type: str, params: Dict) -> str:
+        """
+        执行一个已领取的任务并记录结果
+        
+        Returns:
+            任务结束状态: success/failed
+        """
+        start = time.time()
+        logger.info(f"▶️ 开始执行后台任务 #{job_id}: {JOB_TYPES.get(job_type, job_type)}")
+        status, result, error_message, error_traceback = 'success', None, None, None
+        try:
+            handler = self.handlers.get(job_type)
+            if handler is None:
+                raise ValueError(f"未知的任务类型: {job_type}")
+            result = handler(params, lambda fraction, message: JobQueueService.update_progress(job_id, fraction, message))
+            # 调度器任务方法返回的状态（如部分数据集保存失败）作为任务状态
+            if isinstance(result, dict) and result.get('status') == 'failed':
+                status, error_message = 'failed', result.get('errorMessage')
+        except Exception as e:
+            logger.error(f"❌ 后台任务 #{job_id} 执行失败: {str(e)}", exc_info=True)
+            status, error_message, error_traceback = 'failed', str(e), traceback.format_exc()
+        
+        db = SessionLocal()
+        try:
+            JobQueueService.finish(db, job_id, status, result, error_message, error_traceback)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ 保存后台任务 #{job_id} 结果失败: {str(e)}", exc_info=True)
+        finally:
+            db.close()
+        logger.info(f"{'✅' if status == 'success' else '❌'} 后台任务 #{job_id} 结束: {status}，耗时 {time.time() - start:.2f} 秒")
+        return status
+    
+    def claim_next(self) -> Optional[Dict]:
+        """领取一个任务，返回 {'id', 'job_type', 'params'}，没有可领取的任务时返回 None"""
+        db = SessionLocal()
+        try:
+            job = JobQueueService.claim(db, self.identity, self.job_types)
+            if job is None:
+                return None
+            return {'id': job.id, 'job_type': job.job_type, 'params': json.loads(job.params) if job.params else {}}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def run(self, once: bool = False) -> int:
+        """
+        领取并执行任务，直到 stop() 被调用
+        
+        Args:
+            once: 队列中没有可领取的任务且正在执行的任务都结束后退出
+        
+        Returns:
+            执行的任务数
+        """
+        executed = 0
+        logger.info(f"🚀 后台任务工作进程已启动: {self.identity}，并发 {self.concurrency}，轮询间隔 {self.poll_seconds} 秒")
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job-worker') as executor:
+            while True:
+                # 回收已结束的任务
+                for job_id in [job_id for job_id, future in self._active.items() if future.done()]:
+                    self._active.pop(job_id)
+                    executed += 1
+                
+                try:
+                    self._maintain()
+                    claimed = 0
+                    while not self._stop.is_set() and len(self._active) < self.concurrency:
+                        job = self.claim_next()
+                        if job is None:
+                            break
+                        self._active[job['id']] = executor.submit(self.execute, job['id'], job['job_type'], job['params'])
+                        claimed += 1
+                except Exception as e:
+                    logger.error(f"❌ 领取后台任务失败: {str(e)}")
+                    claimed = 0
+                
+                if self._stop.is_set() and not self._active:
+                    break
+                if once and not claimed and not self._active:
+                    break
+                self._stop.wait(self.poll_seconds)
+        logger.info(f"后台任务工作进程已停止: {self.identity}，共执行 {executed} 个任务")
+        return executed
+    
+    def _maintain(self):
+        """定期刷新正在执行的任务的心跳，并重新排队心跳超时的任务"""
+        if time.monotonic() - self._last_heartbeat < Config.JOB_HEARTBEAT_SECONDS:
+            return
+        self._last_heartbeat = time.monotonic()
+        db = SessionLocal()
+        try:
+            JobQueueService.heartbeat(db, list(self._active))
+            JobQueueService.requeue_stale(db, Config.JOB_STALE_SECONDS)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时快照预取器
+
+在后台守护线程中按固定间隔并行获取实时仪表盘所需的全部数据
+（行业板块、概念板块、涨停/跌停/炸板股票池、指数行情），
+获取完成后整体替换进程内的最新快照（原子发布）。
+同一进程中的所有页面会话共享该快照，页面渲染只读取快照，不等待网络请求。
+
+刷新策略：
+- 交易日交易时间内每 interval_seconds 秒刷新一次
+- 收盘后补刷一次收盘数据，之后不再请求接口
+- 非交易日只在进程启动后获取一次
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+from config import Config
+from services.sector_service import SectorService
+from services.concept_service import ConceptService
+from services.zt_pool_service import ZtPoolService
+from services.dtgc_service import DtgcService
+from services.zbgc_service import ZbgcService
+from services.stock_index_service import StockIndexService
+from utils.time_utils import get_utc8_now, get_utc8_date_compact_str, is_trading_time, is_trading_day
+
+logger = logging.getLogger(__name__)
+
+# 数据集 -> 数据获取函数（参数为日期字符串 YYYYMMDD）
+DATASETS: Dict[str, Callable[[str], List[Dict]]] = {
+    'industry_sectors': lambda date_str: SectorService.get_industry_summary(),
+    'concept_sectors': lambda date_str: ConceptService.get_concept_summary(),
+    'zt_pool': lambda date_str: ZtPoolService.get_zt_pool(date=date_str),
+    'dt_pool': lambda date_str: DtgcService.get_dtgc_pool(date=date_str),
+    'zb_pool': lambda date_str: ZbgcService.get_zbgc_pool(date=date_str),
+    'indices': lambda date_str: StockIndexService.get_index_spot_sina(),
+}
+
+
+def fetch_realtime_data() -> Dict:
+    """
+    并行获取全部实时数据
+    
+    Returns:
+        {'industry_sectors', 'concept_sectors', 'zt_pool', 'dt_pool', 'zb_pool', 'indices',
+         'source': 'realtime', 'errors': {数据集: 错误信息}}，
+        有数据集获取失败时额外包含 'error'
+    """
+    date_str = get_utc8_date_compact_str()
+    results = {name: [] for name in DATASETS}
+    results['source'] = 'realtime'
+    results['errors'] = {}
+    
+    with ThreadPoolExecutor(max_workers=len(DATASETS)) as executor:
+        future_to_name = {executor.submit(fetcher, date_str): name for name, fetcher in DATASETS.items()}
+        for future in as_completed(future_to_name):
+            name = future_to_name[future]
+            try:
+                results[name] = future.result() or []
+            except Exception as e:
+                results['errors'][name] = str(e)
+    
+    # 如果有错误，记录但不阻止返回
+    if results['errors']:
+        error_msg = "; ".join([f"{k}: {v}" for k, v in results['errors'].items()])
+        results['error'] = f"部分数据获取失败: {error_msg}"
+    
+    return results
+
+
+class RealtimePrefetcher:
+    """实时快照预取器（后台守护线程）"""
+    
+    def __init__(self, interval_seconds: int = None, fetcher: Callable[[], Dict] = None):
+        """
+        Args:
+            interval_seconds: 交易时间内的刷新间隔（秒），默认使用 Config.REALTIME_PREFETCH_SECONDS
+            fetcher: 数据获取函数，默认 fetch_realtime_data
+        """
+        if interval_seconds is None:
+            interval_seconds = Config.REALTIME_PREFETCH_SECONDS
+        self.interval_seconds = max(int(interval_seconds), 5)
+        self.fetcher = fetcher or fetch_realtime_data
+        
+        # 最新快照：{'data', 'fetched_at', 'duration', 'in_session'}，发布后不再修改
+        self._snapshot: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._published = threading.Event()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # 交易日判断缓存（每天只查询一次交易日历）
+        self._trading_day: Optional[tuple] = None
+    
+    def start(self):
+        """启动后台线程（已启动时不重复启动）"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='realtime-prefetcher', daemon=True)
+            self._thread.start()
+        logger.info(f"实时快照预取器已启动，交易时间内每 {self.interval_seconds} 秒刷新")
+    
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        self._wakeup.set()
+    
+    @property
+    def running(self) -> bool:
+        """后台线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def get_snapshot(self) -> Optional[Dict]:
+        """获取最新快照（不阻塞，尚未获取到时返回None）"""
+        return self._snapshot
+    
+    def wait_for_snapshot(self, timeout: float = None) -> Optional[Dict]:
+        """等待第一份快照发布（进程启动后首次访问时使用）"""
+        self._published.wait(timeout)
+        return self._snapshot
+    
+    def request_refresh(self):
+        """请求立即刷新（不等待刷新完成）"""
+        self._wakeup.set()
+    
+    def refresh(self) -> Dict:
+        """同步获取一次数据并发布快照"""
+        start = time.time()
+        data = self.fetcher()
+        now = get_utc8_now()
+        snapshot = {
+            'data': data,
+            'fetched_at': now,
+            'duration': round(time.time() - start, 2),
+            'in_session': self._in_session(now),
+        }
+        # 整体替换引用，读取方要么看到旧快照，要么看到新快照
+        self._snapshot = snapshot
+        self._published.set()
+        
+        if data.get('errors'):
+            logger.warning(f"实时快照刷新完成（{snapshot['duration']}秒），部分数据失败: {list(data['errors'].keys())}")
+        else:
+            logger.info(f"实时快照刷新完成（{snapshot['duration']}秒）")
+        return snapshot
+    
+    def _is_trading_day(self, today: date) -> bool:
+        """判断今天是否为交易日（按日期缓存）"""
+        if self._trading_day is None or self._trading_day[0] != today:
+            self._trading_day = (today, is_trading_day(today))
+        return self._trading_day[1]
+    
+    def _in_session(self, now: datetime) -> bool:
+        """当前是否处于交易日的交易时间内"""
+        return is_trading_time() and self._is_trading_day(now.date())
+    
+    def _should_refresh(self, now: datetime) -> bool:
+        """判断本轮是否需要刷新"""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot['fetched_at'].date() != now.date():
+            return True
+        if self._in_session(now):
+            return True
+        # 收盘（或午间休市）后补刷一次，之后保持最后一份快照
+        return snapshot['in_session']
+    
+    def _run(self):
+        """后台线程主循环"""
+        while not self._stop.is_set():
+            woken = self._wakeup.is_set()
+            self._wakeup.clear()
+            try:
+                if woken or self._should_refresh(get_utc8_now()):
+                    self.refresh()
+            except Exception as e:
+                logger.error(f"实时快照刷新失败: {str(e)}", exc_info=True)
+            self._wakeup.wait(self.interval_seconds)
+
+
+# 全局预取器实例
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_realtime_prefetcher() -> RealtimePrefetcher:
+    """获取预取器实例（单例模式，进程内所有会话共享），首次调用时启动后台线程"""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = RealtimePrefetcher()
+        _prefetcher.start()
+    return _prefetcher
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时任务调度器主节点选举（数据库租约）
+
+Flask 的每个 worker 和 Streamlit 进程都会创建调度器，为避免同一个 15:10 任务被多个进程重复执行，
+所有进程通过 scheduler_lease 表中的一行租约竞选主节点：
+- 租约未过期时只有持有者能续约；租约过期（或不存在）时任意进程都能通过一条条件 UPDATE（或 INSERT）抢到租约
+- 主节点每 renew_seconds 秒续约一次，租约有效期为 lease_seconds 秒
+- 主节点进程退出时主动释放租约；进程崩溃或与数据库失联时租约过期，其他进程在下一轮竞选中接管
+- 续约失败或本地计时超过租约有效期时立即降为观察者，不等待其他进程确认
+- 租约的过期判断和续约时间都使用数据库时间（每轮先查询一次数据库当前时间），不依赖各进程的本地时钟
+- 成为主节点时调用 on_elected 回调（调度器用来补跑主节点切换期间遗漏的定时任务）
+
+使用租约行而不是 PostgreSQL 会话级 advisory lock：Supabase 连接池（端口 6543）为事务模式，
+会话级锁无法跨事务保持；租约行对任意数据库和连接方式都有效，且可以直接查询当前主节点。
+"""
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from sqlalchemy import update, or_, case, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database.db import SessionLocal
+from models.scheduler_lease import SchedulerLease
+from config import Config
+from utils.time_utils import UTC8
+
+logger = logging.getLogger(__name__)
+
+
+def _db_now(db: Session) -> datetime:
+    """数据库当前时间（转换为不带时区的北京时间，与租约表的时间列一致）"""
+    value = db.execute(select(func.now())).scalar()
+    if value.tzinfo is None:
+        # SQLite 的 CURRENT_TIMESTAMP 为不带时区的 UTC 时间；PostgreSQL 的 now() 带时区
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(UTC8).replace(tzinfo=None)
+
+
+class SchedulerLeader:
+    """调度器主节点选举（后台守护线程定期竞选/续约）"""
+    
+    def __init__(self, name: str = 'sector_scheduler', lease_seconds: int = None, renew_seconds: int = None,
+                 on_elected: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            name: 调度器名称（同名调度器之间竞选）
+            lease_seconds: 租约有效期（秒），默认使用 Config.SCHEDULER_LEASE_SECONDS
+            renew_seconds: 竞选/续约间隔（秒），默认使用 Config.SCHEDULER_LEASE_RENEW_SECONDS
+            on_elected: 成为主节点时调用的回调（在竞选线程中调用，不能长时间阻塞，否则影响续约）
+        """
+        self.name = name
+        self.on_elected = on_elected
+        self.lease_seconds = int(lease_seconds if lease_seconds is not None else Config.SCHEDULER_LEASE_SECONDS)
+        renew_seconds = renew_seconds if renew_seconds is not None else Config.SCHEDULER_LEASE_RENEW_SECONDS
+        # 续约间隔不超过租约有效期的一半，保证一次续约失败后仍有机会在过期前续上
+        self.renew_seconds = max(min(float(renew_seconds), self.lease_seconds / 2), 0.1)
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        
+        # 本进程持有的租约在本地单调时钟上的截止时间（None 表示不是主节点）
+        self._deadline: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registered = False
+    
+    @property
+    def is_leader(self) -> bool:
+        """当前进程是否为主节点（本地计时超过租约有效期后视为已失去主节点身份）"""
+        deadline = self._deadline
+        return deadline is not None and time.monotonic() < deadline
+    
+    @property
+    def running(self) -> bool:
+        """后台线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def try_acquire(self) -> bool:
+        """
+        竞选或续约一次
+        
+        Returns:
+            本轮之后是否为主节点
+        """
+        # 以发起请求前的时间计算本地截止时间，数据库响应慢时只会提前失效
+        started = time.monotonic()
+        db = SessionLocal()
+        try:
+            now = _db_now(db)
+            expires_at = now + timedelta(seconds=self.lease_seconds)
+            # 自己持有或已过期的租约：一条条件 UPDATE 完成抢占/续约，并发时只有一个进程更新成功
+            result = db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    or_(SchedulerLease.holder == self.identity, SchedulerLease.expires_at <= now)
+                )
+                .values(
+                    holder=self.identity,
+                    acquired_at=case((SchedulerLease.holder == self.identity, SchedulerLease.acquired_at), else_=now),
+                    renewed_at=now,
+                    expires_at=expires_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            acquired = result.rowcount == 1
+            if not acquired and db.get(SchedulerLease, self.name) is None:
+                # 首次运行还没有租约行：插入成功即成为主节点，主键冲突说明其他进程先插入
+                db.add(SchedulerLease(
+                    name=self.name, holder=self.identity, acquired_at=now, renewed_at=now, expires_at=expires_at
+                ))
+                db.flush()
+                acquired = True
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            acquired = False
+        except Exception:
+            db.rollback()
+            self._set_leader(None)
+            raise
+        finally:
+            db.close()
+        
+        self._set_leader(started + self.lease_seconds if acquired else None)
+        return acquired
+    
+    def release(self):
+        """释放本进程持有的租约（立即过期，其他进程下一轮即可接管）"""
+        was_leader = self._deadline is not None
+        self._set_leader(None)
+        if not was_leader:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.identity)
+                .values(expires_at=_db_now(db))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            logger.info(f"🔓 已释放调度器主节点租约: {self.name}（{self.identity}）")
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ 释放调度器主节点租约失败（租约将在 {self.lease_seconds} 秒内过期）: {str(e)}")
+        finally:
+            db.close()
+    
+    def get_lease(self) -> Optional[Dict]:
+        """查询当前租约（观察者查看主节点使用），增加 'active'（是否未过期）"""
+        db = SessionLocal()
+        try:
+            lease = db.get(SchedulerLease, self.name)
+            if lease is None:
+                return None
+            result = lease.to_dict()
+            result['active'] = lease.expires_at > _db_now(db)
+            return result
+        finally:
+            db.close()
+    
+    def get_status(self) -> Dict:
+        """本进程的选举状态和当前租约"""
+        try:
+            lease = self.get_lease()
+        except Exception as e:
+            logger.warning(f"⚠️ 查询调度器主节点租约失败: {str(e)}")
+            lease = None
+        return {
+            'name': self.name,
+            'identity': self.identity,
+            'isLeader': self.is_leader,
+            'running': self.running,
+            'leaseSeconds': self.lease_seconds,
+            'lease': lease,
+        }
+    
+    def start(self):
+        """启动后台竞选线程（已启动时不重复启动），进程正常退出时释放租约"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'scheduler-leader-{self.name}', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+        logger.info(f"调度器主节点选举已启动: {self.identity}，租约 {self.lease_seconds} 秒，每 {self.renew_seconds} 秒续约")
+    
+    def stop(self):
+        """停止后台线程并释放租约"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.renew_seconds + 5)
+        self.release()
+    
+    def _set_leader(self, deadline: Optional[float]):
+        """更新主节点状态，身份变化时记录日志"""
+        was_leader = self.is_leader
+        self._deadline = deadline
+        if deadline is not None and not was_leader:
+            logger.info(f"👑 当前进程成为调度器主节点: {self.name}（{self.identity}）")
+            if self.on_elected is not None:
+                try:
+                    self.on_elected()
+                except Exception as e:
+                    logger.error(f"❌ 成为调度器主节点后的回调执行失败: {str(e)}", exc_info=True)
+        elif deadline is None and was_leader:
+            logger.warning(f"👀 当前进程不再是调度器主节点，转为观察者: {self.name}（{self.identity}）")
+    
+    def _run(self):
+        """后台线程主循环"""
+        while not self._stop.is_set():
+            try:
+                self.try_acquire()
+            except Exception as e:
+                logger.error(f"❌ 调度器主节点竞选/续约失败: {str(e)}")
+            self._stop.wait(self.renew_seconds)
@@ -3,8 +3,10 @@
 """
 板块数据定时任务调度器
 """
+import functools
 import logging
 from datetime import datetime, time, date, timedelta
+from typing import Callable, Dict, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 import sys
@@ -21,8 +23,15 @@ from services.zbgc_pool_history_service import ZbgcPoolHistoryService
 from services.dtgc_pool_history_service import DtgcPoolHistoryService
 from services.index_history_service import IndexHistoryService
 from services.scheduler_execution_service import SchedulerExecutionService
+from services.intraday_snapshot_service import IntradaySnapshotService
+from services.market_summary_service import MarketSummaryService
+from services.job_queue_service import JobQueueService, JOB_TYPES
 from utils.excel_export import append_sectors_to_excel
-from utils.time_utils import UTC8, get_utc8_date, get_utc8_now, get_data_date
+from utils.time_utils import UTC8, get_utc8_date, get_utc8_now, get_data_date, is_trading_time
+from utils.metrics import collect_stages, current_stage_breakdown
+from database.query_profiler import profile_unit
+from tasks.scheduler_leader import SchedulerLeader
+from config import Config
 import akshare as ak
 import traceback
 
@@ -33,21 +42,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 概念成分股刷新频率 -> (CronTrigger 参数, 任务名称)
+CONCEPT_MEMBERSHIP_TRIGGERS = {
+    'daily': ({'day_of_week': 'mon-fri', 'hour': 8, 'minute': 30}, '每个工作日08:30刷新概念成分股'),
+    'weekly': ({'day_of_week': 'sun', 'hour': 20, 'minute': 0}, '每周日20:00刷新概念成分股'),
+}
+
+# 每日收盘后执行的任务（调度器任务ID与执行记录的 job_id 相同）及触发时间，主节点切换后补跑当日遗漏的执行
+DAILY_CLOSE_JOB_IDS = ('save_daily_data', 'save_realtime_fund_flow_1510', 'save_all_stocks_fund_flow_1510')
+DAILY_CLOSE_TIME = time(15, 10)
+# 触发时间之后再检查一次当日执行记录的时间
+CATCH_UP_TIME = time(15, 15)
+
 class SectorScheduler:
     """板块数据定时任务调度器"""
     
-    def __init__(self):
+    def __init__(self, intraday_interval_minutes: int = None):
         # 使用UTC+8时区（北京时间）
         self.scheduler = BackgroundScheduler(timezone=UTC8)
         # 使用进程锁，防止多个实例同时运行
         self.scheduler.add_jobstore('memory', alias='default')
+        # 盘中快照采样间隔（分钟），0 表示关闭
+        if intraday_interval_minutes is None:
+            intraday_interval_minutes = Config.INTRADAY_SNAPSHOT_MINUTES
+        self.intraday_interval_minutes = intraday_interval_minutes
+        # 当日是否为交易日的缓存，避免盘中每次采样都请求交易日历
+        self._trading_day_cache = None
+        # 主节点选举：多个进程都启动调度器时只有主节点执行定时任务，其他进程只观察
+        # 成为主节点时补跑遗漏的收盘任务（原主节点在 15:10 前后退出时，租约过期前没有进程执行这些任务）
+        self.leader = SchedulerLeader(
+            'sector_scheduler', on_elected=self._schedule_catch_up
+        ) if Config.SCHEDULER_LEADER_ELECTION else None
         self._setup_jobs()
     
+    @property
+    def is_leader(self) -> bool:
+        """当前进程是否执行定时任务（未启用主节点选举时总是执行）"""
+        return self.leader is None or self.leader.is_leader
+    
+    def _leader_only(self, func):
+        """
+        包装定时任务：只在主节点上执行，观察者进程到点后跳过
+        
+        SCHEDULER_USE_JOB_QUEUE 开启时主节点不在本进程执行，而是提交到后台任务队列由工作进程执行。
+        原函数保存在 __wrapped__ 中，手动执行时直接调用原函数，不受主节点限制。
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.is_leader:
+                logger.info(f"👀 当前进程不是调度器主节点，跳过定时任务: {func.__name__}")
+                return None
+            if Config.SCHEDULER_USE_JOB_QUEUE and func.__name__ in JOB_TYPES:
+                db = SessionLocal()
+                try:
+                    job = JobQueueService.enqueue(db, func.__name__, enqueued_by='scheduler')
+                    logger.info(f"📥 定时任务 {func.__name__} 已提交到后台任务队列: #{job.id}")
+                finally:
+                    db.close()
+                return None
+            return func(*args, **kwargs)
+        return wrapper
+    
     def _setup_jobs(self):
         """设置定时任务"""
         # 每日15:10执行（北京时间）- 保存所有数据（收盘后最终数据）
         self.scheduler.add_job(
-            func=self.save_daily_data,
+            func=self._leader_only(self.save_daily_data),
             trigger=CronTrigger(hour=15, minute=10, timezone=UTC8),
             id='save_daily_data',
             name='每日15:10保存板块和股票池数据',
@@ -56,7 +116,7 @@ class SectorScheduler:
         
         # 每日15:10执行获取即时资金流数据（概念板块）
         self.scheduler.add_job(
-            func=self.save_realtime_fund_flow,
+            func=self._leader_only(self.save_realtime_fund_flow),
             trigger=CronTrigger(hour=15, minute=10, timezone=UTC8),
             id='save_realtime_fund_flow_1510',
             name='每日15:10获取即时资金流数据',
@@ -65,17 +125,114 @@ class SectorScheduler:
         
         # 每日15:10执行获取所有股票的资金流数据（从 stock_fund_flow_individual 接口）
         self.scheduler.add_job(
-            func=self.save_all_stocks_fund_flow,
+            func=self._leader_only(self.save_all_stocks_fund_flow),
             trigger=CronTrigger(hour=15, minute=10, timezone=UTC8),
             id='save_all_stocks_fund_flow_1510',
             name='每日15:10获取所有股票资金流数据',
             replace_existing=True
         )
         
+        # 15:10 之后再检查一次当日执行记录，补跑没有执行的收盘任务
+        self.scheduler.add_job(
+            func=self._leader_only(self.catch_up_missed_jobs),
+            trigger=CronTrigger(hour=CATCH_UP_TIME.hour, minute=CATCH_UP_TIME.minute, timezone=UTC8),
+            id='catch_up_missed_jobs',
+            name='每日15:15补跑遗漏的收盘任务',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+        
+        # 盘中快照采样（交易时间内每N分钟执行一次，只保存变化的数据）
+        if self.intraday_interval_minutes > 0:
+            self.scheduler.add_job(
+                func=self._leader_only(self.capture_intraday_snapshot),
+                trigger=CronTrigger(
+                    day_of_week='mon-fri',
+                    hour='9-11,13-14',
+                    minute=f'*/{self.intraday_interval_minutes}',
+                    timezone=UTC8
+                ),
+                id='capture_intraday_snapshot',
+                name=f'盘中每{self.intraday_interval_minutes}分钟采样板块和涨停股票池',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+        
+        # 每周六02:00执行分区维护（创建未来月分区，汇总并删除超过保留期限的明细）
+        self.scheduler.add_job(
+            func=self._leader_only(self.maintain_partitions),
+            trigger=CronTrigger(day_of_week='sat', hour=2, minute=0, timezone=UTC8),
+            id='maintain_partitions',
+            name='每周六02:00维护历史表分区',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+        
+        # 刷新概念成分股（daily：工作日08:30，weekly：每周日20:00）
+        self.concept_membership_schedule = Config.CONCEPT_MEMBERSHIP_SCHEDULE
+        if self.concept_membership_schedule in CONCEPT_MEMBERSHIP_TRIGGERS:
+            trigger_kwargs, job_name = CONCEPT_MEMBERSHIP_TRIGGERS[self.concept_membership_schedule]
+            self.scheduler.add_job(
+                func=self._leader_only(self.refresh_concept_membership),
+                trigger=CronTrigger(timezone=UTC8, **trigger_kwargs),
+                id='refresh_concept_membership',
+                name=job_name,
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+        
         logger.info("定时任务已设置：")
         logger.info("  - 每日15:10（北京时间）执行数据保存（板块、涨停、炸板、跌停、指数）")
         logger.info("  - 每日15:10（北京时间）获取即时资金流数据（概念板块）")
         logger.info("  - 每日15:10（北京时间）获取所有股票资金流数据（stock_fund_flow_individual接口）")
+        logger.info("  - 每日15:15（北京时间）及成为主节点时补跑当日遗漏的收盘任务")
+        if self.intraday_interval_minutes > 0:
+            logger.info(f"  - 交易时间内每{self.intraday_interval_minutes}分钟（北京时间）采样盘中快照（板块、概念资金流、涨停股票池）")
+        logger.info("  - 每周六02:00（北京时间）维护历史表分区")
+        if self.concept_membership_schedule in CONCEPT_MEMBERSHIP_TRIGGERS:
+            logger.info(f"  - {CONCEPT_MEMBERSHIP_TRIGGERS[self.concept_membership_schedule][1]}（北京时间）")
+    
+    def _schedule_catch_up(self):
+        """成为主节点时的回调：在调度器线程池中补跑遗漏的收盘任务，不阻塞竞选线程的续约"""
+        self.scheduler.add_job(
+            func=self.catch_up_missed_jobs,
+            id='catch_up_missed_jobs_on_elected',
+            name='成为主节点后补跑遗漏的收盘任务',
+            replace_existing=True
+        )
+    
+    def catch_up_missed_jobs(self) -> list:
+        """
+        补跑当日遗漏的收盘任务
+        
+        当日已过 15:10 且 scheduler_execution 中没有某个收盘任务的当日执行记录（任意状态）时，
+        把该任务的下次执行时间改为现在，由调度器立即执行（经过 _leader_only 包装，开启任务队列时提交到队列）。
+        任务正在本进程执行时调度器按 max_instances 跳过，不会重复执行。
+        
+        Returns:
+            补跑的任务ID列表
+        """
+        if not self.is_leader:
+            return []
+        now = get_utc8_now()
+        if now.time() < DAILY_CLOSE_TIME:
+            return []
+        
+        db = SessionLocal()
+        try:
+            executed = {execution.job_id for execution in SchedulerExecutionService.get_executions_by_date(db, now.date())}
+        finally:
+            db.close()
+        
+        missed = [job_id for job_id in DAILY_CLOSE_JOB_IDS if job_id not in executed]
+        for job_id in missed:
+            logger.warning(f"⏰ 今日 ({now.date()}，北京时间) 没有 {job_id} 的执行记录，立即补跑")
+            self.scheduler.modify_job(job_id, next_run_time=now)
+        return missed
     
     def _is_trading_day(self, target_date: date) -> bool:
         """
@@ -110,14 +267,55 @@ class SectorScheduler:
             logger.warning(f"无法判断交易日，默认执行: {str(e)}")
             return True  # 如果出错，默认执行
     
-    def save_daily_data(self):
+    def _is_trading_day_cached(self, target_date: date) -> bool:
+        """检查是否为交易日（按日期缓存结果，供盘中高频任务使用）"""
+        if self._trading_day_cache is None or self._trading_day_cache[0] != target_date:
+            self._trading_day_cache = (target_date, self._is_trading_day(target_date))
+        return self._trading_day_cache[1]
+    
+    @profile_unit('job:capture_intraday_snapshot')
+    def capture_intraday_snapshot(self):
+        """
+        盘中快照采样 - 交易时间内每N分钟执行
+        
+        逻辑说明：
+        1. 非交易日或不在交易时间内（9:30-11:30, 13:00-15:00）直接跳过
+        2. 依次采样行业板块、概念板块资金流和涨停股票池
+        3. 只保存相对上一个采样时间点发生变化的实体和字段
+        """
+        today = get_utc8_date()
+        if not is_trading_time() or not self._is_trading_day_cached(today):
+            return
+        
+        tick = get_utc8_now().time().replace(second=0, microsecond=0)
+        db = SessionLocal()
+        try:
+            for dataset in IntradaySnapshotService.DATASETS.keys():
+                try:
+                    changed = IntradaySnapshotService.capture_tick(db, dataset, target_date=today, tick=tick)
+                    logger.info(f"✅ 盘中快照 {dataset} ({tick}): 写入 {changed} 条增量")
+                except Exception as e:
+                    logger.error(f"❌ 盘中快照 {dataset} ({tick}) 采样失败: {str(e)}", exc_info=True)
+        finally:
+            db.close()
+    
+    @collect_stages()
+    @profile_unit('job:save_daily_data')
+    def save_daily_data(self, force: bool = False, progress: Optional[Callable[[float, str], None]] = None) -> Dict:
         """
         保存每日数据到 Supabase 数据库（板块、涨停、炸板、跌停、指数）
         
         逻辑说明：
         1. 获取实时数据（AKShare API 只能获取实时数据）
         2. 保存日期使用当日交易日（如果今天是交易日用今天，否则用上一个交易日）
-        3. 如果今天不是交易日，跳过保存
+        3. 如果今天不是交易日，跳过保存（force=True 时强制执行）
+        
+        Args:
+            force: 跳过交易日检查（手动执行时使用）
+            progress: 进度回调 progress(0-1, 说明)，后台任务队列用于更新进度
+        
+        Returns:
+            {'status', 'dataDate', 'errorMessage', 各数据集保存条数...}
         """
         job_id = 'save_daily_data'
         job_name = '每日15:10保存板块和股票池数据'
@@ -138,17 +336,20 @@ class SectorScheduler:
             'dtgc_pool_count': 0,
             'index_count': 0,
         }
+        # 变化检测写入的数据集实际写入（新增、更新、删除）的行数
+        changed_rows = {}
         
         error_message = None
         error_traceback = None
         status = 'success'
+        report = progress or (lambda fraction, message: None)
         
         try:
             logger.info("=" * 60)
             logger.info("开始执行每日数据保存任务（保存到 Supabase 数据库）...")
             
             # 检查是否为交易日（基于北京时间判断）
-            if not is_trading:
+            if not is_trading and not force:
                 logger.info(f"今日 ({today}，北京时间) 不是交易日，跳过数据保存")
                 logger.info(f"上一个交易日（北京时间）: {data_date}")
                 status = 'skipped'
@@ -168,7 +369,8 @@ class SectorScheduler:
                     )
                 finally:
                     db.close()
-                return
+                return {'status': status, 'dataDate': data_date.isoformat(), 'errorMessage': None,
+                        'changedRows': changed_rows, **stats}
             
             # 记录保存的日期信息（所有日期均基于北京时间UTC+8）
             logger.info(f"📅 当前日期（北京时间）: {today}, 保存日期（当日交易日，北京时间）: {data_date}")
@@ -194,10 +396,12 @@ class SectorScheduler:
                 logger.info(f"💡 说明: 获取的是实时数据，保存日期为当日交易日 ({data_date}，北京时间)")
                 
                 # 1. 保存行业板块数据到 Supabase（使用当日交易日）
+                report(0.0, '保存行业板块数据')
                 try:
-                    saved_count = SectorHistoryService.save_today_sectors(db, sector_type='industry', target_date=data_date)
-                    stats['industry_sectors_count'] = saved_count
-                    logger.info(f"✅ 成功保存 {saved_count} 条行业板块数据到 Supabase 数据库 (日期: {data_date})")
+                    result = SectorHistoryService.save_today_sectors(db, sector_type='industry', target_date=data_date, refresh_summary=False)
+                    stats['industry_sectors_count'] = result.total
+                    changed_rows['industry'] = result.changed
+                    logger.info(f"✅ 成功保存 {result.total} 条行业板块数据到 Supabase 数据库 (日期: {data_date}，实际写入 {result.changed} 行)")
                     
                     # 追加到Excel文件
                     excel_file = append_sectors_to_excel()
@@ -209,10 +413,12 @@ class SectorScheduler:
                         error_message = f"保存行业板块数据失败: {str(e)}"
                 
                 # 1.1 保存概念板块数据到 Supabase（使用当日交易日）
+                report(1 / 7, '保存概念板块数据')
                 try:
-                    concept_count = SectorHistoryService.save_today_sectors(db, sector_type='concept', target_date=data_date)
-                    stats['concept_sectors_count'] = concept_count
-                    logger.info(f"✅ 成功保存 {concept_count} 条概念板块数据到 Supabase 数据库 (日期: {data_date})")
+                    result = SectorHistoryService.save_today_sectors(db, sector_type='concept', target_date=data_date, refresh_summary=False)
+                    stats['concept_sectors_count'] = result.total
+                    changed_rows['concept'] = result.changed
+                    logger.info(f"✅ 成功保存 {result.total} 条概念板块数据到 Supabase 数据库 (日期: {data_date}，实际写入 {result.changed} 行)")
                 except Exception as e:
                     logger.error(f"❌ 保存概念板块数据到 Supabase 失败: {str(e)}", exc_info=True)
                     if status == 'success':
@@ -220,10 +426,12 @@ class SectorScheduler:
                         error_message = f"保存概念板块数据失败: {str(e)}"
                 
                 # 2. 保存涨停股票池数据到 Supabase（使用当日交易日）
+                report(2 / 7, '保存涨停股票池数据')
                 try:
-                    zt_count = ZtPoolHistoryService.save_today_zt_pool(db, target_date=data_date)
-                    stats['zt_pool_count'] = zt_count
-                    logger.info(f"✅ 成功保存 {zt_count} 条涨停股票数据到 Supabase 数据库 (日期: {data_date})")
+                    result = ZtPoolHistoryService.save_today_zt_pool(db, target_date=data_date, refresh_summary=False)
+                    stats['zt_pool_count'] = result.total
+                    changed_rows['zt_pool'] = result.changed
+                    logger.info(f"✅ 成功保存 {result.total} 条涨停股票数据到 Supabase 数据库 (日期: {data_date}，实际写入 {result.changed} 行)")
                 except Exception as e:
                     logger.error(f"❌ 保存涨停股票数据到 Supabase 失败: {str(e)}", exc_info=True)
                     if status == 'success':
@@ -231,8 +439,9 @@ class SectorScheduler:
                         error_message = f"保存涨停股票数据失败: {str(e)}"
                 
                 # 3. 保存炸板股票池数据到 Supabase（使用当日交易日）
+                report(3 / 7, '保存炸板股票池数据')
                 try:
-                    zbgc_count = ZbgcPoolHistoryService.save_today_zbgc_pool(db, target_date=data_date)
+                    zbgc_count = ZbgcPoolHistoryService.save_today_zbgc_pool(db, target_date=data_date, refresh_summary=False)
                     stats['zbgc_pool_count'] = zbgc_count
                     logger.info(f"✅ 成功保存 {zbgc_count} 条炸板股票数据到 Supabase 数据库 (日期: {data_date})")
                 except Exception as e:
@@ -242,8 +451,9 @@ class SectorScheduler:
                         error_message = f"保存炸板股票数据失败: {str(e)}"
                 
                 # 4. 保存跌停股票池数据到 Supabase（使用当日交易日）
+                report(4 / 7, '保存跌停股票池数据')
                 try:
-                    dtgc_count = DtgcPoolHistoryService.save_today_dtgc_pool(db, target_date=data_date)
+                    dtgc_count = DtgcPoolHistoryService.save_today_dtgc_pool(db, target_date=data_date, refresh_summary=False)
                     stats['dtgc_pool_count'] = dtgc_count
                     logger.info(f"✅ 成功保存 {dtgc_count} 条跌停股票数据到 Supabase 数据库 (日期: {data_date})")
                 except Exception as e:
@@ -253,16 +463,27 @@ class SectorScheduler:
                         error_message = f"保存跌停股票数据失败: {str(e)}"
                 
                 # 5. 保存指数数据到 Supabase（使用当日交易日）
+                report(5 / 7, '保存指数数据')
                 try:
-                    index_count = IndexHistoryService.save_today_indices(db, target_date=data_date)
-                    stats['index_count'] = index_count
-                    logger.info(f"✅ 成功保存 {index_count} 条指数数据到 Supabase 数据库 (日期: {data_date})")
+                    result = IndexHistoryService.save_today_indices(db, target_date=data_date, refresh_summary=False)
+                    stats['index_count'] = result.total
+                    changed_rows['index'] = result.changed
+                    logger.info(f"✅ 成功保存 {result.total} 条指数数据到 Supabase 数据库 (日期: {data_date}，实际写入 {result.changed} 行)")
                 except Exception as e:
                     logger.error(f"❌ 保存指数数据到 Supabase 失败: {str(e)}", exc_info=True)
                     if status == 'success':
                         status = 'failed'
                         error_message = f"保存指数数据失败: {str(e)}"
                 
+                # 6. 根据当日明细计算每日市场概况（派生数据，失败不影响任务状态）
+                report(6 / 7, '更新每日市场概况')
+                try:
+                    MarketSummaryService.refresh_summary(db, data_date)
+                    logger.info(f"✅ 已更新每日市场概况 (日期: {data_date})")
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"❌ 更新每日市场概况失败: {str(e)}", exc_info=True)
+                
                 logger.info("=" * 60)
                 logger.info(f"✅ 每日数据保存任务完成，所有数据已保存到 Supabase 数据库")
                 logger.info(f"📅 保存日期（当日交易日，北京时间）: {data_date}")
@@ -298,6 +519,8 @@ class SectorScheduler:
                         error_traceback=error_traceback,
                         is_trading_day=is_trading,
                         notes=f"总耗时: {duration:.2f}秒 | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}"
+                              + (f" | 实际写入行数: {', '.join(f'{name}={count}' for name, count in changed_rows.items())}" if changed_rows else ""),
+                        stage_breakdown=current_stage_breakdown()
                     )
                     logger.info(f"✅ 执行记录已保存到数据库")
                 except Exception as e:
@@ -307,6 +530,8 @@ class SectorScheduler:
                 
         except Exception as e:
             logger.error(f"定时任务执行失败: {str(e)}", exc_info=True)
+            status = 'failed'
+            error_message = str(e)
             # 记录失败执行
             execution_end_time = get_utc8_now()
             duration = (execution_end_time - execution_start_time).total_seconds()
@@ -323,11 +548,17 @@ class SectorScheduler:
                     error_message=str(e),
                     error_traceback=traceback.format_exc(),
                     is_trading_day=is_trading,
-                    notes="任务执行异常"
+                    notes="任务执行异常",
+                    stage_breakdown=current_stage_breakdown()
                 )
             finally:
                 db.close()
+        
+        return {'status': status, 'dataDate': data_date.isoformat(), 'errorMessage': error_message,
+                'changedRows': changed_rows, **stats}
     
+    @collect_stages()
+    @profile_unit('job:save_realtime_fund_flow')
     def save_realtime_fund_flow(self):
         """
         保存即时资金流数据到 Supabase 数据库（概念板块）- 每日15:10执行
@@ -405,8 +636,8 @@ class SectorScheduler:
                 
                 # 保存概念板块即时资金流数据到 Supabase（使用当日交易日）
                 try:
-                    concept_count = SectorHistoryService.save_today_sectors(db, sector_type='concept', target_date=data_date)
-                    logger.info(f"✅ 成功保存 {concept_count} 条概念板块即时资金流数据到 Supabase 数据库 (日期: {data_date})")
+                    result = SectorHistoryService.save_today_sectors(db, sector_type='concept', target_date=data_date)
+                    logger.info(f"✅ 成功保存 {result.total} 条概念板块即时资金流数据到 Supabase 数据库 (日期: {data_date}，实际写入 {result.changed} 行)")
                 except Exception as e:
                     logger.error(f"❌ 保存概念板块即时资金流数据到 Supabase 失败: {str(e)}", exc_info=True)
                 
@@ -439,7 +670,8 @@ class SectorScheduler:
                         error_message=error_message,
                         error_traceback=error_traceback,
                         is_trading_day=is_trading,
-                        notes=f"总耗时: {duration:.2f}秒 | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}"
+                        notes=f"总耗时: {duration:.2f}秒 | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}",
+                        stage_breakdown=current_stage_breakdown()
                     )
                     logger.info(f"✅ 执行记录已保存到数据库")
                 except Exception as e:
@@ -465,11 +697,14 @@ class SectorScheduler:
                     error_message=str(e),
                     error_traceback=traceback.format_exc(),
                     is_trading_day=is_trading,
-                    notes="任务执行异常"
+                    notes="任务执行异常",
+                    stage_breakdown=current_stage_breakdown()
                 )
             finally:
                 db.close()
     
+    @collect_stages()
+    @profile_unit('job:save_stock_fund_flow')
     def save_stock_fund_flow(self):
         """
         保存个股资金流数据（即时数据）- 每日15:10执行
@@ -602,7 +837,8 @@ class SectorScheduler:
                         error_message=error_message,
                         error_traceback=error_traceback,
                         is_trading_day=is_trading,
-                        notes=f"总耗时: {duration:.2f}秒 | 成功: {success_count} | 失败: {failed_count} | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}"
+                        notes=f"总耗时: {duration:.2f}秒 | 成功: {success_count} | 失败: {failed_count} | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}",
+                        stage_breakdown=current_stage_breakdown()
                     )
                     logger.info(f"✅ 执行记录已保存到数据库")
                 except Exception as e:
@@ -627,11 +863,14 @@ class SectorScheduler:
                     error_message=str(e),
                     error_traceback=traceback.format_exc(),
                     is_trading_day=is_trading,
-                    notes="任务执行异常"
+                    notes="任务执行异常",
+                    stage_breakdown=current_stage_breakdown()
                 )
             finally:
                 db.close()
     
+    @collect_stages()
+    @profile_unit('job:save_all_stocks_fund_flow')
     def save_all_stocks_fund_flow(self):
         """
         保存所有股票的资金流数据（从 stock_fund_flow_individual 接口）- 每日15:10执行
@@ -752,7 +991,8 @@ class SectorScheduler:
                         error_message=error_message,
                         error_traceback=error_traceback,
                         is_trading_day=is_trading,
-                        notes=f"总耗时: {duration:.2f}秒 | 成功: {success_count} | 失败: {failed_count} | 总计: {total_count} | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}"
+                        notes=f"总耗时: {duration:.2f}秒 | 成功: {success_count} | 失败: {failed_count} | 总计: {total_count} | 保存日期（当日交易日，北京时间）: {data_date} | 执行日期（北京时间）: {today}",
+                        stage_breakdown=current_stage_breakdown()
                     )
                     logger.info(f"✅ 执行记录已保存到数据库")
                 except Exception as e:
@@ -777,19 +1017,130 @@ class SectorScheduler:
                     error_message=str(e),
                     error_traceback=traceback.format_exc(),
                     is_trading_day=is_trading,
-                    notes="任务执行异常"
+                    notes="任务执行异常",
+                    stage_breakdown=current_stage_breakdown()
+                )
+            finally:
+                db.close()
+    
+    @collect_stages()
+    @profile_unit('job:maintain_partitions')
+    def maintain_partitions(self):
+        """维护历史表分区 - 每周六02:00执行（见 PartitionService.maintain）"""
+        job_id = 'maintain_partitions'
+        job_name = '每周六02:00维护历史表分区'
+        execution_start_time = get_utc8_now()
+        today = get_utc8_date()
+        status = 'success'
+        error_message = None
+        error_traceback = None
+        notes = None
+        
+        db = SessionLocal()
+        try:
+            from services.partition_service import PartitionService
+            logger.info("开始维护历史表分区...")
+            summary = PartitionService.maintain(db, today=today)
+            notes = ' | '.join(
+                f"{table_name}: 新建分区{len(item['created'])} 汇总{item['rolled_up_weeks']}周 "
+                f"删除分区{len(item['dropped_partitions'])} 删除明细{item['deleted_rows']}行"
+                for table_name, item in summary.items()
+            )
+            logger.info(f"✅ 历史表分区维护完成: {notes}")
+        except Exception as e:
+            logger.error(f"历史表分区维护失败: {str(e)}", exc_info=True)
+            db.rollback()
+            status = 'failed'
+            error_message = str(e)
+            error_traceback = traceback.format_exc()
+        finally:
+            try:
+                SchedulerExecutionService.create_execution(
+                    db=db,
+                    job_id=job_id,
+                    job_name=job_name,
+                    execution_date=today,
+                    execution_time=execution_start_time,
+                    status=status,
+                    duration_seconds=(get_utc8_now() - execution_start_time).total_seconds(),
+                    error_message=error_message,
+                    error_traceback=error_traceback,
+                    notes=notes,
+                    stage_breakdown=current_stage_breakdown()
                 )
+            except Exception as e:
+                logger.error(f"❌ 保存执行记录失败: {str(e)}", exc_info=True)
+            finally:
+                db.close()
+    
+    @collect_stages()
+    @profile_unit('job:refresh_concept_membership')
+    def refresh_concept_membership(self):
+        """刷新概念成分股（见 ConceptMembershipService.refresh）"""
+        job_id = 'refresh_concept_membership'
+        job_name = CONCEPT_MEMBERSHIP_TRIGGERS.get(self.concept_membership_schedule, (None, '刷新概念成分股'))[1]
+        execution_start_time = get_utc8_now()
+        today = get_utc8_date()
+        status = 'success'
+        error_message = None
+        error_traceback = None
+        notes = None
+        
+        db = SessionLocal()
+        try:
+            from services.concept_membership_service import ConceptMembershipService
+            logger.info("开始刷新概念成分股...")
+            summary = ConceptMembershipService.refresh(db)
+            notes = (
+                f"概念{summary['concepts']}个 变化{summary['changed']}个 新增{summary['added']} "
+                f"移除{summary['removed']} 下线{summary['stale_removed']} 失败{summary['failed']}"
+            )
+            if summary['failed']:
+                # 部分概念失败时保留已有成分股，下次刷新重试；全部失败时记为失败
+                if summary['failed'] >= summary['concepts']:
+                    status = 'failed'
+                error_message = '; '.join(
+                    f"{item['concept']}: {item['error']}" for item in summary['failures'][:20]
+                )
+            logger.info(f"✅ 概念成分股刷新完成: {notes}")
+        except Exception as e:
+            logger.error(f"概念成分股刷新失败: {str(e)}", exc_info=True)
+            db.rollback()
+            status = 'failed'
+            error_message = str(e)
+            error_traceback = traceback.format_exc()
+        finally:
+            try:
+                SchedulerExecutionService.create_execution(
+                    db=db,
+                    job_id=job_id,
+                    job_name=job_name,
+                    execution_date=today,
+                    execution_time=execution_start_time,
+                    status=status,
+                    duration_seconds=(get_utc8_now() - execution_start_time).total_seconds(),
+                    error_message=error_message,
+                    error_traceback=error_traceback,
+                    notes=notes,
+                    stage_breakdown=current_stage_breakdown()
+                )
+            except Exception as e:
+                logger.error(f"❌ 保存执行记录失败: {str(e)}", exc_info=True)
             finally:
                 db.close()
     
     def start(self):
-        """启动调度器"""
+        """启动调度器（启用主节点选举时同时开始竞选，成为主节点后才执行定时任务）"""
         self.scheduler.start()
+        if self.leader is not None:
+            self.leader.start()
         logger.info("板块数据定时任务调度器已启动")
     
     def shutdown(self):
-        """关闭调度器"""
+        """关闭调度器（释放主节点租约，其他进程下一轮竞选即可接管）"""
         self.scheduler.shutdown()
+        if self.leader is not None:
+            self.leader.stop()
         logger.info("板块数据定时任务调度器已关闭")
 
 # 全局调度器实例
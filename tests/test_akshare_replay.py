@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+import akshare as ak
+from utils.akshare_replay import AkshareRecorder, FixtureNotFoundError, InjectedError, parse_latency
+
+class TestAkshareReplay:
+    """akshare 录制/回放测试（不访问网络）"""
+    
+    @pytest.fixture
+    def fake_pool(self, monkeypatch):
+        """用本地函数代替 akshare 接口"""
+        calls = []
+        
+        def stock_zt_pool_em(date):
+            calls.append(date)
+            return pd.DataFrame({'代码': ['000001', '600000'], '名称': ['平安银行', '浦发银行'], '涨跌幅': [10.01, 9.98]})
+        
+        monkeypatch.setattr(ak, 'stock_zt_pool_em', stock_zt_pool_em)
+        return calls
+    
+    def test_record_then_replay(self, tmp_path, fake_pool):
+        """测试录制后离线回放"""
+        recorder = AkshareRecorder(mode='record', fixture_dir=tmp_path, functions=['stock_zt_pool_em'])
+        recorder.install()
+        try:
+            recorded = ak.stock_zt_pool_em(date='20240506')
+        finally:
+            recorder.uninstall()
+        assert fake_pool == ['20240506']
+        assert (tmp_path / 'stock_zt_pool_em' / 'index.json').exists()
+        
+        replayer = AkshareRecorder(mode='replay', fixture_dir=tmp_path, functions=['stock_zt_pool_em'])
+        replayer.install()
+        try:
+            replayed = ak.stock_zt_pool_em(date='20240506')
+            with pytest.raises(FixtureNotFoundError):
+                ak.stock_zt_pool_em(date='20240507')
+        finally:
+            replayer.uninstall()
+        assert fake_pool == ['20240506']
+        pd.testing.assert_frame_equal(replayed, recorded)
+        assert replayer.stats['stock_zt_pool_em']['replayed'] == 1
+        assert replayer.stats['stock_zt_pool_em']['missing'] == 1
+    
+    def test_error_injection(self, tmp_path, fake_pool):
+        """测试错误注入"""
+        replayer = AkshareRecorder(mode='replay', fixture_dir=tmp_path, error_rate=1.0, seed=1, functions=['stock_zt_pool_em'])
+        replayer.install()
+        try:
+            with pytest.raises(InjectedError):
+                ak.stock_zt_pool_em(date='20240506')
+        finally:
+            replayer.uninstall()
+        assert fake_pool == []
+    
+    def test_parse_latency(self):
+        """测试延迟配置解析"""
+        assert parse_latency(None) == (0.0, 0.0)
+        assert parse_latency('0.5') == (0.5, 0.5)
+        assert parse_latency('0.2-1.5') == (0.2, 1.5)
@@ -0,0 +1,67 @@
+import io
+import json
+from datetime import date
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.columnar import (
+    to_columns, encode_arrow, encode_parquet, decode_table, iter_ndjson, iter_arrow_stream, iter_parquet
+)
+
+DATASETS = {
+    'zt_pool': [
+        {'code': '000001', 'name': '测试A', 'continuousBoards': 1, 'changePercent': 10.0},
+        {'code': '000002', 'name': None, 'continuousBoards': 3, 'changePercent': 9.98},
+    ],
+    'dt_pool': [],
+}
+
+class TestColumnar:
+    """快照列式编码测试"""
+    
+    def test_to_columns(self):
+        """测试行式记录转换为列式"""
+        columns = to_columns(DATASETS['zt_pool'])
+        assert list(columns) == ['code', 'name', 'continuousBoards', 'changePercent']
+        assert columns['continuousBoards'] == [1, 3]
+        assert columns['name'] == ['测试A', None]
+        assert to_columns([]) == {}
+    
+    def test_arrow_and_parquet_round_trip(self):
+        """测试 Arrow IPC 和 Parquet 编码后还原为 DataFrame"""
+        for table in (
+            pa.ipc.open_stream(encode_arrow(DATASETS)).read_all(),
+            pq.read_table(io.BytesIO(encode_parquet(DATASETS))),
+        ):
+            frames = decode_table(table)
+            assert list(frames) == ['zt_pool', 'dt_pool']
+            assert frames['zt_pool']['code'].tolist() == ['000001', '000002']
+            assert frames['zt_pool']['continuousBoards'].tolist() == [1, 3]
+            assert frames['dt_pool'].empty
+    
+    def test_streaming_encoders(self):
+        """测试按块流式编码：每块产出字节，拼接后可完整读取"""
+        schema = pa.schema([('code', pa.string()), ('date', pa.date32()), ('changePercent', pa.float64())])
+        chunks = [
+            [{'code': '000001', 'date': date(2024, 1, 2), 'changePercent': 1.5}],
+            [],
+            [{'code': '000002', 'date': date(2024, 1, 3), 'changePercent': None}],
+        ]
+        
+        lines = b''.join(iter_ndjson(chunks)).decode('utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {'code': '000001', 'date': '2024-01-02', 'changePercent': 1.5},
+            {'code': '000002', 'date': '2024-01-03', 'changePercent': None},
+        ]
+        
+        arrow_parts = list(iter_arrow_stream(schema, chunks))
+        parquet_parts = list(iter_parquet(schema, chunks))
+        assert len(arrow_parts) >= 2 and len(parquet_parts) >= 2
+        for table in (
+            pa.ipc.open_stream(b''.join(arrow_parts)).read_all(),
+            pq.read_table(pa.BufferReader(b''.join(parquet_parts))),
+        ):
+            assert table.schema.equals(schema)
+            assert table.column('code').to_pylist() == ['000001', '000002']
+            assert table.column('date').to_pylist() == [date(2024, 1, 2), date(2024, 1, 3)]
+        
+        assert pq.read_table(pa.BufferReader(b''.join(iter_parquet(schema, [])))).num_rows == 0
@@ -0,0 +1,80 @@
+import pytest
+from datetime import date
+from services.concept_membership_service import ConceptMembershipService, ConceptMembershipIndex
+from database.db import SessionLocal, Base, engine
+from models.concept_membership import ConceptMembership
+from models.dimension import DimensionCache
+from models.zt_pool_history import ZtPoolHistory
+from models.stock_fund_flow_history import StockFundFlowHistory
+
+# 使用很早的日期和测试专用的概念名称，避免影响真实数据
+TEST_DATE = date(1991, 1, 7)
+CONCEPTS = ['测试概念A', '测试概念B']
+
+def make_zt(index, code):
+    """构造一条涨停股票池历史记录"""
+    return ZtPoolHistory(
+        date=TEST_DATE, index=index, code=code, name=f'测试股票{index}', change_percent=10.0,
+        latest_price=10.0, turnover=1.0, circulating_market_value=10.0, total_market_value=10.0,
+        turnover_rate=1.0, sealing_funds=1.0, explosion_count=0, continuous_boards=1
+    )
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    concept_ids = list(DimensionCache.resolve_ids(db, 'sector', CONCEPTS).values())
+    db.query(ConceptMembership).filter(ConceptMembership.concept_id.in_(concept_ids)).delete(synchronize_session=False)
+    for model in (ZtPoolHistory, StockFundFlowHistory):
+        db.query(model).filter(model.date == TEST_DATE).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+    ConceptMembershipIndex.invalidate()
+
+class TestConceptMembershipService:
+    """概念成分股测试"""
+    
+    def test_apply_membership_writes_only_changes(self, db_session):
+        """测试刷新成分股时只插入新增、删除移除的成分股"""
+        assert ConceptMembershipService.apply_membership(db_session, CONCEPTS[0], ['900001', '900002']) == (2, 0)
+        db_session.commit()
+        assert ConceptMembershipService.apply_membership(db_session, CONCEPTS[0], ['900001', '900002']) == (0, 0)
+        assert ConceptMembershipService.apply_membership(db_session, CONCEPTS[0], ['900002', '900003']) == (1, 1)
+        db_session.commit()
+        
+        ConceptMembershipIndex.invalidate()
+        assert ConceptMembershipService.get_concept_stocks(db_session, CONCEPTS[0]) == ['900002', '900003']
+        assert ConceptMembershipService.get_stock_concepts(db_session, '900001') == []
+    
+    def test_pool_concepts(self, db_session):
+        """测试倒排索引关联涨停股票池和个股资金流"""
+        ConceptMembershipService.apply_membership(db_session, CONCEPTS[0], ['900001', '900002', '900003'])
+        ConceptMembershipService.apply_membership(db_session, CONCEPTS[1], ['900001', '900004'])
+        db_session.add_all([make_zt(1, '900001'), make_zt(2, '900002'), make_zt(3, '900004')])
+        db_session.add_all([
+            StockFundFlowHistory(date=TEST_DATE, stock_code='900001', net_amount=100.0),
+            StockFundFlowHistory(date=TEST_DATE, stock_code='900003', net_amount=-30.0),
+        ])
+        db_session.commit()
+        ConceptMembershipIndex.invalidate()
+        
+        assert ConceptMembershipService.get_stock_concepts(db_session, '900001') == sorted(CONCEPTS)
+        concepts = [
+            item for item in ConceptMembershipService.get_pool_concepts(db_session, TEST_DATE, top=None)
+            if item['concept'] in CONCEPTS
+        ]
+        # 命中数相同时成分股少的概念在前
+        assert [(item['concept'], item['count'], item['memberCount']) for item in concepts] == [
+            (CONCEPTS[1], 2, 2), (CONCEPTS[0], 2, 3)
+        ]
+        by_name = {item['concept']: item for item in concepts}
+        assert by_name[CONCEPTS[0]]['stockCodes'] == ['900001', '900002']
+        assert by_name[CONCEPTS[0]]['memberNetAmount'] == 70.0
+        assert by_name[CONCEPTS[1]]['memberNetAmount'] == 100.0
+        assert by_name[CONCEPTS[0]]['changePercent'] is None
+        
+        with pytest.raises(ValueError):
+            ConceptMembershipService.get_pool_concepts(db_session, TEST_DATE, pool='unknown')
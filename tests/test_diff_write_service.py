@@ -0,0 +1,136 @@
+import pytest
+from datetime import date, datetime
+from services.diff_write_service import DiffWriteService
+from services.index_history_service import IndexHistoryService
+from services.stock_index_service import StockIndexService
+from database.db import SessionLocal, Base, engine
+from models.index_history import IndexHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zt_ladder import ZtLadderDaily
+from services.zt_pool_history_service import ZtPoolHistoryService
+from services.zt_pool_service import ZtPoolService
+
+TEST_DATE = date(1991, 3, 4)
+SCOPE = {'date': TEST_DATE}
+
+def make_index(code, price, **kwargs):
+    """构造一条指数历史记录"""
+    values = dict(
+        code=code, name=None, current_price=price, change_percent=1.0, change=1.0, volume=100.0, amount=1000.0,
+        open=price, high=price, low=price, prev_close=price, amplitude=0.0, volume_ratio=1.0
+    )
+    values.update(kwargs)
+    return IndexHistory(**values)
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    for model in (IndexHistory, ZtPoolHistory, ZtLadderDaily):
+        db.query(model).filter(model.date == TEST_DATE).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestDiffWriteService:
+    """变化检测写入测试"""
+    
+    def test_only_changed_rows_written(self, db_session):
+        """测试重复保存时只写入新增、变化和消失的行"""
+        first = DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000002', 20.0)], ('code',)
+        )
+        db_session.commit()
+        assert (first.inserted, first.changed) == (2, 2)
+        unchanged_id = db_session.query(IndexHistory.id).filter(
+            IndexHistory.date == TEST_DATE, IndexHistory.code == '000001'
+        ).scalar()
+        
+        same = DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000002', 20.0)], ('code',)
+        )
+        db_session.commit()
+        assert same.changed == 0 and same.unchanged == 2
+        
+        result = DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000003', 30.0)], ('code',)
+        )
+        db_session.commit()
+        assert (result.inserted, result.updated, result.deleted, result.unchanged) == (1, 0, 1, 1)
+        
+        result = DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000003', 31.0)], ('code',)
+        )
+        db_session.commit()
+        assert (result.updated, result.changed) == (1, 1)
+        
+        db_session.expire_all()
+        rows = {row.code: row for row in db_session.query(IndexHistory).filter(IndexHistory.date == TEST_DATE)}
+        assert sorted(rows) == ['000001', '000003']
+        assert rows['000003'].current_price == 31.0
+        # 未变化的行没有被删除重建
+        assert rows['000001'].id == unchanged_id
+    
+    def test_legacy_and_duplicate_rows(self, db_session):
+        """测试没有摘要的旧数据视为有变化，自然键重复时整体重写"""
+        db_session.add(make_index('000001', 10.0, date=TEST_DATE))
+        db_session.commit()
+        result = DiffWriteService.sync(db_session, IndexHistory, SCOPE, [make_index('000001', 10.0)], ('code',))
+        db_session.commit()
+        assert result.updated == 1
+        
+        result = DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000001', 11.0)], ('code',)
+        )
+        db_session.commit()
+        assert result.replaced and (result.deleted, result.inserted) == (1, 2)
+        assert db_session.query(IndexHistory).filter(IndexHistory.date == TEST_DATE).count() == 2
+    
+    def test_updated_at_marks_written_rows(self, db_session):
+        """测试更新的行刷新 updated_at（读取缓存据此判断数据版本），未变化的行保持不变"""
+        DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000002', 20.0)], ('code',)
+        )
+        db_session.commit()
+        old = datetime(2000, 1, 1)
+        db_session.query(IndexHistory).filter(IndexHistory.date == TEST_DATE).update(
+            {IndexHistory.updated_at: old}, synchronize_session=False
+        )
+        db_session.commit()
+        
+        DiffWriteService.sync(
+            db_session, IndexHistory, SCOPE, [make_index('000001', 10.0), make_index('000002', 21.0)], ('code',)
+        )
+        db_session.commit()
+        db_session.expire_all()
+        rows = {row.code: row for row in db_session.query(IndexHistory).filter(IndexHistory.date == TEST_DATE)}
+        assert rows['000001'].updated_at == old
+        assert rows['000002'].updated_at > old
+
+    def test_save_returns_changed_rows(self, db_session, monkeypatch):
+        """测试保存函数返回保存条数和实际写入的行数"""
+        spot = [{'code': '000001', 'currentPrice': 10.0}, {'code': '000002', 'currentPrice': 20.0}]
+        monkeypatch.setattr(
+            StockIndexService, 'get_index_spot_hedged', classmethod(lambda cls, **kwargs: (spot, 'test'))
+        )
+        first = IndexHistoryService.save_today_indices(db_session, target_date=TEST_DATE)
+        assert (first.total, first.changed) == (2, 2)
+        again = IndexHistoryService.save_today_indices(db_session, target_date=TEST_DATE)
+        assert (again.total, again.changed) == (2, 0)
+        spot[1] = {'code': '000002', 'currentPrice': 21.0}
+        assert IndexHistoryService.save_today_indices(db_session, target_date=TEST_DATE).to_dict()['updated'] == 1
+
+    def test_unchanged_zt_pool_rebuilds_missing_ladder(self, db_session, monkeypatch):
+        """测试涨停池没有变化时，当天缺少连板梯队（上次更新失败）仍重新计算"""
+        stocks = [{'code': '000001', 'continuousBoards': 1}, {'code': '000002', 'continuousBoards': 2}]
+        monkeypatch.setattr(ZtPoolService, 'get_zt_pool', classmethod(lambda cls, date=None: stocks))
+        assert ZtPoolHistoryService.save_today_zt_pool(db_session, target_date=TEST_DATE).changed == 2
+        ladder = db_session.query(ZtLadderDaily).filter(ZtLadderDaily.date == TEST_DATE)
+        assert ladder.count() == 2
+        
+        ladder.delete(synchronize_session=False)
+        db_session.commit()
+        assert ZtPoolHistoryService.save_today_zt_pool(db_session, target_date=TEST_DATE).changed == 0
+        assert ladder.count() == 2
@@ -0,0 +1,65 @@
+import pytest
+from datetime import date
+from services.dimension_service import DimensionService
+from database.db import SessionLocal, Base, engine
+from models.dimension import DimensionCache, DimSector
+from models.sector_history import SectorHistory
+
+TEST_DATE = date(2020, 1, 2)
+
+def make_sector(index, name, **kwargs):
+    """构造一条板块历史记录"""
+    return SectorHistory(
+        date=TEST_DATE, sector_type='industry', index=index, name=name, change_percent=1.0,
+        total_volume=1.0, total_amount=1.0, net_inflow=0.5, up_count=10, down_count=5, avg_price=10.0,
+        **kwargs
+    )
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    DimensionCache.clear()
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(SectorHistory).filter(SectorHistory.date == TEST_DATE).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+    DimensionCache.clear()
+
+class TestDimensionService:
+    """名称维度编码测试"""
+    
+    def test_encode_records(self, db_session):
+        """测试写入时名称转换为维度ID，读取时 to_dict 还原名称"""
+        records = [
+            make_sector(1, '测试板块A', leading_stock='测试股票'),
+            make_sector(2, '测试板块B', leading_stock='测试股票'),
+        ]
+        DimensionService.encode_records(db_session, records)
+        assert all(record.name is None and record.sector_id for record in records)
+        assert records[0].leading_stock_id == records[1].leading_stock_id
+        db_session.add_all(records)
+        db_session.commit()
+        
+        # 重复的名称复用同一个维度ID
+        ids = DimensionCache.resolve_ids(db_session, 'sector', ['测试板块A'])
+        assert ids['测试板块A'] == records[0].sector_id
+        assert db_session.query(DimSector).filter(DimSector.name == '测试板块A').count() == 1
+        
+        # 清空缓存后从维度表重新加载
+        DimensionCache.clear()
+        saved = db_session.query(SectorHistory).filter(SectorHistory.date == TEST_DATE).order_by(SectorHistory.id).all()
+        assert [item.to_dict()['name'] for item in saved] == ['测试板块A', '测试板块B']
+        assert saved[0].to_dict()['leadingStock'] == '测试股票'
+    
+    def test_encode_existing_rows(self, db_session):
+        """测试把旧数据的名称列迁移为维度ID"""
+        db_session.add(make_sector(1, '测试板块C'))
+        db_session.commit()
+        
+        assert DimensionService.encode_existing_rows(db_session, SectorHistory) >= 1
+        saved = db_session.query(SectorHistory).filter(SectorHistory.date == TEST_DATE).one()
+        assert saved.name is None
+        assert DimensionCache.name('sector', saved.sector_id) == '测试板块C'
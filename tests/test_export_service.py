@@ -0,0 +1,75 @@
+import pytest
+from datetime import date
+from services.export_service import ExportService
+from services.dimension_service import DimensionService
+from database.db import SessionLocal, Base, engine
+from models.index_history import IndexHistory
+
+# 使用很早的日期，避免影响真实数据
+TEST_DATES = [date(1991, 1, 7), date(1991, 1, 8), date(1991, 1, 9)]
+
+def make_index(target_date, code, name, change_percent):
+    """构造一条指数历史记录"""
+    return IndexHistory(
+        date=target_date, code=code, name=name, current_price=100.0, change_percent=change_percent, change=1.0,
+        volume=1.0, amount=1.0, open=99.0, high=101.0, low=98.0, prev_close=99.0, amplitude=3.0, volume_ratio=1.0
+    )
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(IndexHistory).filter(IndexHistory.date.in_(TEST_DATES)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestExportService:
+    """历史数据范围导出测试"""
+    
+    def test_prepare_validation(self):
+        """测试未知的表、列和无效的过滤取值"""
+        with pytest.raises(ValueError):
+            ExportService.prepare('trading_reviews')
+        with pytest.raises(ValueError):
+            ExportService.prepare('index_history', columns=['code', 'no_such_column'])
+        with pytest.raises(ValueError):
+            ExportService.prepare('index_history', filters={'volume': ['abc']})
+        with pytest.raises(ValueError):
+            ExportService.prepare('index_history', start_date=TEST_DATES[1], end_date=TEST_DATES[0])
+        
+        plan = ExportService.prepare('index_history', columns=['date', 'code', 'name', 'code'])
+        assert plan.columns == ['date', 'code', 'name']
+        assert plan.hidden == ['index_id']
+        assert plan.schema.names == ['date', 'code', 'name']
+    
+    def test_iter_chunks(self, db_session):
+        """测试按日期范围分块读取、列投影、名称还原和按名称过滤"""
+        # 一条旧数据保留名称，其余写入维度ID
+        encoded = DimensionService.encode_records(db_session, [
+            make_index(TEST_DATES[0], '000001', '测试指数A', 1.0),
+            make_index(TEST_DATES[1], '000001', '测试指数A', -1.0),
+            make_index(TEST_DATES[2], '399001', '测试指数B', 0.5),
+        ])
+        db_session.add_all(encoded + [make_index(TEST_DATES[2], '000001', '测试指数A', 2.0)])
+        db_session.commit()
+        
+        plan = ExportService.prepare(
+            'index_history', columns=['date', 'code', 'name', 'change_percent'],
+            start_date=TEST_DATES[0], end_date=TEST_DATES[-1]
+        )
+        chunks = list(ExportService.iter_chunks(plan, chunk_size=2))
+        assert [len(rows) for rows in chunks] == [2, 2]
+        rows = [row for rows in chunks for row in rows]
+        assert [row['date'] for row in rows] == [TEST_DATES[0], TEST_DATES[1], TEST_DATES[2], TEST_DATES[2]]
+        assert [row['name'] for row in rows] == ['测试指数A', '测试指数A', '测试指数B', '测试指数A']
+        assert set(rows[0]) == {'date', 'code', 'name', 'change_percent'}
+        
+        plan = ExportService.prepare(
+            'index_history', columns=['code', 'change_percent'],
+            start_date=TEST_DATES[1], end_date=TEST_DATES[-1], filters={'name': ['测试指数A']}
+        )
+        rows = [row for rows in ExportService.iter_chunks(plan) for row in rows]
+        assert [row['change_percent'] for row in rows] == [-1.0, 2.0]
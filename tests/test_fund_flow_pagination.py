@@ -0,0 +1,115 @@
+import pytest
+import pandas as pd
+from datetime import date
+from database.db import SessionLocal, Base, engine
+from models.dimension import DimensionCache, DimStock
+from models.stock_fund_flow_history import StockFundFlowHistory
+from services.stock_fund_flow_history_service import StockFundFlowHistoryService
+from utils.pagination import PageQuery, paginate_query, fetch_query_page, clear_query_cache
+
+TEST_DATE = date(1991, 3, 4)
+DIM_NAME = '测试资金甲'
+# 股票代码 -> (旧数据的股票简称, 净额)；stock_name 为 None 的行名称保存在 dim_stock
+ROWS = {
+    '000001': ('测试旧名', 300.0),
+    '000002': (None, 100.0),
+    '000003': ('测试空值', None),
+    '600001': ('测试其他', 200.0),
+    '300001': ('测试亏损', -50.0),
+}
+
+def codes(rows):
+    """取出股票代码列表"""
+    return [row['stockCode'] for row in rows]
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话（写入一天的资金流数据，其中一行的名称保存在股票维度表）"""
+    Base.metadata.create_all(bind=engine)
+    DimensionCache.clear()
+    db = SessionLocal()
+    dim = DimStock(name=DIM_NAME)
+    db.add(dim)
+    db.flush()
+    db.add_all([
+        StockFundFlowHistory(
+            date=TEST_DATE, stock_code=code, stock_name=name, stock_id=None if name else dim.id,
+            inflow=1.0, outflow=1.0, net_amount=net, turnover=10.0
+        )
+        for code, (name, net) in ROWS.items()
+    ])
+    db.commit()
+    yield db
+    db.rollback()
+    db.query(StockFundFlowHistory).filter(StockFundFlowHistory.date == TEST_DATE).delete(synchronize_session=False)
+    db.query(DimStock).filter(DimStock.name == DIM_NAME).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+    DimensionCache.clear()
+
+class TestFundFlowPagination:
+    """资金流数据库分页测试"""
+    
+    def test_page_contents_and_order(self, db_session):
+        """测试 LIMIT/OFFSET 分页内容和排序（空值始终排在最后）"""
+        page = lambda offset, **kwargs: codes(StockFundFlowHistoryService.get_fund_flow_page(
+            db_session, TEST_DATE, offset=offset, limit=2, **kwargs
+        ))
+        assert [page(0), page(2), page(4)] == [['000001', '600001'], ['000002', '300001'], ['000003']]
+        assert page(0, ascending=True) + page(2, ascending=True) + page(4, ascending=True) == [
+            '300001', '000002', '600001', '000001', '000003'
+        ]
+        with pytest.raises(ValueError):
+            page(0, sort_by='no_such_column')
+    
+    def test_keyword_and_summary(self, db_session):
+        """测试按代码和名称关键字筛选（包括名称保存在维度表的行）、计数和汇总"""
+        search = lambda keyword: codes(StockFundFlowHistoryService.get_fund_flow_page(db_session, TEST_DATE, keyword=keyword))
+        assert search('2') == ['000002']
+        assert search('600001') == ['600001']
+        assert search('资金甲') == ['000002']
+        assert search('旧名') == ['000001']
+        assert StockFundFlowHistoryService.get_fund_flow_page(db_session, TEST_DATE, keyword='资金甲')[0]['stockName'] == DIM_NAME
+        
+        assert StockFundFlowHistoryService.count_fund_flow(db_session, TEST_DATE) == len(ROWS)
+        # 旧数据的 stock_name 和维度表中的名称都参与匹配
+        assert StockFundFlowHistoryService.count_fund_flow(db_session, TEST_DATE, keyword='测试') == len(ROWS)
+        summary = StockFundFlowHistoryService.get_fund_flow_summary(db_session, TEST_DATE, stock_codes=['000001', '300001', '000003'])
+        assert (summary['totalCount'], summary['totalNet'], summary['totalTurnover']) == (3, 250.0, 30.0)
+    
+    def test_paginate_query_caches_count_and_prefetches(self, db_session):
+        """测试 paginate_query 只查询当前页、总数带缓存、预取下一页，清空缓存后重新查询"""
+        calls = {'fetch': [], 'count': 0}
+        
+        def fetch(offset, limit):
+            calls['fetch'].append(offset)
+            db = SessionLocal()
+            try:
+                return pd.DataFrame(StockFundFlowHistoryService.get_fund_flow_page(db, TEST_DATE, offset=offset, limit=limit))
+            finally:
+                db.close()
+        
+        def count():
+            calls['count'] += 1
+            db = SessionLocal()
+            try:
+                return StockFundFlowHistoryService.count_fund_flow(db, TEST_DATE)
+            finally:
+                db.close()
+        
+        query = PageQuery(key=('stock_fund_flow', 'test', TEST_DATE.isoformat()), fetch=fetch, count=count)
+        clear_query_cache('stock_fund_flow')
+        df_page, page_size, total_rows = paginate_query(query, default_page_size=2, page_size_options=[2], key_prefix='test_ff')
+        assert (page_size, total_rows) == (2, len(ROWS))
+        assert df_page['stockCode'].tolist() == ['000001', '600001']
+        
+        # 下一页已在后台预取
+        assert fetch_query_page(query, 2, 2)['stockCode'].tolist() == ['000002', '300001']
+        assert sorted(calls['fetch']) == [0, 2]
+        
+        paginate_query(query, default_page_size=2, page_size_options=[2], key_prefix='test_ff')
+        assert calls['count'] == 1
+        
+        clear_query_cache('stock_fund_flow')
+        paginate_query(query, default_page_size=2, page_size_options=[2], key_prefix='test_ff')
+        assert calls['count'] == 2
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from utils.chart_utils import build_heatmap_matrix, select_heatmap_rows
+
+class TestHeatmapMatrix:
+    """热力图矩阵构建和行选择测试"""
+    
+    def test_build_matrix(self):
+        """测试按 (板块, 日期) 写入矩阵，缺失位置为 NaN"""
+        df = pd.DataFrame({
+            'date': ['2024-01-02', '2024-01-01', '2024-01-02'],
+            'name': ['银行', '银行', '证券'],
+            'changePercent': [2.0, 1.0, -1.0],
+        })
+        values, rows, cols = build_heatmap_matrix(df)
+        assert values.dtype == np.float32
+        assert rows == ['证券', '银行'] and cols == ['2024-01-01', '2024-01-02']
+        assert values[1].tolist() == [1.0, 2.0]
+        assert np.isnan(values[0, 0]) and values[0, 1] == -1.0
+    
+    def test_missing_labels_dropped(self):
+        """测试板块名称或日期为空的记录被丢弃，不写入其他板块"""
+        df = pd.DataFrame({
+            'date': ['2024-01-01', '2024-01-01', '2024-01-01', None],
+            'name': ['A', 'B', None, 'A'],
+            'changePercent': [1.0, 2.0, 9.0, 7.0],
+        })
+        values, rows, cols = build_heatmap_matrix(df)
+        assert rows == ['A', 'B'] and cols == ['2024-01-01']
+        assert values[:, 0].tolist() == [1.0, 2.0]
+    
+    def test_duplicates_averaged(self):
+        """测试同一 (日期, 板块) 的重复记录取平均值，空值不参与"""
+        df = pd.DataFrame({
+            'date': ['2024-01-01'] * 4,
+            'name': ['A', 'A', 'A', 'B'],
+            'changePercent': [1.0, 3.0, None, None],
+        })
+        values, rows, _ = build_heatmap_matrix(df)
+        assert values[0, 0] == 2.0
+        assert np.isnan(values[1, 0])
+    
+    def test_select_rows(self):
+        """测试 Top-K 选择和按最新值、平均值、走势相似度排序"""
+        values = np.array([
+            [1.0, -1.0],
+            [5.0, np.nan],
+            [0.1, 0.2],
+            [-4.0, -3.0],
+        ], dtype=np.float32)
+        labels = ['a', 'b', 'c', 'd']
+        
+        top, top_labels = select_heatmap_rows(values, labels, top_k=2, order='mean')
+        assert top_labels == ['b', 'd'] and top.shape == (2, 2)
+        
+        # 最新值：每行最后一个有效值（b 的最新值为 5.0）
+        _, latest = select_heatmap_rows(values, labels, order='latest')
+        assert latest == ['b', 'c', 'a', 'd']
+        
+        clustered, clustered_labels = select_heatmap_rows(values, labels, order='cluster')
+        assert sorted(clustered_labels) == labels and clustered.shape == values.shape
+        
+        empty, empty_labels = select_heatmap_rows(np.empty((0, 0)), [])
+        assert empty_labels == []
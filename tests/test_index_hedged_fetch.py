@@ -0,0 +1,58 @@
+import time
+import pytest
+from services.stock_index_service import StockIndexService
+
+def _source(delay, codes=None, error=None):
+    """模拟数据源：等待 delay 秒后返回指定代码的指数列表或抛出异常"""
+    def fetch(*args, **kwargs):
+        time.sleep(delay)
+        if error:
+            raise Exception(error)
+        return [{'code': code, 'name': code} for code in codes]
+    return fetch
+
+@pytest.fixture
+def sources(monkeypatch):
+    """替换新浪、东方财富全部指数和深证系列指数三个数据源"""
+    def install(sina, em, em_sz):
+        monkeypatch.setattr(StockIndexService, 'get_index_spot_sina', classmethod(lambda cls: sina()))
+        monkeypatch.setattr(
+            StockIndexService, 'get_index_spot',
+            classmethod(lambda cls, symbol=None: em_sz() if symbol else em())
+        )
+    return install
+
+class TestIndexHedgedFetch:
+    """指数行情多数据源对冲获取测试"""
+    
+    def test_primary_wins_without_hedge(self, sources):
+        """测试主要数据源及时返回完整结果时不请求备用数据源"""
+        called = []
+        sources(
+            _source(0, ['000001', '399001']),
+            lambda: called.append('em') or [],
+            lambda: called.append('em_sz') or [],
+        )
+        indices, source = StockIndexService.get_index_spot_hedged(hedge_seconds=1)
+        assert source == 'sina'
+        assert [item['code'] for item in indices] == ['000001', '399001']
+        assert called == []
+    
+    def test_slow_primary_is_hedged(self, sources):
+        """测试主要数据源过慢时并行请求备用数据源，合并去重后采用"""
+        sources(
+            _source(2, ['000001', '399001']),
+            _source(0.05, ['sh000001', '000300']),
+            _source(0.1, ['sz399001', '000300']),
+        )
+        start = time.monotonic()
+        indices, source = StockIndexService.get_index_spot_hedged(hedge_seconds=0.2)
+        assert time.monotonic() - start < 1
+        assert source == 'em+em_sz'
+        assert sorted(item['code'] for item in indices) == ['000001', '000300', '399001']
+    
+    def test_all_sources_fail(self, sources):
+        """测试所有数据源都失败时抛出异常"""
+        sources(_source(0, error='sina'), _source(0, error='em'), _source(0, error='em_sz'))
+        with pytest.raises(Exception):
+            StockIndexService.get_index_spot_hedged(hedge_seconds=5)
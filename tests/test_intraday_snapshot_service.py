@@ -0,0 +1,90 @@
+import json
+import pytest
+from datetime import date, time as dt_time
+from database.db import SessionLocal, Base, engine
+from models.intraday_snapshot import IntradaySnapshot
+from services.intraday_snapshot_service import IntradaySnapshotService
+
+TEST_DATE = date(1991, 3, 4)
+DATASET = 'industry'
+
+def capture(db, rows, tick):
+    """按指定时间点采样一次"""
+    return IntradaySnapshotService.capture_tick(db, DATASET, rows=rows, target_date=TEST_DATE, tick=tick)
+
+def deltas(db, tick):
+    """读取某个时间点写入的增量：实体键 -> (变化字段, 是否移除)"""
+    rows = db.query(IntradaySnapshot).filter(
+        IntradaySnapshot.date == TEST_DATE,
+        IntradaySnapshot.dataset == DATASET,
+        IntradaySnapshot.tick == tick
+    ).all()
+    return {row.entity_key: (json.loads(row.payload) if row.payload else None, row.is_removed) for row in rows}
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    IntradaySnapshotService._last_states.clear()
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(IntradaySnapshot).filter(IntradaySnapshot.date == TEST_DATE).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+    IntradaySnapshotService._last_states.clear()
+
+class TestIntradaySnapshotService:
+    """盘中快照增量存储测试"""
+    
+    def test_incremental_ticks(self, db_session):
+        """测试第一次采样写入完整行，之后只写入变化的字段和移除的实体"""
+        rows = [{'name': '银行', 'changePercent': 1.0, 'netAmount': 5.0}, {'name': '煤炭', 'changePercent': -1.0, 'netAmount': 2.0}]
+        assert capture(db_session, rows, dt_time(9, 30)) == 2
+        assert deltas(db_session, dt_time(9, 30))['银行'] == (rows[0], False)
+        
+        assert capture(db_session, [dict(row) for row in rows], dt_time(9, 35)) == 0
+        
+        rows = [{'name': '银行', 'changePercent': 1.5, 'netAmount': 5.0}]
+        assert capture(db_session, rows, dt_time(9, 40)) == 2
+        assert deltas(db_session, dt_time(9, 40)) == {'银行': ({'changePercent': 1.5}, False), '煤炭': (None, True)}
+    
+    def test_nan_and_empty_fetch(self, db_session):
+        """测试 NaN 字段不会每次都记为变化，接口返回空数据时跳过本次采样"""
+        rows = [{'name': '银行', 'changePercent': float('nan')}, {'name': '煤炭', 'changePercent': 1.0}]
+        assert capture(db_session, rows, dt_time(9, 30)) == 2
+        assert capture(db_session, [dict(row) for row in rows], dt_time(9, 35)) == 0
+        
+        assert capture(db_session, [], dt_time(9, 40)) == 0
+        assert deltas(db_session, dt_time(9, 40)) == {}
+        assert capture(db_session, [dict(row) for row in rows], dt_time(9, 45)) == 0
+    
+    def test_state_rebuilt_after_restart(self, db_session):
+        """测试缓存清空（进程重启）后从数据库重建上一个时间点的状态"""
+        capture(db_session, [{'name': '银行', 'changePercent': 1.0}, {'name': '煤炭', 'changePercent': 2.0}], dt_time(9, 30))
+        capture(db_session, [{'name': '银行', 'changePercent': 1.5}, {'name': '煤炭', 'changePercent': 2.0}], dt_time(9, 35))
+        IntradaySnapshotService._last_states.clear()
+        
+        assert capture(db_session, [{'name': '银行', 'changePercent': 1.5}, {'name': '煤炭', 'changePercent': 2.5}], dt_time(9, 40)) == 1
+        assert deltas(db_session, dt_time(9, 40)) == {'煤炭': ({'changePercent': 2.5}, False)}
+    
+    def test_reconstruct_in_tick_order(self, db_session):
+        """测试按采样时间顺序叠加增量重建完整快照（与写入顺序无关）"""
+        db_session.add_all([
+            IntradaySnapshot(date=TEST_DATE, tick=dt_time(9, 40), dataset=DATASET, entity_key='银行',
+                             payload=json.dumps({'changePercent': 3.0}), is_removed=False),
+            IntradaySnapshot(date=TEST_DATE, tick=dt_time(9, 30), dataset=DATASET, entity_key='银行',
+                             payload=json.dumps({'name': '银行', 'changePercent': 1.0, 'netAmount': 5.0}), is_removed=False),
+            IntradaySnapshot(date=TEST_DATE, tick=dt_time(9, 30), dataset=DATASET, entity_key='煤炭',
+                             payload=json.dumps({'name': '煤炭', 'changePercent': 2.0}), is_removed=False),
+            IntradaySnapshot(date=TEST_DATE, tick=dt_time(9, 35), dataset=DATASET, entity_key='煤炭',
+                             payload=None, is_removed=True),
+        ])
+        db_session.commit()
+        
+        reconstruct = lambda tick: {
+            row['name']: row for row in IntradaySnapshotService.reconstruct_at(db_session, TEST_DATE, DATASET, tick)
+        }
+        assert sorted(reconstruct(dt_time(9, 30))) == ['煤炭', '银行']
+        assert list(reconstruct(dt_time(9, 35))) == ['银行']
+        assert reconstruct(dt_time(9, 45))['银行'] == {'name': '银行', 'changePercent': 3.0, 'netAmount': 5.0}
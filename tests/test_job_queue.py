@@ -0,0 +1,105 @@
+import pytest
+from datetime import timedelta
+from services.job_queue_service import JobQueueService, _now
+from tasks.job_worker import JobWorker
+from database.db import SessionLocal, Base, engine
+from models.job_queue import QueueJob
+
+# 测试任务的提交来源，便于清理
+TEST_SOURCE = 'test'
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(QueueJob).filter(QueueJob.enqueued_by == TEST_SOURCE).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestJobQueue:
+    """后台任务队列测试"""
+    
+    def test_enqueue_claim_and_finish(self, db_session):
+        """测试提交去重、按优先级领取、同类型不并行和结束记录"""
+        with pytest.raises(ValueError):
+            JobQueueService.enqueue(db_session, 'no_such_job', enqueued_by=TEST_SOURCE)
+        
+        first = JobQueueService.enqueue(db_session, 'refresh_stocks_fund_flow', {'stock_codes': ['000001']}, enqueued_by=TEST_SOURCE)
+        duplicate = JobQueueService.enqueue(db_session, 'refresh_stocks_fund_flow', {'stock_codes': ['000001']}, enqueued_by=TEST_SOURCE)
+        same_type = JobQueueService.enqueue(db_session, 'refresh_stocks_fund_flow', {'stock_codes': ['000002']}, enqueued_by=TEST_SOURCE)
+        urgent = JobQueueService.enqueue(db_session, 'maintain_partitions', priority=10, enqueued_by=TEST_SOURCE)
+        assert duplicate.id == first.id
+        
+        claimed = JobQueueService.claim(db_session, 'worker-a')
+        assert claimed.id == urgent.id and claimed.status == 'running' and claimed.attempts == 1
+        claimed = JobQueueService.claim(db_session, 'worker-b')
+        assert claimed.id == first.id
+        # 同类型任务正在执行，不领取 same_type
+        assert JobQueueService.claim(db_session, 'worker-c') is None
+        
+        JobQueueService.finish(db_session, first.id, 'success', {'successCount': 1})
+        job = JobQueueService.get_job(db_session, first.id)
+        db_session.refresh(job)
+        assert job.to_dict()['result'] == {'successCount': 1} and job.progress == 1.0
+        assert JobQueueService.claim(db_session, 'worker-c').id == same_type.id
+    
+    def test_claim_serializes_job_type(self, db_session, monkeypatch):
+        """测试领取时同类型任务正被其他工作进程领取（锁被占用）或刚领取提交时，跳过该类型领取其他类型"""
+        busy = JobQueueService.enqueue(db_session, 'refresh_stocks_fund_flow', priority=10, enqueued_by=TEST_SOURCE)
+        racing = JobQueueService.enqueue(db_session, 'refresh_concept_membership', priority=5, enqueued_by=TEST_SOURCE)
+        free = JobQueueService.enqueue(db_session, 'maintain_partitions', enqueued_by=TEST_SOURCE)
+        
+        def lock_job_type(db, job_type):
+            if job_type == racing.job_type:
+                # 模拟其他工作进程在本次查询之后领取并提交了同类型任务
+                db.add(QueueJob(job_type=job_type, status='running', priority=0, progress=0.0, attempts=1, enqueued_by=TEST_SOURCE))
+                db.flush()
+            return job_type != busy.job_type
+        
+        monkeypatch.setattr(JobQueueService, '_lock_job_type', staticmethod(lock_job_type))
+        assert JobQueueService.claim(db_session, 'worker-a').id == free.id
+        db_session.expire_all()
+        assert JobQueueService.get_job(db_session, busy.id).status == 'queued'
+        assert JobQueueService.get_job(db_session, racing.id).status == 'queued'
+    
+    def test_requeue_stale_and_cancel(self, db_session):
+        """测试心跳超时的任务重新排队（超过最多次数后失败），以及取消排队中的任务"""
+        job = JobQueueService.enqueue(db_session, 'refresh_concept_membership', enqueued_by=TEST_SOURCE)
+        for attempt in range(2):
+            assert JobQueueService.claim(db_session, 'worker-a').id == job.id
+            db_session.query(QueueJob).filter(QueueJob.id == job.id).update(
+                {QueueJob.heartbeat_at: _now() - timedelta(seconds=600)}, synchronize_session=False
+            )
+            db_session.commit()
+            result = JobQueueService.requeue_stale(db_session, 300)
+            assert result == ({'requeued': 1, 'failed': 0} if attempt == 0 else {'requeued': 0, 'failed': 1})
+        db_session.refresh(job)
+        assert job.status == 'failed' and job.attempts == 2
+        
+        queued = JobQueueService.enqueue(db_session, 'save_daily_data', {'force': True}, enqueued_by=TEST_SOURCE)
+        assert JobQueueService.cancel(db_session, queued.id) is True
+        assert JobQueueService.cancel(db_session, queued.id) is False
+    
+    def test_worker_runs_jobs(self, db_session):
+        """测试工作进程执行任务、记录进度和失败信息"""
+        def succeed(params, report):
+            report(0.5, '执行中')
+            return {'codes': params['stock_codes']}
+        
+        def fail(params, report):
+            raise RuntimeError('接口超时')
+        
+        ok_id = JobQueueService.enqueue(db_session, 'refresh_stocks_fund_flow', {'stock_codes': ['000001']}, enqueued_by=TEST_SOURCE).id
+        bad_id = JobQueueService.enqueue(db_session, 'refresh_all_stocks_fund_flow', enqueued_by=TEST_SOURCE).id
+        worker = JobWorker(concurrency=2, poll_seconds=0.01, job_types=['refresh_stocks_fund_flow', 'refresh_all_stocks_fund_flow'],
+                           handlers={'refresh_stocks_fund_flow': succeed, 'refresh_all_stocks_fund_flow': fail})
+        assert worker.run(once=True) == 2
+        
+        db_session.expire_all()
+        ok, bad = JobQueueService.get_job(db_session, ok_id), JobQueueService.get_job(db_session, bad_id)
+        assert ok.status == 'success' and ok.to_dict()['result'] == {'codes': ['000001']}
+        assert ok.progress_message == '执行中' and ok.worker == worker.identity
+        assert bad.status == 'failed' and bad.error_message == '接口超时' and 'RuntimeError' in bad.error_traceback
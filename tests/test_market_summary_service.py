@@ -0,0 +1,108 @@
+import pytest
+from datetime import date, timedelta
+from services.market_summary_service import MarketSummaryService
+from database.db import SessionLocal, Base, engine
+from models.market_daily_summary import MarketDailySummary
+from models.sector_history import SectorHistory
+from models.zt_pool_history import ZtPoolHistory
+from models.zb_pool_history import ZbgcPoolHistory
+from models.zt_ladder import ZtLadderDaily
+from services.zbgc_pool_history_service import ZbgcPoolHistoryService
+from services.zbgc_service import ZbgcService
+
+# 使用很早的日期，避免影响真实数据
+TEST_DATE = date(1991, 1, 7)
+NEXT_DATE = TEST_DATE + timedelta(days=1)
+
+def make_sector(index, sector_type, change_percent, net_inflow):
+    """构造一条板块历史记录"""
+    return SectorHistory(
+        date=TEST_DATE, sector_type=sector_type, index=index, name=f'测试板块{index}', change_percent=change_percent,
+        total_volume=1.0, total_amount=1.0, net_inflow=net_inflow, up_count=10, down_count=5, avg_price=10.0
+    )
+
+def make_zt(index, continuous_boards):
+    """构造一条涨停股票池历史记录"""
+    return ZtPoolHistory(
+        date=TEST_DATE, index=index, code=f'00000{index}', name=f'测试股票{index}', change_percent=10.0,
+        latest_price=10.0, turnover=1.0, circulating_market_value=10.0, total_market_value=10.0,
+        turnover_rate=1.0, sealing_funds=1.0, explosion_count=0, continuous_boards=continuous_boards
+    )
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    for model in (SectorHistory, ZtPoolHistory, ZbgcPoolHistory, ZtLadderDaily, MarketDailySummary):
+        db.query(model).filter(model.date.in_([TEST_DATE, NEXT_DATE])).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestMarketSummaryService:
+    """每日市场概况测试"""
+    
+    def test_refresh_summary(self, db_session):
+        """测试从明细聚合市场宽度并按日期和日期范围读取"""
+        db_session.add_all([
+            make_sector(1, 'industry', 2.0, 3.5),
+            make_sector(2, 'industry', -1.0, -1.5),
+            make_sector(3, 'industry', 0.0, 0.0),
+            make_sector(4, 'concept', 1.0, 2.0),
+            make_zt(1, 1),
+            make_zt(2, 2),
+            make_zt(3, 3),
+            make_zt(4, 1),
+        ])
+        db_session.commit()
+        
+        MarketSummaryService.refresh_summary(db_session, TEST_DATE)
+        summary = MarketSummaryService.get_summary_by_date(db_session, TEST_DATE)
+        assert summary['industryCount'] == 3
+        assert summary['industryUp'] == 1
+        assert summary['industryDown'] == 1
+        assert summary['industryNetInflow'] == 3.5
+        assert summary['industryNetOutflow'] == 1.5
+        assert summary['conceptUp'] == 1
+        assert summary['ztCount'] == 4
+        assert summary['continuousCount'] == 2
+        assert summary['continuousRate'] == 50.0
+        assert summary['dtCount'] == 0
+        
+        # 重新计算时更新同一行
+        db_session.query(ZtPoolHistory).filter(ZtPoolHistory.date == TEST_DATE, ZtPoolHistory.index == 4).delete()
+        db_session.commit()
+        MarketSummaryService.refresh_summary(db_session, TEST_DATE)
+        summaries = MarketSummaryService.get_summary_by_date_range(db_session, TEST_DATE, TEST_DATE)
+        assert len(summaries) == 1
+        assert summaries[0]['ztCount'] == 3
+
+    def test_save_refreshes_summary(self, db_session, monkeypatch):
+        """测试历史数据服务保存明细后更新当日市场概况"""
+        stocks = [{'code': '000001'}, {'code': '000002'}]
+        monkeypatch.setattr(ZbgcService, 'get_zbgc_pool', classmethod(lambda cls, date=None: stocks))
+        ZbgcPoolHistoryService.save_today_zbgc_pool(db_session, target_date=TEST_DATE)
+        assert MarketSummaryService.get_summary_by_date(db_session, TEST_DATE)['zbCount'] == 2
+        
+        # 一次保存多个数据集时不更新，由调用方最后统一更新
+        stocks.pop()
+        ZbgcPoolHistoryService.save_today_zbgc_pool(db_session, target_date=TEST_DATE, refresh_summary=False)
+        assert MarketSummaryService.get_summary_by_date(db_session, TEST_DATE)['zbCount'] == 2
+    
+    def test_zt_count_trend_falls_back_to_detail(self, db_session):
+        """测试涨停趋势：有概况的日期读取概况，没有概况的日期统计涨停明细"""
+        db_session.add_all([make_zt(1, 1), make_zt(2, 2)])
+        next_day = make_zt(3, 1)
+        next_day.date = NEXT_DATE
+        db_session.add(next_day)
+        db_session.commit()
+        MarketSummaryService.refresh_summary(db_session, TEST_DATE)
+        
+        trend = MarketSummaryService.get_zt_count_trend(db_session, TEST_DATE, NEXT_DATE)
+        assert trend == [
+            {'date': TEST_DATE.isoformat(), 'ztCount': 2},
+            {'date': NEXT_DATE.isoformat(), 'ztCount': 1},
+        ]
+
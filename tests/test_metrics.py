@@ -0,0 +1,55 @@
+import pytest
+from utils.metrics import collect_stages, current_stage_breakdown, registry, render_prometheus, stage, timed
+
+class TestMetrics:
+    """阶段耗时统计测试"""
+    
+    @pytest.fixture(autouse=True)
+    def reset_registry(self):
+        registry.reset()
+        yield
+        registry.reset()
+    
+    def test_timed_counts_rows_and_errors(self):
+        """测试装饰器记录次数、行数和错误"""
+        @timed('transform.test')
+        def convert(rows):
+            if rows is None:
+                raise ValueError('bad input')
+            return list(range(rows))
+        
+        convert(3)
+        convert(5)
+        with pytest.raises(ValueError):
+            convert(None)
+        
+        stats = registry.snapshot()['transform.test']
+        assert stats['count'] == 3
+        assert stats['rows'] == 8
+        assert stats['errors'] == 1
+        assert stats['p95'] >= stats['p50'] >= 0
+    
+    def test_breakdown_uses_self_time(self):
+        """测试执行汇总扣除嵌套阶段的耗时"""
+        with collect_stages():
+            with stage('db.save') as outer:
+                with stage('fetch.api') as inner:
+                    inner.rows = 10
+                outer.rows = 10
+            breakdown = current_stage_breakdown()
+        
+        assert current_stage_breakdown() is None
+        assert set(breakdown) == {'db.save', 'fetch.api'}
+        assert breakdown['fetch.api']['rows'] == 10
+        assert breakdown['db.save']['wallSeconds'] >= breakdown['fetch.api']['wallSeconds']
+        assert breakdown['db.save']['seconds'] <= breakdown['db.save']['wallSeconds']
+    
+    def test_render_prometheus(self):
+        """测试 Prometheus 文本格式输出"""
+        with stage('fetch.stock_zt_pool_em', rows=80):
+            pass
+        text = render_prometheus()
+        assert '# TYPE trading_review_stage_duration_seconds summary' in text
+        assert 'trading_review_stage_duration_seconds_count{stage="fetch.stock_zt_pool_em"} 1' in text
+        assert 'trading_review_stage_rows_total{stage="fetch.stock_zt_pool_em"} 80' in text
+        assert 'trading_review_stage_errors_total{stage="fetch.stock_zt_pool_em"} 0' in text
@@ -0,0 +1,74 @@
+import pytest
+from datetime import date
+from services.partition_service import PartitionService, add_months, month_start, week_start, partition_name
+from database.db import SessionLocal, Base, engine
+from models.history_rollup import HistoryWeeklyRollup
+from models.index_history import IndexHistory
+
+# 使用很早的日期，避免影响真实数据
+WEEK1 = [date(1991, 1, 7), date(1991, 1, 8), date(1991, 1, 9)]
+WEEK2 = [date(1991, 2, 4)]
+CUTOFF = date(1991, 2, 1)
+
+def make_index(target_date, price, change_percent, high):
+    """构造一条指数历史记录"""
+    return IndexHistory(
+        date=target_date, code='000001', name='测试指数', current_price=price, change_percent=change_percent,
+        change=0.0, volume=100.0, amount=1000.0, open=price, high=high, low=price - 1, prev_close=price,
+        amplitude=1.0, volume_ratio=1.0
+    )
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(IndexHistory).filter(IndexHistory.date < date(1992, 1, 1)).delete(synchronize_session=False)
+    db.query(HistoryWeeklyRollup).filter(HistoryWeeklyRollup.week_start < date(1992, 1, 1)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestPartitionService:
+    """历史表分区管理测试"""
+    
+    def test_month_helpers(self):
+        """测试月份计算和分区命名"""
+        assert month_start(date(2024, 3, 15)) == date(2024, 3, 1)
+        assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+        assert week_start(date(2024, 3, 17)) == date(2024, 3, 11)
+        assert partition_name('index_history', date(2024, 3, 1)) == 'index_history_p202403'
+    
+    def test_rollup_and_drop(self, db_session):
+        """测试过期明细汇总为周数据后删除，已汇总的周不重复汇总"""
+        db_session.add_all([
+            make_index(WEEK1[0], 100.0, 0.0, 101.0),
+            make_index(WEEK1[1], 110.0, 10.0, 115.0),
+            make_index(WEEK1[2], 121.0, 10.0, 122.0),
+            make_index(WEEK2[0], 130.0, 1.0, 131.0),
+        ])
+        db_session.commit()
+        
+        summary = PartitionService.maintain(
+            db_session, tables=['index_history'], horizon_months=1, today=date(1991, 3, 10)
+        )
+        assert summary['index_history']['rolled_up_weeks'] == 1
+        assert summary['index_history']['deleted_rows'] == 3
+        assert db_session.query(IndexHistory).filter(IndexHistory.date < date(1992, 1, 1)).count() == 1
+        
+        rollups = PartitionService.get_weekly_rollup(db_session, 'index_history', WEEK1[0], WEEK1[-1])
+        assert len(rollups) == 1
+        item = rollups[0].to_dict()
+        assert item['days'] == 3
+        assert item['name'] == '测试指数'
+        assert item['openPrice'] == 100.0
+        assert item['closePrice'] == 121.0
+        assert item['highPrice'] == 122.0
+        assert item['volume'] == 300.0
+        assert item['changePercent'] == pytest.approx(21.0)
+        
+        # 再次维护时已汇总的周不会被残留明细覆盖
+        PartitionService.maintain(db_session, tables=['index_history'], horizon_months=1, today=date(1991, 3, 10))
+        assert PartitionService.get_weekly_rollup(db_session, 'index_history', WEEK1[0], WEEK1[-1])[0].days == 3
@@ -0,0 +1,73 @@
+import time
+import pytest
+from datetime import date
+import services.pool_backfill_service as pool_backfill
+from services.pool_backfill_service import PoolBackfillService, RateLimiter, BackfillDataset, DATASETS
+from database.db import SessionLocal, Base, engine
+from models.backfill_checkpoint import BackfillCheckpoint
+from models.dt_pool_history import DtgcPoolHistory
+
+TRADING_DAYS = [date(2020, 3, 2), date(2020, 3, 3), date(2020, 3, 4)]
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(DtgcPoolHistory).filter(DtgcPoolHistory.date.in_(TRADING_DAYS)).delete(synchronize_session=False)
+    db.query(BackfillCheckpoint).filter(BackfillCheckpoint.date.in_(TRADING_DAYS)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+@pytest.fixture
+def fake_dtgc(monkeypatch):
+    """跌停股票池接口替身：2020-03-03 失败，其余日期返回两只股票，记录请求的日期"""
+    calls = []
+    
+    def fetch(date_str):
+        calls.append(date_str)
+        if date_str == '20200303':
+            raise Exception('接口超时')
+        return [{'index': 1, 'code': '000001', 'name': '测试A'}, {'index': 2, 'code': '000002', 'name': '测试B'}]
+    
+    spec = DATASETS['dtgc_pool']
+    monkeypatch.setitem(DATASETS, 'dtgc_pool', BackfillDataset(spec.model, fetch, spec.build_records))
+    monkeypatch.setattr(pool_backfill, 'get_trading_days', lambda start_date, end_date: TRADING_DAYS)
+    return calls
+
+class TestPoolBackfill:
+    """股票池历史数据回填测试"""
+    
+    def test_rate_limiter(self):
+        """测试限速：相邻请求间隔不小于 1/rate 秒"""
+        limiter = RateLimiter(rate=50)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        assert time.monotonic() - start >= 4 / 50 * 0.9
+    
+    def test_backfill_resumes_from_checkpoint(self, db_session, fake_dtgc):
+        """测试回填写入分区、记录失败，重新运行时只重试失败的分区"""
+        summary = PoolBackfillService.backfill(
+            db_session, TRADING_DAYS[0], TRADING_DAYS[-1], datasets=['dtgc_pool'],
+            workers=2, rate=0, max_retries=1
+        )
+        assert summary['partitions'] == 3
+        assert summary['done'] == 2
+        assert summary['failed'] == 1
+        assert db_session.query(DtgcPoolHistory).filter(DtgcPoolHistory.date.in_(TRADING_DAYS)).count() == 4
+        
+        fake_dtgc.clear()
+        summary = PoolBackfillService.backfill(
+            db_session, TRADING_DAYS[0], TRADING_DAYS[-1], datasets=['dtgc_pool'], rate=0, max_retries=1
+        )
+        assert summary['partitions'] == 1
+        assert fake_dtgc == ['20200303']
+        
+        checkpoint = db_session.query(BackfillCheckpoint).filter(
+            BackfillCheckpoint.dataset == 'dtgc_pool', BackfillCheckpoint.date == TRADING_DAYS[1]
+        ).one()
+        assert checkpoint.status == 'failed'
+        assert checkpoint.attempts == 2
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine, text
+import database.query_profiler as query_profiler
+from database.query_profiler import QueryProfiler, QueryUnit, statement_shape, profile_unit
+
+@pytest.fixture
+def profiler():
+    """在独立的内存数据库引擎上启用 SQL 分析（每条语句都视为慢查询，重复 3 次视为 N+1）"""
+    engine = create_engine('sqlite://')
+    profiler = QueryProfiler(slow_query_ms=0, repeat_threshold=3)
+    profiler.install(engine)
+    profiler.engine = engine
+    yield profiler
+    profiler.uninstall()
+    engine.dispose()
+
+def run_queries(engine, *values):
+    """按不同参数执行同一结构的语句"""
+    with engine.connect() as conn:
+        for value in values:
+            conn.execute(text('SELECT :value'), {'value': value})
+
+class TestQueryProfiler:
+    """SQL 分析测试"""
+    
+    def test_statement_shape(self):
+        """测试语句结构去掉字面量和命名参数，IN 列表折叠，空白合并"""
+        assert statement_shape("SELECT * FROM t1 WHERE a = 5 AND b = 'x''y'") == "SELECT * FROM t1 WHERE a = ? AND b = ?"
+        assert statement_shape("SELECT *\n  FROM t WHERE price > 1.5") == "SELECT * FROM t WHERE price > ?"
+        assert statement_shape("SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s, %(id_3)s)") == "SELECT * FROM t WHERE id IN (?...)"
+        assert statement_shape("SELECT * FROM t WHERE id IN (1, 2,  3)") == statement_shape("SELECT * FROM t WHERE id IN (4, 5)")
+        assert statement_shape("SELECT col2 FROM t WHERE code = %(code_1)s") == "SELECT col2 FROM t WHERE code = ?"
+    
+    def test_repeat_threshold(self):
+        """测试同一结构执行次数达到阈值时列为疑似 N+1 查询"""
+        unit = QueryUnit('test')
+        for code in range(3):
+            unit.record(f"SELECT * FROM stock WHERE code = '{code}'", 0.001, slow_threshold=1.0)
+        unit.record("SELECT * FROM sector WHERE id = 1", 0.001, slow_threshold=1.0)
+        unit.record("SELECT * FROM sector WHERE id = 2", 0.001, slow_threshold=1.0)
+        
+        summary = unit.summary(repeat_threshold=3)
+        assert (summary['statements'], summary['distinctStatements']) == (5, 2)
+        assert [(item['count'], item['statement']) for item in summary['repeated']] == [(3, "SELECT * FROM stock WHERE code = ?")]
+        assert summary['slowQueries'] == []
+        assert len(unit.summary(repeat_threshold=2)['repeated']) == 2
+    
+    def test_slow_query_call_site(self, profiler):
+        """测试慢查询和重复语句记录项目代码中的调用位置"""
+        token = profiler.begin('test')
+        run_queries(profiler.engine, 1, 2, 3)
+        summary = profiler.end(token)
+        
+        assert summary['statements'] == 3 and len(summary['slowQueries']) == 3
+        assert summary['slowQueries'][0]['callSite'].startswith('tests/test_query_profiler.py:')
+        assert summary['slowQueries'][0]['callSite'].endswith('(run_queries)')
+        assert summary['repeated'][0]['count'] == 3
+        assert profiler.recent_summaries()[0] is summary
+    
+    def test_profile_unit_nesting(self, profiler, monkeypatch):
+        """测试嵌套的执行单元计入最外层单元，未启用时不做任何事"""
+        with profile_unit('disabled'):
+            run_queries(profiler.engine, 1)
+        assert profiler.recent_summaries() == []
+        
+        monkeypatch.setattr(query_profiler, '_profiler', profiler)
+        with profile_unit('outer'):
+            run_queries(profiler.engine, 1)
+            with profile_unit('inner'):
+                run_queries(profiler.engine, 2)
+        assert profiler.current_unit() is None
+        assert [(item['unit'], item['statements']) for item in profiler.recent_summaries()] == [('outer', 2)]
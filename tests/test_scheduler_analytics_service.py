@@ -0,0 +1,71 @@
+import uuid
+import pytest
+from datetime import date, datetime, timedelta
+from services.scheduler_analytics_service import SchedulerAnalyticsService
+from services.scheduler_execution_service import SchedulerExecutionService
+from database.db import SessionLocal, Base, engine
+from models.scheduler_execution import SchedulerExecution
+
+START_DATE = date(2024, 3, 1)
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.close()
+
+@pytest.fixture
+def job_id(db_session):
+    """写入 20 天执行记录的测试任务：第 10 天失败，最后 3 天耗时从约 60 秒升到 180 秒"""
+    job_id = f"test_job_{uuid.uuid4().hex[:8]}"
+    for i in range(20):
+        execution_date = START_DATE + timedelta(days=i)
+        SchedulerExecutionService.create_execution(
+            db_session,
+            job_id=job_id,
+            job_name='测试任务',
+            execution_date=execution_date,
+            execution_time=datetime.combine(execution_date, datetime.min.time()).replace(hour=15, minute=10),
+            status='failed' if i == 10 else 'success',
+            duration_seconds=180.0 if i >= 17 else 40.0 + i,
+            zt_pool_count=50,
+        )
+    yield job_id
+    db_session.query(SchedulerExecution).filter(SchedulerExecution.job_id == job_id).delete()
+    db_session.commit()
+
+class TestSchedulerAnalyticsService:
+    """定时任务性能分析服务测试"""
+    
+    def test_execution_statistics(self, db_session, job_id):
+        """测试按状态聚合的执行统计"""
+        end_date = START_DATE + timedelta(days=19)
+        statistics = SchedulerExecutionService.get_execution_statistics(db_session, START_DATE, end_date, job_id)
+        assert statistics['total'] == 20
+        assert statistics['success'] == 19
+        assert statistics['failed'] == 1
+    
+    def test_job_performance(self, db_session, job_id):
+        """测试按任务汇总成功率和耗时分位数"""
+        end_date = START_DATE + timedelta(days=19)
+        performance = SchedulerAnalyticsService.get_job_performance(db_session, START_DATE, end_date, job_id)
+        assert len(performance) == 1
+        item = performance[0]
+        assert item['success_rate'] == 95.0
+        assert item['max_seconds'] == 180.0
+        assert item['p50_seconds'] < item['p95_seconds'] <= item['max_seconds']
+    
+    def test_detect_regressions(self, db_session, job_id):
+        """测试与滚动基线比较发现耗时退化"""
+        end_date = START_DATE + timedelta(days=19)
+        trend = SchedulerAnalyticsService.get_daily_trend(db_session, START_DATE, end_date, job_id)
+        assert len(trend) == 20
+        assert trend[0]['baseline_seconds'] is None
+        assert all(item['zt_pool'] == 50 for item in trend)
+        
+        regressions = SchedulerAnalyticsService.detect_regressions(db_session, START_DATE, end_date, job_id)
+        assert [item['execution_date'] for item in regressions][0] == START_DATE + timedelta(days=17)
+        assert all(item['ratio'] >= 1.5 for item in regressions)
@@ -0,0 +1,125 @@
+import pytest
+from datetime import datetime, timedelta
+from tasks.scheduler_leader import SchedulerLeader, _db_now
+from tasks import sector_scheduler as sector_scheduler_module
+from tasks.sector_scheduler import SectorScheduler, DAILY_CLOSE_JOB_IDS
+from database.db import SessionLocal, Base, engine
+from models.scheduler_lease import SchedulerLease
+from models.scheduler_execution import SchedulerExecution
+from services.scheduler_execution_service import SchedulerExecutionService
+from utils.time_utils import UTC8
+
+# 测试专用的调度器名称，避免影响真实租约
+TEST_NAME = 'test_scheduler_leader'
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(SchedulerLease).filter(SchedulerLease.name == TEST_NAME).delete(synchronize_session=False)
+    db.query(SchedulerExecution).filter(SchedulerExecution.job_name.like('test_%')).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestSchedulerLeader:
+    """调度器主节点选举测试"""
+    
+    def test_single_leader_and_failover(self, db_session):
+        """测试同一时间只有一个主节点，释放后其他进程接管"""
+        first = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        second = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        
+        assert first.try_acquire() is True
+        assert second.try_acquire() is False
+        # 主节点续约不改变成为主节点的时间
+        acquired_at = first.get_lease()['acquiredAt']
+        assert first.try_acquire() is True
+        assert first.is_leader and not second.is_leader
+        lease = second.get_lease()
+        assert lease['holder'] == first.identity and lease['active'] and lease['acquiredAt'] == acquired_at
+        
+        first.release()
+        assert not first.is_leader
+        assert second.try_acquire() is True
+        assert first.try_acquire() is False
+        assert second.get_lease()['holder'] == second.identity
+    
+    def test_expired_lease_taken_over(self, db_session):
+        """测试主节点失联（租约过期）后其他进程接管，原主节点续约失败后转为观察者"""
+        first = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        second = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        assert first.try_acquire() is True
+        
+        # 模拟主节点停止续约超过租约有效期
+        lease = db_session.get(SchedulerLease, TEST_NAME)
+        lease.expires_at = _db_now(db_session) - timedelta(seconds=1)
+        db_session.commit()
+        
+        assert second.try_acquire() is True
+        assert first.try_acquire() is False
+        assert not first.is_leader
+        assert second.get_status()['lease']['holder'] == second.identity
+
+    def test_lease_uses_database_time(self, db_session, monkeypatch):
+        """测试租约时间取自数据库，本地时钟偏差不影响过期判断"""
+        first = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        second = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        assert first.try_acquire() is True
+        
+        # 本地时钟快了一小时的进程也不能抢到未过期的租约
+        monkeypatch.setattr('utils.time_utils.datetime', type('FastClock', (datetime,), {
+            'now': classmethod(lambda cls, tz=None: datetime.now(tz) + timedelta(hours=1))
+        }))
+        assert second.try_acquire() is False
+        lease = db_session.get(SchedulerLease, TEST_NAME)
+        assert abs((lease.expires_at - _db_now(db_session)).total_seconds() - 60) < 5
+    
+    def test_on_elected_called_once_per_election(self, db_session):
+        """测试只在成为主节点时调用回调，续约不调用"""
+        elected = []
+        first = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10, on_elected=lambda: elected.append('first'))
+        second = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10, on_elected=lambda: elected.append('second'))
+        
+        assert first.try_acquire() and first.try_acquire()
+        assert not second.try_acquire()
+        first.release()
+        assert second.try_acquire()
+        assert elected == ['first', 'second']
+
+
+class TestCatchUpMissedJobs:
+    """主节点切换后补跑遗漏的收盘任务测试"""
+    
+    @pytest.fixture
+    def scheduler(self, monkeypatch):
+        """不启用主节点选举的调度器（总是主节点），当前时间固定为今日 16:00"""
+        monkeypatch.setattr(sector_scheduler_module.Config, 'SCHEDULER_LEADER_ELECTION', False)
+        now = UTC8.localize(datetime.combine(datetime.now(UTC8).date(), datetime.min.time()).replace(hour=16))
+        monkeypatch.setattr(sector_scheduler_module, 'get_utc8_now', lambda: now)
+        scheduler = SectorScheduler(intraday_interval_minutes=0)
+        scheduler.now = now
+        return scheduler
+    
+    def test_runs_jobs_without_execution_today(self, db_session, scheduler):
+        """测试只补跑当日没有执行记录的收盘任务"""
+        SchedulerExecutionService.create_execution(
+            db=db_session, job_id='save_daily_data', job_name='test_save_daily_data',
+            execution_date=scheduler.now.date(), execution_time=scheduler.now, status='success'
+        )
+        
+        missed = scheduler.catch_up_missed_jobs()
+        assert missed == [job_id for job_id in DAILY_CLOSE_JOB_IDS if job_id != 'save_daily_data']
+        for job_id in missed:
+            assert scheduler.scheduler.get_job(job_id).next_run_time == scheduler.now
+    
+    def test_skips_before_close_and_on_observer(self, db_session, scheduler, monkeypatch):
+        """测试 15:10 之前和观察者进程不补跑"""
+        monkeypatch.setattr(sector_scheduler_module, 'get_utc8_now', lambda: scheduler.now.replace(hour=15, minute=9))
+        assert scheduler.catch_up_missed_jobs() == []
+        
+        monkeypatch.setattr(sector_scheduler_module, 'get_utc8_now', lambda: scheduler.now)
+        scheduler.leader = SchedulerLeader(TEST_NAME, lease_seconds=60, renew_seconds=10)
+        assert scheduler.catch_up_missed_jobs() == []
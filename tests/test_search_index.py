@@ -0,0 +1,50 @@
+import pytest
+from utils.search_index import SearchIndex, normalize
+
+ENTRIES = [
+    {'code': '000001', 'name': '上证指数', 'raw_code': 'sh000001'},
+    {'code': '000002', 'name': 'Ａ股指数', 'raw_code': 'sh000002'},
+    {'code': '000016', 'name': '上证50', 'raw_code': 'sh000016'},
+    {'code': '399001', 'name': '深证成指', 'raw_code': 'sz399001'},
+    {'code': '399006', 'name': '创业板指', 'raw_code': 'sz399006'},
+    {'code': '399012', 'name': '创业300', 'raw_code': 'sz399012'},
+]
+
+class TestSearchIndex:
+    """搜索索引测试"""
+    
+    def setup_method(self):
+        self.index = SearchIndex(ENTRIES)
+    
+    def codes(self, query, limit=10):
+        return [item['code'] for item in self.index.search(query, limit)]
+    
+    def test_code_and_name_prefix(self):
+        """测试代码、带前缀代码和名称的前缀匹配及排序"""
+        assert self.codes('000001')[0] == '000001'
+        assert self.index.search('000001')[0]['score'] > self.index.search('00000')[0]['score']
+        assert self.codes('sz39900') == ['399001', '399006']
+        assert self.codes('上证') == ['000001', '000016']
+        assert self.codes('创业', limit=1) == ['399006']
+        assert self.index.search('') == []
+    
+    def test_substring_and_normalization(self):
+        """测试子串匹配和全角字符归一化"""
+        assert normalize('Ａ股指数') == 'a股指数'
+        assert self.codes('a股') == ['000002']
+        assert set(self.codes('指数')) == {'000001', '000002'}
+        assert self.index.search('指数')[0]['match'] == 'name'
+    
+    def test_fuzzy(self):
+        """测试模糊匹配（错字）排在精确匹配之后"""
+        results = self.index.search('创业版指')
+        assert results[0]['code'] == '399006'
+        assert results[0]['match'] == 'fuzzy'
+        assert self.index.search('完全无关') == []
+    
+    def test_pinyin(self):
+        """测试拼音首字母和全拼匹配"""
+        pytest.importorskip('pypinyin')
+        assert self.codes('szzs')[0] == '000001'
+        assert self.codes('cybz')[0] == '399006'
+        assert self.codes('shenzheng')[0] == '399001'
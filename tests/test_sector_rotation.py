@@ -0,0 +1,57 @@
+import numpy as np
+from datetime import date, timedelta
+from utils.sector_rotation import (
+    SectorMatrix,
+    rolling_return,
+    rank_rows,
+    rank_change,
+    streaks,
+    rolling_zscore,
+)
+
+class TestSectorRotation:
+    """板块轮动向量化计算测试"""
+    
+    def test_rolling_return(self):
+        """测试滚动累计涨幅（复利）"""
+        change = np.array([[10.0], [10.0], [-10.0]])
+        result = rolling_return(change, 2)
+        assert np.allclose(result[:, 0], [10.0, 21.0, -1.0])
+    
+    def test_rank_and_change(self):
+        """测试按日期排名和排名变化"""
+        values = np.array([[3.0, 1.0, 2.0], [1.0, 3.0, np.nan]])
+        ranks = rank_rows(values)
+        assert ranks[0].tolist() == [1.0, 3.0, 2.0]
+        assert ranks[1, :2].tolist() == [2.0, 1.0]
+        assert np.isnan(ranks[1, 2])
+        assert rank_change(ranks)[1, :2].tolist() == [-1.0, 2.0]
+    
+    def test_streaks(self):
+        """测试连续涨跌天数"""
+        change = np.array([[1.0], [2.0], [-1.0], [-2.0], [-3.0], [0.0], [1.0]])
+        assert streaks(change)[:, 0].tolist() == [1, 2, -1, -2, -3, 0, 1]
+    
+    def test_rolling_zscore(self):
+        """测试滚动Z分数"""
+        values = np.array([[1.0], [2.0], [3.0], [4.0]])
+        z = rolling_zscore(values, 3)
+        window = values[1:4, 0]
+        assert np.isnan(z[0, 0])
+        assert np.isclose(z[3, 0], (4.0 - window.mean()) / window.std())
+    
+    def test_matrix_incremental_append(self):
+        """测试矩阵增量扩展"""
+        d0 = date(2024, 1, 1)
+        matrix = SectorMatrix()
+        matrix.append_rows([(d0, '银行', 1.0, 2.0, 3, 1), (d0, '证券', -1.0, -2.0, 1, 3)])
+        added = matrix.append_rows([
+            (d0, '银行', 9.0, 9.0, 9, 9),
+            (d0 + timedelta(days=1), '保险', 0.5, 1.0, 2, 2),
+        ])
+        assert added == 1
+        assert matrix.names == ['银行', '证券', '保险']
+        assert matrix.values['change_percent'].shape == (2, 3)
+        assert matrix.values['change_percent'][0, 0] == 1.0
+        assert np.isnan(matrix.values['change_percent'][1, 0])
+        assert matrix.values['up_ratio'][0, 0] == 0.75
@@ -0,0 +1,63 @@
+import pytest
+from datetime import date, datetime
+from database.db import SessionLocal, Base, engine
+from models.sector_history import SectorHistory
+from services.sector_rotation_service import SectorRotationService
+
+DATES = [date(1991, 3, 4), date(1991, 3, 5), date(1991, 3, 6)]
+# 覆盖全部历史，保证测试日期在矩阵范围内
+LOOKBACK = 100000
+
+def make_sector(day, name, change, stamp):
+    """构造一条行业板块历史记录（updated_at 显式指定，避免同一秒内写入无法区分）"""
+    return SectorHistory(
+        date=day, sector_type='industry', index=1, name=name, change_percent=change, total_volume=1.0,
+        total_amount=1.0, net_inflow=1.0, up_count=1, down_count=1, avg_price=1.0, updated_at=stamp
+    )
+
+def cell(matrix, day, name):
+    """读取矩阵中某日某板块的涨跌幅"""
+    return float(matrix.values['change_percent'][matrix.dates.index(day), matrix.name_index[name]])
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话"""
+    Base.metadata.create_all(bind=engine)
+    SectorRotationService.clear_cache()
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    db.query(SectorHistory).filter(SectorHistory.date.in_(DATES)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+    SectorRotationService.clear_cache()
+
+class TestSectorRotationService:
+    """板块矩阵缓存刷新测试"""
+    
+    def test_resaved_and_deleted_older_dates_reloaded(self, db_session):
+        """测试覆盖保存或删除较早日期（不是最新一天）后，缓存的矩阵重新加载这些日期"""
+        stamp = datetime(2000, 1, 1)
+        db_session.add_all([make_sector(day, name, 1.0, stamp) for day in DATES for name in ('银行', '煤炭')])
+        db_session.commit()
+        matrix = SectorRotationService.get_matrix(db_session, 'industry', LOOKBACK)
+        assert cell(matrix, DATES[0], '银行') == 1.0
+        
+        db_session.query(SectorHistory).filter(
+            SectorHistory.date == DATES[0], SectorHistory.name == '银行'
+        ).update({SectorHistory.change_percent: 5.0, SectorHistory.updated_at: datetime(2000, 1, 2)}, synchronize_session=False)
+        db_session.commit()
+        matrix = SectorRotationService.get_matrix(db_session, 'industry', LOOKBACK)
+        assert cell(matrix, DATES[0], '银行') == 5.0
+        assert cell(matrix, DATES[2], '煤炭') == 1.0
+        
+        db_session.query(SectorHistory).filter(SectorHistory.date == DATES[1]).delete(synchronize_session=False)
+        db_session.commit()
+        matrix = SectorRotationService.get_matrix(db_session, 'industry', LOOKBACK)
+        assert DATES[1] not in matrix.dates
+        assert DATES[0] in matrix.dates and DATES[2] in matrix.dates
+        
+        db_session.add(make_sector(DATES[1], '银行', 2.0, datetime(2000, 1, 3)))
+        db_session.commit()
+        matrix = SectorRotationService.get_matrix(db_session, 'industry', LOOKBACK)
+        assert cell(matrix, DATES[1], '银行') == 2.0
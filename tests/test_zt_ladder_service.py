@@ -0,0 +1,78 @@
+import pytest
+from datetime import date
+from database.db import SessionLocal, Base, engine
+from models.zt_pool_history import ZtPoolHistory
+from models.zt_ladder import ZtLadderDaily
+from services.zt_ladder_service import ZtLadderService
+from services.zt_pool_history_service import ZtPoolHistoryService
+from services.zt_pool_service import ZtPoolService
+
+DAY1, DAY2 = date(1991, 3, 4), date(1991, 3, 5)
+# 股票代码 -> 连板数
+POOLS = {
+    DAY1: {'000001': 1, '000002': 1, '000003': 2, '000004': 1},
+    DAY2: {'000001': 2, '000002': 1, '000003': 3, '000005': 1, '000006': 2},
+}
+
+def make_zt(day, code, boards):
+    """构造一条涨停股票池历史记录"""
+    return ZtPoolHistory(
+        date=day, index=1, code=code, change_percent=10.0, latest_price=10.0, turnover=1.0,
+        circulating_market_value=10.0, total_market_value=10.0, turnover_rate=1.0, sealing_funds=1.0,
+        continuous_boards=boards
+    )
+
+def ladder(db, day):
+    """读取梯队：高度 -> 行"""
+    return {row['boardHeight']: row for row in ZtLadderService.get_ladder_by_date(db, day)}
+
+@pytest.fixture
+def db_session():
+    """创建测试数据库会话（写入两天的涨停股票池）"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([make_zt(day, code, boards) for day, pool in POOLS.items() for code, boards in pool.items()])
+    db.commit()
+    yield db
+    db.rollback()
+    for model in (ZtPoolHistory, ZtLadderDaily):
+        db.query(model).filter(model.date.in_(list(POOLS))).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+class TestZtLadderService:
+    """连板梯队测试"""
+    
+    def test_two_day_ladder(self, db_session):
+        """测试各高度的股票数、股票代码、晋级率和最高连板"""
+        assert ZtLadderService.rebuild_ladder(db_session, DAY1, DAY2) == 2
+        
+        first = ladder(db_session, DAY1)
+        assert {height: row['codes'] for height, row in first.items()} == {
+            1: ['000001', '000002', '000004'], 2: ['000003']
+        }
+        assert first[2]['maxHeight'] == 2
+        
+        second = ladder(db_session, DAY2)
+        assert {height: row['stockCount'] for height, row in second.items()} == {1: 2, 2: 2, 3: 1}
+        assert second[2]['codes'] == ['000001', '000006']
+        assert second[1]['prevHeightCount'] is None and second[1]['promotionRate'] is None
+        # 2板：上一交易日 3 只首板中 000001 晋级（000006 上一交易日不在涨停池）
+        assert (second[2]['prevDate'], second[2]['prevHeightCount'], second[2]['promotedCount']) == ('1991-03-04', 3, 1)
+        assert second[2]['promotionRate'] == 33.33
+        assert (second[3]['promotedCount'], second[3]['promotionRate']) == (1, 100.0)
+        assert all(row['maxHeight'] == 3 for row in second.values())
+    
+    def test_resave_updates_next_day(self, db_session, monkeypatch):
+        """测试重新保存较早日期的涨停池后，下一交易日的晋级率同时更新"""
+        ZtLadderService.rebuild_ladder(db_session, DAY1, DAY2)
+        stocks = [
+            {'code': code, 'continuousBoards': boards}
+            for code, boards in POOLS[DAY1].items() if code != '000004'
+        ]
+        monkeypatch.setattr(ZtPoolService, 'get_zt_pool', classmethod(lambda cls, date=None: stocks))
+        ZtPoolHistoryService.save_today_zt_pool(db_session, target_date=DAY1, refresh_summary=False)
+        
+        assert ladder(db_session, DAY1)[1]['stockCount'] == 2
+        second = ladder(db_session, DAY2)
+        assert (second[2]['prevHeightCount'], second[2]['promotionRate']) == (2, 50.0)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+akshare 接口录制/回放工具
+
+- record 模式：正常调用 akshare，并把返回的 DataFrame 按 (函数名, 参数) 保存为压缩的 Parquet 文件
+- replay 模式：不访问网络，直接从 Parquet 文件读取数据返回，可配置人工延迟和错误注入
+
+通过替换 akshare 模块上的函数实现，服务代码中的 ak.xxx(...) 调用无需修改。
+用于在离线环境中稳定复现定时任务和页面的性能问题。
+
+环境变量：
+    AKSHARE_MODE: off（默认）/ record / replay
+    AKSHARE_FIXTURE_DIR: 数据文件目录，默认 data/akshare_fixtures
+    AKSHARE_REPLAY_LATENCY: 回放延迟（秒），如 0.5 或 0.2-1.5（区间内随机）
+    AKSHARE_REPLAY_ERROR_RATE: 回放错误注入概率，0 ~ 1
+    AKSHARE_REPLAY_SEED: 随机种子（固定后延迟和错误注入可复现）
+    AKSHARE_REPLAY_MISSING: 回放时缺少数据文件的处理方式，error（默认）/ live（改为实时调用）
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import pandas as pd
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 项目中使用的 akshare 接口
+AKSHARE_FUNCTIONS = [
+    'stock_board_industry_summary_ths',
+    'stock_board_concept_name_ths',
+    'stock_board_concept_name_em',
+    'stock_board_concept_cons_em',
+    'stock_fund_flow_concept',
+    'stock_board_change_em',
+    'stock_zt_pool_em',
+    'stock_zt_pool_zbgc_em',
+    'stock_zt_pool_dtgc_em',
+    'stock_zh_index_spot_sina',
+    'stock_zh_index_spot_em',
+    'stock_fund_flow_individual',
+    'stock_individual_fund_flow',
+    'stock_zh_a_hist',
+    'tool_trade_date_hist_sina',
+]
+
+DEFAULT_FIXTURE_DIR = DATA_DIR / 'akshare_fixtures'
+
+MODES = ['off', 'record', 'replay']
+
+
+class FixtureNotFoundError(LookupError):
+    """回放时找不到对应的数据文件"""
+
+
+class InjectedError(ConnectionError):
+    """回放时注入的模拟网络错误"""
+
+
+def fixture_key(args: tuple, kwargs: dict) -> str:
+    """根据调用参数生成数据文件键（与参数顺序无关的关键字参数）"""
+    payload = json.dumps([list(args), sorted(kwargs.items())], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def parse_latency(value) -> Tuple[float, float]:
+    """解析延迟配置：0.5 -> (0.5, 0.5)，'0.2-1.5' -> (0.2, 1.5)"""
+    if value is None or value == '':
+        return (0.0, 0.0)
+    if isinstance(value, (tuple, list)):
+        return (float(value[0]), float(value[1]))
+    text = str(value)
+    if '-' in text:
+        low, high = text.split('-', 1)
+        return (float(low), float(high))
+    return (float(text), float(text))
+
+
+class AkshareRecorder:
+    """akshare 接口录制/回放器"""
+    
+    def __init__(
+        self,
+        mode: str = 'replay',
+        fixture_dir: Path = None,
+        latency=None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        missing: str = 'error',
+        functions: Optional[Iterable[str]] = None
+    ):
+        """
+        Args:
+            mode: 'record' 或 'replay'
+            fixture_dir: 数据文件目录
+            latency: 回放延迟（秒），数值或 (最小, 最大) 区间
+            error_rate: 回放错误注入概率
+            seed: 随机种子
+            missing: 回放时缺少数据文件的处理方式，'error' 或 'live'
+            functions: 要接管的 akshare 函数名，默认 AKSHARE_FUNCTIONS
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Invalid mode: {mode}. Must be 'record' or 'replay'")
+        if missing not in ('error', 'live'):
+            raise ValueError(f"Invalid missing: {missing}. Must be 'error' or 'live'")
+        
+        self.mode = mode
+        self.fixture_dir = Path(fixture_dir or DEFAULT_FIXTURE_DIR)
+        self.latency = parse_latency(latency)
+        self.error_rate = float(error_rate or 0.0)
+        self.missing = missing
+        self.functions = list(functions or AKSHARE_FUNCTIONS)
+        # 单个函数的延迟覆盖：函数名 -> (最小, 最大)
+        self.function_latency: Dict[str, Tuple[float, float]] = {}
+        
+        self._random = random.Random(seed)
+        self._originals: Dict[str, object] = {}
+        self._cache: Dict[Path, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        # 调用统计：函数名 -> {'calls', 'recorded', 'replayed', 'missing', 'injected_errors'}
+        self.stats: Dict[str, Dict[str, int]] = {}
+    
+    def fixture_path(self, func_name: str, args: tuple, kwargs: dict) -> Path:
+        """数据文件路径：<目录>/<函数名>/<参数键>.parquet"""
+        return self.fixture_dir / func_name / f"{fixture_key(args, kwargs)}.parquet"
+    
+    def set_latency(self, func_name: str, latency):
+        """设置单个函数的回放延迟"""
+        self.function_latency[func_name] = parse_latency(latency)
+    
+    def install(self):
+        """替换 akshare 模块上的函数"""
+        import akshare as ak
+        
+        for name in self.functions:
+            if name in self._originals:
+                continue
+            original = getattr(ak, name, None)
+            if original is None:
+                logger.warning(f"akshare 中不存在函数 {name}，跳过")
+                continue
+            self._originals[name] = original
+            setattr(ak, name, self._wrap(name, original))
+        logger.info(f"akshare {self.mode} 模式已启用，数据目录: {self.fixture_dir}")
+    
+    def uninstall(self):
+        """恢复 akshare 模块上的原函数"""
+        import akshare as ak
+        
+        for name, original in self._originals.items():
+            setattr(ak, name, original)
+        self._originals.clear()
+    
+    def _count(self, func_name: str, field: str):
+        with self._lock:
+            counters = self.stats.setdefault(func_name, {
+                'calls': 0, 'recorded': 0, 'replayed': 0, 'missing': 0, 'injected_errors': 0
+            })
+            counters[field] += 1
+    
+    def _wrap(self, func_name: str, original):
+        """生成录制或回放的包装函数"""
+        def wrapper(*args, **kwargs):
+            self._count(func_name, 'calls')
+            if self.mode == 'record':
+                return self._record(func_name, original, args, kwargs)
+            return self._replay(func_name, original, args, kwargs)
+        
+        wrapper.__name__ = func_name
+        wrapper.__doc__ = getattr(original, '__doc__', None)
+        wrapper.__wrapped__ = original
+        return wrapper
+    
+    def _record(self, func_name: str, original, args: tuple, kwargs: dict):
+        """调用原函数并保存返回的 DataFrame"""
+        result = original(*args, **kwargs)
+        if not isinstance(result, pd.DataFrame):
+            logger.warning(f"{func_name} 返回值不是 DataFrame，未录制")
+            return result
+        
+        path = self.fixture_path(func_name, args, kwargs)
+        try:
+            write_fixture(result, path)
+            self._write_index(func_name, path.stem, args, kwargs, len(result))
+            self._count(func_name, 'recorded')
+        except Exception as e:
+            logger.warning(f"录制 {func_name} 失败: {str(e)}")
+        return result
+    
+    def _write_index(self, func_name: str, key: str, args: tuple, kwargs: dict, rows: int):
+        """在 index.json 中记录参数键对应的调用参数（便于查看已录制的数据）"""
+        index_path = self.fixture_dir / func_name / 'index.json'
+        with self._lock:
+            index = json.loads(index_path.read_text(encoding='utf-8')) if index_path.exists() else {}
+            index[key] = {
+                'args': json.loads(json.dumps(list(args), ensure_ascii=False, default=str)),
+                'kwargs': json.loads(json.dumps(kwargs, ensure_ascii=False, default=str)),
+                'rows': rows,
+                'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            index_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding='utf-8')
+    
+    def _replay(self, func_name: str, original, args: tuple, kwargs: dict):
+        """从数据文件返回 DataFrame（带延迟和错误注入）"""
+        low, high = self.function_latency.get(func_name, self.latency)
+        with self._lock:
+            delay = self._random.uniform(low, high) if high > 0 else 0.0
+            inject_error = self.error_rate > 0 and self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if inject_error:
+            self._count(func_name, 'injected_errors')
+            raise InjectedError(f"回放注入错误: {func_name}")
+        
+        path = self.fixture_path(func_name, args, kwargs)
+        with self._lock:
+            df = self._cache.get(path)
+        if df is None:
+            if not path.exists():
+                self._count(func_name, 'missing')
+                if self.missing == 'live':
+                    return original(*args, **kwargs)
+                raise FixtureNotFoundError(f"未找到回放数据: {func_name}{args}{kwargs} -> {path}")
+            df = read_fixture(path)
+            with self._lock:
+                self._cache[path] = df
+        
+        self._count(func_name, 'replayed')
+        # 调用方可能修改返回值，每次返回副本
+        return df.copy()
+
+
+def write_fixture(df: pd.DataFrame, path: Path):
+    """
+    保存 DataFrame 为 zstd 压缩的 Parquet 文件
+    
+    列名统一转为字符串；无法直接转换的混合类型列按字符串保存。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    df = df.reset_index(drop=True)
+    try:
+        df.to_parquet(path, compression='zstd', index=False)
+    except Exception:
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+        df.to_parquet(path, compression='zstd', index=False)
+
+
+def read_fixture(path: Path) -> pd.DataFrame:
+    """读取 Parquet 数据文件"""
+    return pd.read_parquet(path)
+
+
+# 全局录制/回放器实例
+_recorder: Optional[AkshareRecorder] = None
+
+
+def install(mode: str = 'replay', **kwargs) -> Optional[AkshareRecorder]:
+    """
+    启用录制或回放（替换已启用的实例）
+    
+    Args:
+        mode: 'off'、'record' 或 'replay'
+        **kwargs: 传给 AkshareRecorder 的参数
+    
+    Returns:
+        AkshareRecorder 实例，mode 为 'off' 时返回 None
+    """
+    global _recorder
+    if mode not in MODES:
+        raise ValueError(f"Invalid mode: {mode}. Must be one of {MODES}")
+    uninstall()
+    if mode == 'off':
+        return None
+    _recorder = AkshareRecorder(mode=mode, **kwargs)
+    _recorder.install()
+    return _recorder
+
+
+def uninstall():
+    """关闭录制或回放，恢复 akshare 原函数"""
+    global _recorder
+    if _recorder is not None:
+        _recorder.uninstall()
+        _recorder = None
+
+
+def get_recorder() -> Optional[AkshareRecorder]:
+    """获取当前启用的录制/回放器"""
+    return _recorder
+
+
+def install_from_env() -> Optional[AkshareRecorder]:
+    """根据环境变量启用录制或回放（AKSHARE_MODE 未设置或为 off 时不做任何事）"""
+    mode = os.environ.get('AKSHARE_MODE', 'off').lower()
+    if mode == 'off' or (_recorder is not None and _recorder.mode == mode):
+        return _recorder
+    seed = os.environ.get('AKSHARE_REPLAY_SEED')
+    return install(
+        mode=mode,
+        fixture_dir=os.environ.get('AKSHARE_FIXTURE_DIR') or DEFAULT_FIXTURE_DIR,
+        latency=os.environ.get('AKSHARE_REPLAY_LATENCY'),
+        error_rate=float(os.environ.get('AKSHARE_REPLAY_ERROR_RATE', '0') or 0),
+        seed=int(seed) if seed else None,
+        missing=os.environ.get('AKSHARE_REPLAY_MISSING', 'error').lower(),
+    )
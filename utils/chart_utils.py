@@ -6,15 +6,107 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+from typing import Optional, Tuple
 from chart_config.chart_config import (
     CHANGE_PERCENT_COLOR_SCALE,
     CHANGE_PERCENT_COLOR_SCALE_REVERSE,
     POSITIVE_COLOR_SCALE,
     NEGATIVE_COLOR_SCALE,
     CHART_CONFIG,
-    LAYOUT_CONFIG
+    LAYOUT_CONFIG,
+    HEATMAP_CONFIG,
+    TRACE_CONFIG,
+    LINE_CHART_CONFIG,
+    MULTI_LINE_COLORS
 )
-from utils.time_utils import filter_trading_days
+
+def prepare_date_axis(df: pd.DataFrame, date_col: str = 'date') -> pd.DataFrame:
+    """
+    解析一次日期列并生成 date_str 列（用作分类X轴，避免非交易日空白）
+    
+    已经存在 date_str 列时直接复用，不重复解析。
+    """
+    if 'date_str' in df.columns:
+        return df
+    df = df.copy()
+    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        df = df.dropna(subset=[date_col])
+    df['date_str'] = df[date_col].dt.strftime('%Y-%m-%d')
+    return df
+
+def build_line_traces(
+    df: pd.DataFrame,
+    y_col: str,
+    x_col: str = 'date_str',
+    group_col: Optional[str] = None,
+    groups: Optional[list] = None,
+    colors: Optional[list] = None,
+    y_label: str = '',
+    value_suffix: str = '',
+    line_width: Optional[float] = None,
+    use_webgl: Optional[bool] = None,
+    **trace_kwargs
+) -> list:
+    """
+    构建多条折线的 trace 列表（只分组一次）
+    
+    - 按 group_col 一次 groupby 切分，每组一条折线
+    - 总点数超过 TRACE_CONFIG['webgl_point_threshold'] 时使用 Scattergl（不支持平滑曲线）
+    - 单条折线点数过多时不绘制标记点
+    
+    Args:
+        df: 数据（x_col 通常为 prepare_date_axis 生成的 date_str）
+        y_col: 数值列
+        group_col: 分组列（如板块名称），None 表示只有一条折线
+        groups: 分组顺序（同时决定颜色），None 表示按出现顺序
+        colors: 颜色列表，默认 MULTI_LINE_COLORS
+        y_label: 悬停提示中的数值标签
+        value_suffix: 悬停提示中的数值后缀（如 %）
+        use_webgl: 是否使用 WebGL，None 表示按点数自动判断
+        **trace_kwargs: 其他 trace 参数（如 fill、fillcolor、name）
+    """
+    if df.empty:
+        return []
+    
+    colors = colors or MULTI_LINE_COLORS
+    if use_webgl is None:
+        use_webgl = len(df) > TRACE_CONFIG['webgl_point_threshold']
+    trace_cls = go.Scattergl if use_webgl else go.Scatter
+    
+    if group_col:
+        grouped = dict(tuple(df.sort_values(x_col).groupby(group_col, sort=False)))
+        groups = [g for g in (groups if groups is not None else grouped.keys()) if g in grouped]
+        series = [(g, grouped[g]) for g in groups]
+    else:
+        series = [(trace_kwargs.pop('name', y_label or y_col), df.sort_values(x_col))]
+    
+    traces = []
+    for i, (name, group_df) in enumerate(series):
+        color = colors[i % len(colors)]
+        show_markers = len(group_df) <= TRACE_CONFIG['marker_point_limit']
+        line = dict(color=color, width=line_width or LINE_CHART_CONFIG.get('line_width', 2))
+        if not use_webgl:
+            line['shape'] = 'spline'  # 平滑曲线（WebGL 不支持）
+        traces.append(trace_cls(
+            x=group_df[x_col].to_numpy(),
+            y=group_df[y_col].to_numpy(),
+            mode='lines+markers' if show_markers else 'lines',
+            name=str(name),
+            line=line,
+            marker=dict(
+                color=color,
+                size=LINE_CHART_CONFIG.get('marker_size', 5),
+                line=dict(
+                    width=LINE_CHART_CONFIG.get('marker_line_width', 1),
+                    color=LINE_CHART_CONFIG.get('marker_line_color', 'white')
+                )
+            ),
+            hovertemplate=f'<b>{name}</b><br>日期: %{{x}}<br>{y_label}: %{{y:.2f}}{value_suffix}<extra></extra>',
+            **trace_kwargs
+        ))
+    return traces
 
 def create_sector_trend_chart(
     df: pd.DataFrame,
@@ -40,30 +132,13 @@ def create_sector_trend_chart(
         return go.Figure()
     
     # 筛选选中的板块
-    filtered_df = df[df['name'].isin(sectors)].copy() if 'name' in df.columns else df.copy()
+    filtered_df = df[df['name'].isin(sectors)] if 'name' in df.columns else df
     
     if filtered_df.empty:
         return go.Figure()
     
-    # 确保日期是datetime类型
-    if not pd.api.types.is_datetime64_any_dtype(filtered_df[date_col]):
-        filtered_df[date_col] = pd.to_datetime(filtered_df[date_col])
-    
-    # 过滤非交易日
-    filtered_df = filter_trading_days(filtered_df, date_column=date_col)
-    
-    if filtered_df.empty:
-        return go.Figure()
-    
-    # filter_trading_days 会将date列转换为date对象，需要重新转换为datetime才能使用.dt访问器
-    if not pd.api.types.is_datetime64_any_dtype(filtered_df[date_col]):
-        filtered_df[date_col] = pd.to_datetime(filtered_df[date_col])
-    
-    # 排序数据
-    filtered_df = filtered_df.sort_values([date_col, 'name'])
-    
-    # 将日期转换为字符串格式，用于X轴显示（避免非交易日空白）
-    filtered_df['date_str'] = filtered_df[date_col].dt.strftime('%Y-%m-%d')
+    # 历史数据只包含交易日，解析一次日期即可
+    filtered_df = prepare_date_axis(filtered_df, date_col)
     
     # 根据value_col设置不同的标签
     y_label_map = {
@@ -73,44 +148,20 @@ def create_sector_trend_chart(
     }
     y_label = y_label_map.get(value_col, value_col)
     
-    # 使用统一的配色方案
-    from chart_config.chart_config import MULTI_LINE_COLORS, LINE_CHART_CONFIG
-    
-    # 获取唯一的板块名称
-    unique_sectors = filtered_df['name'].unique() if 'name' in filtered_df.columns else []
-    
-    # 创建颜色映射
-    color_map = {}
-    for i, sector in enumerate(unique_sectors):
-        color_map[sector] = MULTI_LINE_COLORS[i % len(MULTI_LINE_COLORS)]
-    
-    # 使用 go.Figure 和 go.Scatter 来创建图表，以便更好地控制 X 轴
+    # 使用 go.Figure 和统一的 trace 构建函数，以便更好地控制 X 轴
     fig = go.Figure()
     
-    # 为每个板块添加一条折线
-    for sector in unique_sectors:
-        sector_data = filtered_df[filtered_df['name'] == sector].copy()
-        if not sector_data.empty:
-            fig.add_trace(go.Scatter(
-                x=sector_data['date_str'],
-                y=sector_data[value_col],
-                mode='lines+markers',
-                name=sector,
-                line=dict(
-                    color=color_map[sector],
-                    width=LINE_CHART_CONFIG.get('line_width', 2),
-                    shape='spline'  # 平滑曲线
-                ),
-                marker=dict(
-                    color=color_map[sector],
-                    size=LINE_CHART_CONFIG.get('marker_size', 5),
-                    line=dict(
-                        width=LINE_CHART_CONFIG.get('marker_line_width', 1),
-                        color=LINE_CHART_CONFIG.get('marker_line_color', 'white')
-                    )
-                ),
-                hovertemplate=f'<b>{sector}</b><br>日期: %{{x}}<br>{y_label}: %{{y:.2f}}<extra></extra>'
-            ))
+    # 每个板块一条折线（按名称排序，颜色稳定）
+    group_col = 'name' if 'name' in filtered_df.columns else None
+    groups = sorted(filtered_df['name'].unique()) if group_col else None
+    fig.add_traces(build_line_traces(
+        filtered_df,
+        y_col=value_col,
+        group_col=group_col,
+        groups=groups,
+        y_label=y_label,
+        line_width=3
+    ))
     
     # 添加零线 - 优化样式
     fig.add_hline(
@@ -183,20 +234,13 @@ def create_sector_trend_chart(
         margin=dict(l=60, r=30, t=80, b=60)
     )
     
-    # 设置X轴日期格式，只显示日期（不显示时间）
-    fig.update_xaxes(
-        tickformat='%Y-%m-%d',  # 只显示日期格式：YYYY-MM-DD
-        dtick='D1'  # 每天一个刻度
-    )
+    # 分类X轴最多显示20个日期刻度，日期较多时避免标签重叠
+    fig.update_xaxes(nticks=20)
     
-    # 优化线条样式
+    # 优化标记点样式
     fig.update_traces(
-        line_width=3,  # 增加线条宽度，更清晰
         marker_size=6,  # 标记点大小
-        marker_line_width=1.5,  # 标记点边框宽度
-        marker_line_color='white',  # 标记点边框颜色
-        mode='lines+markers',  # 显示线条和标记点
-        hovertemplate='<b>%{fullData.name}</b><br>日期: %{x}<br>' + y_label + ': %{y:.2f}<extra></extra>'
+        marker_line_width=1.5  # 标记点边框宽度
     )
     
     return fig
@@ -442,14 +486,206 @@ def create_distribution_histogram(
     
     return fig
 
+def build_heatmap_matrix(
+    df: pd.DataFrame,
+    x_col: str = 'date',
+    y_col: str = 'name',
+    value_col: str = 'changePercent'
+) -> Tuple[np.ndarray, list, list]:
+    """
+    将长表数据转换为 行(板块)×列(日期) 的 float32 矩阵
+    
+    按 (板块, 日期) 的位置编码用 bincount 聚合，不做 pivot_table：
+    日期或板块名称为空的记录被丢弃，同一 (日期, 板块) 有多条记录时取平均值（与 pivot_table 一致）。
+    
+    Returns:
+        (values, row_labels, col_labels)，缺失值为 NaN
+    """
+    dates = df[x_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors='coerce')
+    valid = dates.notna().to_numpy() & df[y_col].notna().to_numpy()
+    
+    col_codes, col_labels = pd.factorize(dates[valid], sort=True)
+    row_codes, row_labels = pd.factorize(df[y_col][valid], sort=True)
+    raw = pd.to_numeric(df[value_col][valid], errors='coerce').to_numpy(dtype=np.float64)
+    
+    size = len(row_labels) * len(col_labels)
+    cells = row_codes * len(col_labels) + col_codes
+    present = ~np.isnan(raw)
+    sums = np.bincount(cells[present], weights=raw[present], minlength=size)
+    counts = np.bincount(cells[present], minlength=size)
+    values = np.divide(sums, counts, out=np.full(size, np.nan), where=counts > 0)
+    values = values.reshape(len(row_labels), len(col_labels)).astype(np.float32)
+    return values, list(row_labels), [d.strftime('%Y-%m-%d') for d in col_labels]
+
+def select_heatmap_rows(
+    values: np.ndarray,
+    row_labels: list,
+    top_k: Optional[int] = None,
+    order: str = 'latest'
+) -> Tuple[np.ndarray, list]:
+    """
+    服务端选择和排序热力图的行
+    
+    Args:
+        values: 行×列 矩阵
+        row_labels: 行标签
+        top_k: 只保留波动最大（平均绝对值最大）的前K行，None表示全部保留
+        order: 行排序方式：
+            - 'latest': 按最新一列的数值降序
+            - 'mean': 按平均值降序
+            - 'cluster': 按走势相似度排序（第一主成分投影），相似的板块排在一起
+    
+    Returns:
+        (values, row_labels)
+    """
+    if len(row_labels) == 0:
+        return values, row_labels
+    
+    if top_k and top_k < len(row_labels):
+        activity = np.nanmean(np.abs(values), axis=1)
+        keep = np.argsort(-np.nan_to_num(activity, nan=-1.0), kind='stable')[:top_k]
+        values = values[keep]
+        row_labels = [row_labels[i] for i in keep]
+    
+    if order == 'latest':
+        # 每行最后一个有效值
+        last_valid = values.shape[1] - 1 - np.argmax(~np.isnan(values[:, ::-1]), axis=1)
+        key = values[np.arange(len(values)), last_valid]
+    elif order == 'mean':
+        key = np.nanmean(values, axis=1)
+    elif order == 'cluster':
+        filled = np.nan_to_num(values - np.nanmean(values, axis=1, keepdims=True), nan=0.0)
+        norms = np.linalg.norm(filled, axis=1, keepdims=True)
+        normalized = np.divide(filled, norms, out=np.zeros_like(filled), where=norms > 0)
+        # 第一主成分方向上的投影，走势相近的行投影值相近
+        _, _, vt = np.linalg.svd(normalized, full_matrices=False)
+        key = normalized @ vt[0]
+    else:
+        return values, row_labels
+    
+    sorted_idx = np.argsort(-np.nan_to_num(key, nan=-np.inf), kind='stable')
+    return values[sorted_idx], [row_labels[i] for i in sorted_idx]
+
+def create_heatmap_from_matrix(
+    values: np.ndarray,
+    row_labels: list,
+    col_labels: list,
+    title: str = '板块涨跌幅热力图',
+    value_label: str = '涨跌幅(%)',
+    show_text: Optional[bool] = None,
+    use_webgl: Optional[bool] = None
+) -> go.Figure:
+    """
+    根据预先透视好的矩阵创建热力图
+    
+    - 矩阵以 float32 传给前端（紧凑的二进制数组编码）
+    - 单元格数量超过阈值时不显示数值文字
+    - 行数较多时压缩行高并隐藏纵轴标签，避免图表过高
+    
+    Args:
+        values: 行×列 矩阵
+        row_labels: 行标签（板块）
+        col_labels: 列标签（日期）
+        show_text: 是否显示数值文字，None表示按单元格数量自动判断
+        use_webgl: 是否使用WebGL热力图，None表示按单元格数量自动判断（当前Plotly版本不支持时自动回退）
+    """
+    if values.size == 0:
+        return go.Figure()
+    
+    n_rows, n_cols = values.shape
+    n_cells = n_rows * n_cols
+    if show_text is None:
+        show_text = n_cells <= HEATMAP_CONFIG['text_max_cells']
+    if use_webgl is None:
+        use_webgl = n_cells >= HEATMAP_CONFIG['webgl_min_cells']
+    trace_cls = getattr(go, 'Heatmapgl', None) if use_webgl else None
+    trace_cls = trace_cls or go.Heatmap
+    
+    z = np.ascontiguousarray(values, dtype=np.float32)
+    trace_kwargs = dict(
+        z=z,
+        x=col_labels,
+        y=row_labels,
+        colorscale=CHANGE_PERCENT_COLOR_SCALE,  # 红-黄-绿配色
+        zmid=0,  # 0值为中间点
+        hovertemplate='<b>%{y}</b><br>日期: %{x}<br>' + value_label + ': %{z:.2f}<extra></extra>',
+        colorbar=dict(
+            title=dict(text=value_label, font=dict(size=12, color='#2c3e50')),
+            tickfont=dict(size=11, color='#6b7280'),
+            thickness=20,
+            len=0.6,
+            yanchor='middle',
+            y=0.5,
+            xanchor='left',
+            x=1.02
+        ),
+    )
+    if show_text and trace_cls is go.Heatmap:
+        trace_kwargs.update(texttemplate='%{z:.1f}', textfont=dict(size=10))
+    fig = go.Figure(trace_cls(**trace_kwargs))
+    
+    # 行数较多时压缩行高，总高度不超过上限
+    row_height = max(
+        HEATMAP_CONFIG['min_row_height'],
+        min(HEATMAP_CONFIG['row_height'], HEATMAP_CONFIG['max_height'] // max(n_rows, 1))
+    )
+    height = min(HEATMAP_CONFIG['max_height'], max(HEATMAP_CONFIG['min_height'], n_rows * row_height + 140))
+    show_y_ticks = n_rows <= HEATMAP_CONFIG['max_y_ticks']
+    
+    fig.update_layout(
+        title=dict(
+            text=title,
+            font=dict(size=20, color='#2c3e50', family='Arial, sans-serif'),
+            x=0.5,
+            xanchor='center',
+            pad=dict(b=25)
+        ),
+        height=height,
+        plot_bgcolor='rgba(0,0,0,0)',  # 透明背景
+        paper_bgcolor='rgba(0,0,0,0)',  # 透明背景
+        font=dict(size=12, family='Arial, sans-serif'),
+        xaxis=dict(
+            title=dict(
+                font=dict(size=14, color='#2c3e50', family='Arial, sans-serif'),
+                text='日期'
+            ),
+            type='category',  # 只显示有数据的交易日
+            tickfont=dict(size=11, color='#6b7280'),
+            nticks=min(n_cols, 20),
+            side='bottom'
+        ),
+        yaxis=dict(
+            title=dict(
+                font=dict(size=14, color='#2c3e50', family='Arial, sans-serif'),
+                text='板块'
+            ),
+            type='category',
+            autorange='reversed',  # 第一行显示在顶部
+            showticklabels=show_y_ticks,
+            tickfont=dict(size=11 if n_rows <= 40 else 9, color='#6b7280')
+        ),
+        margin=dict(l=100 if show_y_ticks else 40, r=120, t=80, b=60)
+    )
+    
+    return fig
+
 def create_heatmap(
     df: pd.DataFrame,
     x_col: str = 'date',
     y_col: str = 'name',
     value_col: str = 'changePercent',
-    title: str = '板块涨跌幅热力图'
+    title: str = '板块涨跌幅热力图',
+    top_k: Optional[int] = None,
+    order: str = 'latest'
 ) -> go.Figure:
-    """创建热力图 - 优化显示"""
+    """
+    创建热力图（长表数据）
+    
+    数据只包含交易日，直接按 (日期, 板块) 写入矩阵，不再逐次过滤非交易日。
+    行数较多时可以通过 top_k 只保留波动最大的板块。
+    """
     if df.empty:
         return go.Figure()
     
@@ -460,113 +696,14 @@ def create_heatmap(
         print(f"Warning: Missing columns in create_heatmap: {missing_cols}")
         return go.Figure()
     
-    # 透视表
     try:
-        # 确保日期是datetime类型
-        df_copy = df.copy()
-        if not pd.api.types.is_datetime64_any_dtype(df_copy[x_col]):
-            df_copy[x_col] = pd.to_datetime(df_copy[x_col], errors='coerce')
-        
-        # 移除日期转换失败的行
-        df_copy = df_copy.dropna(subset=[x_col])
-        
-        if df_copy.empty:
-            print("Warning: All dates are invalid after conversion")
-            return go.Figure()
-        
-        # 过滤非交易日
-        df_copy = filter_trading_days(df_copy, date_column=x_col)
-        
-        if df_copy.empty:
-            print("Warning: No trading days found after filtering")
+        values, row_labels, col_labels = build_heatmap_matrix(df, x_col, y_col, value_col)
+        if values.size == 0:
+            print("Warning: Heatmap matrix is empty")
             return go.Figure()
         
-        # 按日期排序
-        df_copy = df_copy.sort_values(by=[x_col, y_col])
-        
-        pivot_df = df_copy.pivot_table(
-            index=y_col,
-            columns=x_col,
-            values=value_col,
-            aggfunc='mean'
-        )
-        
-        # 如果透视表为空，返回空图表
-        if pivot_df.empty:
-            print("Warning: Pivot table is empty")
-            return go.Figure()
-        
-        fig = px.imshow(
-            pivot_df,
-            title=title,
-            labels=dict(x='日期', y='板块', color='涨跌幅(%)'),
-            color_continuous_scale='RdYlGn',  # 红-黄-绿配色，红色表示上涨，绿色表示下跌
-            color_continuous_midpoint=0,  # 设置0值为中间点（黄色），确保上涨为红色，下跌为绿色
-            aspect='auto',
-            text_auto='.1f',  # 显示数值，保留1位小数
-            textfont=dict(size=10, color='white')  # 数值文字样式
-        )
-        
-        # 优化数值显示 - 根据背景色自动调整文字颜色
-        fig.update_traces(
-            texttemplate='%{text:.1f}%',
-            textfont=dict(size=10),
-            hovertemplate='<b>%{y}</b><br>日期: %{x}<br>涨跌幅: %{z:.2f}%<extra></extra>'
-        )
-        
-        # 优化布局
-        fig.update_layout(
-            height=max(600, len(pivot_df) * 30),  # 根据板块数量动态调整高度，增加行高
-            plot_bgcolor='rgba(0,0,0,0)',  # 透明背景
-            paper_bgcolor='rgba(0,0,0,0)',  # 透明背景
-            font=dict(size=12, family='Arial, sans-serif'),
-            title=dict(
-                font=dict(size=20, color='#2c3e50', family='Arial, sans-serif'),
-                x=0.5,
-                xanchor='center',
-                pad=dict(b=25)
-            ),
-            xaxis=dict(
-                title=dict(
-                    font=dict(size=14, color='#2c3e50', family='Arial, sans-serif'),
-                    text='日期'
-                ),
-                tickformat='%m-%d',  # 只显示月-日，更简洁
-                tickfont=dict(size=11, color='#6b7280'),
-                showgrid=True,
-                gridcolor='rgba(128, 128, 128, 0.1)',
-                gridwidth=1,
-                side='bottom'
-            ),
-            yaxis=dict(
-                title=dict(
-                    font=dict(size=14, color='#2c3e50', family='Arial, sans-serif'),
-                    text='板块'
-                ),
-                tickfont=dict(size=11, color='#6b7280'),
-                showgrid=True,
-                gridcolor='rgba(128, 128, 128, 0.1)',
-                gridwidth=1
-            ),
-            coloraxis=dict(
-                colorbar=dict(
-                    title=dict(
-                        text='涨跌幅(%)',
-                        font=dict(size=12, color='#2c3e50')
-                    ),
-                    tickfont=dict(size=11, color='#6b7280'),
-                    thickness=20,
-                    len=0.6,
-                    yanchor='middle',
-                    y=0.5,
-                    xanchor='left',
-                    x=1.02
-                )
-            ),
-            margin=dict(l=100, r=120, t=80, b=60)  # 优化边距
-        )
-        
-        return fig
+        values, row_labels = select_heatmap_rows(values, row_labels, top_k=top_k, order=order)
+        return create_heatmap_from_matrix(values, row_labels, col_labels, title=title)
     except Exception as e:
         print(f"Error in create_heatmap: {str(e)}")
         import traceback
@@ -581,34 +718,54 @@ def create_scatter_chart(
     color_col: str = 'changePercent',
     title: str = '涨跌幅 vs 成交量'
 ) -> go.Figure:
-    """创建散点图（气泡图）"""
+    """创建散点图（气泡图），点数较多时使用 WebGL 渲染"""
     if df.empty:
         return go.Figure()
     
-    fig = px.scatter(
-        df,
-        x=x_col,
-        y=y_col,
-        size=size_col,
-        color=color_col,
-        hover_data=['name'] if 'name' in df.columns else [],
-        title=title,
-        labels={
-            x_col: '总成交量(万手)',
-            y_col: '涨跌幅(%)',
-            size_col: '总成交额(亿元)',
-            color_col: '涨跌幅(%)',
-            'name': '板块'
-        },
-        color_continuous_scale=CHANGE_PERCENT_COLOR_SCALE
+    labels = {
+        x_col: '总成交量(万手)',
+        y_col: '涨跌幅(%)',
+        size_col: '总成交额(亿元)',
+        color_col: '涨跌幅(%)',
+    }
+    trace_cls = go.Scattergl if len(df) > TRACE_CONFIG['webgl_point_threshold'] else go.Scatter
+    
+    marker = dict(
+        color=df[color_col].to_numpy() if color_col in df.columns else None,
+        colorscale=CHANGE_PERCENT_COLOR_SCALE,
+        colorbar=dict(title=dict(text=labels[color_col])),
+        line=dict(width=0.5, color='white'),
+        opacity=0.8
     )
+    if size_col in df.columns:
+        # 与 px.scatter 一致：最大气泡直径约 20 像素
+        sizes = df[size_col].clip(lower=0).fillna(0).to_numpy()
+        marker.update(size=sizes, sizemode='area', sizeref=2.0 * max(sizes.max(), 1e-9) / (20 ** 2), sizemin=2)
+    
+    hover_name = df['name'].to_numpy() if 'name' in df.columns else None
+    fig = go.Figure(trace_cls(
+        x=df[x_col].to_numpy(),
+        y=df[y_col].to_numpy(),
+        mode='markers',
+        marker=marker,
+        text=hover_name,
+        hovertemplate=(
+            ('<b>%{text}</b><br>' if hover_name is not None else '')
+            + f'{labels[x_col]}: %{{x:,.2f}}<br>{labels[y_col]}: %{{y:.2f}}<extra></extra>'
+        )
+    ))
     
     # 添加象限线
     fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
     if x_col in df.columns:
         fig.add_vline(x=df[x_col].median(), line_dash="dash", line_color="gray", opacity=0.5)
     
-    fig.update_layout(height=CHART_CONFIG['height'])
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels[x_col],
+        yaxis_title=labels[y_col],
+        height=CHART_CONFIG['height']
+    )
     return fig
 
 def create_pie_chart(
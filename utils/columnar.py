@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多数据集的列式编码（快照接口使用）
+
+- 列式 JSON：每个数据集编码为 {列名: [值, ...]}，可直接 pd.DataFrame(columns) 还原
+- Arrow IPC / Parquet：所有数据集放在一行的表中，每列是一个数据集（list<struct>），
+  一次请求、一次反序列化即可得到全部数据集，用 decode_table 还原为 DataFrame
+
+以及按块的流式编码（范围导出接口使用）：iter_ndjson / iter_arrow_stream / iter_parquet
+逐块编码行式记录，每块编码完成后立即产出字节，内存占用与块大小相关、与总行数无关。
+"""
+import io
+import json
+from datetime import date, datetime, time
+from typing import Dict, Iterable, Iterator, List
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def to_columns(rows: List[Dict]) -> Dict[str, list]:
+    """行式记录列表转换为列式 {列名: [值, ...]}（列顺序与第一行的键一致）"""
+    columns: Dict[str, list] = {}
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns[key] = []
+    for key, values in columns.items():
+        values.extend(row.get(key) for row in rows)
+    return columns
+
+
+def to_arrow_table(datasets: Dict[str, List[Dict]]) -> pa.Table:
+    """多个数据集编码为一行的 Arrow 表：每列一个数据集，类型为 list<struct>"""
+    return pa.table({name: pa.array([rows]) for name, rows in datasets.items()})
+
+
+def encode_arrow(datasets: Dict[str, List[Dict]]) -> bytes:
+    """编码为 Arrow IPC 流"""
+    table = to_arrow_table(datasets)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_parquet(datasets: Dict[str, List[Dict]]) -> bytes:
+    """编码为 Parquet 文件"""
+    buffer = io.BytesIO()
+    pq.write_table(to_arrow_table(datasets), buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+def decode_table(table: pa.Table) -> Dict[str, pd.DataFrame]:
+    """
+    把 to_arrow_table 的表还原为 {数据集: DataFrame}
+    
+    示例（Arrow IPC 流）：decode_table(pa.ipc.open_stream(content).read_all())
+    """
+    result = {}
+    for name in table.column_names:
+        values = table.column(name).combine_chunks().flatten()
+        if pa.types.is_struct(values.type):
+            result[name] = pa.Table.from_struct_array(values).to_pandas()
+        else:
+            result[name] = pd.DataFrame()
+    return result
+
+
+class _ChunkSink(io.BytesIO):
+    """写入器的输出缓冲：take() 取出已写入的字节并清空缓冲，tell() 仍返回累计写入的位置"""
+    
+    def __init__(self):
+        super().__init__()
+        self._offset = 0
+    
+    def tell(self) -> int:
+        return self._offset + super().tell()
+    
+    def take(self) -> bytes:
+        data = self.getvalue()
+        self._offset += len(data)
+        self.seek(0)
+        self.truncate(0)
+        return data
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f'无法序列化的类型: {type(value).__name__}')
+
+
+def iter_ndjson(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """逐块编码为 NDJSON（每行一条记录）"""
+    for rows in chunks:
+        if rows:
+            yield ''.join(
+                json.dumps(row, ensure_ascii=False, default=_json_default) + '\n' for row in rows
+            ).encode('utf-8')
+
+
+def iter_arrow_stream(schema: pa.Schema, chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """逐块编码为 Arrow IPC 流（每块一个 record batch，schema 随第一块产出）"""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in chunks:
+            if rows:
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                yield sink.take()
+    yield sink.take()
+
+
+def iter_parquet(schema: pa.Schema, chunks: Iterable[List[Dict]], compression: str = 'zstd') -> Iterator[bytes]:
+    """逐块编码为 Parquet（每块一个 row group，文件尾的元数据在最后产出）"""
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        for rows in chunks:
+            if rows:
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                yield sink.take()
+    yield sink.take()
@@ -5,11 +5,16 @@
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from database.db import SessionLocal
 from services.sector_history_service import SectorHistoryService
+from services.index_history_service import IndexHistoryService
 from services.zt_pool_history_service import ZtPoolHistoryService
 from services.zbgc_pool_history_service import ZbgcPoolHistoryService
 from services.dtgc_pool_history_service import DtgcPoolHistoryService
+from services.sector_rotation_service import SectorRotationService
+from services.market_summary_service import MarketSummaryService
+from utils.chart_utils import select_heatmap_rows
 from datetime import date
 
 @st.cache_data(ttl=300)  # 缓存5分钟
@@ -75,6 +80,57 @@ def load_sector_data_by_date(target_date: date, sector_type: str = None) -> pd.D
     finally:
         db.close()
 
+@st.cache_data(ttl=300)
+def load_sector_rotation(sector_type: str = 'industry', window: int = 5, target_date: date = None) -> pd.DataFrame:
+    """
+    加载板块轮动排名（滚动累计涨幅、排名变化、连续涨跌天数、Z分数）
+    
+    Args:
+        sector_type: 板块类型，'industry'（行业板块）或 'concept'（概念板块）
+        window: 滚动窗口（交易日数）
+        target_date: 日期，None 表示最新交易日
+    """
+    db = SessionLocal()
+    try:
+        rotation = SectorRotationService.get_rotation_by_date(db, sector_type, window, target_date)
+        return pd.DataFrame(rotation)
+    except Exception as e:
+        st.error(f"加载板块轮动数据失败: {str(e)}")
+        load_sector_rotation.clear()
+        return pd.DataFrame()
+    finally:
+        db.close()
+
+@st.cache_data(ttl=300)
+def load_sector_heatmap(
+    start_date: date,
+    end_date: date,
+    sector_type: str = 'industry',
+    metric: str = 'change_percent',
+    top_k: int = None,
+    order: str = 'latest'
+) -> tuple:
+    """
+    加载预先透视好的板块热力图矩阵（已在服务端完成 Top-K 选择和排序）
+    
+    Returns:
+        (values, row_labels, col_labels)，values 为 float32 矩阵
+    """
+    db = SessionLocal()
+    try:
+        # 热力图日期范围可能较长，使用一年的回看窗口
+        values, names, dates = SectorRotationService.get_metric_matrix(
+            db, sector_type, metric, start_date, end_date, lookback_days=250
+        )
+        values, names = select_heatmap_rows(values, names, top_k=top_k, order=order)
+        return values, names, [d.strftime('%Y-%m-%d') for d in dates]
+    except Exception as e:
+        st.error(f"加载板块热力图数据失败: {str(e)}")
+        load_sector_heatmap.clear()
+        return np.empty((0, 0), dtype=np.float32), [], []
+    finally:
+        db.close()
+
 @st.cache_data(ttl=600)  # 缓存10分钟
 def get_available_dates() -> list:
     """获取所有有数据的日期列表"""
@@ -127,3 +183,39 @@ def load_dtgc_pool_data(target_date: date) -> pd.DataFrame:
     finally:
         db.close()
 
+# 批量加载当月所有日期的数据（优化性能）
+@st.cache_data(ttl=300)  # 缓存5分钟
+def load_month_data(year, month, month_dates, focused_indices):
+    """批量加载整月的数据"""
+    if not month_dates:
+        return {}
+    
+    db = SessionLocal()
+    try:
+        # 每日市场概况（整月一次查询）
+        summaries = {
+            summary['date']: summary
+            for summary in MarketSummaryService.get_summary_by_date_range(db, min(month_dates), max(month_dates))
+        }
+        month_data = {}
+        for current_date in month_dates:
+            try:
+                # 获取所有关注的指数数据
+                indices_data = IndexHistoryService.get_indices_by_date(db, current_date)
+                focused_indices_data = [idx for idx in indices_data if idx.get('code') in focused_indices]
+                
+                # 获取top3板块
+                sectors_data = SectorHistoryService.get_sectors_by_date(db, current_date, 'concept')
+                up_sectors = [s for s in sectors_data if s.get('changePercent', 0) > 0]
+                top3_sectors = sorted(up_sectors, key=lambda x: x.get('changePercent', 0), reverse=True)[:3]
+                
+                month_data[current_date] = {
+                    'indices': focused_indices_data,
+                    'top3_sectors': top3_sectors,
+                    'market_summary': summaries.get(current_date.strftime('%Y-%m-%d'))
+                }
+            except Exception:
+                pass
+        return month_data
+    finally:
+        db.close()
@@ -13,21 +13,29 @@ from services.stock_index_service import StockIndexService
 # 配置文件路径
 CONFIG_FILE = Path(__file__).parent.parent / "data" / "index_base_config.json"
 
+# 已加载的配置：(配置文件修改时间, 指数列表)，修改时间变化后重新读取
+_config_cache: Optional[tuple] = None
+
 def load_index_base_config() -> List[Dict[str, str]]:
     """
-    加载指数基础配置
+    加载指数基础配置（按配置文件修改时间缓存，文件未修改时不重新读取）
     
     Returns:
         List[Dict]: 指数基础配置列表，每个元素包含 'code' 和 'name'
     """
+    global _config_cache
     if not CONFIG_FILE.exists():
         # 如果配置文件不存在，从CSV文件生成
         generate_base_config_from_csv()
     
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('indices', [])
+        mtime = CONFIG_FILE.stat().st_mtime
+        if _config_cache is None or _config_cache[0] != mtime:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _config_cache = (mtime, data.get('indices', []))
+        # 返回副本，调用方修改不影响缓存
+        return [dict(idx) for idx in _config_cache[1]]
     except (json.JSONDecodeError, IOError):
         return []
 
@@ -129,32 +137,22 @@ def get_index_by_code(code: str) -> Optional[Dict[str, str]]:
 
 def search_indices(keyword: str) -> List[Dict[str, str]]:
     """
-    搜索指数（根据代码或名称）
+    搜索指数（根据代码、名称或拼音首字母，见 services.search_service）
     
     Args:
         keyword: 搜索关键词
     
     Returns:
-        List[Dict]: 匹配的指数列表
+        List[Dict]: 匹配的指数列表（按匹配程度排序）
     """
     if not keyword:
         return load_index_base_config()
     
-    keyword_lower = keyword.lower()
-    indices = load_index_base_config()
-    
-    matched = []
-    for idx in indices:
-        code = idx.get('code', '').lower()
-        name = idx.get('name', '').lower()
-        raw_code = idx.get('raw_code', '').lower()
-        
-        if (keyword_lower in code or 
-            keyword_lower in name or 
-            keyword_lower in raw_code):
-            matched.append(idx)
-    
-    return matched
+    from services.search_service import SearchService
+    return [
+        {key: value for key, value in idx.items() if key not in ('score', 'match')}
+        for idx in SearchService.get_index_search_index().search(keyword, limit=None)
+    ]
 
 def get_index_name(code: str) -> str:
     """
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阶段耗时统计
+
+把数据获取（akshare）、数据转换和数据库写入等阶段的耗时记录到进程内的统计表中：
+每个阶段记录调用次数、错误次数、处理行数和最近的耗时样本（用于计算 p50/p95）。
+
+用法：
+    @timed('transform.zt_pool')
+    def _dataframe_to_dict_list(df): ...
+    
+    with stage('fetch.stock_zt_pool_em') as s:
+        df = ak.stock_zt_pool_em(date=date)
+        s.rows = len(df)
+
+- Flask 应用的 /metrics 接口以 Prometheus 文本格式输出统计（render_prometheus）
+- 定时任务执行期间（collect_stages）各阶段的耗时汇总到本次执行记录中
+"""
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# 每个阶段保留的耗时样本数（用于计算分位数）
+SAMPLE_SIZE = 1024
+
+METRIC_PREFIX = 'trading_review_stage'
+
+
+def _percentile(sorted_values, q: float) -> float:
+    """计算已排序样本的分位数（线性插值）"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _count_rows(result) -> int:
+    """根据返回值推断处理行数（列表/DataFrame 取长度，整数直接使用）"""
+    if isinstance(result, bool) or result is None:
+        return 0
+    if isinstance(result, int):
+        return result
+    try:
+        return len(result)
+    except TypeError:
+        return 0
+
+
+class StageStats:
+    """单个阶段的累计统计"""
+    
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+    
+    def add(self, seconds: float, rows: int, error: bool):
+        self.count += 1
+        self.rows += rows
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+        if error:
+            self.errors += 1
+    
+    def to_dict(self) -> Dict:
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'totalSeconds': round(self.total_seconds, 6),
+            'p50': round(_percentile(samples, 0.5), 6),
+            'p95': round(_percentile(samples, 0.95), 6),
+            'max': round(self.max_seconds, 6),
+        }
+
+
+class MetricsRegistry:
+    """进程内阶段统计表（线程安全）"""
+    
+    def __init__(self):
+        self._stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, name: str, seconds: float, rows: int = 0, error: bool = False):
+        """记录一次阶段执行"""
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = StageStats()
+            stats.add(seconds, rows, error)
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """获取所有阶段的统计：阶段名 -> {'count', 'errors', 'rows', 'totalSeconds', 'p50', 'p95', 'max'}"""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stages.items())}
+    
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stages.clear()
+
+
+class StageBreakdown:
+    """一次任务执行期间各阶段的耗时汇总"""
+    
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, timer: 'StageTimer', error: bool):
+        with self._lock:
+            item = self.stages.setdefault(timer.name, {
+                'count': 0, 'seconds': 0.0, 'wallSeconds': 0.0, 'rows': 0, 'errors': 0
+            })
+            item['count'] += 1
+            item['seconds'] += timer.self_seconds
+            item['wallSeconds'] += timer.seconds
+            item['rows'] += int(timer.rows or 0)
+            if error:
+                item['errors'] += 1
+    
+    def to_dict(self) -> Dict[str, Dict]:
+        """
+        阶段名 -> {'count', 'seconds', 'wallSeconds', 'rows', 'errors'}（按自身耗时降序）
+        
+        seconds 为不含嵌套阶段的自身耗时，各阶段的 seconds 相加不会重复计算；
+        wallSeconds 为包含嵌套阶段的总耗时。
+        """
+        with self._lock:
+            items = sorted(self.stages.items(), key=lambda item: item[1]['seconds'], reverse=True)
+            return {
+                name: dict(item, seconds=round(item['seconds'], 3), wallSeconds=round(item['wallSeconds'], 3))
+                for name, item in items
+            }
+    
+    def category_seconds(self) -> Dict[str, float]:
+        """按阶段类别（fetch/transform/db 等，阶段名第一段）汇总自身耗时"""
+        totals: Dict[str, float] = {}
+        for name, item in self.to_dict().items():
+            category = name.split('.', 1)[0]
+            totals[category] = round(totals.get(category, 0.0) + item['seconds'], 3)
+        return totals
+
+
+registry = MetricsRegistry()
+
+_current_breakdown: contextvars.ContextVar[Optional[StageBreakdown]] = contextvars.ContextVar(
+    'stage_breakdown', default=None
+)
+_current_timer: contextvars.ContextVar[Optional['StageTimer']] = contextvars.ContextVar(
+    'stage_timer', default=None
+)
+
+
+class StageTimer:
+    """stage() 返回的计时对象，可在 with 块中设置处理行数"""
+    
+    def __init__(self, name: str, rows: int = 0):
+        self.name = name
+        self.rows = rows
+        self.seconds = 0.0
+        # 嵌套阶段的耗时（用于计算本阶段自身耗时）
+        self.child_seconds = 0.0
+    
+    @property
+    def self_seconds(self) -> float:
+        """不含嵌套阶段的自身耗时"""
+        return max(self.seconds - self.child_seconds, 0.0)
+
+
+@contextmanager
+def stage(name: str, rows: int = 0):
+    """
+    记录 with 块的耗时
+    
+    Args:
+        name: 阶段名，约定为 '类别.名称'，类别为 fetch（接口获取）/ transform（数据转换）/ db（数据库读写）
+        rows: 处理行数（也可以在 with 块中设置 timer.rows）
+    
+    阶段可以嵌套：统计表记录包含嵌套阶段的总耗时，执行汇总中的 seconds 为扣除嵌套阶段后的自身耗时。
+    """
+    timer = StageTimer(name, rows)
+    parent = _current_timer.get()
+    token = _current_timer.set(timer)
+    error = False
+    start = time.perf_counter()
+    try:
+        yield timer
+    except BaseException:
+        error = True
+        raise
+    finally:
+        timer.seconds = time.perf_counter() - start
+        _current_timer.reset(token)
+        if parent is not None:
+            parent.child_seconds += timer.seconds
+        registry.record(name, timer.seconds, int(timer.rows or 0), error)
+        breakdown = _current_breakdown.get()
+        if breakdown is not None:
+            breakdown.record(timer, error)
+
+
+def timed(name: str, rows: Optional[Callable] = None):
+    """
+    记录函数耗时的装饰器
+    
+    Args:
+        name: 阶段名
+        rows: 从返回值计算处理行数的函数，默认按返回值长度（整数返回值直接作为行数）
+    """
+    count_rows = rows or _count_rows
+    
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as timer:
+                result = func(*args, **kwargs)
+                timer.rows = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect_stages():
+    """
+    汇总 with 块（或被装饰的函数）执行期间当前线程内各阶段的耗时
+    
+    可作为装饰器使用，在函数内通过 current_stage_breakdown() 获取汇总结果。
+    """
+    breakdown = StageBreakdown()
+    token = _current_breakdown.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        _current_breakdown.reset(token)
+
+
+def current_stage_breakdown() -> Optional[Dict[str, Dict]]:
+    """获取当前 collect_stages 汇总的各阶段耗时，不在 collect_stages 中时返回None"""
+    breakdown = _current_breakdown.get()
+    return breakdown.to_dict() if breakdown is not None else None
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus() -> str:
+    """以 Prometheus 文本格式输出所有阶段的统计"""
+    snapshot = registry.snapshot()
+    duration = f'{METRIC_PREFIX}_duration_seconds'
+    lines = [
+        f'# HELP {duration} Stage latency in seconds (quantiles over the last {SAMPLE_SIZE} calls).',
+        f'# TYPE {duration} summary',
+    ]
+    for name, stats in snapshot.items():
+        label = f'stage="{_escape_label(name)}"'
+        lines.append(f'{duration}{{{label},quantile="0.5"}} {stats["p50"]}')
+        lines.append(f'{duration}{{{label},quantile="0.95"}} {stats["p95"]}')
+        lines.append(f'{duration}_sum{{{label}}} {stats["totalSeconds"]}')
+        lines.append(f'{duration}_count{{{label}}} {stats["count"]}')
+    
+    for metric, field, help_text in [
+        ('rows_total', 'rows', 'Rows processed by the stage.'),
+        ('errors_total', 'errors', 'Stage calls that raised an exception.'),
+    ]:
+        full_name = f'{METRIC_PREFIX}_{metric}'
+        lines.append(f'# HELP {full_name} {help_text}')
+        lines.append(f'# TYPE {full_name} counter')
+        for name, stats in snapshot.items():
+            lines.append(f'{full_name}{{stage="{_escape_label(name)}"}} {stats[field]}')
+    return '\n'.join(lines) + '\n'
@@ -3,10 +3,20 @@
 """
 数据表格分页工具
 提供通用的分页功能，用于在Streamlit中显示大量数据
+
+- paginate_dataframe / paginate_dataframe_with_size_selector：对已加载的DataFrame分页
+- paginate_query：对数据库查询分页，只查询当前页，总数带缓存，并在后台预取下一页
 """
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
 import streamlit as st
 import pandas as pd
-from typing import Optional
+from typing import Optional, Callable, Tuple
+
+PAGE_SIZE_OPTIONS = [20, 50, 100, 200, 500]
 
 
 def paginate_dataframe(
@@ -100,7 +110,7 @@ def paginate_dataframe(
 def paginate_dataframe_with_size_selector(
     df: pd.DataFrame,
     default_page_size: int = 50,
-    page_size_options: list = [20, 50, 100, 200, 500],
+    page_size_options: list = PAGE_SIZE_OPTIONS,
     key_prefix: str = "pagination",
     show_info: bool = True
 ):
@@ -190,12 +200,22 @@ def show_pagination_controls(
     if df.empty:
         return
     
+    _render_pagination_controls(len(df), page_size, key_prefix, show_info)
+
+
+def _render_pagination_controls(
+    total_rows: int,
+    page_size: int,
+    key_prefix: str = "pagination",
+    show_info: bool = True
+):
+    """根据总行数显示分页控件（DataFrame分页和数据库分页共用）"""
     # 页面大小选择器
     page_size_key = f"{key_prefix}_page_size"
     if page_size_key not in st.session_state:
         st.session_state[page_size_key] = page_size
     
-    page_size_options = [20, 50, 100, 200, 500]
+    page_size_options = PAGE_SIZE_OPTIONS
     
     col_size, _ = st.columns([1, 4])
     with col_size:
@@ -215,7 +235,6 @@ def show_pagination_controls(
     # 使用当前选择的页面大小
     current_page_size = st.session_state[page_size_key]
     
-    total_rows = len(df)
     # 更新总页数（基于当前的页面大小）
     total_pages = (total_rows + current_page_size - 1) // current_page_size if current_page_size > 0 else 1
     
@@ -277,3 +296,170 @@ def show_pagination_controls(
         end_idx = min(start_idx + current_page_size, total_rows)
         st.caption(f"📊 显示第 {start_idx + 1} - {end_idx} 行，共 {total_rows} 行数据")
 
+
+# ==================== 数据库分页 ====================
+
+@dataclass(frozen=True)
+class PageQuery:
+    """
+    数据库分页查询对象
+    
+    Attributes:
+        key: 查询的唯一标识（数据集 + 筛选条件 + 排序），用于缓存总数和页面
+        fetch: fetch(offset, limit) -> DataFrame，只查询一页数据
+        count: count() -> int，查询符合条件的总行数
+    
+    fetch 和 count 会在后台线程中调用，需要自行创建和关闭数据库会话。
+    """
+    key: tuple
+    fetch: Callable[[int, int], pd.DataFrame]
+    count: Callable[[], int]
+
+
+# 页面缓存：(查询标识, offset, limit) -> (创建时间, Future)，包含后台预取的页面
+_PAGE_CACHE_TTL = 60
+_PAGE_CACHE_SIZE = 32
+_page_cache: "OrderedDict[tuple, Tuple[float, Future]]" = OrderedDict()
+_page_cache_lock = threading.Lock()
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='page-prefetch')
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _cached_count(key: tuple, _query: PageQuery) -> int:
+    """查询总行数（按查询标识缓存）"""
+    return int(_query.count())
+
+
+def _get_page_future(query: PageQuery, offset: int, limit: int, submit: bool = True) -> Optional[Future]:
+    """获取页面的 Future（已缓存且未过期时直接返回，否则提交到后台线程）"""
+    cache_key = (query.key, offset, limit)
+    with _page_cache_lock:
+        cached = _page_cache.get(cache_key)
+        if cached is not None:
+            created, future = cached
+            failed = future.done() and future.exception() is not None
+            if time.time() - created <= _PAGE_CACHE_TTL and not failed:
+                _page_cache.move_to_end(cache_key)
+                return future
+            del _page_cache[cache_key]
+        if not submit:
+            return None
+        
+        future = _prefetch_executor.submit(query.fetch, offset, limit)
+        _page_cache[cache_key] = (time.time(), future)
+        while len(_page_cache) > _PAGE_CACHE_SIZE:
+            _page_cache.popitem(last=False)
+        return future
+
+
+def fetch_query_page(query: PageQuery, offset: int, limit: int) -> pd.DataFrame:
+    """
+    获取一页数据（优先使用缓存或后台预取的结果）
+    
+    Args:
+        query: 分页查询对象
+        offset: 起始行
+        limit: 行数
+    """
+    return _get_page_future(query, offset, limit).result()
+
+
+def prefetch_query_page(query: PageQuery, offset: int, limit: int):
+    """在后台预取一页数据（已缓存时不重复查询）"""
+    _get_page_future(query, offset, limit)
+
+
+def clear_query_cache(dataset: Optional[str] = None):
+    """
+    清空数据库分页缓存（数据刷新后调用）
+    
+    Args:
+        dataset: 只清空 key[0] 等于该数据集的页面，None 表示全部
+    """
+    with _page_cache_lock:
+        for cache_key in list(_page_cache):
+            if dataset is None or cache_key[0][:1] == (dataset,):
+                del _page_cache[cache_key]
+    _cached_count.clear()
+
+
+def paginate_query(
+    query: PageQuery,
+    default_page_size: int = 50,
+    page_size_options: list = PAGE_SIZE_OPTIONS,
+    key_prefix: str = "pagination",
+    prefetch_next: bool = True
+) -> Tuple[pd.DataFrame, int, int]:
+    """
+    数据库分页：只查询当前页数据，总数带缓存，并在后台预取下一页
+    与 paginate_dataframe_with_size_selector 使用相同的 session_state 键，
+    显示数据表格后调用 show_query_pagination_controls 显示分页控件。
+    
+    Args:
+        query: 分页查询对象
+        default_page_size: 默认每页显示的行数
+        page_size_options: 可选的页面大小选项
+        key_prefix: 用于session_state的唯一前缀
+        prefetch_next: 是否在后台预取下一页
+    
+    Returns:
+        (当前页的DataFrame, 当前页面大小, 总行数)
+    """
+    # 获取或初始化页面大小
+    page_size_key = f"{key_prefix}_page_size"
+    if page_size_key not in st.session_state:
+        st.session_state[page_size_key] = default_page_size
+    
+    page_size = st.session_state[page_size_key]
+    if page_size not in page_size_options:
+        page_size = default_page_size
+        st.session_state[page_size_key] = page_size
+    
+    # 查询条件变化时回到第一页
+    page_key = f"{key_prefix}_page"
+    query_key = f"{key_prefix}_query_key"
+    if st.session_state.get(query_key) != query.key:
+        st.session_state[query_key] = query.key
+        st.session_state[page_key] = 1
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    
+    total_rows = _cached_count(query.key, query)
+    total_pages = max((total_rows + page_size - 1) // page_size, 1)
+    
+    # 确保当前页在有效范围内
+    current_page = min(max(st.session_state[page_key], 1), total_pages)
+    st.session_state[page_key] = current_page
+    
+    if total_rows == 0:
+        return pd.DataFrame(), page_size, 0
+    
+    offset = (current_page - 1) * page_size
+    df_page = fetch_query_page(query, offset, page_size)
+    
+    # 后台预取下一页，翻页时直接使用
+    if prefetch_next and offset + page_size < total_rows:
+        prefetch_query_page(query, offset + page_size, page_size)
+    
+    return df_page, page_size, total_rows
+
+
+def show_query_pagination_controls(
+    total_rows: int,
+    page_size: int,
+    key_prefix: str = "pagination",
+    show_info: bool = True
+):
+    """
+    显示数据库分页的分页控件（与 show_pagination_controls 相同的控件）
+    
+    Args:
+        total_rows: paginate_query 返回的总行数
+        page_size: 当前每页显示的行数
+        key_prefix: 用于session_state的唯一前缀
+        show_info: 是否显示分页信息
+    """
+    if total_rows <= 0:
+        return
+    
+    _render_pagination_controls(total_rows, page_size, key_prefix, show_info)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+代码/名称/拼音首字母的内存搜索索引（输入联想使用）
+
+每个条目索引以下键（统一转为小写、全角转半角）：
+- 代码：code、raw_code（如 000001、sh000001）
+- 名称：name（如 上证指数）
+- 拼音：首字母（szzs）和全拼（shangzhengzhishu），需要安装 pypinyin，未安装时只索引代码和名称
+
+查询时依次匹配：完全匹配 > 代码前缀 > 名称前缀 > 拼音前缀 > 子串 > 模糊匹配（二元组相似度），
+前缀匹配使用有序键列表二分查找，子串和模糊匹配使用 n-gram 倒排索引，不再逐条扫描。
+"""
+import bisect
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # 可选依赖：未安装时不支持拼音搜索
+    Style = None
+    lazy_pinyin = None
+
+# 各匹配方式的得分
+SCORE_EXACT = 100.0
+SCORE_CODE_PREFIX = 90.0
+SCORE_NAME_PREFIX = 85.0
+SCORE_PINYIN_PREFIX = 75.0
+SCORE_SUBSTRING = 60.0
+SCORE_FUZZY = 40.0
+
+# 模糊匹配的最低二元组相似度（Dice 系数）
+FUZZY_THRESHOLD = 0.3
+# 模糊匹配最多计算相似度的候选数（按共有二元组数选取）
+FUZZY_CANDIDATES = 200
+
+# 每种匹配方式至少收集的候选数（候选不超过该数时全部参与排序）
+MIN_BUDGET = 200
+
+# 键类型 -> 前缀匹配得分
+PREFIX_SCORES = {
+    'code': SCORE_CODE_PREFIX,
+    'name': SCORE_NAME_PREFIX,
+    'initials': SCORE_PINYIN_PREFIX,
+    'pinyin': SCORE_PINYIN_PREFIX,
+}
+
+
+def normalize(text) -> str:
+    """统一为小写半角字符（Ａ股指数 -> a股指数），去除首尾空白"""
+    return unicodedata.normalize('NFKC', str(text or '')).strip().lower()
+
+
+def pinyin_keys(name: str) -> Tuple[str, str]:
+    """名称的拼音首字母和全拼（未安装 pypinyin 时返回空字符串）"""
+    if lazy_pinyin is None or not name:
+        return '', ''
+    syllables = lazy_pinyin(name, errors='ignore')
+    initials = lazy_pinyin(name, style=Style.FIRST_LETTER, errors='ignore')
+    return normalize(''.join(initials)), normalize(''.join(syllables))
+
+
+def _grams(text: str, n: int = 2) -> Set[str]:
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    """
+    不可变的搜索索引（构建后只读，可在多线程间共享）
+    
+    用法：
+        index = SearchIndex([{'code': '000001', 'name': '上证指数'}, ...])
+        index.search('szzs')  # [{'code': '000001', 'name': '上证指数', 'score': 100.0, 'match': 'initials'}]
+    """
+    
+    def __init__(self, entries: Iterable[Dict], code_fields: Tuple[str, ...] = ('code', 'raw_code'),
+                 name_field: str = 'name'):
+        self.entries: List[Dict] = list(entries)
+        # 有序键列表：(键, 条目序号, 键类型)
+        self._keys: List[Tuple[str, int, str]] = []
+        # 条目序号 -> {键类型: 键}，以及名称和拼音首字母的二元组（模糊匹配使用）
+        self._entry_keys: List[Dict[str, str]] = []
+        self._entry_grams: List[List[Set[str]]] = []
+        # 单字和二元组 -> 条目序号
+        self._unigrams: Dict[str, Set[int]] = {}
+        self._bigrams: Dict[str, Set[int]] = {}
+        
+        for entry_id, entry in enumerate(self.entries):
+            keys = {}
+            codes = [normalize(entry.get(field)) for field in code_fields if entry.get(field)]
+            name = normalize(entry.get(name_field))
+            initials, full_pinyin = pinyin_keys(name)
+            for key_type, key in [('code', code) for code in codes] + [
+                ('name', name), ('initials', initials), ('pinyin', full_pinyin)
+            ]:
+                if not key:
+                    continue
+                self._keys.append((key, entry_id, key_type))
+                keys.setdefault(key_type, key)
+                if key_type == 'pinyin':
+                    continue
+                for gram in _grams(key, 1):
+                    self._unigrams.setdefault(gram, set()).add(entry_id)
+                for gram in _grams(key, 2):
+                    self._bigrams.setdefault(gram, set()).add(entry_id)
+            self._entry_keys.append(keys)
+            self._entry_grams.append([_grams(keys[key_type]) for key_type in ('name', 'initials') if keys.get(key_type)])
+        self._keys.sort()
+        self._key_strings = [key for key, _, _ in self._keys]
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def search(self, query: str, limit: Optional[int] = 10) -> List[Dict]:
+        """
+        搜索条目
+        
+        Args:
+            query: 代码、名称、拼音首字母或全拼的任意部分
+            limit: 最多返回的条目数，None 表示全部
+        
+        Returns:
+            条目副本列表，增加 'score'（匹配得分）和 'match'（匹配的键类型），按得分降序、名称长度升序
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        # 每种匹配方式最多收集的候选数（避免单字符查询收集全部条目后再排序）
+        budget = max(limit * 4, MIN_BUDGET) if limit else None
+        scores: Dict[int, Tuple[float, str]] = {}
+        
+        def add(entry_id: int, score: float, match: str):
+            if score > scores.get(entry_id, (0.0, ''))[0]:
+                scores[entry_id] = (score, match)
+        
+        # 完全匹配和前缀匹配：有序键列表中 [query, query + '\uffff') 的范围
+        start = bisect.bisect_left(self._key_strings, query)
+        end = bisect.bisect_left(self._key_strings, query + '\uffff', lo=start)
+        collected: Dict[str, int] = {}
+        for key, entry_id, key_type in self._keys[start:end]:
+            if budget and collected.get(key_type, 0) >= budget:
+                continue
+            collected[key_type] = collected.get(key_type, 0) + 1
+            add(entry_id, SCORE_EXACT if key == query else PREFIX_SCORES[key_type], key_type)
+        
+        # 前缀匹配已足够时不再匹配子串（子串和模糊匹配的得分都低于前缀匹配）
+        if limit and len(scores) >= limit:
+            return self._ranked(scores, limit)
+        
+        # 子串匹配：各 n-gram 倒排列表求交集后校验
+        postings = self._unigrams if len(query) == 1 else self._bigrams
+        grams = _grams(query, 1 if len(query) == 1 else 2)
+        candidate_lists = sorted((postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*candidate_lists) if candidate_lists and candidate_lists[0] else set()
+        matched = 0
+        for entry_id in sorted(candidates):
+            if budget and matched >= budget:
+                break
+            if entry_id in scores:
+                continue
+            keys = self._entry_keys[entry_id]
+            match = next((key_type for key_type in ('code', 'name', 'initials') if query in keys.get(key_type, '')), None)
+            if match:
+                add(entry_id, SCORE_SUBSTRING, match)
+                matched += 1
+        
+        # 模糊匹配：结果不足时按二元组相似度补充（容忍错字、漏字）
+        if len(query) >= 2 and (not limit or len(scores) < limit):
+            query_grams = _grams(query)
+            overlap = Counter()
+            for gram in query_grams:
+                overlap.update(self._bigrams.get(gram, ()))
+            # 只计算共有二元组最多的候选的相似度
+            for entry_id, _ in overlap.most_common(FUZZY_CANDIDATES):
+                if entry_id in scores:
+                    continue
+                best = max((
+                    2.0 * len(query_grams & key_grams) / (len(query_grams) + len(key_grams))
+                    for key_grams in self._entry_grams[entry_id]
+                ), default=0.0)
+                if best >= FUZZY_THRESHOLD:
+                    add(entry_id, round(SCORE_FUZZY * best, 2), 'fuzzy')
+        
+        return self._ranked(scores, limit)
+    
+    def _ranked(self, scores: Dict[int, Tuple[float, str]], limit: Optional[int]) -> List[Dict]:
+        """按得分降序、名称长度升序排列，返回条目副本"""
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (-item[1][0], len(self._entry_keys[item[0]].get('name', '')), item[0])
+        )
+        if limit:
+            ranked = ranked[:limit]
+        return [
+            {**self.entries[entry_id], 'score': score, 'match': match}
+            for entry_id, (score, match) in ranked
+        ]
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+板块轮动计算工具（向量化）
+
+将板块历史数据转换为 日期×板块 的稠密矩阵，
+并在矩阵上一次性计算滚动累计涨幅、排名、排名变化、连续涨跌天数和Z分数，
+避免逐个板块循环计算。
+"""
+from typing import Dict, List, Iterable, Optional
+from datetime import date
+import numpy as np
+
+# 支持的指标
+METRICS = ['change_percent', 'net_inflow', 'up_ratio']
+
+class SectorMatrix:
+    """
+    日期×板块 指标矩阵
+    
+    - dates: 日期列表（升序）
+    - names: 板块名称列表
+    - values: 指标名 -> ndarray(shape=(len(dates), len(names)))，缺失值为 NaN
+    """
+    
+    def __init__(self, dates: List[date] = None, names: List[str] = None, values: Dict[str, np.ndarray] = None):
+        self.dates = list(dates or [])
+        self.names = list(names or [])
+        self.name_index = {name: i for i, name in enumerate(self.names)}
+        self.values = values or {metric: np.full((len(self.dates), len(self.names)), np.nan) for metric in METRICS}
+        # 数据版本（最后一次写入时间），用于判断缓存是否需要刷新
+        self.version = None
+        # 各日期的数据版本：日期 -> (行数, 最后写入时间)，用于找出需要重新加载的日期
+        self.date_versions: Dict[date, tuple] = {}
+    
+    @property
+    def last_date(self) -> Optional[date]:
+        """矩阵中最新的日期"""
+        return self.dates[-1] if self.dates else None
+    
+    def append_rows(self, rows: Iterable[tuple]) -> int:
+        """
+        追加新日期的数据（增量扩展矩阵）
+        
+        Args:
+            rows: (date, name, change_percent, net_inflow, up_count, down_count) 元组序列，
+                  只应包含晚于 last_date 的日期
+        
+        Returns:
+            新增的日期数
+        """
+        rows = [row for row in rows if self.last_date is None or row[0] > self.last_date]
+        if not rows:
+            return 0
+        
+        new_dates = sorted({row[0] for row in rows})
+        date_pos = {d: len(self.dates) + i for i, d in enumerate(new_dates)}
+        
+        # 新出现的板块追加为新列
+        new_names = [name for name in dict.fromkeys(row[1] for row in rows) if name not in self.name_index]
+        for name in new_names:
+            self.name_index[name] = len(self.names)
+            self.names.append(name)
+        
+        n_dates = len(self.dates) + len(new_dates)
+        n_names = len(self.names)
+        for metric in METRICS:
+            old = self.values[metric]
+            grown = np.full((n_dates, n_names), np.nan)
+            grown[:old.shape[0], :old.shape[1]] = old
+            self.values[metric] = grown
+        
+        row_idx = np.fromiter((date_pos[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        col_idx = np.fromiter((self.name_index[row[1]] for row in rows), dtype=np.int64, count=len(rows))
+        raw = np.array([row[2:6] for row in rows], dtype=float)
+        
+        self.values['change_percent'][row_idx, col_idx] = raw[:, 0]
+        self.values['net_inflow'][row_idx, col_idx] = raw[:, 1]
+        up_down = raw[:, 2] + raw[:, 3]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.values['up_ratio'][row_idx, col_idx] = np.where(up_down > 0, raw[:, 2] / up_down, np.nan)
+        
+        self.dates.extend(new_dates)
+        return len(new_dates)
+    
+    def drop_last(self, n: int = 1):
+        """删除最近 n 个日期（用于重新加载被覆盖的最新数据）"""
+        if n > 0 and self.dates:
+            n = min(n, len(self.dates))
+            self.dates = self.dates[:-n]
+            for metric in METRICS:
+                self.values[metric] = self.values[metric][:-n]
+    
+    def trim(self, max_dates: int):
+        """只保留最近 max_dates 个日期"""
+        if len(self.dates) > max_dates:
+            drop = len(self.dates) - max_dates
+            self.dates = self.dates[drop:]
+            for metric in METRICS:
+                self.values[metric] = self.values[metric][drop:]
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """沿日期轴计算滚动求和（NaN 视为 0），前 window-1 行使用已有数据求和"""
+    filled = np.nan_to_num(values, nan=0.0)
+    cumsum = np.cumsum(filled, axis=0)
+    result = cumsum.copy()
+    if window < len(values):
+        result[window:] = cumsum[window:] - cumsum[:-window]
+    return result
+
+def rolling_return(change_percent: np.ndarray, window: int) -> np.ndarray:
+    """
+    滚动 N 日累计涨幅(%)（复利）
+    
+    累计涨幅 = exp(sum(log(1 + r/100))) - 1
+    """
+    log_returns = np.log1p(change_percent / 100.0)
+    result = np.expm1(rolling_sum(log_returns, window)) * 100.0
+    # 窗口内完全没有数据的位置保持 NaN
+    result[rolling_sum(~np.isnan(change_percent), window) == 0] = np.nan
+    return result
+
+def rank_rows(values: np.ndarray, descending: bool = True) -> np.ndarray:
+    """
+    按行（每个日期）对板块排名，1 为第一名，NaN 排名为 NaN
+    """
+    filled = np.where(np.isnan(values), -np.inf if descending else np.inf, values)
+    order = np.argsort(-filled if descending else filled, axis=1, kind='stable')
+    ranks = np.empty_like(order, dtype=float)
+    np.put_along_axis(ranks, order, np.arange(1, values.shape[1] + 1, dtype=float)[None, :].repeat(values.shape[0], axis=0), axis=1)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+def rank_change(ranks: np.ndarray, lag: int = 1) -> np.ndarray:
+    """排名变化（正数表示排名上升），与 lag 天前的排名比较"""
+    change = np.full_like(ranks, np.nan)
+    if lag < len(ranks):
+        change[lag:] = ranks[:-lag] - ranks[lag:]
+    return change
+
+def streaks(values: np.ndarray) -> np.ndarray:
+    """
+    连续上涨/下跌天数（正数为连续上涨天数，负数为连续下跌天数，0 表示持平或无数据）
+    """
+    signs = np.sign(np.nan_to_num(values, nan=0.0))
+    n_dates = len(signs)
+    if n_dates == 0:
+        return signs
+    steps = np.arange(n_dates)[:, None]
+    changed = np.ones_like(signs, dtype=bool)
+    changed[1:] = signs[1:] != signs[:-1]
+    # 每个位置所在连续区间的起点
+    run_start = np.maximum.accumulate(np.where(changed, steps, 0), axis=0)
+    return (steps - run_start + 1) * signs
+
+def rolling_zscore(values: np.ndarray, window: int) -> np.ndarray:
+    """当日数值相对最近 window 日均值和标准差的Z分数"""
+    valid = ~np.isnan(values)
+    count = rolling_sum(valid, window)
+    total = rolling_sum(values, window)
+    total_sq = rolling_sum(np.where(valid, values, 0.0) ** 2, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = total_sq / count - mean ** 2
+        std = np.sqrt(np.clip(var, 0, None))
+        z = (values - mean) / std
+    z[(count < 2) | (std == 0)] = np.nan
+    return z
+
+def compute_rotation(matrix: SectorMatrix, window: int = 5) -> Dict[str, np.ndarray]:
+    """
+    在矩阵上计算板块轮动指标
+    
+    Returns:
+        指标名 -> ndarray(shape=(len(dates), len(names)))：
+        - cum_return: 滚动 N 日累计涨幅(%)
+        - rank: 累计涨幅排名
+        - rank_change: 相对上一日的排名变化
+        - streak: 连续涨跌天数
+        - zscore: 当日涨跌幅Z分数
+        - net_inflow_sum: 滚动 N 日净流入合计
+        - up_ratio: 上涨家数占比
+    """
+    change = matrix.values['change_percent']
+    cum_return = rolling_return(change, window)
+    ranks = rank_rows(cum_return)
+    return {
+        'cum_return': cum_return,
+        'rank': ranks,
+        'rank_change': rank_change(ranks),
+        'streak': streaks(change),
+        'zscore': rolling_zscore(change, window),
+        'net_inflow_sum': rolling_sum(matrix.values['net_inflow'], window),
+        'up_ratio': matrix.values['up_ratio'],
+    }
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表格显示格式化工具
+
+- 保留数值类型，通过 st.column_config 的数字格式控制显示，不再逐个单元格转换为字符串
+- 涨跌颜色通过 numpy 向量化比较一次性计算，在一次 Styler 调用中应用
+- 按 (数据集, 日期) 缓存处理后的表格和样式
+"""
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# 常用数字格式（printf 风格，与 st.column_config.NumberColumn 一致）
+NUMBER_FORMATS = {
+    'price': '%.2f',  # 价格：12.34
+    'number': '%.2f',  # 普通数值：12.34
+    'signed': '%+.2f',  # 带符号数值：+1.23
+    'percent': '%.2f%%',  # 百分比：1.23%
+    'signed_percent': '%+.2f%%',  # 带符号百分比：+1.23%
+    'integer': '%d',  # 整数：123
+    'wan': '%.2f万',  # 已换算为万的数值：1.23万
+    'yi': '%.2f亿',  # 已换算为亿的数值：1.23亿
+}
+
+# 整行涨跌样式：上涨红色背景，下跌绿色背景
+ROW_STYLE_UP = 'background-color: #ef4444; color: #ffffff;'
+ROW_STYLE_DOWN = 'background-color: #10b981; color: #ffffff;'
+
+def _resolve_format(fmt: str) -> str:
+    """格式名转换为 printf 格式（直接传入 printf 格式时原样返回）"""
+    return NUMBER_FORMATS.get(fmt, fmt)
+
+def scale_columns(df: pd.DataFrame, scales: Dict[str, float]) -> pd.DataFrame:
+    """
+    按列整体换算单位（如元 -> 万元），保持数值类型
+    
+    Args:
+        df: 数据
+        scales: 列名 -> 除数
+    """
+    df = df.copy()
+    for col, divisor in scales.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce') / divisor
+    return df
+
+def build_column_config(df: pd.DataFrame, formats: Dict[str, str]) -> Dict:
+    """根据格式映射生成 st.dataframe 的 column_config（只包含存在的列）"""
+    return {
+        col: st.column_config.NumberColumn(col, format=_resolve_format(fmt))
+        for col, fmt in formats.items()
+        if col in df.columns
+    }
+
+def sign_row_styles(values, n_cols: int, up_style: str = ROW_STYLE_UP, down_style: str = ROW_STYLE_DOWN) -> np.ndarray:
+    """
+    根据一列数值的正负生成整行样式矩阵（向量化）
+    
+    Args:
+        values: 判断涨跌的数值（长度等于行数）
+        n_cols: 表格列数
+    
+    Returns:
+        shape=(行数, n_cols) 的 CSS 字符串矩阵
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    row_styles = np.where(values > 0, up_style, np.where(values < 0, down_style, ''))
+    return np.repeat(row_styles[:, None], n_cols, axis=1)
+
+@st.cache_data(ttl=300, max_entries=64)
+def prepare_table(
+    dataset: str,
+    data_date,
+    _df: pd.DataFrame,
+    sign_column: Optional[str] = None,
+    scales: Optional[Dict[str, float]] = None,
+    version=None
+) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """
+    预处理表格（带缓存，按 数据集 + 日期 + version 缓存，_df 不参与哈希）
+    
+    Args:
+        dataset: 数据集名称（缓存键）
+        data_date: 数据日期（缓存键）
+        _df: 要显示的数据
+        sign_column: 按该列的正负为整行着色，None 表示不着色
+        scales: 单位换算，列名 -> 除数
+        version: 可选的数据版本（同一日期数据会变化时传入，如行数或更新时间）
+    
+    Returns:
+        (换算后的数据, 样式矩阵或None)
+    """
+    df = scale_columns(_df, scales) if scales else _df.copy()
+    styles = sign_row_styles(df[sign_column], len(df.columns)) if sign_column and sign_column in df.columns else None
+    return df, styles
+
+def render_table(
+    df: pd.DataFrame,
+    formats: Optional[Dict[str, str]] = None,
+    styles: Optional[np.ndarray] = None,
+    **dataframe_kwargs
+):
+    """
+    显示表格：数值列按 formats 格式化，styles 不为空时一次性应用样式
+    
+    Args:
+        df: 数据（数值列保持数值类型）
+        formats: 列名 -> 格式名（NUMBER_FORMATS 的键）或 printf 格式
+        styles: sign_row_styles 生成的样式矩阵
+        **dataframe_kwargs: 传给 st.dataframe 的其他参数
+    """
+    formats = formats or {}
+    column_config = build_column_config(df, formats)
+    column_config.update(dataframe_kwargs.pop('column_config', None) or {})
+    
+    data = df
+    if styles is not None:
+        # 样式矩阵已预先计算，这里只做一次 Styler 调用；同时设置显示格式，保证带样式时格式一致
+        printf_formats = {col: _resolve_format(fmt) for col, fmt in formats.items() if col in df.columns}
+        data = df.style.apply(lambda _: styles, axis=None).format(
+            {col: (lambda v, f=fmt: f % v if pd.notna(v) else '') for col, fmt in printf_formats.items()}
+        )
+    
+    st.dataframe(data, column_config=column_config, **dataframe_kwargs)
+
+def render_cached_table(
+    dataset: str,
+    data_date,
+    df: pd.DataFrame,
+    formats: Optional[Dict[str, str]] = None,
+    sign_column: Optional[str] = None,
+    scales: Optional[Dict[str, float]] = None,
+    version=None,
+    **dataframe_kwargs
+):
+    """
+    按 (数据集, 日期) 缓存预处理结果并显示表格
+    
+    未指定 version 时使用数据内容的哈希（向量化计算），数据变化后自动重新处理。
+    """
+    if version is None:
+        version = int(pd.util.hash_pandas_object(df, index=False).sum())
+    prepared, styles = prepare_table(dataset, data_date, df, sign_column, scales, version)
+    render_table(prepared, formats, styles, **dataframe_kwargs)
@@ -224,3 +224,32 @@ def filter_trading_days(df, date_column: str = 'date'):
         print(f"⚠️  过滤交易日时出错: {str(e)}")
         return df
 
+
+def get_trading_days(start_date: date, end_date: date) -> list:
+    """
+    获取日期范围内的交易日列表（基于akshare交易日历，升序）
+    
+    :param start_date: 开始日期
+    :param end_date: 结束日期
+    :return: 交易日date对象列表；无法获取交易日历时退化为范围内的工作日
+    """
+    try:
+        import akshare as ak
+        import pandas as pd
+        
+        # 获取交易日历
+        trade_dates = ak.tool_trade_date_hist_sina()
+        if trade_dates is not None and not trade_dates.empty:
+            dates = pd.to_datetime(trade_dates['trade_date']).dt.date
+            return sorted(d for d in dates if start_date <= d <= end_date)
+    except Exception as e:
+        print(f"⚠️  获取交易日历失败，使用工作日代替: {str(e)}")
+    
+    from datetime import timedelta
+    days = []
+    current = start_date
+    while current <= end_date:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days